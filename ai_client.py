@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente de IA compartido por todo el proceso.
+
+Centraliza el acceso a OpenAI para que los módulos que usan AIExpert no vuelvan a
+leer .streamlit/secrets.toml ni creen un cliente nuevo en cada llamada:
+
+- La configuración (API key, modelo y asistente) se lee una sola vez.
+- Se reutiliza un único cliente OpenAI, y con él su pool de conexiones HTTP.
+- Las solicitudes se ejecutan en un pool de hilos con concurrencia limitada y
+  un límite compartido de solicitudes por minuto.
+- Las solicitudes idénticas en curso (mismo modelo, mensajes y parámetros)
+  comparten una única llamada a la API.
+- Las ejecuciones de asistentes se esperan con backoff exponencial y un plazo
+  total, reutilizando un thread por sesión (por ejemplo, por símbolo) y con una
+  sola ejecución activa por thread.
+
+Uso:
+    from ai_client import get_ai_client
+
+    client = get_ai_client()
+    texto = client.complete("Resume esta noticia ...", max_tokens=250)
+    textos = client.complete_many(["prompt 1", "prompt 2"])
+    texto = await client.complete_async("prompt")
+"""
+
+import os
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Intentar importar OpenAI
+try:
+    import openai
+
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+    logger.warning("OpenAI no está instalado. El cliente de IA no estará disponible.")
+
+SECRETS_PATH = os.path.join(".streamlit", "secrets.toml")
+DEFAULT_MODEL = "gpt-4"
+DEFAULT_SYSTEM_PROMPT = "Eres un experto en análisis financiero y trading."
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_TIMEOUT = 120
+
+# Espera de ejecuciones de asistentes: backoff exponencial con plazo total
+RUN_TERMINAL_STATUSES = ("completed", "failed", "cancelled", "expired", "incomplete")
+# Estados en los que el asistente espera al cliente (por ejemplo, salidas de herramientas)
+RUN_ACTION_STATUSES = ("requires_action",)
+RUN_POLL_INITIAL = 0.25
+RUN_POLL_MAX = 2.0
+RUN_POLL_FACTOR = 1.6
+DEFAULT_RUN_TIMEOUT = 60
+
+_config: Optional[Dict[str, Any]] = None
+_config_lock = threading.Lock()
+_client_instance = None
+_client_lock = threading.Lock()
+
+
+def load_ai_config(secrets_path: str = SECRETS_PATH) -> Dict[str, Any]:
+    """
+    Lee la configuración de IA desde secrets.toml y variables de entorno
+
+    Args:
+        secrets_path (str): Ruta del archivo de secretos
+
+    Returns:
+        Dict[str, Any]: Configuración con api_key, model, assistant_id, max_concurrency
+            y requests_per_minute
+    """
+    config = {
+        "api_key": None,
+        "model": DEFAULT_MODEL,
+        "assistant_id": None,
+        "max_concurrency": DEFAULT_MAX_CONCURRENCY,
+        "requests_per_minute": DEFAULT_REQUESTS_PER_MINUTE,
+    }
+
+    try:
+        if os.path.exists(secrets_path):
+            import toml
+
+            secrets = toml.load(secrets_path)
+            openai_section = secrets.get("openai", {})
+            api_keys_section = secrets.get("api_keys", {})
+
+            # Buscar API key en las mismas ubicaciones que openai_credentials.py
+            config["api_key"] = (
+                openai_section.get("api_key")
+                or secrets.get("OPENAI_API_KEY")
+                or api_keys_section.get("OPENAI_API_KEY")
+            )
+            config["model"] = (
+                secrets.get("OPENAI_API_MODEL")
+                or openai_section.get("model")
+                or api_keys_section.get("OPENAI_API_MODEL")
+                or DEFAULT_MODEL
+            )
+            config["assistant_id"] = secrets.get("ASSISTANT_ID") or openai_section.get(
+                "assistant_id"
+            )
+            if "AI_MAX_CONCURRENCY" in secrets:
+                config["max_concurrency"] = int(secrets["AI_MAX_CONCURRENCY"])
+            if "AI_REQUESTS_PER_MINUTE" in secrets:
+                config["requests_per_minute"] = int(secrets["AI_REQUESTS_PER_MINUTE"])
+    except Exception as e:
+        logger.warning(f"Error cargando configuración de IA desde secrets.toml: {str(e)}")
+
+    # Variables de entorno como respaldo
+    if not config["api_key"]:
+        config["api_key"] = os.environ.get("OPENAI_API_KEY")
+    if "OPENAI_API_MODEL" in os.environ and config["model"] == DEFAULT_MODEL:
+        config["model"] = os.environ["OPENAI_API_MODEL"]
+    if not config["assistant_id"]:
+        config["assistant_id"] = os.environ.get("ASSISTANT_ID")
+    if "AI_MAX_CONCURRENCY" in os.environ:
+        config["max_concurrency"] = int(os.environ["AI_MAX_CONCURRENCY"])
+    if "AI_REQUESTS_PER_MINUTE" in os.environ:
+        config["requests_per_minute"] = int(os.environ["AI_REQUESTS_PER_MINUTE"])
+
+    config["max_concurrency"] = max(1, config["max_concurrency"])
+    return config
+
+
+def get_ai_config() -> Dict[str, Any]:
+    """
+    Devuelve la configuración de IA del proceso, leyéndola solo la primera vez
+
+    Returns:
+        Dict[str, Any]: Configuración de IA
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = load_ai_config()
+                logger.info(
+                    f"Configuración de IA cargada (modelo: {_config['model']}, "
+                    f"asistente: {'sí' if _config['assistant_id'] else 'no'})"
+                )
+    return _config
+
+
+class RateLimiter:
+    """
+    Limitador de solicitudes por minuto (cubo de tokens) seguro entre hilos
+    """
+
+    def __init__(self, requests_per_minute: int):
+        """
+        Inicializa el limitador
+
+        Args:
+            requests_per_minute (int): Solicitudes permitidas por minuto (0 = sin límite)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, min(float(requests_per_minute), 10.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Espera hasta que haya un token disponible
+
+        Returns:
+            float: Segundos esperados
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class AIClient:
+    """
+    Cliente de IA con concurrencia limitada y agrupación de solicitudes en curso
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, client=None):
+        """
+        Inicializa el cliente
+
+        Args:
+            config (Optional[Dict[str, Any]]): Configuración de IA (por defecto get_ai_config())
+            client: Cliente OpenAI ya inicializado (opcional)
+        """
+        self.config = config or get_ai_config()
+        self.model = self.config.get("model", DEFAULT_MODEL)
+        self.assistant_id = self.config.get("assistant_id")
+        self.max_concurrency = self.config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        self.rate_limiter = RateLimiter(
+            self.config.get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE)
+        )
+        self.client = client
+
+        if self.client is None and OPENAI_AVAILABLE and self.config.get("api_key"):
+            try:
+                openai.api_key = self.config["api_key"]
+                self.client = openai.OpenAI(api_key=self.config["api_key"])
+                logger.info("Cliente OpenAI compartido inicializado")
+            except Exception as e:
+                logger.warning(f"Error inicializando cliente OpenAI: {str(e)}")
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="ai-client"
+        )
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._session_threads: Dict[str, str] = {}
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        self._threads_lock = threading.Lock()
+        self.stats = {"requests": 0, "coalesced": 0, "errors": 0, "runs": 0, "run_timeouts": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        """Incrementa un contador de stats (se actualizan desde varios hilos)"""
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    @property
+    def available(self) -> bool:
+        """Indica si hay un cliente OpenAI utilizable"""
+        return self.client is not None
+
+    @staticmethod
+    def _request_key(model: str, messages: List[Dict[str, str]], **params) -> str:
+        """
+        Calcula la clave que identifica una solicitud para agruparla con otras iguales
+
+        Args:
+            model (str): Modelo
+            messages (List[Dict[str, str]]): Mensajes enviados
+            **params: Resto de parámetros de la solicitud
+
+        Returns:
+            str: Hash SHA-256 de la solicitud
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _call(self, client, model: str, messages: List[Dict[str, str]], params: Dict) -> str:
+        """Ejecuta la llamada a la API (se ejecuta en el pool de hilos)"""
+        self.rate_limiter.acquire()
+        response = client.chat.completions.create(
+            model=model, messages=messages, **params
+        )
+        return response.choices[0].message.content
+
+    def submit(
+        self,
+        prompt: str,
+        max_tokens: int = 250,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+        client=None,
+    ) -> Future:
+        """
+        Envía una solicitud de chat sin bloquear
+
+        Si ya hay en curso una solicitud idéntica, se devuelve su Future en lugar de
+        hacer una llamada nueva.
+
+        Args:
+            prompt (str): Texto del usuario
+            max_tokens (int): Número máximo de tokens en la respuesta
+            system_prompt (str): Mensaje de sistema
+            temperature (float): Temperatura
+            model (Optional[str]): Modelo (por defecto el configurado)
+            client: Cliente OpenAI alternativo (por ejemplo el de st.session_state)
+
+        Returns:
+            Future: Future con el texto de la respuesta
+        """
+        client = client or self.client
+        if client is None:
+            raise RuntimeError("Cliente OpenAI no disponible")
+
+        model = model or self.model
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+        params = {"temperature": temperature, "max_tokens": max_tokens}
+        key = self._request_key(model, messages, **params)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._count("coalesced")
+                logger.debug("Solicitud de IA agrupada con otra idéntica en curso")
+                return future
+
+            future = self._executor.submit(self._call, client, model, messages, params)
+            self._inflight[key] = future
+            self._count("requests")
+
+        def _release(done: Future, key=key):
+            with self._inflight_lock:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            if done.exception() is not None:
+                self._count("errors")
+
+        future.add_done_callback(_release)
+        return future
+
+    def complete(self, prompt: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> str:
+        """
+        Envía una solicitud y espera la respuesta
+
+        Args:
+            prompt (str): Texto del usuario
+            timeout (float): Tiempo máximo de espera en segundos
+            **kwargs: Parámetros de submit()
+
+        Returns:
+            str: Texto de la respuesta
+        """
+        return self.submit(prompt, **kwargs).result(timeout=timeout)
+
+    def complete_many(
+        self, prompts: List[str], timeout: float = DEFAULT_TIMEOUT, **kwargs
+    ) -> List[Optional[str]]:
+        """
+        Envía varias solicitudes en paralelo y devuelve las respuestas en el mismo orden
+
+        Args:
+            prompts (List[str]): Textos del usuario
+            timeout (float): Tiempo máximo de espera por solicitud en segundos
+            **kwargs: Parámetros de submit()
+
+        Returns:
+            List[Optional[str]]: Respuestas (None en las que fallaron)
+        """
+        futures = [self.submit(prompt, **kwargs) for prompt in prompts]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception as e:
+                logger.error(f"Error en solicitud de IA: {str(e)}")
+                results.append(None)
+        return results
+
+    async def complete_async(self, prompt: str, **kwargs) -> str:
+        """
+        Versión asíncrona de complete() para usar desde corrutinas
+
+        Args:
+            prompt (str): Texto del usuario
+            **kwargs: Parámetros de submit()
+
+        Returns:
+            str: Texto de la respuesta
+        """
+        return await asyncio.wrap_future(self.submit(prompt, **kwargs))
+
+    def get_session_thread(self, session_key: str, client=None) -> str:
+        """
+        Devuelve el thread asociado a una sesión, creándolo si no existe
+
+        Args:
+            session_key (str): Clave de la sesión (por ejemplo, el símbolo)
+            client: Cliente OpenAI alternativo
+
+        Returns:
+            str: ID del thread
+        """
+        client = client or self.client
+        with self._threads_lock:
+            thread_id = self._session_threads.get(session_key)
+            if not thread_id:
+                thread_id = client.beta.threads.create().id
+                self._session_threads[session_key] = thread_id
+                logger.info(f"Nuevo thread creado para la sesión {session_key}: {thread_id}")
+            return thread_id
+
+    def _forget_session_thread(self, session_key: str, thread_id: str) -> None:
+        """Olvida el thread de una sesión para que la siguiente consulta cree uno nuevo"""
+        with self._threads_lock:
+            if self._session_threads.get(session_key) == thread_id:
+                del self._session_threads[session_key]
+
+    def _get_thread_lock(self, thread_id: str) -> threading.Lock:
+        """Lock por thread: OpenAI no admite dos ejecuciones activas en el mismo thread"""
+        with self._threads_lock:
+            lock = self._thread_locks.get(thread_id)
+            if lock is None:
+                lock = threading.Lock()
+                self._thread_locks[thread_id] = lock
+            return lock
+
+    def wait_for_run(
+        self,
+        thread_id: str,
+        run,
+        timeout: float = DEFAULT_RUN_TIMEOUT,
+        on_status=None,
+        client=None,
+    ):
+        """
+        Espera a que termine una ejecución con backoff exponencial y plazo total
+
+        Deja de consultar cuando la ejecución termina o cuando pasa a requires_action:
+        en ese estado el asistente no avanza hasta que el cliente responda, así que
+        seguir esperando solo agotaría el plazo.
+
+        Args:
+            thread_id (str): ID del thread
+            run: Ejecución devuelta por runs.create
+            timeout (float): Plazo total en segundos
+            on_status (callable, optional): Función llamada con (run, elapsed) en cada
+                comprobación, para actualizar barras de progreso
+            client: Cliente OpenAI alternativo
+
+        Returns:
+            Ejecución en su último estado conocido (status "expired" si se agotó el
+            plazo, "requires_action" si el asistente espera una respuesta del cliente)
+        """
+        client = client or self.client
+        start_time = time.time()
+        delay = RUN_POLL_INITIAL
+
+        while run.status not in RUN_TERMINAL_STATUSES + RUN_ACTION_STATUSES:
+            elapsed = time.time() - start_time
+            if on_status:
+                on_status(run, elapsed)
+
+            remaining = timeout - elapsed
+            if remaining <= 0:
+                self._count("run_timeouts")
+                logger.warning(
+                    f"Plazo de {timeout}s agotado esperando la ejecución {run.id}"
+                )
+                try:
+                    client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+                except Exception as e:
+                    logger.debug(f"No se pudo cancelar la ejecución {run.id}: {str(e)}")
+                run.status = "expired"
+                break
+
+            time.sleep(min(delay, remaining))
+            delay = min(delay * RUN_POLL_FACTOR, RUN_POLL_MAX)
+            run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+
+        return run
+
+    def run_assistant(
+        self,
+        prompt: str,
+        assistant_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        session_key: Optional[str] = None,
+        timeout: float = DEFAULT_RUN_TIMEOUT,
+        on_status=None,
+        client=None,
+    ) -> Dict[str, Any]:
+        """
+        Envía un mensaje a un asistente y espera su respuesta
+
+        Si no se indica thread_id ni session_key se crea un thread nuevo; con
+        session_key se reutiliza el thread de esa sesión. Si la ejecución queda en
+        requires_action se devuelve sin texto y con la acción pendiente en
+        "required_action"; el thread de la sesión se descarta porque sigue ocupado
+        por esa ejecución.
+
+        Args:
+            prompt (str): Mensaje del usuario
+            assistant_id (Optional[str]): ID del asistente (por defecto el configurado)
+            thread_id (Optional[str]): Thread existente
+            session_key (Optional[str]): Clave de sesión para reutilizar el thread
+            timeout (float): Plazo total en segundos
+            on_status (callable, optional): Ver wait_for_run()
+            client: Cliente OpenAI alternativo
+
+        Returns:
+            Dict[str, Any]: status, text (None si no hubo respuesta), thread_id y run_id
+        """
+        client = client or self.client
+        assistant_id = assistant_id or self.assistant_id
+        if client is None or not assistant_id:
+            raise RuntimeError("Cliente OpenAI o asistente no disponible")
+
+        if not thread_id:
+            if session_key:
+                thread_id = self.get_session_thread(session_key, client=client)
+            else:
+                thread_id = client.beta.threads.create().id
+
+        with self._get_thread_lock(thread_id):
+            self.rate_limiter.acquire()
+            client.beta.threads.messages.create(
+                thread_id=thread_id, role="user", content=prompt
+            )
+            run = client.beta.threads.runs.create(
+                thread_id=thread_id, assistant_id=assistant_id
+            )
+            self._count("runs")
+            run = self.wait_for_run(
+                thread_id, run, timeout=timeout, on_status=on_status, client=client
+            )
+
+            result = {
+                "status": run.status,
+                "text": None,
+                "thread_id": thread_id,
+                "run_id": run.id,
+            }
+            if run.status in RUN_ACTION_STATUSES:
+                logger.warning(
+                    f"La ejecución {run.id} requiere una acción del cliente; no se esperará más"
+                )
+                result["required_action"] = getattr(run, "required_action", None)
+                if session_key:
+                    self._forget_session_thread(session_key, thread_id)
+            if run.status != "completed":
+                return result
+
+            messages = client.beta.threads.messages.list(thread_id=thread_id)
+            for message in messages:
+                if message.role == "assistant" and getattr(message, "run_id", run.id) == run.id:
+                    result["text"] = message_text(message)
+                    break
+
+        return result
+
+    def submit_assistant(self, prompt: str, **kwargs) -> Future:
+        """
+        Envía una ejecución de asistente sin bloquear
+
+        Args:
+            prompt (str): Mensaje del usuario
+            **kwargs: Parámetros de run_assistant() (sin on_status, que no es seguro
+                fuera del hilo principal de Streamlit)
+
+        Returns:
+            Future: Future con el resultado de run_assistant()
+        """
+        kwargs.pop("on_status", None)
+        return self._executor.submit(self.run_assistant, prompt, **kwargs)
+
+    def run_assistant_many(
+        self, prompts: List[str], timeout: float = DEFAULT_RUN_TIMEOUT, **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Ejecuta varias consultas al asistente en paralelo
+
+        Args:
+            prompts (List[str]): Mensajes del usuario
+            timeout (float): Plazo total de cada ejecución en segundos
+            **kwargs: Parámetros de run_assistant()
+
+        Returns:
+            List[Dict[str, Any]]: Resultados en el mismo orden que los prompts
+        """
+        futures = [self.submit_assistant(p, timeout=timeout, **kwargs) for p in prompts]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Error en ejecución del asistente: {str(e)}")
+                results.append({"status": "failed", "text": None, "error": str(e)})
+        return results
+
+
+def message_text(message) -> Optional[str]:
+    """
+    Extrae el texto de un mensaje de asistente
+
+    Args:
+        message: Mensaje devuelto por threads.messages.list
+
+    Returns:
+        Optional[str]: Texto del mensaje o None
+    """
+    if hasattr(message, "content") and len(message.content) > 0:
+        message_content = message.content[0]
+        if hasattr(message_content, "text"):
+            nested_text = message_content.text
+            if hasattr(nested_text, "value"):
+                return nested_text.value
+            if isinstance(nested_text, str):
+                return nested_text
+        elif isinstance(message_content, dict) and "text" in message_content:
+            return message_content["text"].get("value", message_content["text"])
+    return None
+
+
+def get_ai_client() -> AIClient:
+    """
+    Devuelve el cliente de IA compartido por el proceso
+
+    Returns:
+        AIClient: Instancia única del cliente
+    """
+    global _client_instance
+    if _client_instance is None:
+        with _client_lock:
+            if _client_instance is None:
+                _client_instance = AIClient()
+    return _client_instance
+
+
+if __name__ == "__main__":
+    # Prueba de funcionamiento
+    ai_client = get_ai_client()
+    print(f"Cliente disponible: {ai_client.available}")
+    print(f"Modelo: {ai_client.model}")
+    if ai_client.available:
+        print(ai_client.complete("Di 'hola' en una palabra.", max_tokens=10))
+        print(f"Estadísticas: {ai_client.stats}")
@@ -72,7 +72,9 @@ El resumen debe:
 5. Ir directo al punto principal de la noticia"""
 
         # Generar resumen
-        summary = ai_expert.process_text(prompt, max_tokens=250)
+        summary = ai_expert.process_text(
+            prompt, max_tokens=250, namespace="news_summary"
+        )
 
         # Verificar si el resumen contiene parte del prompt (caso de fallback)
         prompt_fragments = [
@@ -154,7 +156,9 @@ El análisis debe:
 6. NO incluir frases genéricas de introducción o cierre"""
 
         # Generar análisis
-        analysis = ai_expert.process_text(prompt, max_tokens=500)
+        analysis = ai_expert.process_text(
+            prompt, max_tokens=500, namespace="sentiment_analysis"
+        )
 
         # Verificar si el análisis contiene parte del prompt (caso de fallback)
         prompt_fragments = [
@@ -241,7 +245,9 @@ El análisis debe:
 7. NO incluir frases genéricas de introducción o cierre"""
 
         # Generar análisis
-        analysis = ai_expert.process_text(prompt, max_tokens=400)
+        analysis = ai_expert.process_text(
+            prompt, max_tokens=400, namespace="technical_analysis"
+        )
 
         # Verificar si el análisis contiene parte del prompt (caso de fallback)
         prompt_fragments = [
@@ -357,7 +363,9 @@ El análisis experto debe:
 10. NO incluir frases genéricas de introducción o cierre"""
 
         # Generar análisis
-        analysis = ai_expert.process_text(prompt, max_tokens=600)
+        analysis = ai_expert.process_text(
+            prompt, max_tokens=600, namespace="signal_analysis"
+        )
 
         # Verificar si el análisis contiene parte del prompt (caso de fallback)
         prompt_fragments = [
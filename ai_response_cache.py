@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de respuestas de IA.
+
+Guarda en SQLite las respuestas del modelo indexadas por un hash del modelo, el
+prompt normalizado y los parámetros de la solicitud. Así, volver a procesar las
+mismas noticias o señales (resúmenes, traducciones y análisis) no hace nuevas
+llamadas a la API.
+
+Las entradas caducan tras un TTL y la tabla se limita a un número máximo de
+entradas, eliminando primero las menos usadas recientemente.
+
+Configuración (variables de entorno):
+    AI_CACHE_PATH         Ruta del archivo SQLite (por defecto .cache/ai_responses.db)
+    AI_CACHE_TTL          TTL en segundos (por defecto 30 días)
+    AI_CACHE_MAX_ENTRIES  Número máximo de entradas (por defecto 20000)
+    AI_CACHE_DISABLED     "1" para desactivar la caché
+
+Uso:
+    python ai_response_cache.py stats
+    python ai_response_cache.py prune
+    python ai_response_cache.py clear
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import argparse
+import threading
+from typing import Any, Dict, Optional
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "ai_responses.db"
+)
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 20000
+PRUNE_EVERY = 200  # Escrituras entre limpiezas
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normaliza un prompt para que diferencias de formato no cambien la clave
+
+    Args:
+        prompt (str): Prompt original
+
+    Returns:
+        str: Prompt sin espacios repetidos ni sangrías
+    """
+    return re.sub(r"\s+", " ", prompt or "").strip()
+
+
+def make_cache_key(model: str, prompt: str, **params) -> str:
+    """
+    Calcula la clave de caché de una solicitud
+
+    Args:
+        model (str): Modelo o asistente que responde
+        prompt (str): Prompt enviado
+        **params: Parámetros que afectan a la respuesta (max_tokens, tipo, etc.)
+
+    Returns:
+        str: Hash SHA-256 de la solicitud
+    """
+    payload = json.dumps(
+        {"model": model or "", "prompt": normalize_prompt(prompt), "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """
+    Caché de respuestas de IA respaldada por SQLite
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: int = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Inicializa la caché
+
+        Args:
+            path (str): Ruta del archivo SQLite
+            ttl (int): Tiempo de vida de las entradas en segundos
+            max_entries (int): Número máximo de entradas
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ai_responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT,
+                namespace TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_expires_at ON ai_responses (expires_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON ai_responses (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Obtiene una respuesta de la caché
+
+        Args:
+            key (str): Clave calculada con make_cache_key()
+
+        Returns:
+            Optional[str]: Respuesta guardada o None si no existe o caducó
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM ai_responses WHERE cache_key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                """UPDATE ai_responses SET last_access = ?, hit_count = hit_count + 1
+                   WHERE cache_key = ?""",
+                (now, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(
+        self,
+        key: str,
+        response: str,
+        model: str = None,
+        namespace: str = None,
+        ttl: Optional[int] = None,
+    ) -> None:
+        """
+        Guarda una respuesta en la caché
+
+        Args:
+            key (str): Clave calculada con make_cache_key()
+            response (str): Respuesta del modelo
+            model (str, optional): Modelo que generó la respuesta
+            namespace (str, optional): Tipo de contenido (resumen, traducción, etc.)
+            ttl (Optional[int]): TTL específico en segundos
+        """
+        if not response:
+            return
+
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO ai_responses
+                   (cache_key, model, namespace, response, created_at, expires_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (key, model, namespace, response, now, expires_at, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            prune_now = self._writes % PRUNE_EVERY == 0
+
+        if prune_now:
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Elimina las entradas caducadas y las menos usadas si se supera el límite
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM ai_responses WHERE expires_at <= ?", (time.time(),)
+            )
+            deleted = cursor.rowcount
+
+            total = self._conn.execute("SELECT COUNT(*) FROM ai_responses").fetchone()[0]
+            excess = total - self.max_entries
+            if excess > 0:
+                cursor = self._conn.execute(
+                    """DELETE FROM ai_responses WHERE cache_key IN (
+                           SELECT cache_key FROM ai_responses
+                           ORDER BY last_access ASC LIMIT ?)""",
+                    (excess,),
+                )
+                deleted += cursor.rowcount
+
+            self._conn.commit()
+
+        if deleted:
+            logger.info(f"Caché de IA: {deleted} entradas eliminadas")
+        return deleted
+
+    def clear(self) -> None:
+        """Elimina todas las entradas"""
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve estadísticas de la caché
+
+        Returns:
+            Dict[str, Any]: Entradas por tipo, aciertos y fallos de esta sesión
+        """
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM ai_responses").fetchone()[0]
+            by_namespace = dict(
+                self._conn.execute(
+                    """SELECT COALESCE(namespace, '-'), COUNT(*)
+                       FROM ai_responses GROUP BY namespace"""
+                ).fetchall()
+            )
+        return {
+            "path": self.path,
+            "entries": total,
+            "by_namespace": by_namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def get_response_cache() -> Optional[AIResponseCache]:
+    """
+    Devuelve la caché de respuestas compartida por el proceso
+
+    Returns:
+        Optional[AIResponseCache]: Caché o None si está desactivada o no se pudo abrir
+    """
+    global _cache_instance
+    if os.environ.get("AI_CACHE_DISABLED") == "1":
+        return None
+
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                try:
+                    _cache_instance = AIResponseCache(
+                        path=os.environ.get("AI_CACHE_PATH", DEFAULT_CACHE_PATH),
+                        ttl=int(os.environ.get("AI_CACHE_TTL", DEFAULT_TTL)),
+                        max_entries=int(
+                            os.environ.get("AI_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+                        ),
+                    )
+                except Exception as e:
+                    logger.warning(f"No se pudo abrir la caché de IA: {str(e)}")
+                    return None
+    return _cache_instance
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Gestión de la caché de respuestas de IA")
+    parser.add_argument("command", choices=["stats", "prune", "clear"], help="Acción")
+    args = parser.parse_args()
+
+    cache = get_response_cache()
+    if cache is None:
+        logger.error("La caché de IA no está disponible")
+        return 1
+
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=2, ensure_ascii=False))
+    elif args.command == "prune":
+        cache.prune()
+    elif args.command == "clear":
+        cache.clear()
+        logger.info("Caché de IA vaciada")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,6 +48,22 @@ try:
 except Exception as e:
     logging.error(f"Error importando componentes: {str(e)}")
 
+# Importar cliente de IA compartido si está disponible
+try:
+    from ai_client import get_ai_client, message_text
+
+    AI_CLIENT_AVAILABLE = True
+except ImportError:
+    AI_CLIENT_AVAILABLE = False
+
+# Importar caché persistente de respuestas de IA si está disponible
+try:
+    from ai_response_cache import get_response_cache, make_cache_key
+
+    AI_CACHE_AVAILABLE = True
+except ImportError:
+    AI_CACHE_AVAILABLE = False
+
 # Importar OpenAI si está disponible
 try:
     import openai
@@ -125,22 +141,41 @@ def format_patterns_for_prompt(patterns, symbol, price=None):
 def process_message_with_citations(message):
     """Extrae y devuelve el texto del mensaje del asistente con manejo mejorado de errores"""
     try:
-        if hasattr(message, "content") and len(message.content) > 0:
-            message_content = message.content[0]
-            if hasattr(message_content, "text"):
-                nested_text = message_content.text
-                if hasattr(nested_text, "value"):
-                    return nested_text.value
-                elif isinstance(nested_text, str):
-                    return nested_text
-            elif isinstance(message_content, dict) and "text" in message_content:
-                return message_content["text"].get("value", message_content["text"])
+        if AI_CLIENT_AVAILABLE:
+            text = message_text(message)
+            if text is not None:
+                return text
     except Exception as e:
         logger.error(f"Error procesando mensaje: {str(e)}")
 
     return "No se pudo procesar el mensaje del asistente"
 
 
+def run_assistant(
+    client, assistant_id, prompt, thread_id=None, session_key=None, timeout=60, on_status=None
+):
+    """
+    Ejecuta una consulta al asistente y espera el resultado sin sondeo fijo de 1 segundo
+
+    Usa el ejecutor compartido de ai_client (backoff exponencial y plazo total).
+
+    Returns:
+        Dict[str, Any]: status, text, thread_id y run_id
+    """
+    if not AI_CLIENT_AVAILABLE:
+        raise RuntimeError("ai_client no está disponible")
+
+    return get_ai_client().run_assistant(
+        prompt,
+        assistant_id=assistant_id,
+        thread_id=thread_id,
+        session_key=session_key,
+        timeout=timeout,
+        on_status=on_status,
+        client=client,
+    )
+
+
 def process_expert_analysis(client, assistant_id, symbol, context):
     """Procesa análisis experto con OpenAI asegurando una sección de análisis fundamental"""
     if not client or not assistant_id:
@@ -334,16 +369,6 @@ def process_expert_analysis(client, assistant_id, symbol, context):
         logger.info(f"Nuevo thread creado: {thread.id}")
 
     try:
-        # Enviar mensaje al thread
-        client.beta.threads.messages.create(
-            thread_id=st.session_state.thread_id, role="user", content=prompt
-        )
-
-        # Crear una ejecución para el thread
-        run = client.beta.threads.runs.create(
-            thread_id=st.session_state.thread_id, assistant_id=assistant_id
-        )
-
         # Fases del análisis para mostrar al usuario
         analysis_phases = [
             "Recopilando datos de mercado...",
@@ -378,57 +403,47 @@ def process_expert_analysis(client, assistant_id, symbol, context):
             status_text.text(f"Analizando {symbol}... (0%)")
             status_details.text(analysis_phases[0])
 
-        # Esperar a que se complete la ejecución con timeout
-        start_time = time.time()
         timeout = 45  # 45 segundos máximo
         phase_duration = timeout / len(analysis_phases)
-        current_phase = 0
 
-        while run.status in ["queued", "in_progress"]:
-            # Calcular progreso basado en tiempo transcurrido
-            elapsed = time.time() - start_time
+        def update_status(run, elapsed):
+            """Actualiza la barra de progreso en cada comprobación de la ejecución"""
             progress = min(elapsed / timeout, 0.95)  # Máximo 95% hasta completar
-
-            # Actualizar fase actual basado en el tiempo transcurrido
-            new_phase = min(int(elapsed / phase_duration), len(analysis_phases) - 1)
-            if new_phase > current_phase:
-                current_phase = new_phase
-
-            # Actualizar progreso
+            phase = analysis_phases[
+                min(int(elapsed / phase_duration), len(analysis_phases) - 1)
+            ]
             if PROGRESS_MANAGER_AVAILABLE:
                 progress_manager.update_progress(
                     progress_key,
                     progress,
                     f"Analizando {symbol}... ({int(progress*100)}%)",
-                    analysis_phases[current_phase],
+                    phase,
                 )
             else:
                 progress_bar.progress(progress)
                 status_text.text(f"Analizando {symbol}... ({int(progress*100)}%)")
-                status_details.text(analysis_phases[current_phase])
-
-            # Verificar timeout
-            if elapsed > timeout:
-                if PROGRESS_MANAGER_AVAILABLE:
-                    progress_manager.error_progress(
-                        progress_key, f"Tiempo de espera excedido para {symbol}"
-                    )
-                else:
-                    status_text.text(
-                        f"Tiempo de espera excedido, finalizando análisis..."
-                    )
-                break
-
-            # Esperar un momento antes de verificar de nuevo
-            time.sleep(1)
-
-            # Actualizar estado de la ejecución
-            run = client.beta.threads.runs.retrieve(
-                thread_id=st.session_state.thread_id, run_id=run.id
-            )
+                status_details.text(phase)
+
+        # Ejecutar el asistente en el thread de la sesión (backoff exponencial
+        # con plazo total en lugar de consultar cada segundo)
+        result = run_assistant(
+            client,
+            assistant_id,
+            prompt,
+            thread_id=st.session_state.thread_id,
+            timeout=timeout,
+            on_status=update_status,
+        )
 
         # Completar barra de progreso
-        if PROGRESS_MANAGER_AVAILABLE:
+        if result["status"] == "expired":
+            if PROGRESS_MANAGER_AVAILABLE:
+                progress_manager.error_progress(
+                    progress_key, f"Tiempo de espera excedido para {symbol}"
+                )
+            else:
+                status_text.text(f"Tiempo de espera excedido, finalizando análisis...")
+        elif PROGRESS_MANAGER_AVAILABLE:
             progress_manager.complete_progress(
                 progress_key, f"¡Análisis de {symbol} completado!"
             )
@@ -436,24 +451,12 @@ def process_expert_analysis(client, assistant_id, symbol, context):
             progress_bar.progress(1.0)
             status_text.text("¡Análisis completado!")
             status_details.empty()
-            time.sleep(1)  # Mostrar el mensaje de completado por un segundo
             status_text.empty()
 
-        if run.status != "completed":
-            return f"Error: La consulta al experto falló con estado {run.status}"
-
-        # Recuperar mensajes
-        messages = client.beta.threads.messages.list(
-            thread_id=st.session_state.thread_id
-        )
-
-        # Obtener respuesta
-        for message in messages:
-            if message.run_id == run.id and message.role == "assistant":
-                # Extraer texto del mensaje
-                return process_message_with_citations(message)
+        if result["status"] != "completed":
+            return f"Error: La consulta al experto falló con estado {result['status']}"
 
-        return "No se recibió respuesta del experto."
+        return result["text"] or "No se recibió respuesta del experto."
 
     except Exception as e:
         logger.error(f"Error al consultar al experto: {str(e)}")
@@ -594,58 +597,25 @@ def process_with_assistant(prompt, symbol, context, assistant_id):
         Pregunta del usuario: {prompt}
         """
 
-        # Crear mensaje en el thread
-        thread_messages = openai.beta.threads.messages.create(
-            thread_id=st.session_state.thread_id, role="user", content=context_prompt
-        )
-
-        # Ejecutar con herramientas
-        run = openai.beta.threads.runs.create(
-            thread_id=st.session_state.thread_id, assistant_id=assistant_id
+        # Ejecutar el asistente con plazo de 30 segundos
+        result = run_assistant(
+            openai,
+            assistant_id,
+            context_prompt,
+            thread_id=st.session_state.thread_id,
+            timeout=30,
         )
 
-        # Esperar a que se complete la ejecución con timeout
-        start_time = time.time()
-        timeout = 30  # 30 segundos máximo
-        while True:
-            # Verificar timeout
-            if time.time() - start_time > timeout:
-                logger.warning(f"Timeout esperando respuesta del asistente")
-                return "La consulta tomó demasiado tiempo. Por favor, intenta de nuevo con una pregunta más específica."
-
-            # Esperar un momento antes de verificar de nuevo
-            time.sleep(1)
-
-            # Actualizar estado de la ejecución
-            run = openai.beta.threads.runs.retrieve(
-                thread_id=st.session_state.thread_id, run_id=run.id
-            )
-
-            # Verificar si la ejecución ha terminado
-            if run.status in ["completed", "failed", "cancelled", "expired"]:
-                break
+        if result["status"] == "expired":
+            logger.warning(f"Timeout esperando respuesta del asistente")
+            return "La consulta tomó demasiado tiempo. Por favor, intenta de nuevo con una pregunta más específica."
 
         # Verificar si la ejecución fue exitosa
-        if run.status != "completed":
-            logger.error(f"La ejecución falló con estado: {run.status}")
-            return f"Error: La consulta falló con estado {run.status}"
+        if result["status"] != "completed":
+            logger.error(f"La ejecución falló con estado: {result['status']}")
+            return f"Error: La consulta falló con estado {result['status']}"
 
-        # Obtener mensajes actualizados
-        try:
-            messages = openai.beta.threads.messages.list(
-                thread_id=st.session_state.thread_id
-            )
-
-            # Encontrar respuesta del asistente
-            for message in messages:
-                if message.run_id == run.id and message.role == "assistant":
-                    # Extraer texto de la respuesta
-                    return process_message_with_citations(message)
-
-            return "No se pudo obtener una respuesta del asistente."
-        except Exception as msg_error:
-            logger.error(f"Error obteniendo mensajes: {str(msg_error)}")
-            return f"Error obteniendo respuesta: {str(msg_error)}"
+        return result["text"] or "No se pudo obtener una respuesta del asistente."
 
     except Exception as e:
         logger.error(f"Error en process_with_assistant: {str(e)}")
@@ -912,51 +882,26 @@ def process_content_with_ai(
                 st.session_state.content_thread_id = thread_id
             logger.info(f"Nuevo thread creado para procesar contenido: {thread_id}")
 
-        # Enviar mensaje al thread
-        client.beta.threads.messages.create(
-            thread_id=thread_id, role="user", content=prompt
-        )
+        # Ejecutar el asistente con plazo de 30 segundos
+        result = run_assistant(client, assistant_id, prompt, thread_id=thread_id, timeout=30)
 
-        # Crear una ejecución para el thread
-        run = client.beta.threads.runs.create(
-            thread_id=thread_id, assistant_id=assistant_id
-        )
-
-        # Esperar a que se complete la ejecución con timeout
-        start_time = time.time()
-        timeout = 30  # 30 segundos máximo
-        while run.status in ["queued", "in_progress"]:
-            # Verificar timeout
-            if time.time() - start_time > timeout:
-                logger.warning(
-                    f"Timeout esperando respuesta del asistente para procesar contenido"
-                )
-                return content  # Devolver contenido original si hay timeout
-
-            # Esperar un momento antes de verificar de nuevo
-            time.sleep(1)
-
-            # Actualizar estado de la ejecución
-            run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+        if result["status"] == "expired":
+            logger.warning(
+                f"Timeout esperando respuesta del asistente para procesar contenido"
+            )
+            return content  # Devolver contenido original si hay timeout
 
-        if run.status != "completed":
+        if result["status"] != "completed":
             logger.warning(
-                f"La ejecución para procesar contenido falló con estado {run.status}"
+                f"La ejecución para procesar contenido falló con estado {result['status']}"
             )
             return content  # Devolver contenido original si hay error
 
-        # Recuperar mensajes
-        messages = client.beta.threads.messages.list(thread_id=thread_id)
-
-        # Obtener respuesta
-        for message in messages:
-            if message.run_id == run.id and message.role == "assistant":
-                # Extraer texto del mensaje
-                processed_content = process_message_with_citations(message)
-                if (
-                    processed_content and len(processed_content) > len(content) * 0.5
-                ):  # Verificar que la respuesta sea sustancial
-                    return processed_content
+        processed_content = result["text"]
+        if (
+            processed_content and len(processed_content) > len(content) * 0.5
+        ):  # Verificar que la respuesta sea sustancial
+            return processed_content
 
         # Si no se pudo procesar, devolver el contenido original
         return content
@@ -1036,6 +981,8 @@ class AIExpert:
         """
         self.client = None
         self.assistant_id = None
+        self.ai_client = None
+        self.model = "gpt-4"
 
         try:
             # Intentar obtener el cliente desde session_state si estamos en Streamlit
@@ -1047,52 +994,30 @@ class AIExpert:
                 # Si no estamos en Streamlit, inicializar el cliente directamente
                 pass
 
-            # Si no tenemos cliente, intentar inicializarlo directamente
-            if not self.client:
-                try:
-                    import os
-                    import toml
-                    import openai
-
-                    # Intentar cargar secretos desde secrets.toml
-                    secrets_path = os.path.join(".streamlit", "secrets.toml")
-                    if os.path.exists(secrets_path):
-                        secrets = toml.load(secrets_path)
-
-                        # Configurar cliente OpenAI
-                        if "openai" in secrets and "api_key" in secrets["openai"]:
-                            openai.api_key = secrets["openai"]["api_key"]
-                            self.client = openai.OpenAI(
-                                api_key=secrets["openai"]["api_key"]
-                            )
-                            logger.info(
-                                "Cliente OpenAI inicializado con 'openai.api_key'"
-                            )
-                        elif "OPENAI_API_KEY" in secrets:
-                            openai.api_key = secrets["OPENAI_API_KEY"]
-                            self.client = openai.OpenAI(
-                                api_key=secrets["OPENAI_API_KEY"]
-                            )
-                            logger.info(
-                                "Cliente OpenAI inicializado con 'OPENAI_API_KEY'"
-                            )
-
-                        # Obtener el ID del asistente
-                        if "ASSISTANT_ID" in secrets:
-                            self.assistant_id = secrets["ASSISTANT_ID"]
-                            logger.info(f"Usando asistente con ID: {self.assistant_id}")
-                except Exception as e:
-                    logger.warning(f"Error inicializando cliente OpenAI: {str(e)}")
+            # Usar la configuración y el cliente compartidos del proceso
+            # (secrets.toml se lee una sola vez en ai_client.get_ai_config)
+            if AI_CLIENT_AVAILABLE:
+                self.ai_client = get_ai_client()
+                self.model = self.ai_client.model
+                if not self.client:
+                    self.client = self.ai_client.client
+                    self.assistant_id = self.ai_client.assistant_id
         except Exception as e:
             logger.warning(f"Error en __init__: {str(e)}")
 
-    def process_text(self, prompt: str, max_tokens: int = 250) -> str:
+    def process_text(
+        self, prompt: str, max_tokens: int = 250, namespace: str = None
+    ) -> str:
         """
         Procesa texto con IA
 
+        Antes de llamar a la API se consulta la caché persistente de respuestas; las
+        respuestas válidas se guardan en ella.
+
         Args:
             prompt (str): Texto a procesar
             max_tokens (int): Número máximo de tokens en la respuesta
+            namespace (str, optional): Tipo de contenido, para las estadísticas de la caché
 
         Returns:
             str: Texto procesado
@@ -1102,47 +1027,117 @@ class AIExpert:
             if not self.client:
                 return self._fallback_process(prompt)
 
+            cache_key = self._cache_key(prompt, max_tokens)
+            if cache_key:
+                cached = get_response_cache().get(cache_key)
+                if cached is not None:
+                    return cached
+
             # Si tenemos un asistente configurado, usarlo
             if self.assistant_id:
-                return self._process_with_assistant(prompt)
+                result = self._process_with_assistant(prompt)
+            # Enviar solicitud a través del cliente compartido (concurrencia limitada
+            # y agrupación de solicitudes idénticas en curso)
+            elif self.ai_client:
+                result = self.ai_client.complete(
+                    prompt, max_tokens=max_tokens, client=self.client
+                )
+            else:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "Eres un experto en análisis financiero y trading.",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    temperature=0.7,
+                    max_tokens=max_tokens,
+                )
 
-            # Obtener el modelo preferido de los secretos
-            model = "gpt-4"
-            try:
-                import os
-                import toml
-
-                # Intentar cargar el modelo desde secrets.toml
-                secrets_path = os.path.join(".streamlit", "secrets.toml")
-                if os.path.exists(secrets_path):
-                    secrets = toml.load(secrets_path)
-                    if "OPENAI_API_MODEL" in secrets:
-                        model = secrets["OPENAI_API_MODEL"]
-                        logger.info(f"Usando modelo: {model}")
-            except Exception as e:
-                logger.warning(f"Error cargando modelo desde secrets.toml: {str(e)}")
-
-            # Enviar solicitud
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un experto en análisis financiero y trading.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=max_tokens,
-            )
+                # Extraer respuesta
+                result = response.choices[0].message.content
 
-            # Extraer respuesta
-            return response.choices[0].message.content
+            self._store_in_cache(cache_key, prompt, result, namespace)
+            return result
 
         except Exception as e:
             logger.error(f"Error en process_text: {str(e)}")
             return self._fallback_process(prompt)
 
+    def process_texts(
+        self, prompts: List[str], max_tokens: int = 250, namespace: str = None
+    ) -> List[str]:
+        """
+        Procesa varios textos con IA en paralelo
+
+        Args:
+            prompts (List[str]): Textos a procesar
+            max_tokens (int): Número máximo de tokens en cada respuesta
+            namespace (str, optional): Tipo de contenido, para las estadísticas de la caché
+
+        Returns:
+            List[str]: Textos procesados, en el mismo orden que los prompts
+        """
+        # Sin cliente compartido o con asistente, procesar uno a uno
+        if not self.client or not self.ai_client or self.assistant_id:
+            return [self.process_text(prompt, max_tokens, namespace) for prompt in prompts]
+
+        # Resolver primero desde la caché y enviar solo los que falten
+        results: List[Optional[str]] = [None] * len(prompts)
+        keys = [self._cache_key(prompt, max_tokens) for prompt in prompts]
+        pending = []
+        for i, key in enumerate(keys):
+            cached = get_response_cache().get(key) if key else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        if pending:
+            responses = self.ai_client.complete_many(
+                [prompts[i] for i in pending], max_tokens=max_tokens, client=self.client
+            )
+            for i, response in zip(pending, responses):
+                if response is None:
+                    results[i] = self._fallback_process(prompts[i])
+                else:
+                    results[i] = response
+                    self._store_in_cache(keys[i], prompts[i], response, namespace)
+
+        return results
+
+    def _cache_key(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """
+        Calcula la clave de caché de un prompt (None si la caché no está disponible)
+        """
+        if not AI_CACHE_AVAILABLE or get_response_cache() is None:
+            return None
+        return make_cache_key(
+            self.assistant_id or self.model, prompt, max_tokens=max_tokens
+        )
+
+    def _store_in_cache(
+        self, cache_key: Optional[str], prompt: str, result: str, namespace: str = None
+    ) -> None:
+        """
+        Guarda una respuesta en la caché si es una respuesta real del modelo
+        """
+        if not cache_key or not result:
+            return
+        # No guardar las respuestas de respaldo ni los mensajes de error
+        if result == self._fallback_process(prompt) or result.startswith(
+            "No se pudo procesar"
+        ):
+            return
+        get_response_cache().set(
+            cache_key,
+            result,
+            model=self.assistant_id or self.model,
+            namespace=namespace,
+        )
+
     def _process_with_assistant(self, prompt: str) -> str:
         """
         Procesa texto utilizando un asistente de OpenAI
@@ -1154,49 +1149,15 @@ class AIExpert:
             str: Texto procesado
         """
         try:
-            import time
-
-            # Crear un hilo
-            thread = self.client.beta.threads.create()
+            # Cada texto se procesa en un thread nuevo: los prompts son independientes
+            # y así pueden ejecutarse varios en paralelo
+            result = run_assistant(self.client, self.assistant_id, prompt)
 
-            # Añadir mensaje al hilo
-            self.client.beta.threads.messages.create(
-                thread_id=thread.id, role="user", content=prompt
-            )
-
-            # Ejecutar el asistente
-            run = self.client.beta.threads.runs.create(
-                thread_id=thread.id, assistant_id=self.assistant_id
-            )
-
-            # Esperar a que termine la ejecución
-            while run.status != "completed":
-                time.sleep(1)
-                run = self.client.beta.threads.runs.retrieve(
-                    thread_id=thread.id, run_id=run.id
-                )
+            if result["status"] != "completed":
+                logger.error(f"Error en la ejecución del asistente: {result['status']}")
+                return self._fallback_process(prompt)
 
-                # Si hay un error, salir del bucle
-                if run.status in ["failed", "cancelled", "expired"]:
-                    logger.error(f"Error en la ejecución del asistente: {run.status}")
-                    return self._fallback_process(prompt)
-
-            # Obtener los mensajes
-            messages = self.client.beta.threads.messages.list(thread_id=thread.id)
-
-            # Extraer la respuesta del asistente
-            for message in messages.data:
-                if message.role == "assistant":
-                    # Extraer el contenido del mensaje
-                    if hasattr(message, "content") and len(message.content) > 0:
-                        message_content = message.content[0]
-                        if hasattr(message_content, "text"):
-                            nested_text = message_content.text
-                            if hasattr(nested_text, "value"):
-                                return nested_text.value
-
-            # Si no se pudo extraer la respuesta
-            return "No se pudo procesar el mensaje del asistente"
+            return result["text"] or "No se pudo procesar el mensaje del asistente"
 
         except Exception as e:
             logger.error(f"Error procesando con asistente: {str(e)}")
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Construcción de gráficos Plotly con caché y reducción de puntos.
+
+Streamlit vuelve a ejecutar la página en cada interacción y, sin caché, cada
+rerun reconstruye la figura completa con todos los indicadores y envía todo el
+histórico al navegador. Este módulo ofrece:
+
+- cached_figure: decorador que guarda la figura por (función, argumentos,
+  huella de los datos). La huella incluye el número de barras, la primera y la
+  última barra y el conjunto de columnas (indicadores), de modo que una barra
+  nueva o un indicador distinto generan otra figura.
+- downsample_ohlc: agrupa las velas en cubetas conservando apertura, máximo,
+  mínimo, cierre y volumen (min-max), hasta el presupuesto de velas del gráfico.
+- downsample_line / line_trace: reduce una serie con LTTB (Largest Triangle
+  Three Buckets) y usa Scattergl (WebGL) cuando la serie es grande.
+
+Uso:
+    @cached_figure("grafico_tecnico")
+    def create_chart(data, symbol):
+        plot_df = downsample_ohlc(data)
+        webgl = use_webgl(len(data))
+        fig.add_trace(line_trace(data.index, data["SMA_20"], webgl=webgl, name="SMA 20"))
+"""
+
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.lazy_loader import lazy_import
+
+go = lazy_import("plotly.graph_objects")
+
+# Configuración de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Presupuesto de píxeles: ancho típico del gráfico en la página
+CHART_WIDTH_PX = 1200
+MIN_PX_PER_CANDLE = 2  # Por debajo de esto las velas no se distinguen
+MAX_CANDLES = CHART_WIDTH_PX // MIN_PX_PER_CANDLE
+MAX_LINE_POINTS = CHART_WIDTH_PX  # Más de un punto por píxel no se aprecia
+WEBGL_MIN_POINTS = 1000  # A partir de aquí las líneas se dibujan con WebGL
+
+MAX_CACHED_FIGURES = 64
+
+OHLC_COLUMNS = ("Open", "High", "Low", "Close")
+
+
+def use_webgl(n_points: int) -> bool:
+    """
+    Indica si las series de un gráfico deben dibujarse con WebGL
+
+    Se decide una vez por gráfico (con el tamaño del histórico) para que todas
+    las líneas sean del mismo tipo; el relleno "tonexty" no funciona entre una
+    traza SVG y una WebGL.
+
+    Args:
+        n_points (int): Número de barras del histórico
+
+    Returns:
+        bool: True si conviene usar Scattergl
+    """
+    return n_points > WEBGL_MIN_POINTS
+
+
+def _numeric_x(x: Any) -> np.ndarray:
+    """Convierte el eje X a float64 para los cálculos de LTTB"""
+    values = np.asarray(x)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.float64)
+    try:
+        return (
+            pd.to_datetime(values).values.astype("datetime64[ns]").astype(np.int64)
+        ).astype(np.float64)
+    except (TypeError, ValueError):
+        return np.arange(len(values), dtype=np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Selecciona puntos de una serie con Largest Triangle Three Buckets
+
+    Conserva el primer y el último punto y, en cada cubeta intermedia, el que
+    forma el triángulo de mayor área con el punto elegido antes y la media de la
+    cubeta siguiente, lo que mantiene picos y valles visibles.
+
+    Args:
+        x (np.ndarray): Eje X numérico y creciente
+        y (np.ndarray): Valores (sin NaN)
+        threshold (int): Número de puntos deseado
+
+    Returns:
+        np.ndarray: Índices de los puntos seleccionados, en orden
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area)) if len(area) else start
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_line(
+    x: Any, y: Any, max_points: int = MAX_LINE_POINTS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce una serie a max_points con LTTB, descartando los NaN
+
+    Args:
+        x (Any): Eje X (índice, columna de fechas o lista)
+        y (Any): Valores de la serie
+        max_points (int): Presupuesto de puntos
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (x, y) reducidos
+    """
+    x_values = np.asarray(x)
+    y_values = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y_values)
+    if not valid.all():
+        x_values = x_values[valid]
+        y_values = y_values[valid]
+
+    if len(y_values) <= max_points:
+        return x_values, y_values
+
+    indexes = lttb_indices(_numeric_x(x_values), y_values, max_points)
+    return x_values[indexes], y_values[indexes]
+
+
+def line_trace(
+    x: Any,
+    y: Any,
+    max_points: int = MAX_LINE_POINTS,
+    webgl: Optional[bool] = None,
+    **kwargs,
+):
+    """
+    Crea una traza de línea reducida con LTTB y, si procede, con WebGL
+
+    Args:
+        x (Any): Eje X
+        y (Any): Valores de la serie
+        max_points (int): Presupuesto de puntos
+        webgl (bool, optional): Forzar (o no) Scattergl; por defecto según el tamaño
+        **kwargs: Argumentos de go.Scatter (name, line, fill...)
+
+    Returns:
+        go.Scatter | go.Scattergl: Traza lista para add_trace
+    """
+    if webgl is None:
+        webgl = use_webgl(len(y))
+    x_values, y_values = downsample_line(x, y, max_points)
+    trace_class = go.Scattergl if webgl else go.Scatter
+    return trace_class(x=x_values, y=y_values, **kwargs)
+
+
+def downsample_ohlc(
+    df: pd.DataFrame, max_candles: int = MAX_CANDLES, date_column: str = "Date"
+) -> pd.DataFrame:
+    """
+    Agrupa las velas en cubetas hasta max_candles (min-max)
+
+    Cada cubeta conserva la apertura de la primera barra, el máximo de los
+    máximos, el mínimo de los mínimos, el cierre de la última barra y la suma del
+    volumen; el resto de columnas numéricas toma el valor de la última barra. La
+    última cubeta termina siempre en la última barra, así que el precio actual
+    no cambia. La etiqueta de cada cubeta es la fecha de su primera barra.
+
+    Args:
+        df (pd.DataFrame): Datos OHLC (índice de fechas o columna Date)
+        max_candles (int): Presupuesto de velas
+        date_column (str): Columna de fechas, si existe
+
+    Returns:
+        pd.DataFrame: Datos agrupados (el mismo DataFrame si ya cabe)
+    """
+    n = len(df)
+    if n <= max_candles or max_candles < 1:
+        return df
+
+    bucket = -(-n // max_candles)  # Redondeo hacia arriba
+    offset = (-n) % bucket  # La primera cubeta es la incompleta
+    starts = np.unique((np.arange(n) + offset) // bucket, return_index=True)[1]
+    ends = np.append(starts[1:], n) - 1
+
+    result = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if column == "Open":
+            result[column] = values[starts]
+        elif column == "High":
+            result[column] = np.fmax.reduceat(values.astype(np.float64), starts)
+        elif column == "Low":
+            result[column] = np.fmin.reduceat(values.astype(np.float64), starts)
+        elif column == "Volume":
+            result[column] = np.add.reduceat(
+                np.nan_to_num(values.astype(np.float64)), starts
+            )
+        elif column == date_column:
+            result[column] = values[starts]
+        else:
+            result[column] = values[ends]
+
+    return pd.DataFrame(result, index=df.index[starts], columns=df.columns)
+
+
+def _value_token(value: Any) -> str:
+    """Representación estable de un valor para la huella de los datos"""
+    if isinstance(value, (float, np.floating)):
+        return repr(round(float(value), 8))
+    return repr(value)
+
+
+def data_fingerprint(data: Any) -> Optional[str]:
+    """
+    Calcula una huella barata de los datos de un gráfico
+
+    No recorre todo el histórico: usa el número de barras, las columnas y los
+    valores de la primera y la última barra, que es lo que cambia cuando llegan
+    datos nuevos o se añade un indicador.
+
+    Args:
+        data (Any): DataFrame o lista de registros
+
+    Returns:
+        Optional[str]: Huella o None si los datos no son cacheables
+    """
+    if isinstance(data, pd.DataFrame):
+        if data.empty:
+            return None
+        parts = [
+            str(len(data)),
+            "|".join(map(str, data.columns)),
+            _value_token(data.index[0]),
+            _value_token(data.index[-1]),
+        ]
+        for position in (0, -1):
+            parts.extend(_value_token(v) for v in data.iloc[position].tolist())
+    elif isinstance(data, list):
+        if not data or not isinstance(data[-1], dict):
+            return None
+        parts = [str(len(data)), "|".join(map(str, data[-1].keys()))]
+        for record in (data[0], data[-1]):
+            parts.extend(_value_token(v) for v in record.values())
+    else:
+        return None
+
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """
+    Caché LRU de figuras en memoria, compartida por todas las sesiones
+
+    Las figuras se devuelven tal cual (sin copiar); quien las use no debe
+    modificarlas.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_FIGURES):
+        self.max_entries = max_entries
+        self._figures: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is None:
+                self.misses += 1
+                return None
+            self._figures.move_to_end(key)
+            self.hits += 1
+            return figure
+
+    def put(self, key: str, figure: Any):
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._figures),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(name: str) -> Callable:
+    """
+    Decorador que cachea la figura devuelta por una función de gráficos
+
+    La función decorada debe recibir los datos como primer argumento. La clave
+    combina el nombre, la huella de los datos y el resto de argumentos (símbolo,
+    intervalo...). Si la función devuelve None no se guarda nada.
+
+    Args:
+        name (str): Nombre del gráfico (distingue funciones con los mismos datos)
+
+    Returns:
+        Callable: Decorador
+    """
+
+    def decorator(builder: Callable) -> Callable:
+        @functools.wraps(builder)
+        def wrapper(data, *args, **kwargs):
+            fingerprint = data_fingerprint(data)
+            if fingerprint is None:
+                return builder(data, *args, **kwargs)
+
+            key = hashlib.sha1(
+                "\x1f".join(
+                    [name, fingerprint, repr(args), repr(sorted(kwargs.items()))]
+                ).encode("utf-8")
+            ).hexdigest()
+
+            figure = figure_cache.get(key)
+            if figure is not None:
+                return figure
+
+            figure = builder(data, *args, **kwargs)
+            if figure is not None:
+                figure_cache.put(key, figure)
+            return figure
+
+        wrapper.uncached = builder
+        return wrapper
+
+    return decorator
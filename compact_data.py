@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Datos de gráfico en formato columnar compacto.
+
+get_market_context guardaba el histórico como una lista de diccionarios por
+barra (data.reset_index().to_dict(orient="records")): cada valor es un float de
+Python con su propia cabecera y cada barra repite todas las claves. Ese contexto
+se queda en st.session_state y, en un escaneo de muchos símbolos, ocupa varias
+veces más que los propios datos.
+
+ChartData guarda las columnas numéricas en un único bloque float64 de solo
+lectura, las fechas como datetime64 y las columnas no numéricas aparte.
+to_dataframe() reconstruye un DataFrame modificable (una copia por llamada, que
+se libera al terminar de usarlo) con las mismas columnas que producía
+reset_index() (fecha incluida). Los consumidores que solo leen (gráficos,
+detección de patrones) pueden pedir copy=False y trabajar sobre vistas de solo
+lectura sin copiar el bloque numérico.
+
+Uso:
+    chart_data = ChartData.from_dataframe(data)
+    df = chart_data_to_frame(context.get("chart_data"))  # ChartData o lista de registros
+    df = chart_data_to_frame(context.get("chart_data"), copy=False)  # solo lectura
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Configuración de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Las fechas se guardan en microsegundos (UTC sin zona) para que tolist()
+# devuelva objetos datetime que NumpyEncoder sabe serializar
+DATETIME_UNIT = "datetime64[us]"
+
+
+class ChartData:
+    """
+    Histórico OHLC e indicadores en formato columnar
+
+    Atributos:
+        index_name (str): Nombre de la columna de fechas (por ejemplo, "Date")
+        index (np.ndarray): Fechas (datetime64 en UTC) u otros valores del índice
+        tz (str): Zona horaria original de las fechas, si la tenían
+        columns (List[str]): Columnas numéricas, en el orden original
+        values (np.ndarray): Bloque float64 (barras x columnas) de solo lectura
+        extra (Dict[str, np.ndarray]): Columnas no numéricas
+    """
+
+    __slots__ = ("index_name", "index", "tz", "columns", "values", "extra")
+
+    def __init__(
+        self,
+        index_name: str,
+        index: np.ndarray,
+        columns: List[str],
+        values: np.ndarray,
+        extra: Optional[Dict[str, np.ndarray]] = None,
+        tz: Optional[str] = None,
+    ):
+        self.index_name = index_name
+        self.index = index
+        self.tz = tz
+        self.columns = list(columns)
+        self.values = values
+        self.extra = extra or {}
+        # Los datos se comparten entre sesiones y reruns: evitar modificaciones
+        for array in [self.index, self.values, *self.extra.values()]:
+            array.setflags(write=False)
+
+    @classmethod
+    def from_dataframe(cls, data: pd.DataFrame) -> "ChartData":
+        """
+        Convierte un DataFrame con índice de fechas al formato columnar
+
+        Args:
+            data (pd.DataFrame): Datos OHLC e indicadores
+
+        Returns:
+            ChartData: Datos compactos
+        """
+        index_name = data.index.name or "index"
+        index = data.index
+        tz = None
+        if isinstance(index, pd.DatetimeIndex):
+            if index.tz is not None:
+                tz = str(index.tz)
+                index = index.tz_convert("UTC").tz_localize(None)
+            index_values = index.to_numpy().astype(DATETIME_UNIT)
+        else:
+            index_values = np.array(index)
+
+        numeric = [
+            column
+            for column in data.columns
+            if pd.api.types.is_numeric_dtype(data[column])
+            and not pd.api.types.is_bool_dtype(data[column])
+        ]
+        values = np.ascontiguousarray(
+            data[numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+        extra = {
+            str(column): data[column].to_numpy(copy=True)
+            for column in data.columns
+            if column not in numeric
+        }
+        return cls(
+            index_name, index_values, [str(c) for c in numeric], values, extra, tz
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.index) == 0
+
+    @property
+    def nbytes(self) -> int:
+        """Tamaño aproximado en memoria de los arrays"""
+        return (
+            self.index.nbytes
+            + self.values.nbytes
+            + sum(array.nbytes for array in self.extra.values())
+        )
+
+    def _index_series(self) -> pd.Series:
+        """Fechas con su zona horaria original"""
+        if np.issubdtype(self.index.dtype, np.datetime64):
+            dates = pd.to_datetime(self.index)
+            if self.tz:
+                dates = dates.tz_localize("UTC").tz_convert(self.tz)
+            return pd.Series(dates, name=self.index_name)
+        return pd.Series(self.index, name=self.index_name)
+
+    def to_dataframe(self, copy: bool = True) -> pd.DataFrame:
+        """
+        Reconstruye el DataFrame equivalente a data.reset_index()
+
+        Por defecto el bloque numérico se copia para que el DataFrame se pueda
+        modificar (fillna(inplace=True), asignaciones con .loc...) sin tocar los
+        datos compartidos. Con copy=False las columnas son vistas de los arrays de
+        solo lectura: no se copia nada, pero modificar valores existentes falla.
+        Añadir columnas nuevas funciona en ambos casos.
+
+        Args:
+            copy (bool): Copiar los datos (False para consumidores de solo lectura)
+
+        Returns:
+            pd.DataFrame: Datos con la columna de fechas en primer lugar
+        """
+        df = pd.DataFrame(self.values, columns=self.columns, copy=copy)
+        df.insert(0, self.index_name, self._index_series().to_numpy())
+        for column, array in self.extra.items():
+            df[column] = array.copy() if copy else array
+        return df
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Devuelve la lista de registros por barra (formato anterior)"""
+        return self.to_dataframe().to_dict(orient="records")
+
+    def to_json_dict(self) -> Dict[str, List[Any]]:
+        """
+        Devuelve las columnas como listas, listo para json.dumps
+
+        Returns:
+            Dict[str, List[Any]]: {columna: valores}; NaN se convierte en None
+        """
+        result = {self.index_name: self._index_series().tolist()}
+        for position, column in enumerate(self.columns):
+            column_values = self.values[:, position]
+            result[column] = [
+                None if np.isnan(value) else value for value in column_values.tolist()
+            ]
+        for column, array in self.extra.items():
+            result[column] = array.tolist()
+        return result
+
+    def __repr__(self) -> str:
+        return (
+            f"<ChartData {len(self)} barras x {len(self.columns) + len(self.extra)} "
+            f"columnas, {self.nbytes / 1024:.1f} KB>"
+        )
+
+
+def chart_data_to_frame(chart_data: Any, copy: bool = True) -> pd.DataFrame:
+    """
+    Convierte el chart_data de un contexto de mercado en DataFrame
+
+    Acepta el formato columnar (ChartData), la lista de registros que usaban las
+    versiones anteriores y un DataFrame.
+
+    Args:
+        chart_data (Any): ChartData, lista de registros, DataFrame o None
+        copy (bool): Ver ChartData.to_dataframe(); False para consumidores de
+            solo lectura
+
+    Returns:
+        pd.DataFrame: Datos del gráfico (vacío si no hay)
+    """
+    if chart_data is None:
+        return pd.DataFrame()
+    if isinstance(chart_data, ChartData):
+        return chart_data.to_dataframe(copy=copy)
+    if isinstance(chart_data, pd.DataFrame):
+        return chart_data
+    return pd.DataFrame(chart_data)
@@ -27,9 +27,9 @@ def render_ai_chat():
     
     # Mostrar mensaje de bienvenida si el historial está vacío
     if not st.session_state.chat_history:
-        welcome_message = {
-            "role": "assistant",
-            "content": f"""
+        add_chat_message(
+            "assistant",
+            f"""
             # 👋 Bienvenido al Trading Specialist IA
             
             Soy tu asistente de trading personalizado. Puedo ayudarte con:
@@ -41,9 +41,8 @@ def render_ai_chat():
             - 📝 Recomendaciones personalizadas
             
             Estoy analizando datos en tiempo real para {st.session_state.current_symbol}. ¿En qué puedo ayudarte hoy?
-            """
-        }
-        st.session_state.chat_history.append(welcome_message)
+            """,
+        )
     
     # Mostrar historial de chat
     chat_container = st.container(height=500)
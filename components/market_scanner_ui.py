@@ -108,19 +108,16 @@ def render_market_scanner():
                                 signal_manager.db_manager.save_signal(signal)
                                 signals_saved += 1
 
-                                                    # Procesar la calidad de los datos después de guardar
-                                                    try:
-                                                        import post_save_quality_check
-                                                        
-                                                        # Procesar solo las señales de trading
-                                                        post_save_quality_check.process_quality_after_save(
-                                                            table_name="signals", limit=1
-                                                        )
-                                                        logger.info(f"Procesamiento de calidad completado para la señal")
-                                                    except Exception as e:
-                                                        logger.warning(f"Error en el procesamiento de calidad: {str(e)}")
-                                                        logger.warning(f"Traza completa:", exc_info=True)
-                                                            except Exception as e:
+                                # Encolar el control de calidad (lo procesa quality_job_queue.py)
+                                try:
+                                    from quality_job_queue import enqueue_quality_job
+
+                                    enqueue_quality_job("signals", limit=1)
+                                except Exception as e:
+                                    logger.warning(
+                                        f"No se pudo encolar el control de calidad: {str(e)}"
+                                    )
+                        except Exception as e:
                             logger.error(
                                 f"Error guardando señal en la base de datos: {str(e)}"
                             )
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+InversorIA Pro - Archivo de Datos Históricos
+--------------------------------------------
+Mantiene pequeñas las tablas trading_signals, market_news y email_logs moviendo las
+filas antiguas a tablas *_archive, y conserva resúmenes diarios para los gráficos de
+largo plazo. Las consultas de los paneles (últimos días) solo leen la tabla principal.
+
+Uso:
+    python data_archiver.py status
+    python data_archiver.py archive [--table trading_signals] [--retention-days 90]
+    python data_archiver.py summarize [--days 90]
+    python data_archiver.py prune --keep-days 730
+    python data_archiver.py compact
+"""
+
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+import mysql.connector
+
+from database_quality_utils import (
+    load_db_config,
+    connect_to_db,
+    remove_from_quality_queue,
+)
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+# Tablas archivables: columna de fecha y días que permanecen en la tabla principal
+ARCHIVE_TABLES: Dict[str, Dict[str, Any]] = {
+    "trading_signals": {"date_column": "created_at", "retention_days": 90},
+    "market_news": {"date_column": "news_date", "retention_days": 90},
+    "email_logs": {
+        "date_column": "sent_at",
+        "retention_days": 180,
+        # Las filas referenciadas por newsletter_send_logs no se mueven para no
+        # perder el vínculo (la clave foránea pondría email_log_id a NULL)
+        "referenced_by": ("newsletter_send_logs", "email_log_id"),
+    },
+}
+
+# Consultas de agregación diaria por tabla. {source} se sustituye por la unión de la
+# tabla principal y su archivo restringida a la ventana a recalcular.
+SUMMARY_QUERIES: Dict[str, Dict[str, str]] = {
+    "trading_signals": {
+        "columns": "created_at, symbol, direction, confidence_level, price",
+        "query": """
+        INSERT INTO trading_signals_daily_summary
+            (summary_date, symbol, direction, confidence_level, signal_count, avg_price)
+        SELECT DATE(created_at), COALESCE(symbol, ''), COALESCE(direction, ''),
+               COALESCE(confidence_level, ''), COUNT(*), AVG(price)
+        FROM ({source}) AS s
+        GROUP BY DATE(created_at), COALESCE(symbol, ''), COALESCE(direction, ''),
+                 COALESCE(confidence_level, '')
+        ON DUPLICATE KEY UPDATE
+            signal_count = VALUES(signal_count), avg_price = VALUES(avg_price)
+        """,
+    },
+    "market_news": {
+        "columns": "news_date, symbol, impact",
+        "query": """
+        INSERT INTO market_news_daily_summary (summary_date, symbol, impact, news_count)
+        SELECT DATE(news_date), COALESCE(symbol, ''), COALESCE(impact, ''), COUNT(*)
+        FROM ({source}) AS s
+        GROUP BY DATE(news_date), COALESCE(symbol, ''), COALESCE(impact, '')
+        ON DUPLICATE KEY UPDATE news_count = VALUES(news_count)
+        """,
+    },
+    "email_logs": {
+        "columns": "sent_at, status",
+        "query": """
+        INSERT INTO email_logs_daily_summary (summary_date, status, send_count)
+        SELECT DATE(sent_at), COALESCE(status, ''), COUNT(*)
+        FROM ({source}) AS s
+        GROUP BY DATE(sent_at), COALESCE(status, '')
+        ON DUPLICATE KEY UPDATE send_count = VALUES(send_count)
+        """,
+    },
+}
+
+
+def ensure_archive_tables(connection: mysql.connector.MySQLConnection) -> bool:
+    """
+    Crea las tablas de archivo y de resumen si no existen (sql/create_archive_tables.sql)
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+
+    Returns:
+        bool: True si las tablas existen o se crearon correctamente
+    """
+    sql_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "sql", "create_archive_tables.sql"
+    )
+    try:
+        with open(sql_path, "r", encoding="utf-8") as f:
+            script = f.read()
+
+        # Eliminar comentarios y ejecutar cada sentencia por separado
+        lines = [line for line in script.splitlines() if not line.strip().startswith("--")]
+        statements = [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+        cursor = connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        connection.commit()
+        cursor.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error creando tablas de archivo: {str(e)}")
+        return False
+
+
+def table_exists(connection: mysql.connector.MySQLConnection, table_name: str) -> bool:
+    """
+    Verifica si una tabla existe en la base de datos
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+
+    Returns:
+        bool: True si la tabla existe
+    """
+    cursor = connection.cursor()
+    cursor.execute("SHOW TABLES LIKE %s", (table_name,))
+    exists = cursor.fetchone() is not None
+    cursor.close()
+    return exists
+
+
+def get_copyable_columns(
+    connection: mysql.connector.MySQLConnection, table_name: str
+) -> List[str]:
+    """
+    Obtiene las columnas comunes a la tabla y su archivo, sin columnas generadas
+
+    Las columnas generadas (summary_missing, expert_analysis_missing) no admiten
+    valores explícitos en INSERT, y la tabla principal puede tener columnas añadidas
+    después de crear el archivo.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla principal
+
+    Returns:
+        List[str]: Columnas a copiar, en el orden de la tabla principal
+    """
+    cursor = connection.cursor()
+    query = """
+    SELECT COLUMN_NAME, TABLE_NAME
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+      AND TABLE_NAME IN (%s, %s)
+      AND COALESCE(GENERATION_EXPRESSION, '') = ''
+    ORDER BY ORDINAL_POSITION
+    """
+    cursor.execute(query, (table_name, f"{table_name}_archive"))
+    rows = cursor.fetchall()
+    cursor.close()
+
+    archive_columns = {column for column, table in rows if table != table_name}
+    return [
+        column
+        for column, table in rows
+        if table == table_name and column in archive_columns
+    ]
+
+
+def archive_table(
+    connection: mysql.connector.MySQLConnection,
+    table_name: str,
+    retention_days: Optional[int] = None,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> int:
+    """
+    Mueve a la tabla de archivo las filas más antiguas que la ventana de retención
+
+    Trabaja en lotes por ID con un commit por lote, de modo que no se mantienen
+    bloqueos largos sobre la tabla principal. Solo se borran de la tabla principal
+    las filas que están en el archivo con el mismo ID y fecha: INSERT IGNORE omite
+    sin error las que no pudo copiar (por ejemplo, un ID ya ocupado en el archivo
+    por otra fila), y esas se quedan en la tabla principal.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Tabla a archivar (clave de ARCHIVE_TABLES)
+        retention_days (Optional[int]): Días que permanecen en la tabla principal
+        batch_size (int): Filas por lote
+        dry_run (bool): Si es True, solo cuenta las filas que se moverían
+
+    Returns:
+        int: Número de filas movidas (o que se moverían en dry_run)
+    """
+    config = ARCHIVE_TABLES[table_name]
+    date_column = config["date_column"]
+    retention_days = retention_days or config["retention_days"]
+    cutoff = datetime.now() - timedelta(days=retention_days)
+
+    where = f"{date_column} < %s"
+    referenced_by = config.get("referenced_by")
+    if referenced_by and table_exists(connection, referenced_by[0]):
+        ref_table, ref_column = referenced_by
+        where += (
+            f" AND NOT EXISTS (SELECT 1 FROM {ref_table} r"
+            f" WHERE r.{ref_column} = {table_name}.id)"
+        )
+
+    if dry_run:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE {where}", (cutoff,))
+        count = cursor.fetchone()[0]
+        cursor.close()
+        logger.info(
+            f"{table_name}: {count} filas anteriores a {cutoff:%Y-%m-%d} se archivarían"
+        )
+        return count
+
+    columns = ", ".join(get_copyable_columns(connection, table_name))
+    track_quality = table_exists(connection, "quality_enrichment_queue")
+    moved = 0
+    skipped = 0
+    last_id = 0
+
+    while True:
+        cursor = connection.cursor()
+        try:
+            # Avanzar por ID para no volver a leer las filas que no se pudieron mover
+            cursor.execute(
+                f"SELECT id FROM {table_name} WHERE {where} AND id > %s "
+                f"ORDER BY id LIMIT %s",
+                (cutoff, last_id, batch_size),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"INSERT IGNORE INTO {table_name}_archive ({columns}) "
+                f"SELECT {columns} FROM {table_name} WHERE id IN ({placeholders})",
+                ids,
+            )
+
+            # Borrar solo las filas confirmadas en el archivo
+            cursor.execute(
+                f"SELECT t.id FROM {table_name} t "
+                f"JOIN {table_name}_archive a ON a.id = t.id "
+                f"AND a.{date_column} <=> t.{date_column} "
+                f"WHERE t.id IN ({placeholders})",
+                ids,
+            )
+            archived_ids = [row[0] for row in cursor.fetchall()]
+            if len(archived_ids) < len(ids):
+                missing = sorted(set(ids) - set(archived_ids))
+                skipped += len(missing)
+                logger.warning(
+                    f"{table_name}: {len(missing)} filas no se copiaron al archivo y "
+                    f"se conservan en la tabla principal (IDs {missing[:10]})"
+                )
+
+            if archived_ids:
+                archived_placeholders = ", ".join(["%s"] * len(archived_ids))
+                cursor.execute(
+                    f"DELETE FROM {table_name} WHERE id IN ({archived_placeholders})",
+                    archived_ids,
+                )
+                if track_quality:
+                    remove_from_quality_queue(connection, table_name, archived_ids)
+            connection.commit()
+            moved += len(archived_ids)
+            logger.info(f"{table_name}: {moved} filas archivadas")
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error archivando {table_name}: {str(e)}")
+            break
+        finally:
+            cursor.close()
+
+    if skipped:
+        logger.warning(f"{table_name}: {skipped} filas antiguas quedan sin archivar")
+    return moved
+
+
+def refresh_summaries(
+    connection: mysql.connector.MySQLConnection,
+    table_name: str,
+    days: Optional[int] = None,
+) -> bool:
+    """
+    Recalcula el resumen diario de una tabla para los últimos días
+
+    Lee tanto la tabla principal como el archivo, por lo que puede ejecutarse antes
+    o después de archivar. Por defecto recalcula toda la ventana de retención de la
+    tabla: así cada día queda resumido mientras su detalle sigue en la tabla
+    principal, aunque el archivo se haya saltado algún ciclo o lleguen filas con
+    fecha atrasada.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Tabla a resumir (clave de SUMMARY_QUERIES)
+        days (Optional[int]): Número de días a recalcular (por defecto la retención)
+
+    Returns:
+        bool: True si el resumen se actualizó correctamente
+    """
+    spec = SUMMARY_QUERIES[table_name]
+    date_column = ARCHIVE_TABLES[table_name]["date_column"]
+    days = days or ARCHIVE_TABLES[table_name]["retention_days"]
+    since = (datetime.now() - timedelta(days=days)).date()
+
+    source = (
+        f"SELECT {spec['columns']} FROM {table_name} WHERE {date_column} >= %s "
+        f"UNION ALL "
+        f"SELECT {spec['columns']} FROM {table_name}_archive WHERE {date_column} >= %s"
+    )
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(spec["query"].format(source=source), (since, since))
+        connection.commit()
+        cursor.close()
+        logger.info(f"{table_name}: resumen diario actualizado desde {since}")
+        return True
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Error actualizando resumen de {table_name}: {str(e)}")
+        return False
+
+
+def prune_archive(
+    connection: mysql.connector.MySQLConnection,
+    table_name: str,
+    keep_days: int,
+    batch_size: int = 5000,
+) -> int:
+    """
+    Elimina del archivo las filas más antiguas que keep_days
+
+    Los resúmenes diarios no se tocan, de modo que los gráficos de largo plazo siguen
+    disponibles después de podar el detalle. keep_days no puede ser menor que la
+    retención de la tabla: refresh_summaries recalcula esa ventana desde el detalle y
+    sobrescribiría los resúmenes de los días ya podados.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Tabla principal cuyo archivo se poda
+        keep_days (int): Días de detalle a conservar en el archivo
+        batch_size (int): Filas eliminadas por lote
+
+    Returns:
+        int: Número de filas eliminadas
+    """
+    date_column = ARCHIVE_TABLES[table_name]["date_column"]
+    retention_days = ARCHIVE_TABLES[table_name]["retention_days"]
+    if keep_days < retention_days:
+        logger.error(
+            f"{table_name}_archive: keep_days ({keep_days}) no puede ser menor que la "
+            f"retención de la tabla ({retention_days} días)"
+        )
+        return 0
+
+    cutoff = datetime.now() - timedelta(days=keep_days)
+    deleted = 0
+
+    while True:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"DELETE FROM {table_name}_archive WHERE {date_column} < %s LIMIT %s",
+                (cutoff, batch_size),
+            )
+            count = cursor.rowcount
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error podando {table_name}_archive: {str(e)}")
+            break
+        finally:
+            cursor.close()
+
+        deleted += count
+        if count < batch_size:
+            break
+
+    logger.info(f"{table_name}_archive: {deleted} filas eliminadas")
+    return deleted
+
+
+def compact_table(connection: mysql.connector.MySQLConnection, table_name: str) -> bool:
+    """
+    Reconstruye una tabla para recuperar el espacio liberado tras archivar o podar
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+
+    Returns:
+        bool: True si se compactó correctamente
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"OPTIMIZE TABLE {table_name}")
+        cursor.fetchall()
+        cursor.close()
+        logger.info(f"Tabla {table_name} compactada")
+        return True
+    except Exception as e:
+        logger.error(f"Error compactando {table_name}: {str(e)}")
+        return False
+
+
+def get_archive_status(connection: mysql.connector.MySQLConnection) -> List[Dict[str, Any]]:
+    """
+    Obtiene el número de filas y el rango de fechas de cada tabla y su archivo
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+
+    Returns:
+        List[Dict[str, Any]]: Una entrada por tabla
+    """
+    status = []
+    cursor = connection.cursor(dictionary=True)
+    for table_name, config in ARCHIVE_TABLES.items():
+        date_column = config["date_column"]
+        for name in (table_name, f"{table_name}_archive"):
+            if not table_exists(connection, name):
+                continue
+            cursor.execute(
+                f"SELECT COUNT(*) AS row_count, MIN({date_column}) AS oldest, "
+                f"MAX({date_column}) AS newest FROM {name}"
+            )
+            row = cursor.fetchone()
+            row["table"] = name
+            status.append(row)
+    cursor.close()
+    return status
+
+
+def run_archive(
+    connection: mysql.connector.MySQLConnection,
+    tables: Optional[List[str]] = None,
+    retention_days: Optional[int] = None,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """
+    Actualiza los resúmenes de la ventana de retención y archiva las filas antiguas
+    de cada tabla
+
+    Es la tarea que ejecuta periódicamente schedule_data_processor.py.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        tables (Optional[List[str]]): Tablas a procesar (por defecto todas)
+        retention_days (Optional[int]): Retención común (por defecto la de cada tabla)
+        batch_size (int): Filas por lote
+
+    Returns:
+        Dict[str, int]: Filas archivadas por tabla
+    """
+    result = {}
+    if not ensure_archive_tables(connection):
+        return result
+
+    for table_name in tables or list(ARCHIVE_TABLES.keys()):
+        refresh_summaries(connection, table_name, retention_days)
+        result[table_name] = archive_table(
+            connection, table_name, retention_days, batch_size
+        )
+
+    return result
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(
+        description="Archivo y retención de datos históricos"
+    )
+    parser.add_argument(
+        "command",
+        choices=["status", "archive", "summarize", "prune", "compact"],
+        help="Operación a realizar",
+    )
+    parser.add_argument(
+        "--table",
+        type=str,
+        choices=list(ARCHIVE_TABLES.keys()),
+        help="Tabla a procesar (por defecto todas)",
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=None,
+        help="Días que permanecen en la tabla principal (archive)",
+    )
+    parser.add_argument(
+        "--keep-days",
+        type=int,
+        default=730,
+        help="Días de detalle a conservar en el archivo (prune)",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help="Días de resumen a recalcular (summarize; por defecto la retención)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Filas por lote"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Mostrar cuántas filas se archivarían sin moverlas",
+    )
+    args = parser.parse_args()
+
+    connection = connect_to_db(load_db_config())
+    if not connection:
+        logger.error("No se pudo conectar a la base de datos")
+        return 1
+
+    tables = [args.table] if args.table else list(ARCHIVE_TABLES.keys())
+
+    try:
+        if args.command == "status":
+            print("\n" + "=" * 80)
+            print("ESTADO DEL ARCHIVO")
+            print("=" * 80)
+            for row in get_archive_status(connection):
+                print(
+                    f"{row['table']:<30} {row['row_count']:>10} filas  "
+                    f"{row['oldest'] or '-'} -> {row['newest'] or '-'}"
+                )
+            print("=" * 80)
+        elif args.command == "archive":
+            if args.dry_run:
+                for table_name in tables:
+                    archive_table(
+                        connection, table_name, args.retention_days, dry_run=True
+                    )
+            else:
+                result = run_archive(
+                    connection, tables, args.retention_days, args.batch_size
+                )
+                for table_name, moved in result.items():
+                    print(f"{table_name}: {moved} filas archivadas")
+        elif args.command == "summarize":
+            ensure_archive_tables(connection)
+            for table_name in tables:
+                refresh_summaries(connection, table_name, args.days)
+        elif args.command == "prune":
+            for table_name in tables:
+                prune_archive(connection, table_name, args.keep_days, args.batch_size)
+        elif args.command == "compact":
+            for table_name in tables:
+                compact_table(connection, table_name)
+                compact_table(connection, f"{table_name}_archive")
+    finally:
+        connection.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,7 +22,7 @@ from database_quality_utils import (
     update_news_url,
     update_sentiment_analysis,
 )
-from text_processing import translate_title_to_spanish
+from text_processing import translate_titles_to_spanish
 from ai_content_generator import (
     generate_summary_with_ai,
     generate_sentiment_analysis_with_ai,
@@ -65,9 +65,15 @@ def process_empty_news_summaries(
             f"  - ID: {news.get('id')}, Título: {news.get('title')[:50]}..., Símbolo: {news.get('symbol')}"
         )
 
+    # Traducir en lote los títulos en inglés (pocas solicitudes en lugar de una por noticia)
+    print("Traduciendo títulos en lote...")
+    translated_titles = translate_titles_to_spanish(
+        [news.get("title", "") for news in empty_news]
+    )
+
     # Procesar cada noticia
     processed_count = 0
-    for i, news in enumerate(empty_news):
+    for i, (news, translated_title) in enumerate(zip(empty_news, translated_titles)):
         news_id = news.get("id")
         title = news.get("title", "")
         symbol = news.get("symbol", "SPY")
@@ -79,8 +85,6 @@ def process_empty_news_summaries(
 
         # Traducir título si está en inglés
         original_title = title
-        print(f"Traduciendo título: {original_title[:50]}...")
-        translated_title = translate_title_to_spanish(title)
         if translated_title != original_title:
             print(f"Título traducido: {translated_title[:50]}...")
 
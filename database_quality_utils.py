@@ -9,7 +9,7 @@ import os
 import logging
 import toml
 import mysql.connector
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 # Configurar logging
 logging.basicConfig(
@@ -113,12 +113,456 @@ def connect_to_db(config: Dict[str, Any]) -> Optional[mysql.connector.MySQLConne
         return None
 
 
+# Caché de columnas existentes por tabla (la estructura no cambia durante la ejecución)
+_column_cache: Dict[str, set] = {}
+
+
+def column_exists(
+    connection: mysql.connector.MySQLConnection, table_name: str, column_name: str
+) -> bool:
+    """
+    Verifica si una columna existe en una tabla, consultando la estructura una sola vez
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+        column_name (str): Nombre de la columna
+
+    Returns:
+        bool: True si la columna existe, False en caso contrario
+    """
+    if table_name not in _column_cache:
+        columns = get_table_columns(connection, table_name)
+        if not columns:
+            return False
+        _column_cache[table_name] = {column["Field"] for column in columns}
+
+    return column_name in _column_cache[table_name]
+
+
+# =============================================================================
+# Control de calidad incremental (sql/create_quality_tracking.sql)
+# =============================================================================
+
+# Verificaciones de calidad: nombre -> (tabla, condición de "necesita enriquecimiento")
+# Las condiciones se ejecutan siempre con parámetros, por eso los % van duplicados.
+QUALITY_CHECKS: Dict[str, Tuple[str, str]] = {
+    "news_summary": ("market_news", "(summary IS NULL OR summary = '')"),
+    "news_review": ("market_news", "(symbol = 'REVIEW')"),
+    "sentiment_fields": (
+        "market_sentiment",
+        """((analysis IS NULL OR analysis = '') OR
+            (symbol IS NULL OR symbol = '') OR
+            (sentiment IS NULL OR sentiment = '') OR
+            (score IS NULL) OR
+            (source IS NULL OR source = '') OR
+            (sentiment_date IS NULL))""",
+    ),
+    "signal_analysis": (
+        "trading_signals",
+        "(expert_analysis IS NULL OR expert_analysis = '')",
+    ),
+    "signal_analysis_error": (
+        "trading_signals",
+        """(expert_analysis LIKE '%%Error%%' OR
+            expert_analysis LIKE '%%error%%' OR
+            expert_analysis LIKE '%%st.session_state%%' OR
+            expert_analysis LIKE '%%AttributeError%%' OR
+            expert_analysis LIKE '%%Exception%%')""",
+    ),
+}
+
+SCAN_BATCH_SIZE = 5000
+
+# None = sin comprobar; True/False = tablas de seguimiento disponibles o no
+_tracking_available: Optional[bool] = None
+
+
+def ensure_quality_tracking(connection: mysql.connector.MySQLConnection) -> bool:
+    """
+    Crea las tablas de seguimiento incremental si no existen
+
+    Ejecuta sql/create_quality_tracking.sql. Si no se pueden crear (por ejemplo, por
+    falta de permisos), el control de calidad sigue funcionando con consultas sobre
+    la tabla completa.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+
+    Returns:
+        bool: True si las tablas de seguimiento están disponibles
+    """
+    global _tracking_available
+    if _tracking_available is not None:
+        return _tracking_available
+
+    sql_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "sql", "create_quality_tracking.sql"
+    )
+    try:
+        with open(sql_path, "r", encoding="utf-8") as f:
+            script = f.read()
+
+        # Eliminar comentarios y ejecutar cada sentencia por separado
+        lines = [line for line in script.splitlines() if not line.strip().startswith("--")]
+        statements = [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+        cursor = connection.cursor()
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                # Los índices sobre updated_at son opcionales
+                if statement.upper().startswith("CREATE TABLE"):
+                    raise
+                logger.warning(f"No se pudo aplicar {statement.split()[2]}: {str(e)}")
+        connection.commit()
+        cursor.close()
+        _tracking_available = True
+    except Exception as e:
+        logger.warning(
+            f"Control de calidad incremental no disponible, se usarán consultas completas: {str(e)}"
+        )
+        _tracking_available = False
+
+    return _tracking_available
+
+
+def get_quality_watermark(
+    connection: mysql.connector.MySQLConnection, table_name: str
+) -> Dict[str, Any]:
+    """
+    Obtiene la marca de agua de una tabla
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+
+    Returns:
+        Dict[str, Any]: last_id, last_scan_at y rows_scanned (valores iniciales si no existe)
+    """
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(
+        """
+        SELECT last_id, last_scan_at, rows_scanned
+        FROM quality_watermarks
+        WHERE table_name = %s
+        """,
+        (table_name,),
+    )
+    watermark = cursor.fetchone()
+    cursor.close()
+    return watermark or {"last_id": 0, "last_scan_at": None, "rows_scanned": 0}
+
+
+def refresh_quality_queue(
+    connection: mysql.connector.MySQLConnection,
+    table_name: str,
+    batch_size: int = SCAN_BATCH_SIZE,
+) -> int:
+    """
+    Revisa las filas nuevas o modificadas de una tabla y actualiza la cola de enriquecimiento
+
+    Solo se leen las filas con id mayor que la marca de agua y las que tienen
+    updated_at posterior al inicio de la revisión anterior. Cada fila se evalúa con
+    todas las verificaciones de la tabla en la misma consulta: si necesita
+    enriquecimiento se añade a la cola y, si ya no lo necesita, se elimina de ella.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+        batch_size (int): Filas por consulta al recorrer las filas nuevas
+
+    Returns:
+        int: Número de filas revisadas
+    """
+    checks = [
+        (name, condition)
+        for name, (table, condition) in QUALITY_CHECKS.items()
+        if table == table_name
+    ]
+    if not checks:
+        return 0
+
+    try:
+        watermark = get_quality_watermark(connection, table_name)
+        flags = ", ".join(f"{condition} AS {name}" for name, condition in checks)
+
+        cursor = connection.cursor(dictionary=True)
+
+        # El inicio de esta revisión es la referencia de la siguiente: lo que se
+        # modifique mientras tanto se volverá a revisar
+        cursor.execute("SELECT NOW() AS scan_started_at")
+        scan_started_at = cursor.fetchone()["scan_started_at"]
+
+        def apply(rows: List[Dict[str, Any]], last_id: int) -> None:
+            enqueue = []
+            dequeue = []
+            for row in rows:
+                for name, _ in checks:
+                    if row[name]:
+                        enqueue.append((name, table_name, row["id"]))
+                    else:
+                        dequeue.append((name, row["id"]))
+
+            write_cursor = connection.cursor()
+            if enqueue:
+                write_cursor.executemany(
+                    """
+                    INSERT IGNORE INTO quality_enrichment_queue (check_name, table_name, record_id)
+                    VALUES (%s, %s, %s)
+                    """,
+                    enqueue,
+                )
+            if dequeue:
+                write_cursor.executemany(
+                    """
+                    DELETE FROM quality_enrichment_queue
+                    WHERE check_name = %s AND record_id = %s
+                    """,
+                    dequeue,
+                )
+            write_cursor.execute(
+                """
+                INSERT INTO quality_watermarks (table_name, last_id, last_scan_at, rows_scanned)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    last_id = VALUES(last_id),
+                    last_scan_at = VALUES(last_scan_at),
+                    rows_scanned = VALUES(rows_scanned)
+                """,
+                (table_name, last_id, scan_started_at, scanned),
+            )
+            # Un commit por lote: si la revisión se interrumpe, continúa desde aquí
+            connection.commit()
+            write_cursor.close()
+
+        scanned = 0
+        last_id = watermark["last_id"]
+
+        # Filas ya revisadas que se modificaron desde la revisión anterior
+        if watermark["last_scan_at"] and column_exists(
+            connection, table_name, "updated_at"
+        ):
+            cursor.execute(
+                f"""
+                SELECT id, {flags} FROM {table_name}
+                WHERE updated_at >= %s AND id <= %s
+                """,
+                (watermark["last_scan_at"], last_id),
+            )
+            rows = cursor.fetchall()
+            scanned += len(rows)
+            apply(rows, last_id)
+
+        # Filas nuevas, en lotes por ID
+        while True:
+            cursor.execute(
+                f"""
+                SELECT id, {flags} FROM {table_name}
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            scanned += len(rows)
+            apply(rows, last_id)
+            if len(rows) < batch_size:
+                break
+
+        cursor.close()
+
+        if scanned:
+            logger.info(
+                f"Control de calidad incremental: {scanned} filas revisadas en {table_name}"
+            )
+        return scanned
+    except Exception as e:
+        logger.error(f"Error revisando filas nuevas de {table_name}: {str(e)}")
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        return 0
+
+
+def get_pending_records(
+    connection: mysql.connector.MySQLConnection,
+    check_name: str,
+    columns: str,
+    limit: int = 10,
+    order_by: str = "id DESC",
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Obtiene registros pendientes de enriquecimiento a partir de la cola
+
+    Antes de consultar se revisan las filas nuevas o modificadas de la tabla. La
+    condición se vuelve a evaluar sobre cada fila para no devolver registros que
+    se completaron después de la revisión.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        check_name (str): Verificación (clave de QUALITY_CHECKS)
+        columns (str): Columnas a seleccionar de la tabla
+        limit (int): Número máximo de registros a obtener
+        order_by (str): Orden de los resultados
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: Registros pendientes, o None si el seguimiento
+        incremental no está disponible
+    """
+    if not ensure_quality_tracking(connection):
+        return None
+
+    table_name, condition = QUALITY_CHECKS[check_name]
+    refresh_quality_queue(connection, table_name)
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # La cola dirige la consulta; las columnas de la tabla no coinciden con las
+        # de la cola, por lo que no hace falta calificarlas
+        query = f"""
+        SELECT {columns}
+        FROM quality_enrichment_queue q
+        JOIN {table_name} t ON t.id = q.record_id
+        WHERE q.check_name = %s AND {condition}
+        ORDER BY {order_by}
+        LIMIT %s
+        """
+        cursor.execute(query, (check_name, limit))
+        results = cursor.fetchall()
+        cursor.close()
+        return results
+    except Exception as e:
+        logger.error(f"Error obteniendo registros pendientes ({check_name}): {str(e)}")
+        return None
+
+
+def get_quality_backlog(
+    connection: mysql.connector.MySQLConnection,
+) -> Optional[Dict[str, int]]:
+    """
+    Obtiene el número de registros pendientes por verificación
+
+    Revisa las filas nuevas o modificadas de cada tabla y cuenta las entradas de la
+    cola que siguen existiendo en su tabla, sin recorrer las tablas completas.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+
+    Returns:
+        Optional[Dict[str, int]]: Pendientes por verificación, o None si el seguimiento
+        incremental no está disponible
+    """
+    if not ensure_quality_tracking(connection):
+        return None
+
+    for table_name in sorted({table for table, _ in QUALITY_CHECKS.values()}):
+        refresh_quality_queue(connection, table_name)
+
+    try:
+        cursor = connection.cursor()
+        backlog = {}
+        for check_name, (table_name, _) in QUALITY_CHECKS.items():
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM quality_enrichment_queue q
+                JOIN {table_name} t ON t.id = q.record_id
+                WHERE q.check_name = %s
+                """,
+                (check_name,),
+            )
+            backlog[check_name] = cursor.fetchone()[0]
+        cursor.close()
+        return backlog
+    except Exception as e:
+        logger.error(f"Error contando registros pendientes: {str(e)}")
+        return None
+
+
+def remove_from_quality_queue(
+    connection: mysql.connector.MySQLConnection, table_name: str, record_ids: List[int]
+) -> int:
+    """
+    Elimina de la cola de enriquecimiento los registros indicados
+
+    Se usa al borrar o archivar filas para que la cola no conserve entradas huérfanas.
+    No confirma la transacción; lo hace quien borra las filas.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+        record_ids (List[int]): IDs de los registros
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    if not record_ids:
+        return 0
+
+    placeholders = ", ".join(["%s"] * len(record_ids))
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+        DELETE FROM quality_enrichment_queue
+        WHERE table_name = %s AND record_id IN ({placeholders})
+        """,
+        [table_name] + list(record_ids),
+    )
+    deleted = cursor.rowcount
+    cursor.close()
+    return deleted
+
+
+def reset_quality_watermarks(
+    connection: mysql.connector.MySQLConnection, table_name: Optional[str] = None
+) -> bool:
+    """
+    Reinicia el seguimiento incremental para volver a revisar las tablas completas
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (Optional[str]): Tabla a reiniciar (por defecto todas)
+
+    Returns:
+        bool: True si se reinició correctamente
+    """
+    try:
+        cursor = connection.cursor()
+        if table_name:
+            cursor.execute(
+                "DELETE FROM quality_watermarks WHERE table_name = %s", (table_name,)
+            )
+            cursor.execute(
+                "DELETE FROM quality_enrichment_queue WHERE table_name = %s",
+                (table_name,),
+            )
+        else:
+            cursor.execute("DELETE FROM quality_watermarks")
+            cursor.execute("DELETE FROM quality_enrichment_queue")
+        connection.commit()
+        cursor.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error reiniciando las marcas de agua: {str(e)}")
+        return False
+
+
 def get_empty_news_summaries(
     connection: mysql.connector.MySQLConnection, limit: int = 10
 ) -> List[Dict[str, Any]]:
     """
     Obtiene noticias con resumen vacío
 
+    Usa la cola de enriquecimiento incremental si está disponible. Si no, y existe
+    la columna generada summary_missing (sql/add_performance_indexes.sql), se filtra
+    por ella para usar su índice en lugar de recorrer toda la tabla.
+
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         limit (int): Número máximo de registros a obtener
@@ -126,14 +570,24 @@ def get_empty_news_summaries(
     Returns:
         List[Dict[str, Any]]: Lista de noticias con resumen vacío
     """
+    columns = "id, title, symbol, source, url, news_date, impact"
+    pending = get_pending_records(connection, "news_summary", columns, limit)
+    if pending is not None:
+        return pending
+
     try:
+        if column_exists(connection, "market_news", "summary_missing"):
+            empty_condition = "summary_missing = 1"
+        else:
+            empty_condition = "(summary IS NULL OR summary = '')"
+
         cursor = connection.cursor(dictionary=True)
 
         # Ejecutar consulta
-        query = """
-        SELECT id, title, symbol, source, url, news_date, impact
+        query = f"""
+        SELECT {columns}
         FROM market_news
-        WHERE (summary IS NULL OR summary = '')
+        WHERE {empty_condition}
         ORDER BY id DESC
         LIMIT %s
         """
@@ -164,20 +618,20 @@ def get_empty_sentiment_analysis(
     Returns:
         List[Dict[str, Any]]: Lista de registros de sentimiento con campos críticos vacíos
     """
+    columns = """id, date, overall, vix, sp500_trend, technical_indicators, volume, notes,
+               symbol, sentiment, score, source, sentiment_date, analysis"""
+    pending = get_pending_records(connection, "sentiment_fields", columns, limit)
+    if pending is not None:
+        return pending
+
     try:
         cursor = connection.cursor(dictionary=True)
 
         # Ejecutar consulta para obtener registros con cualquier campo crítico vacío
-        query = """
-        SELECT id, date, overall, vix, sp500_trend, technical_indicators, volume, notes,
-               symbol, sentiment, score, source, sentiment_date, analysis
+        query = f"""
+        SELECT {columns}
         FROM market_sentiment
-        WHERE (analysis IS NULL OR analysis = '') OR
-              (symbol IS NULL OR symbol = '') OR
-              (sentiment IS NULL OR sentiment = '') OR
-              (score IS NULL) OR
-              (source IS NULL OR source = '') OR
-              (sentiment_date IS NULL)
+        WHERE {QUALITY_CHECKS["sentiment_fields"][1]}
         ORDER BY id DESC
         LIMIT %s
         """
@@ -407,6 +861,74 @@ def update_sentiment_analysis(
         return False
 
 
+def update_rows_batch(
+    connection: mysql.connector.MySQLConnection,
+    table_name: str,
+    updates: List[Dict[str, Any]],
+    id_column: str = "id",
+) -> int:
+    """
+    Actualiza varios registros de una tabla en una sola transacción
+
+    Las actualizaciones se agrupan por el conjunto de columnas que modifican y cada
+    grupo se envía con executemany. Las columnas con valor None se omiten, igual
+    que en update_sentiment_analysis.
+
+    Args:
+        connection (mysql.connector.MySQLConnection): Conexión a la base de datos
+        table_name (str): Nombre de la tabla
+        updates (List[Dict[str, Any]]): Diccionarios con el ID y las columnas a actualizar
+        id_column (str): Nombre de la columna de ID
+
+    Returns:
+        int: Número de registros actualizados
+    """
+    groups: Dict[tuple, List[tuple]] = {}
+    for update in updates:
+        row_id = update.get(id_column)
+        fields = {
+            column: value
+            for column, value in update.items()
+            if column != id_column and value is not None
+        }
+        if row_id is None or not fields:
+            continue
+        columns = tuple(sorted(fields))
+        groups.setdefault(columns, []).append(
+            tuple(fields[column] for column in columns) + (row_id,)
+        )
+
+    if not groups:
+        return 0
+
+    try:
+        cursor = connection.cursor()
+        updated = 0
+
+        for columns, rows in groups.items():
+            set_clause = ", ".join(f"{column} = %s" for column in columns)
+            query = f"""
+            UPDATE {table_name}
+            SET {set_clause}, updated_at = NOW()
+            WHERE {id_column} = %s
+            """
+            cursor.executemany(query, rows)
+            updated += len(rows)
+
+        # Confirmar todos los cambios de una vez
+        connection.commit()
+        cursor.close()
+
+        return updated
+    except Exception as e:
+        logger.error(f"Error actualizando registros de {table_name} en lote: {str(e)}")
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        return 0
+
+
 def get_database_tables(connection: mysql.connector.MySQLConnection) -> List[str]:
     """
     Obtiene la lista de tablas en la base de datos
@@ -472,14 +994,22 @@ def get_table_columns(
 
 
 def get_empty_fields_count(
-    connection: mysql.connector.MySQLConnection, table_name: str
+    connection: mysql.connector.MySQLConnection,
+    table_name: str,
+    full_scan: bool = False,
 ) -> Dict[str, int]:
     """
     Obtiene el conteo de campos vacíos por columna en una tabla
 
+    Todas las columnas se cuentan en una sola consulta. Por defecto solo se cuentan
+    las filas nuevas o modificadas desde la última revisión incremental de la tabla
+    (ver refresh_quality_queue), de modo que el coste no crece con la tabla. Con
+    full_scan=True se recorre la tabla completa.
+
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         table_name (str): Nombre de la tabla
+        full_scan (bool): Contar todas las filas ignorando la marca de agua
 
     Returns:
         Dict[str, int]: Diccionario con el conteo de campos vacíos por columna
@@ -491,37 +1021,34 @@ def get_empty_fields_count(
         if not columns:
             return {}
 
-        # Inicializar diccionario de resultados
-        empty_counts = {}
-
-        # Obtener conteo de campos vacíos para cada columna
-        cursor = connection.cursor()
-
-        for column in columns:
-            column_name = column["Field"]
-
-            # Ejecutar consulta para contar campos vacíos
-            query = f"""
-            SELECT COUNT(*) FROM {table_name}
-            WHERE {column_name} IS NULL OR {column_name} = ''
-            """
-
-            try:
-                cursor.execute(query)
-                count = cursor.fetchone()[0]
+        column_names = [column["Field"] for column in columns]
+        sums = ", ".join(
+            f"SUM({name} IS NULL OR {name} = '') AS `{name}`" for name in column_names
+        )
 
-                # Añadir al diccionario si hay campos vacíos
-                if count > 0:
-                    empty_counts[column_name] = count
-            except Exception as e:
-                logger.warning(
-                    f"Error contando campos vacíos para {table_name}.{column_name}: {str(e)}"
-                )
+        where = ""
+        params: tuple = ()
+        if (
+            not full_scan
+            and "id" in column_names
+            and ensure_quality_tracking(connection)
+        ):
+            watermark = get_quality_watermark(connection, table_name)
+            where = "WHERE id > %s"
+            params = (watermark["last_id"],)
+            if watermark["last_scan_at"] and "updated_at" in column_names:
+                where += " OR updated_at >= %s"
+                params += (watermark["last_scan_at"],)
 
-        # Cerrar cursor
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(f"SELECT {sums} FROM {table_name} {where}", params)
+        row = cursor.fetchone() or {}
         cursor.close()
 
-        return empty_counts
+        # Añadir al diccionario solo las columnas con campos vacíos
+        return {
+            name: int(count) for name, count in row.items() if count and int(count) > 0
+        }
     except Exception as e:
         logger.error(
             f"Error obteniendo conteo de campos vacíos para la tabla {table_name}: {str(e)}"
@@ -542,12 +1069,19 @@ def get_empty_news_symbols(
     Returns:
         List[Dict[str, Any]]: Lista de noticias con símbolos para revisión
     """
+    columns = "id, title, summary, source, url, news_date, symbol"
+    pending = get_pending_records(
+        connection, "news_review", columns, limit, order_by="news_date DESC"
+    )
+    if pending is not None:
+        return pending
+
     try:
         cursor = connection.cursor(dictionary=True)
 
         # Ejecutar consulta
-        query = """
-        SELECT id, title, summary, source, url, news_date, symbol
+        query = f"""
+        SELECT {columns}
         FROM market_news
         WHERE symbol = 'REVIEW'
         ORDER BY news_date DESC
@@ -573,6 +1107,9 @@ def get_empty_trading_signals_analysis(
     """
     Obtiene señales de trading con análisis experto vacío
 
+    Usa la cola de enriquecimiento incremental si está disponible. Si no, y existe
+    la columna generada expert_analysis_missing, se filtra por ella para usar su índice.
+
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         limit (int): Número máximo de registros a obtener
@@ -580,18 +1117,28 @@ def get_empty_trading_signals_analysis(
     Returns:
         List[Dict[str, Any]]: Lista de señales de trading con análisis experto vacío
     """
+    columns = """id, symbol, price, direction, confidence_level, timeframe, strategy,
+               category, analysis, technical_analysis, support_level, resistance_level,
+               rsi, trend, trend_strength, volatility, options_signal, options_analysis,
+               trading_specialist_signal, trading_specialist_confidence, sentiment,
+               sentiment_score, signal_date, latest_news, news_source, additional_news"""
+    pending = get_pending_records(connection, "signal_analysis", columns, limit)
+    if pending is not None:
+        return pending
+
     try:
+        if column_exists(connection, "trading_signals", "expert_analysis_missing"):
+            empty_condition = "expert_analysis_missing = 1"
+        else:
+            empty_condition = "(expert_analysis IS NULL OR expert_analysis = '')"
+
         cursor = connection.cursor(dictionary=True)
 
         # Ejecutar consulta
-        query = """
-        SELECT id, symbol, price, direction, confidence_level, timeframe, strategy,
-               category, analysis, technical_analysis, support_level, resistance_level,
-               rsi, trend, trend_strength, volatility, options_signal, options_analysis,
-               trading_specialist_signal, trading_specialist_confidence, sentiment,
-               sentiment_score, signal_date, latest_news, news_source, additional_news
+        query = f"""
+        SELECT {columns}
         FROM trading_signals
-        WHERE (expert_analysis IS NULL OR expert_analysis = '')
+        WHERE {empty_condition}
         ORDER BY id DESC
         LIMIT %s
         """
@@ -624,23 +1171,24 @@ def get_error_trading_signals_analysis(
     Returns:
         List[Dict[str, Any]]: Lista de señales de trading con errores en el análisis experto
     """
-    try:
-        cursor = connection.cursor(dictionary=True)
-
-        # Ejecutar consulta para buscar análisis que contengan mensajes de error comunes
-        query = """
-        SELECT id, symbol, price, direction, confidence_level, timeframe, strategy,
+    columns = """id, symbol, price, direction, confidence_level, timeframe, strategy,
                category, analysis, technical_analysis, support_level, resistance_level,
                rsi, trend, trend_strength, volatility, options_signal, options_analysis,
                trading_specialist_signal, trading_specialist_confidence, sentiment,
                sentiment_score, signal_date, latest_news, news_source, additional_news,
-               expert_analysis
+               expert_analysis"""
+    pending = get_pending_records(connection, "signal_analysis_error", columns, limit)
+    if pending is not None:
+        return pending
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+
+        # Ejecutar consulta para buscar análisis que contengan mensajes de error comunes
+        query = f"""
+        SELECT {columns}
         FROM trading_signals
-        WHERE expert_analysis LIKE '%%Error%%' OR
-              expert_analysis LIKE '%%error%%' OR
-              expert_analysis LIKE '%%st.session_state%%' OR
-              expert_analysis LIKE '%%AttributeError%%' OR
-              expert_analysis LIKE '%%Exception%%'
+        WHERE {QUALITY_CHECKS["signal_analysis_error"][1]}
         ORDER BY id DESC
         LIMIT %s
         """
@@ -709,6 +1257,24 @@ def update_trading_signal_analysis(
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Revisar la calidad de los datos")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Contar los campos vacíos en las tablas completas",
+    )
+    parser.add_argument(
+        "--reset-watermarks",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="TABLA",
+        help="Reiniciar el seguimiento incremental (de una tabla o de todas)",
+    )
+    args = parser.parse_args()
+
     # Pruebas básicas
     try:
         # Cargar configuración
@@ -720,13 +1286,19 @@ if __name__ == "__main__":
         if connection:
             print("Conexión establecida correctamente")
 
+            if args.reset_watermarks is not None:
+                if reset_quality_watermarks(connection, args.reset_watermarks or None):
+                    print("Marcas de agua de calidad reiniciadas")
+
             # Obtener tablas
             tables = get_database_tables(connection)
             print(f"Tablas en la base de datos: {tables}")
 
             # Obtener información de campos vacíos
             for table in tables:
-                empty_counts = get_empty_fields_count(connection, table)
+                empty_counts = get_empty_fields_count(
+                    connection, table, full_scan=args.full
+                )
                 if empty_counts:
                     print(f"\nCampos vacíos en la tabla {table}:")
                     for column, count in empty_counts.items():
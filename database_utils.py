@@ -10,12 +10,34 @@ import decimal
 import json
 import csv
 import os
+import re
+import time
+import threading
 from datetime import datetime
 import streamlit as st
 from typing import Dict, List, Any, Optional, Union, Tuple
 
+from symbol_extractor import symbol_extractor
+
 logger = logging.getLogger(__name__)
 
+# Importación masiva de suscriptores
+IMPORT_CHUNK_SIZE = 1000  # Filas por consulta de duplicados e INSERT múltiple
+MAX_IMPORT_ERROR_MESSAGES = 100  # Los demás errores solo se cuentan
+EMAIL_PATTERN = re.compile(r"^[^@\s,;]+@[^@\s,;]+\.[^@\s,;]+$")
+
+# Búsqueda de títulos similares por lotes: noticias por consulta UNION ALL
+SIMILAR_TITLES_BATCH_SIZE = 50
+
+# Caché de suscriptores compartida por todas las sesiones y tareas del proceso.
+# Cada escritura incrementa un contador en la tabla cache_versions; los demás
+# procesos comparan ese contador (una lectura por clave primaria) antes de usar
+# su copia, como mucho una vez cada VERSION_CHECK_INTERVAL segundos.
+SUBSCRIBERS_CACHE_NAME = "newsletter_subscribers"
+VERSION_CHECK_INTERVAL = 2.0
+_subscribers_cache: Dict[str, Any] = {"version": None, "checked_at": 0.0, "entries": {}}
+_subscribers_cache_lock = threading.Lock()
+
 
 class DatabaseManager:
     """Gestiona la conexión y operaciones con la base de datos"""
@@ -689,8 +711,11 @@ class DatabaseManager:
 
         # Verificar si ya existe un registro para hoy
         today = datetime.now().strftime("%Y-%m-%d")
-        check_query = "SELECT id FROM market_sentiment WHERE DATE(created_at) = %s"
-        existing_record = self.execute_query(check_query, params=[today], fetch=True)
+        check_query = """SELECT id FROM market_sentiment
+                        WHERE created_at >= %s AND created_at < %s + INTERVAL 1 DAY"""
+        existing_record = self.execute_query(
+            check_query, params=[today, today], fetch=True
+        )
 
         if existing_record and len(existing_record) > 0:
             logger.info(
@@ -848,11 +873,15 @@ class DatabaseManager:
 
             try:
                 # Verificar si la noticia ya existe (por título y fecha)
+                news_date = cleaned_data.get("news_date", datetime.now())
                 check_query = """SELECT id FROM market_news
-                                WHERE title = %s AND DATE(news_date) = DATE(%s)"""
+                                WHERE title = %s
+                                  AND news_date >= DATE(%s)
+                                  AND news_date < DATE(%s) + INTERVAL 1 DAY"""
                 check_params = (
                     cleaned_data.get("title", ""),
-                    cleaned_data.get("news_date", datetime.now()),
+                    news_date,
+                    news_date,
                 )
 
                 existing_news = self.execute_query(
@@ -927,6 +956,301 @@ class DatabaseManager:
 
         return self.execute_query(query, params)
 
+    # Índices FULLTEXT de market_news detectados (se consulta una sola vez por proceso)
+    _fulltext_indexes: Optional[set] = None
+
+    def has_fulltext_index(self, index_name: str) -> bool:
+        """Verifica si existe un índice FULLTEXT en market_news
+
+        Args:
+            index_name (str): Nombre del índice (ft_title_summary o ft_title)
+
+        Returns:
+            bool: True si el índice existe, False en caso contrario
+        """
+        if DatabaseManager._fulltext_indexes is None:
+            rows = self.execute_query(
+                "SHOW INDEX FROM market_news WHERE Index_type = 'FULLTEXT'"
+            )
+            if not rows:
+                # No cachear un resultado vacío por si la conexión falló
+                return False
+            DatabaseManager._fulltext_indexes = {row.get("Key_name") for row in rows}
+
+        return index_name in DatabaseManager._fulltext_indexes
+
+    def search_market_news(
+        self,
+        keywords: str,
+        symbol: Optional[str] = None,
+        days_back: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Busca noticias por palabras clave ordenadas por relevancia
+
+        Usa el índice FULLTEXT ft_title_summary (sql/add_news_fulltext.sql). Si el
+        índice no existe se recurre a LIKE sobre el título, sin orden por relevancia.
+
+        Args:
+            keywords (str): Palabras clave a buscar
+            symbol (Optional[str], optional): Filtrar por símbolo. Defaults to None.
+            days_back (Optional[int], optional): Limitar a los últimos N días. Defaults to None.
+            limit (int, optional): Número máximo de resultados. Defaults to 20.
+
+        Returns:
+            List[Dict[str, Any]]: Noticias encontradas con su puntuación en 'relevance'
+        """
+        if not keywords or not keywords.strip():
+            return []
+
+        if self.has_fulltext_index("ft_title_summary"):
+            query = """SELECT id, title, summary, source, url, news_date, symbol,
+                              MATCH(title, summary) AGAINST (%s IN NATURAL LANGUAGE MODE) AS relevance
+                       FROM market_news
+                       WHERE MATCH(title, summary) AGAINST (%s IN NATURAL LANGUAGE MODE)"""
+            params = [keywords, keywords]
+        else:
+            query = """SELECT id, title, summary, source, url, news_date, symbol,
+                              0 AS relevance
+                       FROM market_news
+                       WHERE title LIKE %s"""
+            params = [f"%{keywords.strip()}%"]
+
+        if symbol:
+            query += " AND symbol = %s"
+            params.append(symbol)
+
+        if days_back:
+            query += " AND news_date >= DATE_SUB(NOW(), INTERVAL %s DAY)"
+            params.append(days_back)
+
+        query += " ORDER BY relevance DESC, news_date DESC LIMIT %s"
+        params.append(limit)
+
+        return self.execute_query(query, params)
+
+    def search_news_by_symbol(
+        self, symbol: str, days_back: Optional[int] = None, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Busca noticias relacionadas con un símbolo, aunque no lo tengan asignado
+
+        Combina las noticias con el símbolo asignado y las que mencionan el ticker o
+        el nombre de la compañía (según company_data.py) en una única consulta.
+
+        Args:
+            symbol (str): Símbolo del activo
+            days_back (Optional[int], optional): Limitar a los últimos N días. Defaults to None.
+            limit (int, optional): Número máximo de resultados. Defaults to 20.
+
+        Returns:
+            List[Dict[str, Any]]: Noticias ordenadas por relevancia
+        """
+        if not symbol:
+            return []
+
+        from company_data import COMPANY_INFO
+
+        symbol = symbol.upper()
+        company_name = COMPANY_INFO.get(symbol, {}).get("name", "")
+        search_terms = f"{symbol} {company_name}".strip()
+
+        date_filter = ""
+        date_params: List[Any] = []
+        if days_back:
+            date_filter = " AND news_date >= DATE_SUB(NOW(), INTERVAL %s DAY)"
+            date_params = [days_back]
+
+        if not self.has_fulltext_index("ft_title_summary"):
+            query = f"""SELECT id, title, summary, source, url, news_date, symbol,
+                               0 AS relevance
+                        FROM market_news
+                        WHERE symbol = %s{date_filter}
+                        ORDER BY news_date DESC
+                        LIMIT %s"""
+            return self.execute_query(query, [symbol] + date_params + [limit])
+
+        # UNION en lugar de OR para que cada rama use su propio índice
+        # (idx_symbol_news_date y ft_title_summary). La segunda rama excluye el
+        # símbolo: su relevancia no lleva el +10 y UNION no eliminaría el duplicado
+        # (las noticias sin símbolo se conservan)
+        query = f"""(SELECT id, title, summary, source, url, news_date, symbol,
+                            MATCH(title, summary) AGAINST (%s IN NATURAL LANGUAGE MODE) + 10 AS relevance
+                     FROM market_news
+                     WHERE symbol = %s{date_filter}
+                     ORDER BY news_date DESC
+                     LIMIT %s)
+                    UNION ALL
+                    (SELECT id, title, summary, source, url, news_date, symbol,
+                            MATCH(title, summary) AGAINST (%s IN NATURAL LANGUAGE MODE) AS relevance
+                     FROM market_news
+                     WHERE MATCH(title, summary) AGAINST (%s IN NATURAL LANGUAGE MODE)
+                       AND (symbol IS NULL OR symbol <> %s){date_filter}
+                     LIMIT %s)
+                    ORDER BY relevance DESC, news_date DESC
+                    LIMIT %s"""
+        params = (
+            [search_terms, symbol]
+            + date_params
+            + [limit, search_terms, search_terms, symbol]
+            + date_params
+            + [limit, limit]
+        )
+
+        return self.execute_query(query, params)
+
+    def find_similar_news_titles(
+        self,
+        title: str,
+        min_similarity: float = 0.85,
+        days_back: Optional[int] = None,
+        exclude_id: Optional[int] = None,
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """Busca noticias con títulos casi duplicados
+
+        Obtiene los candidatos con el índice FULLTEXT ft_title y los filtra por la
+        similitud de secuencia entre títulos normalizados, para no traer la tabla
+        completa a Python.
+
+        Args:
+            title (str): Título de referencia
+            min_similarity (float, optional): Similitud mínima (0-1). Defaults to 0.85.
+            days_back (Optional[int], optional): Limitar a los últimos N días. Defaults to None.
+            exclude_id (Optional[int], optional): ID a excluir (la propia noticia). Defaults to None.
+            limit (int, optional): Número máximo de resultados. Defaults to 5.
+
+        Returns:
+            List[Dict[str, Any]]: Noticias similares con su similitud en 'similarity',
+                                  ordenadas de mayor a menor similitud
+        """
+        if not title or not title.strip():
+            return []
+
+        if self.has_fulltext_index("ft_title"):
+            query = """SELECT id, title, symbol, news_date,
+                              MATCH(title) AGAINST (%s IN NATURAL LANGUAGE MODE) AS relevance
+                       FROM market_news
+                       WHERE MATCH(title) AGAINST (%s IN NATURAL LANGUAGE MODE)"""
+            params: List[Any] = [title, title]
+        else:
+            query = """SELECT id, title, symbol, news_date, 0 AS relevance
+                       FROM market_news
+                       WHERE title = %s"""
+            params = [title]
+
+        if exclude_id:
+            query += " AND id <> %s"
+            params.append(exclude_id)
+
+        if days_back:
+            query += " AND news_date >= DATE_SUB(NOW(), INTERVAL %s DAY)"
+            params.append(days_back)
+
+        # Traer algunos candidatos más de los pedidos; el filtro fino se hace abajo
+        query += " ORDER BY relevance DESC LIMIT %s"
+        params.append(limit * 4)
+
+        candidates = self.execute_query(query, params) or []
+        return self._filter_similar_titles(title, candidates, min_similarity, limit)
+
+    def find_similar_news_titles_batch(
+        self,
+        items: List[Tuple[int, str]],
+        min_similarity: float = 0.85,
+        limit: int = 5,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Busca noticias con títulos casi duplicados para varias noticias a la vez
+
+        Equivale a llamar a find_similar_news_titles(title, exclude_id=id) por cada
+        noticia, pero con una sola consulta (UNION ALL de las búsquedas FULLTEXT)
+        por cada grupo de noticias.
+
+        Args:
+            items (List[Tuple[int, str]]): Pares (id, título) de las noticias de referencia
+            min_similarity (float, optional): Similitud mínima (0-1). Defaults to 0.85.
+            limit (int, optional): Resultados máximos por noticia. Defaults to 5.
+
+        Returns:
+            Dict[int, List[Dict[str, Any]]]: Noticias similares por ID de referencia
+        """
+        items = [(news_id, title) for news_id, title in items if title and title.strip()]
+        if not items:
+            return {}
+
+        use_fulltext = self.has_fulltext_index("ft_title")
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        for start in range(0, len(items), SIMILAR_TITLES_BATCH_SIZE):
+            group = items[start : start + SIMILAR_TITLES_BATCH_SIZE]
+            params: List[Any] = []
+            if use_fulltext:
+                selects = []
+                for news_id, title in group:
+                    selects.append(
+                        """(SELECT %s AS ref_id, id, title, symbol, news_date,
+                                   MATCH(title) AGAINST (%s IN NATURAL LANGUAGE MODE) AS relevance
+                            FROM market_news
+                            WHERE MATCH(title) AGAINST (%s IN NATURAL LANGUAGE MODE)
+                            AND id <> %s
+                            ORDER BY relevance DESC LIMIT %s)"""
+                    )
+                    params.extend([news_id, title, title, news_id, limit * 4])
+                query = " UNION ALL ".join(selects)
+            else:
+                # Sin índice FULLTEXT solo se detectan títulos idénticos
+                placeholders = ", ".join(["%s"] * len(group))
+                query = f"""SELECT id, title, symbol, news_date, 0 AS relevance
+                           FROM market_news
+                           WHERE title IN ({placeholders})"""
+                params = [title for _, title in group]
+
+            candidates = self.execute_query(query, params) or []
+            by_reference: Dict[int, List[Dict[str, Any]]] = {}
+            if use_fulltext:
+                for candidate in candidates:
+                    by_reference.setdefault(candidate.pop("ref_id"), []).append(candidate)
+            else:
+                for news_id, title in group:
+                    by_reference[news_id] = [
+                        dict(candidate)
+                        for candidate in candidates
+                        if candidate.get("title") == title and candidate.get("id") != news_id
+                    ]
+
+            for news_id, title in group:
+                similar = self._filter_similar_titles(
+                    title, by_reference.get(news_id, []), min_similarity, limit
+                )
+                if similar:
+                    results[news_id] = similar
+
+        return results
+
+    @staticmethod
+    def _filter_similar_titles(
+        title: str,
+        candidates: List[Dict[str, Any]],
+        min_similarity: float,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Filtra los candidatos por similitud de secuencia entre títulos normalizados"""
+        from difflib import SequenceMatcher
+
+        def normalize(text: str) -> str:
+            return re.sub(r"[^\w\s]", "", text.lower()).strip()
+
+        reference = normalize(title)
+        similar = []
+        for candidate in candidates:
+            similarity = SequenceMatcher(
+                None, reference, normalize(candidate.get("title") or "")
+            ).ratio()
+            if similarity >= min_similarity:
+                candidate["similarity"] = round(similarity, 3)
+                similar.append(candidate)
+
+        similar.sort(key=lambda x: x["similarity"], reverse=True)
+        return similar[:limit]
+
     def save_multiple_records(
         self, records_data: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
@@ -1118,11 +1442,15 @@ class DatabaseManager:
                                 cleaned_data[key] = value
 
                         # Verificar si la noticia ya existe
+                        news_date = cleaned_data.get("news_date", datetime.now())
                         check_query = """SELECT id FROM market_news
-                                        WHERE title = %s AND DATE(news_date) = DATE(%s)"""
+                                        WHERE title = %s
+                                          AND news_date >= DATE(%s)
+                                          AND news_date < DATE(%s) + INTERVAL 1 DAY"""
                         check_params = (
                             cleaned_data.get("title", ""),
-                            cleaned_data.get("news_date", datetime.now()),
+                            news_date,
+                            news_date,
                         )
 
                         existing_news = self.execute_query(
@@ -1291,6 +1619,33 @@ class DatabaseManager:
             return None
 
 
+def enqueue_quality_check(
+    table_name: str, record_id: Optional[int] = None, limit: int = 1
+) -> Optional[int]:
+    """
+    Encola el control de calidad de un registro recién guardado
+
+    El control de calidad (IA, traducción, enriquecimiento) lo ejecuta el trabajador
+    de quality_job_queue.py, de modo que el guardado no espera por él.
+
+    Args:
+        table_name (str): Tabla del registro (news, sentiment, signals o news_symbols)
+        record_id (Optional[int]): ID del registro guardado
+        limit (int): Número de registros a procesar
+
+    Returns:
+        Optional[int]: ID del trabajo encolado o None si no se pudo encolar
+    """
+    try:
+        # Importar aquí para evitar problemas de importación circular
+        from quality_job_queue import enqueue_quality_job
+
+        return enqueue_quality_job(table_name, limit=limit, record_id=record_id)
+    except Exception as e:
+        logger.warning(f"No se pudo encolar el control de calidad: {str(e)}")
+        return None
+
+
 def save_market_news(
     news_data: Dict[str, Any], process_quality: bool = True
 ) -> Optional[int]:
@@ -1298,7 +1653,7 @@ def save_market_news(
 
     Args:
         news_data (Dict[str, Any]): Datos de la noticia a guardar
-        process_quality (bool): Indica si se debe procesar la calidad de los datos después de guardar
+        process_quality (bool): Indica si se debe encolar el control de calidad después de guardar
 
     Returns:
         Optional[int]: ID de la noticia guardada o None si hubo un error
@@ -1552,54 +1907,11 @@ def save_market_news(
         if news_id:
             logger.info(f"Noticia guardada con ID: {news_id}")
 
-            # Procesar la calidad de los datos después de guardar
+            # Encolar el control de calidad y la actualización de símbolos
+            # (los procesa el trabajador de quality_job_queue.py)
             if process_quality:
-                try:
-                    # Importar aquí para evitar problemas de importación circular
-                    import post_save_quality_check
-                    import sys
-                    import os
-
-                    # Asegurar que post_save_quality_check está en el path
-                    current_dir = os.path.dirname(os.path.abspath(__file__))
-                    if current_dir not in sys.path:
-                        sys.path.append(current_dir)
-
-                    # Procesar solo las noticias
-                    result = post_save_quality_check.process_quality_after_save(
-                        table_name="news", limit=1
-                    )
-
-                    if result and result.get("news_processed", 0) > 0:
-                        logger.info(
-                            f"Procesamiento de calidad completado para la noticia {news_id}. Se procesaron {result.get('news_processed', 0)} noticias."
-                        )
-                    else:
-                        logger.warning(
-                            "No se procesaron noticias en post_save_quality_check"
-                        )
-
-                    # Ejecutar update_news_symbols.py para actualizar símbolos
-                    try:
-                        import update_news_symbols
-
-                        updated, skipped = update_news_symbols.update_news_symbols()
-                        logger.info(
-                            f"Actualización de símbolos completada: {updated} registros actualizados, {skipped} sin cambios"
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Error en la actualización de símbolos: {str(e)}"
-                        )
-                        logger.warning("Traza completa:", exc_info=True)
-
-                    # Mostrar mensaje de confirmación
-                    logger.info(
-                        "Los datos han sido almacenados correctamente en la base de datos y estarán disponibles para consultas futuras."
-                    )
-                except Exception as e:
-                    logger.warning(f"Error en el procesamiento de calidad: {str(e)}")
-                    logger.warning("Traza completa:", exc_info=True)
+                enqueue_quality_check("news", news_id)
+                enqueue_quality_check("news_symbols", news_id)
 
             return news_id
         else:
@@ -1618,7 +1930,7 @@ def save_market_sentiment(
 
     Args:
         sentiment_data (Dict[str, Any]): Datos de sentimiento a guardar
-        process_quality (bool): Indica si se debe procesar la calidad de los datos después de guardar
+        process_quality (bool): Indica si se debe encolar el control de calidad después de guardar
 
     Returns:
         Optional[int]: ID del sentimiento guardado o None si hubo un error
@@ -1628,11 +1940,10 @@ def save_market_sentiment(
 
         # Verificar si ya existe un registro para hoy
         today = datetime.now().strftime("%Y-%m-%d")
-        check_today_query = (
-            "SELECT id FROM market_sentiment WHERE DATE(created_at) = %s"
-        )
+        check_today_query = """SELECT id FROM market_sentiment
+                              WHERE created_at >= %s AND created_at < %s + INTERVAL 1 DAY"""
         existing_today = db_manager.execute_query(
-            check_today_query, params=[today], fetch=True
+            check_today_query, params=[today, today], fetch=True
         )
 
         if existing_today and len(existing_today) > 0:
@@ -1822,22 +2133,9 @@ def save_market_sentiment(
             sentiment_id = existing_sentiment[0].get("id")
             logger.info(f"Sentimiento de mercado actualizado con ID: {sentiment_id}")
 
-            # Procesar la calidad de los datos después de guardar
+            # Encolar el control de calidad (lo procesa quality_job_queue.py)
             if process_quality:
-                try:
-                    # Importar aquí para evitar problemas de importación circular
-                    import post_save_quality_check
-
-                    # Procesar solo el sentimiento
-                    post_save_quality_check.process_quality_after_save(
-                        table_name="sentiment", limit=1
-                    )
-                    logger.info(
-                        f"Procesamiento de calidad completado para el sentimiento {sentiment_id}"
-                    )
-                except Exception as e:
-                    logger.warning(f"Error en el procesamiento de calidad: {str(e)}")
-                    logger.warning("Traza completa:", exc_info=True)
+                enqueue_quality_check("sentiment", sentiment_id)
 
             return sentiment_id
         else:
@@ -1874,22 +2172,9 @@ def save_market_sentiment(
             sentiment_id = db_manager.execute_query(insert_query, params, fetch=False)
             logger.info(f"Nuevo sentimiento de mercado guardado con ID: {sentiment_id}")
 
-            # Procesar la calidad de los datos después de guardar
+            # Encolar el control de calidad (lo procesa quality_job_queue.py)
             if process_quality:
-                try:
-                    # Importar aquí para evitar problemas de importación circular
-                    import post_save_quality_check
-
-                    # Procesar solo el sentimiento
-                    post_save_quality_check.process_quality_after_save(
-                        table_name="sentiment", limit=1
-                    )
-                    logger.info(
-                        f"Procesamiento de calidad completado para el sentimiento {sentiment_id}"
-                    )
-                except Exception as e:
-                    logger.warning(f"Error en el procesamiento de calidad: {str(e)}")
-                    logger.warning("Traza completa:", exc_info=True)
+                enqueue_quality_check("sentiment", sentiment_id)
 
             return sentiment_id
 
@@ -1905,7 +2190,7 @@ def save_trading_signal(
 
     Args:
         signal_data (Dict[str, Any]): Datos de la señal a guardar
-        process_quality (bool): Indica si se debe procesar la calidad de los datos después de guardar
+        process_quality (bool): Indica si se debe encolar el control de calidad después de guardar
 
     Returns:
         Optional[int]: ID de la señal guardada o None si hubo un error
@@ -1970,22 +2255,9 @@ def save_trading_signal(
         # Usar el método save_signal del DatabaseManager
         signal_id = db_manager.save_signal(signal_data)
 
-        # Procesar la calidad de los datos después de guardar
+        # Encolar el control de calidad (lo procesa quality_job_queue.py)
         if signal_id and process_quality:
-            try:
-                # Importar aquí para evitar problemas de importación circular
-                import post_save_quality_check
-
-                # Procesar solo las señales de trading
-                post_save_quality_check.process_quality_after_save(
-                    table_name="signals", limit=1
-                )
-                logger.info(
-                    f"Procesamiento de calidad completado para la señal {signal_id}"
-                )
-            except Exception as e:
-                logger.warning(f"Error en el procesamiento de calidad: {str(e)}")
-                logger.warning("Traza completa:", exc_info=True)
+            enqueue_quality_check("signals", signal_id)
 
         return signal_id
 
@@ -1999,7 +2271,8 @@ def extract_symbol_from_content(
 ) -> Optional[str]:
     """
     Extrae el símbolo de una acción o ETF del título y/o contenido de una noticia.
-    Utiliza company_data.py para validar los símbolos encontrados.
+    Utiliza el extractor precompilado de symbol_extractor.py, construido a partir de
+    company_data.py.
 
     Args:
         text (str): Título de la noticia
@@ -2012,165 +2285,7 @@ def extract_symbol_from_content(
     if not text and not content and not current_context_symbol:
         return None
 
-    # Importar módulos necesarios
-    import re
-    import logging
-    import inspect
-
-    logger = logging.getLogger(__name__)
-
-    # Importar datos de company_data.py
-    from company_data import COMPANY_INFO
-
-    # Lista de símbolos candidatos con su puntuación de relevancia
-    candidates = {}
-
-    # Si tenemos un símbolo de contexto, añadirlo como candidato con alta puntuación
-    if current_context_symbol and current_context_symbol in COMPANY_INFO:
-        candidates[current_context_symbol] = 5.0
-        logger.info(f"Usando símbolo del contexto actual: {current_context_symbol}")
-
-    # Si no se proporcionó un símbolo de contexto, intentar encontrarlo en el stack
-    if not current_context_symbol:
-        # Obtener el frame actual para buscar el símbolo en el contexto
-        frame = inspect.currentframe().f_back
-
-        # Primero buscar en las variables locales de los frames
-        while frame:
-            if "symbol" in frame.f_locals and frame.f_locals["symbol"]:
-                context_symbol = frame.f_locals["symbol"]
-                if context_symbol in COMPANY_INFO:
-                    candidates[context_symbol] = 4.0
-                    logger.info(f"Símbolo encontrado en el contexto: {context_symbol}")
-                break
-            frame = frame.f_back
-
-    # Combinar título y contenido para análisis si ambos están disponibles
-    all_text = text or ""
-    if content:
-        all_text = f"{all_text} {content}"
-
-    # Buscar patrones comunes de símbolos en el texto
-    logger.info(f"Buscando símbolos en texto: '{text[:100]}...'")
-
-    # Patrón 1: Símbolos entre paréntesis como (AAPL), (TSLA), etc.
-    parenthesis_pattern = r"\(([A-Z]{1,5})\)"
-    matches = re.findall(parenthesis_pattern, all_text)
-    logger.info(f"Coincidencias de paréntesis: {matches}")
-
-    if matches:
-        # Verificar que el símbolo no sea una abreviatura común
-        common_abbr = [
-            "CEO",
-            "CFO",
-            "CTO",
-            "COO",
-            "USA",
-            "UK",
-            "EU",
-            "Q1",
-            "Q2",
-            "Q3",
-            "Q4",
-            "AI",
-            "IPO",
-            "ETF",
-        ]
-        for match in matches:
-            if match not in common_abbr and len(match) >= 2 and len(match) <= 5:
-                # Verificar si el símbolo existe en COMPANY_INFO
-                if match in COMPANY_INFO:
-                    # Mayor puntuación si está en el título
-                    score = 3.0 if match in text else 2.0
-                    candidates[match] = candidates.get(match, 0) + score
-                    logger.info(f"Símbolo encontrado en paréntesis: {match}")
-
-    # Patrón 2: Símbolos con prefijo NYSE: o NASDAQ: como NYSE:AAPL, NASDAQ:TSLA, etc.
-    exchange_pattern = r"(NYSE|NASDAQ):\s*([A-Z]{1,5})"
-    matches = re.findall(exchange_pattern, all_text)
-    logger.info(f"Coincidencias de exchange_pattern: {matches}")
-    if matches:
-        for match in matches:
-            symbol = match[1]  # Devolver el símbolo, no el exchange
-            # Verificar si el símbolo existe en COMPANY_INFO
-            if symbol in COMPANY_INFO:
-                # Mayor puntuación si está en el título
-                score = 3.0 if f"{match[0]}:{symbol}" in text else 2.0
-                candidates[symbol] = candidates.get(symbol, 0) + score
-                logger.info(f"Símbolo encontrado con prefijo de exchange: {symbol}")
-
-    # Patrón 3: Buscar nombres de compañías conocidas en el texto y devolver su símbolo
-    for symbol, info in COMPANY_INFO.items():
-        company_name = info.get("name", "")
-        if company_name and len(company_name) > 3:  # Evitar nombres muy cortos
-            # Buscar el nombre de la compañía en el texto
-            if company_name.lower() in all_text.lower():
-                # Mayor puntuación si está en el título
-                score = 2.5 if company_name.lower() in text.lower() else 1.5
-                candidates[symbol] = candidates.get(symbol, 0) + score
-                logger.info(
-                    f"Nombre de compañía encontrado: {company_name}, símbolo: {symbol}"
-                )
-
-    # Patrón 4: Buscar símbolos directamente en el texto (palabras en mayúsculas de 2-5 letras)
-    ticker_pattern = r"\b([A-Z]{2,5})\b"
-    matches = re.findall(ticker_pattern, all_text)
-    logger.info(f"Coincidencias de ticker_pattern: {matches}")
-    if matches:
-        common_words = [
-            "CEO",
-            "CFO",
-            "CTO",
-            "COO",
-            "USA",
-            "UK",
-            "EU",
-            "AI",
-            "IPO",
-            "ETF",
-            "SEC",
-            "FED",
-            "GDP",
-            "CPI",
-        ]
-        for match in matches:
-            if match not in common_words and match in COMPANY_INFO:
-                # Mayor puntuación si está en el título
-                score = 2.0 if match in text else 1.0
-                candidates[symbol] = candidates.get(symbol, 0) + score
-                logger.info(f"Símbolo encontrado directamente en el texto: {match}")
-
-    # Patrón 5: Buscar índices comunes si se mencionan en el texto
-    indices = {
-        "S&P 500": "SPY",
-        "S&P500": "SPY",
-        "SP500": "SPY",
-        "Dow Jones": "DIA",
-        "DJIA": "DIA",
-        "Nasdaq": "QQQ",
-        "Nasdaq 100": "QQQ",
-        "Russell 2000": "IWM",
-        "VIX": "VIX",
-        "Volatilidad": "VIX",
-    }
-
-    for index_name, index_symbol in indices.items():
-        if index_name.lower() in all_text.lower():
-            # Mayor puntuación si está en el título
-            score = 1.5 if index_name.lower() in text.lower() else 0.8
-            candidates[index_symbol] = candidates.get(index_symbol, 0) + score
-            logger.info(f"Índice encontrado: {index_name}, símbolo: {index_symbol}")
-
-    # Si hay candidatos, devolver el de mayor puntuación
-    if candidates:
-        best_symbol = max(candidates.items(), key=lambda x: x[1])[0]
-        logger.info(
-            f"Mejor símbolo encontrado: {best_symbol} con puntuación {candidates[best_symbol]}"
-        )
-        return best_symbol
-
-    # Si no se encuentra ningún símbolo, devolver None
-    return None
+    return symbol_extractor.extract(text or "", content, current_context_symbol)
 
 
 def extract_symbol_from_title(title: str) -> Optional[str]:
@@ -2260,6 +2375,27 @@ class NewsletterSubscriberManager:
                 self.db_manager.execute_query(create_logs_table, fetch=False)
                 logger.info("Tabla newsletter_send_logs creada correctamente")
 
+            # Verificar si la tabla de versiones de caché existe
+            query = "SHOW TABLES LIKE 'cache_versions'"
+            result = self.db_manager.execute_query(query)
+
+            if not result:
+                # Crear tabla de versiones de caché (una fila por caché compartida)
+                create_versions_table = """
+                CREATE TABLE IF NOT EXISTS cache_versions (
+                    name VARCHAR(64) PRIMARY KEY,
+                    version BIGINT NOT NULL DEFAULT 0,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """
+                self.db_manager.execute_query(create_versions_table, fetch=False)
+                self.db_manager.execute_query(
+                    "INSERT IGNORE INTO cache_versions (name, version) VALUES (%s, 0)",
+                    [SUBSCRIBERS_CACHE_NAME],
+                    fetch=False,
+                )
+                logger.info("Tabla cache_versions creada correctamente")
+
             return True
         except Exception as e:
             logger.error(f"Error asegurando tablas de suscriptores: {str(e)}")
@@ -2278,15 +2414,17 @@ class NewsletterSubscriberManager:
         Returns:
             List[Dict[str, Any]]: Lista de suscriptores
         """
-        # Usar caché de sesión si está disponible y no se fuerza la recarga
-        cache_key = f"cached_subscribers_{active_only}"
+        # Usar la caché del proceso si su versión coincide con la de la base de datos
+        version = self._get_subscribers_version(force=force_refresh)
 
-        if hasattr(st, "session_state") and not force_refresh:
-            if cache_key in st.session_state:
+        if not force_refresh:
+            with _subscribers_cache_lock:
+                entry = _subscribers_cache["entries"].get(active_only)
+            if entry is not None and entry[0] == version:
                 logger.info(
-                    f"Usando suscriptores en caché ({len(st.session_state[cache_key])} registros)"
+                    f"Usando suscriptores en caché ({len(entry[1])} registros, versión {version})"
                 )
-                return st.session_state[cache_key]
+                return list(entry[1])
 
         try:
             query = "SELECT * FROM newsletter_subscribers"
@@ -2316,14 +2454,15 @@ class NewsletterSubscriberManager:
                 elif not subscriber.get("preferences"):
                     subscriber["preferences"] = {}
 
-            # Guardar en caché si está disponible
-            if hasattr(st, "session_state"):
-                st.session_state[cache_key] = subscribers
-                logger.info(
-                    f"Suscriptores guardados en caché ({len(subscribers)} registros)"
-                )
+            # Guardar en caché si nadie la invalidó durante la consulta
+            with _subscribers_cache_lock:
+                if _subscribers_cache["version"] == version:
+                    _subscribers_cache["entries"][active_only] = (version, subscribers)
+                    logger.info(
+                        f"Suscriptores guardados en caché ({len(subscribers)} registros, versión {version})"
+                    )
 
-            return subscribers
+            return list(subscribers)
         except Exception as e:
             logger.error(f"Error obteniendo suscriptores: {str(e)}")
             return []
@@ -2507,21 +2646,60 @@ class NewsletterSubscriberManager:
             logger.error(f"Error actualizando suscriptor: {str(e)}")
             return False
 
+    def _get_subscribers_version(self, force: bool = False) -> Optional[int]:
+        """
+        Devuelve la versión actual de los suscriptores en la base de datos
+
+        La lectura se reutiliza durante VERSION_CHECK_INTERVAL segundos. Si la
+        versión cambió, se descartan las copias en caché del proceso.
+
+        Args:
+            force (bool): Si es True, consulta la base de datos en cualquier caso
+
+        Returns:
+            Optional[int]: Versión actual
+        """
+        now = time.monotonic()
+        with _subscribers_cache_lock:
+            if (
+                not force
+                and _subscribers_cache["version"] is not None
+                and now - _subscribers_cache["checked_at"] < VERSION_CHECK_INTERVAL
+            ):
+                return _subscribers_cache["version"]
+
+        result = self.db_manager.execute_query(
+            "SELECT version FROM cache_versions WHERE name = %s",
+            [SUBSCRIBERS_CACHE_NAME],
+        )
+        version = int(result[0]["version"]) if result else 0
+
+        with _subscribers_cache_lock:
+            if version != _subscribers_cache["version"]:
+                _subscribers_cache["entries"].clear()
+            _subscribers_cache["version"] = version
+            _subscribers_cache["checked_at"] = now
+        return version
+
     def _invalidate_subscribers_cache(self):
         """
-        Invalida la caché de suscriptores para forzar una recarga en la próxima solicitud
+        Invalida la caché de suscriptores de todos los procesos
+
+        Incrementa la versión en cache_versions (los demás procesos la verán en
+        su próxima comprobación) y descarta de inmediato la copia de este proceso.
         """
-        if hasattr(st, "session_state"):
-            # Eliminar todas las claves de caché de suscriptores
-            keys_to_remove = [
-                k
-                for k in st.session_state.keys()
-                if k.startswith("cached_subscribers_")
-            ]
-            for key in keys_to_remove:
-                if key in st.session_state:
-                    del st.session_state[key]
-                    logger.info(f"Caché de suscriptores invalidada: {key}")
+        self.db_manager.execute_query(
+            """
+            INSERT INTO cache_versions (name, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+            """,
+            [SUBSCRIBERS_CACHE_NAME],
+            fetch=False,
+        )
+        with _subscribers_cache_lock:
+            _subscribers_cache["entries"].clear()
+            _subscribers_cache["version"] = None
+        logger.info("Caché de suscriptores invalidada")
 
     def delete_subscriber(self, subscriber_id: int) -> bool:
         """
@@ -2621,6 +2799,136 @@ class NewsletterSubscriberManager:
             logger.error(f"Error registrando envío de boletín: {str(e)}")
             return None
 
+    def get_subscribers_by_emails(self, emails: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtiene varios suscriptores por correo electrónico en una sola consulta
+
+        Args:
+            emails (List[str]): Correos electrónicos a buscar
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Suscriptores encontrados por correo (en minúsculas)
+        """
+        emails = list(dict.fromkeys(e.strip().lower() for e in emails if e))
+        if not emails:
+            return {}
+
+        try:
+            placeholders = ", ".join(["%s"] * len(emails))
+            # La intercalación de la tabla no distingue mayúsculas y usa el índice de email
+            query = f"""
+            SELECT id, email, name, last_name, active, preferences
+            FROM newsletter_subscribers
+            WHERE email IN ({placeholders})
+            """
+            result = self.db_manager.execute_query(query, emails)
+            return {r["email"].lower(): r for r in result or [] if r.get("email")}
+        except Exception as e:
+            logger.error(f"Error obteniendo suscriptores por email: {str(e)}")
+            return {}
+
+    def log_newsletter_sends(
+        self,
+        send_results: List[Dict[str, Any]],
+        email_log_id: Optional[int],
+        pdf_attached: bool = False,
+        signals_included: str = "",
+    ) -> int:
+        """
+        Registra en lote el resultado del envío de un boletín a varios suscriptores
+
+        Los destinatarios que no son suscriptores registrados se ignoran. Los
+        registros se insertan con una sola sentencia y el contador y la fecha de
+        último envío se actualizan con otra para todos los envíos correctos.
+
+        Args:
+            send_results (List[Dict[str, Any]]): Estado por destinatario
+                ({"email", "status", "error_message"})
+            email_log_id (Optional[int]): ID del registro de correo
+            pdf_attached (bool, optional): Si se adjuntó un PDF
+            signals_included (str, optional): IDs de las señales incluidas
+
+        Returns:
+            int: Número de registros de envío guardados
+        """
+        subscribers = self.get_subscribers_by_emails(
+            [r.get("email") for r in send_results]
+        )
+        if not subscribers:
+            return 0
+
+        rows = []
+        sent_ids = []
+        for result in send_results:
+            subscriber = subscribers.get((result.get("email") or "").lower())
+            if not subscriber:
+                continue
+            success = result.get("status") == "success"
+            rows.append(
+                (
+                    subscriber["id"],
+                    email_log_id,
+                    result.get("status"),
+                    result.get("error_message") or "",
+                    pdf_attached and success,
+                    signals_included,
+                )
+            )
+            if success:
+                sent_ids.append(subscriber["id"])
+
+        if not rows:
+            return 0
+
+        cursor = None
+        invalidate_cache = False
+        try:
+            if not self.db_manager.connect():
+                logger.error("No se pudo conectar a la base de datos para registrar envíos")
+                return 0
+
+            cursor = self.db_manager.connection.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO newsletter_send_logs
+                (subscriber_id, email_log_id, status, error_message, pdf_attached, signals_included)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                rows,
+            )
+
+            if sent_ids:
+                placeholders = ", ".join(["%s"] * len(sent_ids))
+                cursor.execute(
+                    f"""
+                    UPDATE newsletter_subscribers
+                    SET send_count = send_count + 1, last_sent_date = %s
+                    WHERE id IN ({placeholders})
+                    """,
+                    [datetime.now()] + sent_ids,
+                )
+
+            self.db_manager.connection.commit()
+            logger.info(
+                f"Registrados {len(rows)} envíos de boletín ({len(sent_ids)} correctos)"
+            )
+            # El contador y la fecha de último envío forman parte de la caché
+            invalidate_cache = bool(sent_ids)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error registrando envíos de boletín: {str(e)}")
+            try:
+                self.db_manager.connection.rollback()
+            except Exception:
+                pass
+            return 0
+        finally:
+            if cursor:
+                cursor.close()
+            self.db_manager.disconnect()
+            if invalidate_cache:
+                self._invalidate_subscribers_cache()
+
     def get_send_logs(
         self, subscriber_id: Optional[int] = None, limit: int = 100
     ) -> List[Dict[str, Any]]:
@@ -2679,52 +2987,164 @@ class NewsletterSubscriberManager:
             return []
 
     def import_subscribers_from_csv(
-        self, csv_file_path: str
+        self,
+        csv_file_path: str,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress_callback=None,
     ) -> Tuple[int, int, List[str]]:
         """
         Importa suscriptores desde un archivo CSV
 
+        El archivo se lee por bloques: en cada bloque los correos se validan, se
+        buscan los existentes con una sola consulta, se reactivan los inactivos
+        con un UPDATE y los nuevos se insertan con un INSERT de varias filas. La
+        caché de suscriptores se invalida una sola vez al final.
+
         Args:
             csv_file_path (str): Ruta al archivo CSV
+            chunk_size (int, optional): Filas por bloque
+            progress_callback (Callable, optional): Función que recibe
+                (filas procesadas, añadidos, errores) tras cada bloque
 
         Returns:
             Tuple[int, int, List[str]]: (Número de suscriptores añadidos, número de errores, lista de errores)
         """
+        stats = {"rows": 0, "added": 0, "inserted": 0, "reactivated": 0, "duplicates": 0}
+        errors = 0
+        error_messages = []
+        seen = set()
+
+        def add_error(message: str):
+            nonlocal errors
+            errors += 1
+            if len(error_messages) < MAX_IMPORT_ERROR_MESSAGES:
+                error_messages.append(message)
+
+        cursor = None
         try:
-            import csv
-
-            added = 0
-            errors = 0
-            error_messages = []
+            if not self.db_manager.connect():
+                return 0, 1, ["No se pudo conectar a la base de datos"]
+            cursor = self.db_manager.connection.cursor(dictionary=True)
 
-            with open(csv_file_path, "r", encoding="utf-8") as file:
+            with open(csv_file_path, "r", encoding="utf-8-sig", newline="") as file:
                 reader = csv.DictReader(file)
+                chunk = []
 
-                for row in reader:
-                    email = row.get("email", "").strip()
+                for line_number, row in enumerate(reader, start=2):
+                    stats["rows"] += 1
+                    email = (row.get("email") or "").strip()
 
-                    if not email or "@" not in email:
-                        errors += 1
-                        error_messages.append(f"Correo inválido: {email}")
-                        continue
+                    if not EMAIL_PATTERN.match(email):
+                        add_error(f"Correo inválido (línea {line_number}): {email}")
+                    elif email.lower() in seen:
+                        stats["duplicates"] += 1
+                    else:
+                        seen.add(email.lower())
+                        chunk.append(
+                            (
+                                email,
+                                (row.get("name") or "").strip(),
+                                (row.get("last_name") or "").strip(),
+                                (row.get("company") or "").strip(),
+                            )
+                        )
 
-                    name = row.get("name", "").strip()
-                    last_name = row.get("last_name", "").strip()
-                    company = row.get("company", "").strip()
+                    if len(chunk) >= chunk_size:
+                        self._import_subscriber_chunk(cursor, chunk, stats, add_error)
+                        chunk = []
+                        if progress_callback:
+                            progress_callback(stats["rows"], stats["added"], errors)
 
-                    # Intentar añadir el suscriptor
-                    result = self.add_subscriber(email, name, last_name, company)
+                if chunk:
+                    self._import_subscriber_chunk(cursor, chunk, stats, add_error)
+                if progress_callback:
+                    progress_callback(stats["rows"], stats["added"], errors)
 
-                    if result:
-                        added += 1
-                    else:
-                        errors += 1
-                        error_messages.append(f"Error añadiendo: {email}")
+            if errors > len(error_messages):
+                error_messages.append(
+                    f"... y {errors - len(error_messages)} errores más"
+                )
 
-            return added, errors, error_messages
+            logger.info(
+                f"Importación de suscriptores: {stats['rows']} filas, "
+                f"{stats['inserted']} nuevos, {stats['reactivated']} reactivados, "
+                f"{stats['added'] - stats['inserted'] - stats['reactivated']} ya existentes, "
+                f"{stats['duplicates']} duplicados en el archivo, {errors} errores"
+            )
+            return stats["added"], errors, error_messages
         except Exception as e:
             logger.error(f"Error importando suscriptores desde CSV: {str(e)}")
-            return 0, 1, [str(e)]
+            return stats["added"], errors + 1, error_messages + [str(e)]
+        finally:
+            if cursor:
+                cursor.close()
+            self.db_manager.disconnect()
+            # Invalidar caché de suscriptores una sola vez
+            if stats["inserted"] or stats["reactivated"]:
+                self._invalidate_subscribers_cache()
+
+    def _import_subscriber_chunk(
+        self,
+        cursor,
+        chunk: List[Tuple[str, str, str, str]],
+        stats: Dict[str, int],
+        add_error,
+    ) -> None:
+        """
+        Importa un bloque de suscriptores ya validados y sin duplicados
+
+        Args:
+            cursor: Cursor (dictionary=True) de la conexión abierta
+            chunk (List[Tuple[str, str, str, str]]): Filas (email, name, last_name, company)
+            stats (Dict[str, int]): Contadores de la importación, se actualizan aquí
+            add_error (Callable): Función para registrar un error
+        """
+        try:
+            # Buscar los existentes del bloque con una sola consulta
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"SELECT id, email, active FROM newsletter_subscribers WHERE email IN ({placeholders})",
+                [row[0] for row in chunk],
+            )
+            existing = {r["email"].lower(): r for r in cursor.fetchall()}
+
+            inactive_ids = [r["id"] for r in existing.values() if not r.get("active", True)]
+            if inactive_ids:
+                placeholders = ", ".join(["%s"] * len(inactive_ids))
+                cursor.execute(
+                    f"UPDATE newsletter_subscribers SET active = TRUE WHERE id IN ({placeholders})",
+                    inactive_ids,
+                )
+
+            new_rows = [row for row in chunk if row[0].lower() not in existing]
+            inserted = 0
+            if new_rows:
+                now = datetime.now()
+                values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(new_rows))
+                params = [value for row in new_rows for value in (*row, now)]
+                # IGNORE evita fallar el bloque si otro proceso añadió el mismo correo
+                cursor.execute(
+                    f"""
+                    INSERT IGNORE INTO newsletter_subscribers
+                    (email, name, last_name, company, subscription_date)
+                    VALUES {values}
+                    """,
+                    params,
+                )
+                inserted = cursor.rowcount
+
+            self.db_manager.connection.commit()
+            stats["inserted"] += inserted
+            stats["reactivated"] += len(inactive_ids)
+            stats["added"] += len(existing) + inserted
+        except Exception as e:
+            logger.error(f"Error importando bloque de suscriptores: {str(e)}")
+            try:
+                self.db_manager.connection.rollback()
+            except Exception:
+                pass
+            for row in chunk:
+                add_error(f"Error añadiendo: {row[0]}")
 
     # El método add_subscriber ya está definido arriba
 
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Envío de boletines por correo con sesiones SMTP persistentes.
+
+En lugar de abrir una conexión, hacer STARTTLS, iniciar sesión y cerrarla por
+cada correo, NewsletterDelivery mantiene un pequeño pool de sesiones SMTP
+autenticadas durante todo el envío:
+
+1. Las partes comunes del mensaje (texto plano, PDF adjunto e imágenes) se
+   construyen y codifican una sola vez.
+2. Para cada destinatario solo se crean las cabeceras y el cuerpo HTML
+   (personalizable).
+3. Los destinatarios se reparten en lotes que se envían en paralelo, cada lote
+   por una sesión del pool.
+
+El resultado es el estado de cada destinatario, listo para registrarse en la
+base de datos en una sola operación.
+
+La configuración es el mismo diccionario que usa EmailManager (smtp_server,
+smtp_port, email_user, email_password, email_from). Con "smtp_starttls": False
+se puede probar contra un servidor SMTP local sin TLS (por ejemplo, aiosmtpd).
+"""
+
+import queue
+import socket
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.mime.application import MIMEApplication
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_BATCH_SIZE = 25
+SMTP_TIMEOUT = 10  # segundos
+
+PDF_FILENAME = "InversorIA_Pro_Boletin_Trading.pdf"
+PLAIN_TEXT_BODY = (
+    "Este correo contiene un boletín de trading de InversorIA Pro. Por favor, "
+    "utilice un cliente de correo que soporte HTML para visualizarlo correctamente."
+)
+
+
+class SMTPSessionPool:
+    """
+    Pool de sesiones SMTP autenticadas que se reutilizan entre mensajes
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: int = SMTP_TIMEOUT,
+    ):
+        """
+        Inicializa el pool (las conexiones se abren bajo demanda)
+
+        Args:
+            config (Dict[str, Any]): Configuración de correo
+            size (int): Número máximo de sesiones abiertas
+            timeout (int): Timeout de conexión en segundos
+        """
+        self.config = config
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.Queue[smtplib.SMTP]" = queue.Queue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._sessions: List[smtplib.SMTP] = []
+
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Abre y autentica una sesión SMTP
+
+        Returns:
+            smtplib.SMTP: Sesión lista para enviar
+        """
+        host = self.config.get("smtp_server")
+        port = int(self.config.get("smtp_port") or 587)
+
+        logger.info(f"Conectando a servidor SMTP: {host}:{port}")
+        if port == 465:
+            # Conexión SSL directa
+            server = smtplib.SMTP_SSL(host, port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(host, port, timeout=self.timeout)
+            if self.config.get("smtp_starttls", True):
+                server.starttls()
+
+        user = self.config.get("email_user")
+        password = self.config.get("email_password")
+        if user and password:
+            server.login(user, password)
+
+        return server
+
+    def _open(self) -> smtplib.SMTP:
+        """Abre una sesión nueva y la registra para cerrarla al final"""
+        server = self._connect()
+        with self._lock:
+            self._sessions.append(server)
+        return server
+
+    def _discard(self, server: smtplib.SMTP):
+        """Cierra una sesión rota y libera su hueco en el pool"""
+        with self._lock:
+            if server in self._sessions:
+                self._sessions.remove(server)
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def session(self):
+        """
+        Presta una sesión del pool durante un bloque with
+
+        Abre una sesión nueva si hay hueco; si no, espera a que otra se libere.
+        """
+        server = None
+        try:
+            server = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    server = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                server = self._idle.get()
+
+        holder = {"server": server}
+        try:
+            yield holder
+        finally:
+            if holder["server"] is not None:
+                self._idle.put(holder["server"])
+            else:
+                with self._lock:
+                    self._opened -= 1
+
+    def reconnect(self, holder: Dict[str, Optional[smtplib.SMTP]]) -> smtplib.SMTP:
+        """
+        Sustituye la sesión prestada por una nueva (por ejemplo, si el servidor
+        cerró la conexión por inactividad)
+
+        Args:
+            holder (Dict[str, Optional[smtplib.SMTP]]): Objeto devuelto por session()
+
+        Returns:
+            smtplib.SMTP: Nueva sesión
+        """
+        old = holder["server"]
+        holder["server"] = None
+        if old is not None:
+            self._discard(old)
+        holder["server"] = self._open()
+        return holder["server"]
+
+    def close(self):
+        """
+        Cierra todas las sesiones abiertas
+        """
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            self._opened = 0
+        while not self._idle.empty():
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for server in sessions:
+            try:
+                server.quit()
+            except Exception:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+
+
+class NewsletterDelivery:
+    """
+    Motor de envío de boletines por lotes con sesiones SMTP reutilizadas
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        pool_size: int = DEFAULT_POOL_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Inicializa el motor de envío
+
+        Args:
+            config (Dict[str, Any]): Configuración de correo (ver EmailManager)
+            pool_size (int): Sesiones SMTP simultáneas (y lotes en paralelo)
+            batch_size (int): Destinatarios por lote
+        """
+        self.config = config
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.sender = config.get("email_from") or config.get("email_user")
+
+    def build_shared_parts(
+        self, pdf_attachment: Optional[bytes] = None, images: Dict = None
+    ) -> Dict[str, Any]:
+        """
+        Construye una sola vez las partes comunes a todos los mensajes
+
+        Args:
+            pdf_attachment (Optional[bytes]): Contenido del PDF a adjuntar
+            images (Dict, optional): Imágenes embebidas {content_id: bytes}
+
+        Returns:
+            Dict[str, Any]: Partes MIME ya codificadas ("plain" y "attachments")
+        """
+        attachments = []
+
+        if pdf_attachment:
+            try:
+                pdf_part = MIMEApplication(pdf_attachment, _subtype="pdf")
+                pdf_part.add_header(
+                    "Content-Disposition", "attachment", filename=PDF_FILENAME
+                )
+                attachments.append(pdf_part)
+            except Exception as e:
+                logger.error(f"Error adjuntando PDF al correo: {str(e)}")
+
+        if images and isinstance(images, dict):
+            for img_id, img_data in images.items():
+                image = MIMEImage(img_data)
+                image.add_header("Content-ID", f"<{img_id}>")
+                attachments.append(image)
+
+        return {
+            "plain": MIMEText(PLAIN_TEXT_BODY, "plain"),
+            "attachments": attachments,
+        }
+
+    def build_message(
+        self,
+        recipient: str,
+        subject: str,
+        html_content: str,
+        shared_parts: Dict[str, Any],
+        html_part: MIMEText = None,
+    ) -> MIMEMultipart:
+        """
+        Construye el mensaje de un destinatario reutilizando las partes comunes
+
+        Args:
+            recipient (str): Correo del destinatario
+            subject (str): Asunto
+            html_content (str): Cuerpo HTML del destinatario
+            shared_parts (Dict[str, Any]): Resultado de build_shared_parts
+            html_part (MIMEText, optional): Parte HTML ya construida (si el cuerpo
+                es el mismo para todos)
+
+        Returns:
+            MIMEMultipart: Mensaje listo para enviar
+        """
+        msg = MIMEMultipart("related")
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = recipient
+
+        alt = MIMEMultipart("alternative")
+        alt.attach(shared_parts["plain"])
+        alt.attach(html_part or MIMEText(html_content, "html"))
+        msg.attach(alt)
+
+        for part in shared_parts["attachments"]:
+            msg.attach(part)
+
+        return msg
+
+    def send(
+        self,
+        recipients: Iterable[str],
+        subject: str,
+        html_content: str,
+        pdf_attachment: Optional[bytes] = None,
+        images: Dict = None,
+        personalize: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Envía el boletín a cada destinatario por separado
+
+        Args:
+            recipients (Iterable[str]): Correos de los destinatarios
+            subject (str): Asunto
+            html_content (str): Cuerpo HTML común
+            pdf_attachment (Optional[bytes]): PDF a adjuntar
+            images (Dict, optional): Imágenes embebidas {content_id: bytes}
+            personalize (Callable, optional): Función que recibe el correo del
+                destinatario y devuelve su HTML (None para usar el común)
+
+        Returns:
+            List[Dict[str, Any]]: Estado por destinatario, en el orden recibido:
+            {"email", "status" ("success" o "failed"), "error_message"}
+        """
+        return self.send_groups(
+            [
+                {
+                    "recipients": recipients,
+                    "html_content": html_content,
+                    "pdf_attachment": pdf_attachment,
+                }
+            ],
+            subject,
+            images=images,
+            personalize=personalize,
+        )
+
+    def send_groups(
+        self,
+        groups: List[Dict[str, Any]],
+        subject: str,
+        images: Dict = None,
+        personalize: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Envía varios boletines distintos compartiendo el mismo pool de sesiones
+
+        Los lotes de todos los grupos se reparten entre las sesiones SMTP en
+        paralelo, así que enviar N variantes cuesta lo mismo que enviar una.
+
+        Args:
+            groups (List[Dict[str, Any]]): Grupos {"recipients", "html_content",
+                "pdf_attachment" (opcional)}; un destinatario repetido solo recibe
+                el boletín del primer grupo en que aparece
+            subject (str): Asunto
+            images (Dict, optional): Imágenes embebidas {content_id: bytes}
+            personalize (Callable, optional): Ver send
+
+        Returns:
+            List[Dict[str, Any]]: Estado por destinatario, en el orden de los grupos
+        """
+        prepared = []
+        seen = set()
+        for group in groups:
+            # Eliminar duplicados conservando el orden
+            group_recipients = [
+                r
+                for r in dict.fromkeys(
+                    r.strip() for r in group.get("recipients") or [] if r and r.strip()
+                )
+                if r not in seen
+            ]
+            if not group_recipients:
+                continue
+            seen.update(group_recipients)
+            prepared.append(
+                {
+                    "recipients": group_recipients,
+                    "html_content": group["html_content"],
+                    "shared_parts": self.build_shared_parts(
+                        group.get("pdf_attachment"), images
+                    ),
+                    "html_part": MIMEText(group["html_content"], "html"),
+                }
+            )
+
+        recipient_list = [r for group in prepared for r in group["recipients"]]
+        if not recipient_list:
+            return []
+
+        batches = [
+            (group, group["recipients"][i : i + self.batch_size])
+            for group in prepared
+            for i in range(0, len(group["recipients"]), self.batch_size)
+        ]
+        results: Dict[str, Dict[str, Any]] = {}
+        abort = threading.Event()
+        pool = SMTPSessionPool(self.config, size=min(self.pool_size, len(batches)))
+
+        def send_batch(group: Dict[str, Any], batch: List[str]) -> List[Dict[str, Any]]:
+            batch_results = []
+            if abort.is_set():
+                return [
+                    self._result(r, "Envío cancelado por un error de autenticación")
+                    for r in batch
+                ]
+            try:
+                with pool.session() as holder:
+                    for recipient in batch:
+                        html = personalize(recipient) if personalize else None
+                        msg = self.build_message(
+                            recipient,
+                            subject,
+                            html or group["html_content"],
+                            group["shared_parts"],
+                            html_part=None if html else group["html_part"],
+                        )
+                        batch_results.append(
+                            self._send_one(pool, holder, msg, recipient)
+                        )
+            except smtplib.SMTPAuthenticationError as e:
+                abort.set()
+                logger.error(f"Error de autenticación SMTP: {str(e)}")
+                logger.error(
+                    "Verifica tu usuario y contraseña. Si usas Gmail, asegúrate de usar una 'Clave de aplicación'."
+                )
+                done = {r["email"] for r in batch_results}
+                batch_results += [
+                    self._result(r, f"Error de autenticación SMTP: {str(e)}")
+                    for r in batch
+                    if r not in done
+                ]
+            except OSError as e:
+                logger.error(f"Error conectando con el servidor SMTP: {str(e)}")
+                done = {r["email"] for r in batch_results}
+                batch_results += [
+                    self._result(r, f"Error de conexión SMTP: {str(e)}")
+                    for r in batch
+                    if r not in done
+                ]
+            return batch_results
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=pool.size, thread_name_prefix="smtp"
+            ) as executor:
+                futures = [
+                    executor.submit(send_batch, group, batch)
+                    for group, batch in batches
+                ]
+                for future in as_completed(futures):
+                    for result in future.result():
+                        results[result["email"]] = result
+        finally:
+            pool.close()
+
+        ordered = [results[r] for r in recipient_list]
+        sent = sum(1 for r in ordered if r["status"] == "success")
+        logger.info(
+            f"Boletín enviado a {sent} de {len(ordered)} destinatarios "
+            f"({len(prepared)} variantes, {len(batches)} lotes, {pool.size} sesiones SMTP)"
+        )
+        return ordered
+
+    def _send_one(
+        self,
+        pool: SMTPSessionPool,
+        holder: Dict[str, Optional[smtplib.SMTP]],
+        msg: MIMEMultipart,
+        recipient: str,
+    ) -> Dict[str, Any]:
+        """
+        Envía un mensaje por la sesión prestada, reconectando una vez si el
+        servidor cerró la conexión
+
+        Returns:
+            Dict[str, Any]: Estado del destinatario
+        """
+        for attempt in range(2):
+            try:
+                holder["server"].send_message(msg, self.sender, [recipient])
+                return self._result(recipient)
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    return self._result(
+                        recipient, "El servidor SMTP se desconectó durante el envío"
+                    )
+                logger.warning("Sesión SMTP cerrada por el servidor, reconectando")
+                pool.reconnect(holder)
+            except smtplib.SMTPRecipientsRefused as e:
+                return self._result(recipient, f"Destinatario rechazado: {str(e)}")
+            except socket.timeout:
+                pool.reconnect(holder)
+                return self._result(recipient, "Timeout durante el envío del correo")
+            except smtplib.SMTPException as e:
+                return self._result(recipient, f"Error SMTP: {str(e)}")
+
+    @staticmethod
+    def _result(email: str, error_message: Optional[str] = None) -> Dict[str, Any]:
+        """Construye el estado de envío de un destinatario"""
+        return {
+            "email": email,
+            "status": "failed" if error_message else "success",
+            "error_message": error_message,
+        }
@@ -14,7 +14,8 @@ from datetime import datetime
 import logging
 import os
 import toml
-import time
+
+from utils.session_state import get_state, set_state
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -48,30 +49,27 @@ def load_openai_config():
 
 
 # Función para obtener análisis experto
-def get_expert_analysis_from_scanner(prompt):
+def get_expert_analysis_from_scanner(prompt, symbol=None):
     """
     Obtiene análisis experto utilizando el asistente configurado en ASSISTANT_ID
     o la API directa como alternativa
 
     Args:
         prompt (str): Prompt para el modelo de IA
+        symbol (str, optional): Símbolo analizado; las consultas del mismo símbolo
+            comparten thread del asistente
 
     Returns:
         str: Análisis generado por el modelo
     """
 
-    # Procesar la calidad de los datos después de guardar
+    # Encolar el control de calidad de las señales (lo procesa quality_job_queue.py)
     try:
-        import post_save_quality_check
+        from quality_job_queue import enqueue_quality_job
 
-        # Procesar solo las señales de trading
-        post_save_quality_check.process_quality_after_save(
-            table_name="signals", limit=1
-        )
-        logger.info(f"Procesamiento de calidad completado para la señal")
+        enqueue_quality_job("signals", limit=1)
     except Exception as e:
-        logger.warning(f"Error en el procesamiento de calidad: {str(e)}")
-        logger.warning(f"Traza completa:", exc_info=True)
+        logger.warning(f"No se pudo encolar el control de calidad: {str(e)}")
     try:
         # Intentar usar ai_utils.get_expert_analysis
         try:
@@ -96,48 +94,18 @@ def get_expert_analysis_from_scanner(prompt):
 
                 openai.api_key = api_key
 
-                # Crear un thread
-                thread = openai.beta.threads.create()
-
-                # Enviar mensaje al thread
-                openai.beta.threads.messages.create(
-                    thread_id=thread.id, role="user", content=prompt
-                )
+                from ai_client import get_ai_client
 
-                # Ejecutar el asistente
-                run = openai.beta.threads.runs.create(
-                    thread_id=thread.id, assistant_id=assistant_id
+                # Ejecutar el asistente con backoff exponencial y plazo total
+                result = get_ai_client().run_assistant(
+                    prompt,
+                    assistant_id=assistant_id,
+                    session_key=symbol,
+                    timeout=60,
+                    client=openai,
                 )
-
-                # Esperar a que se complete
-                while run.status in ["queued", "in_progress"]:
-                    time.sleep(1)
-                    run = openai.beta.threads.runs.retrieve(
-                        thread_id=thread.id, run_id=run.id
-                    )
-
-                # Obtener la respuesta
-                if run.status == "completed":
-                    messages = openai.beta.threads.messages.list(thread_id=thread.id)
-
-                    for message in messages:
-                        if message.role == "assistant":
-                            # Extraer el contenido del mensaje
-                            if hasattr(message, "content") and len(message.content) > 0:
-                                message_content = message.content[0]
-                                if hasattr(message_content, "text"):
-                                    nested_text = message_content.text
-                                    if hasattr(nested_text, "value"):
-                                        return nested_text.value
-                                    elif isinstance(nested_text, str):
-                                        return nested_text
-                                elif (
-                                    isinstance(message_content, dict)
-                                    and "text" in message_content
-                                ):
-                                    return message_content["text"].get(
-                                        "value", message_content["text"]
-                                    )
+                if result["status"] == "completed" and result["text"]:
+                    return result["text"]
 
                 # Si no se pudo obtener la respuesta, usar la API directa
                 logger.warning(
@@ -246,9 +214,9 @@ def render_enhanced_market_scanner(
             # Obtener oportunidades
             if scan_button or "scan_results" not in st.session_state:
                 opportunities = scanner.scan_market(selected_sectors)
-                st.session_state.scan_results = opportunities
+                set_state("scan_results", opportunities)
             else:
-                opportunities = st.session_state.scan_results
+                opportunities = get_state("scan_results", pd.DataFrame())
 
         if opportunities.empty:
             st.warning("No se identificaron oportunidades que cumplan los criterios")
@@ -2679,7 +2647,9 @@ def render_enhanced_market_scanner(
 
                                         # Usar la función get_expert_analysis_from_scanner que prioriza el asistente
                                         expert_analysis = (
-                                            get_expert_analysis_from_scanner(prompt)
+                                            get_expert_analysis_from_scanner(
+                                                prompt, symbol=symbol
+                                            )
                                         )
 
                                         st.markdown(
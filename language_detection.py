@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección rápida del idioma (inglés o español) de títulos y resúmenes de noticias.
+
+El texto se pasa a minúsculas y se divide en palabras una sola vez; después se
+cuentan las palabras vacías (stopwords) distintas de cada idioma con conjuntos
+precalculados. Un texto se considera en inglés cuando tiene al menos min_words
+palabras inglesas distintas y más que españolas.
+
+Lo usan text_processing.is_english_text, DataValidator._is_english_text y
+NewsProcessor._is_english_text. Los casos de regresión se comprueban con
+"python language_detection.py".
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+# Palabras comunes en inglés que no suelen usarse en español
+ENGLISH_STOPWORDS = frozenset("""
+    the and of to a in that have i it for not on with he as you do at this but
+    his by from they we say her she or an will my one all would there their what
+    so up out if about who get which go me when make can like time no just him
+    know take people has
+    """.split())
+
+# Palabras comunes en español. Las que también son inglesas ("a", "no", "me")
+# figuran en ambas listas y se compensan entre sí
+SPANISH_STOPWORDS = frozenset("""
+    de la que el en y a no los del se las por un para con una su al lo como más
+    pero sus le ya o u este sí si porque esta entre cuando muy sin sobre también
+    me te mi mis tu tus hasta hay donde quien desde todo nos durante todos uno
+    les ni contra otros ese eso ante ellos e esto antes algunos qué unos yo otro
+    otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar
+    estas algunas algo nosotros es son fue han ha tras según está están era ser
+    será tiene tienen hace puede pueden hacia bajo mientras aunque cómo dónde
+    hoy ayer nuevo nuevos nueva nuevas
+    """.split())
+
+# Los apóstrofos separan palabras ("it's" -> "it", "s")
+TOKEN_PATTERN = re.compile(r"[a-záéíóúüñ]+")
+
+DEFAULT_MIN_WORDS = 4
+MIN_TEXT_LENGTH = 10
+
+
+def language_scores(text: str) -> Tuple[int, int]:
+    """
+    Cuenta las palabras vacías distintas de cada idioma en un texto
+
+    Args:
+        text (str): Texto a analizar
+
+    Returns:
+        Tuple[int, int]: (palabras inglesas distintas, palabras españolas distintas)
+    """
+    tokens = set(TOKEN_PATTERN.findall(text.lower()))
+    return len(tokens & ENGLISH_STOPWORDS), len(tokens & SPANISH_STOPWORDS)
+
+
+@lru_cache(maxsize=4096)
+def is_english(text: str, min_words: int = DEFAULT_MIN_WORDS) -> bool:
+    """
+    Detecta si un texto está en inglés
+
+    Args:
+        text (str): Texto a analizar
+        min_words (int): Número mínimo de palabras inglesas distintas
+
+    Returns:
+        bool: True si el texto parece estar en inglés, False en caso contrario
+    """
+    if not isinstance(text, str) or len(text) < MIN_TEXT_LENGTH:
+        return False
+
+    english_count, spanish_count = language_scores(text)
+    return english_count >= min_words and english_count > spanish_count
+
+
+def is_english_batch(
+    texts: Iterable[str], min_words: int = DEFAULT_MIN_WORDS
+) -> List[bool]:
+    """
+    Detecta el idioma de varios textos
+
+    Args:
+        texts (Iterable[str]): Textos a analizar
+        min_words (int): Número mínimo de palabras inglesas distintas
+
+    Returns:
+        List[bool]: True para cada texto en inglés, en el mismo orden
+    """
+    return [is_english(text, min_words) if text else False for text in texts]
+
+
+# Casos de regresión: (texto, min_words, resultado esperado)
+REGRESSION_CASES = [
+    ("Tesla no logra subir a nuevos máximos", 2, False),
+    ("Apple no sube a máximos hoy", 2, False),
+    ("It's time for the Fed", DEFAULT_MIN_WORDS, True),
+    (
+        "Apple's shares rise as investors bet on the iPhone for the holidays",
+        DEFAULT_MIN_WORDS,
+        True,
+    ),
+    ("Las acciones de Apple suben tras la presentación del iPhone", 2, False),
+    ("Fed holds rates and says it will wait for more data", 2, True),
+]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for text, min_words, expected in REGRESSION_CASES:
+        result = is_english(text, min_words)
+        status = "OK" if result == expected else "FALLO"
+        failures += result != expected
+        print(f"[{status}] is_english({text!r}, {min_words}) = {result}")
+    raise SystemExit(1 if failures else 0)
@@ -153,7 +153,9 @@ class MarketDataManager:
 
                             # Validar y mejorar la noticia antes de guardarla
                             if self.data_validator:
-                                news = self.data_validator.validate_market_news(news)
+                                news = self.data_validator.validate_market_news(
+                                    news, signal_data.get("symbol")
+                                )
                                 logger.info(f"Noticia {i+1} validada y mejorada con IA")
 
                             # Guardar noticia
@@ -341,7 +343,9 @@ class MarketDataManager:
 
                 # Validar y mejorar la noticia principal antes de guardarla
                 if self.data_validator:
-                    main_news = self.data_validator.validate_market_news(main_news)
+                    main_news = self.data_validator.validate_market_news(
+                        main_news, signal_data.get("symbol")
+                    )
                     logger.info("Noticia principal validada y mejorada con IA")
 
                 # Guardar la noticia principal (permitir múltiples noticias del mismo día)
@@ -451,7 +455,7 @@ class MarketDataManager:
                         # Validar y mejorar la noticia adicional antes de guardarla
                         if self.data_validator:
                             add_news = self.data_validator.validate_market_news(
-                                add_news
+                                add_news, signal_data.get("symbol")
                             )
                             logger.info(
                                 f"Noticia adicional {i+1} validada y mejorada con IA"
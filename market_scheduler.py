@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificador de tareas por eventos para los procesos en segundo plano.
+
+Sustituye el bucle de "ejecutar y dormir un intervalo fijo" por tareas con
+expresiones tipo cron en la zona horaria del mercado (America/New_York):
+
+- Cada tarea tiene una o varias expresiones cron y un margen aleatorio (jitter)
+  para que varias instancias o tareas no arranquen en el mismo segundo.
+- Las tareas pueden despertarse antes de su hora cuando una fuente de backlog
+  (por ejemplo, la cola de control de calidad) supera un umbral.
+- Una tarea no se solapa consigo misma: si la ejecución anterior sigue en curso,
+  la nueva se omite y se registra.
+- Un bloqueo de archivo impide que haya más de un planificador activo.
+- Se registran por tarea la duración y el retraso (lag) respecto a la hora
+  prevista, y se guardan en .cache/scheduler_metrics.json.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import pytz
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+MARKET_TIMEZONE = pytz.timezone("America/New_York")
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_LOCK_PATH = os.path.join(CACHE_DIR, "scheduler.lock")
+DEFAULT_METRICS_PATH = os.path.join(CACHE_DIR, "scheduler_metrics.json")
+
+DEFAULT_POLL_INTERVAL = 30.0  # Segundos entre comprobaciones de backlog
+
+
+class CronExpression:
+    """
+    Expresión cron de cinco campos: minuto hora día-del-mes mes día-de-la-semana
+
+    Admite "*", listas (1,15), rangos (9-16), pasos (*/15, 10-20/5) y los días
+    de la semana 0-7 (0 y 7 son domingo).
+    """
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        """
+        Inicializa la expresión
+
+        Args:
+            expression (str): Expresión cron, por ejemplo "30 8 * * 1-5"
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expresión cron inválida: '{expression}'")
+
+        self.expression = expression
+        parsed = [
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.RANGES)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Convertir 7 (domingo) a 0
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        """
+        Convierte un campo cron en el conjunto de valores que acepta
+
+        Args:
+            field (str): Campo de la expresión
+            low (int): Valor mínimo permitido
+            high (int): Valor máximo permitido
+
+        Returns:
+            Set[int]: Valores aceptados
+        """
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = end = int(part)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Campo cron fuera de rango: '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        """Comprueba el día del mes y de la semana (se combinan con OR si ambos están restringidos)"""
+        weekday = (moment.weekday() + 1) % 7  # cron: 0 = domingo
+        day_ok = moment.day in self.days
+        weekday_ok = weekday in self.weekdays
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Calcula la siguiente hora que cumple la expresión
+
+        Args:
+            moment (datetime): Momento de referencia con zona horaria
+
+        Returns:
+            datetime: Siguiente coincidencia posterior a moment, en la misma zona horaria
+        """
+        tz = moment.tzinfo
+        # Trabajar en hora local sin zona para que los cambios de horario no alteren
+        # la hora de reloj de las tareas
+        local = moment.astimezone(tz).replace(tzinfo=None) if tz else moment
+        candidate = local.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+
+            if tz is None:
+                return candidate
+            if hasattr(tz, "localize"):
+                return tz.localize(candidate)
+            return candidate.replace(tzinfo=tz)
+
+        raise ValueError(f"La expresión '{self.expression}' no tiene próximas coincidencias")
+
+
+class JobMetrics:
+    """
+    Métricas de ejecución de una tarea
+    """
+
+    def __init__(self):
+        """Inicializa las métricas"""
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_duration: Optional[float] = None
+        self.last_lag: Optional[float] = None
+        self.max_lag = 0.0
+        self.last_started_at: Optional[float] = None
+        self.last_trigger: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def record(self, duration: float, lag: float, trigger: str, error: str = None):
+        """
+        Registra una ejecución
+
+        Args:
+            duration (float): Duración en segundos
+            lag (float): Retraso respecto a la hora prevista en segundos
+            trigger (str): Origen de la ejecución ("cron", "backlog", "manual")
+            error (str, optional): Error si la ejecución falló
+        """
+        self.runs += 1
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.last_duration = duration
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.last_trigger = trigger
+        self.last_error = error
+        if error:
+            self.failures += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Devuelve las métricas como diccionario
+
+        Returns:
+            Dict[str, Any]: Ejecuciones, fallos, duración y retraso
+        """
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "avg_duration": self.total_duration / self.runs if self.runs else 0.0,
+            "max_duration": self.max_duration,
+            "last_duration": self.last_duration,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "last_started_at": (
+                datetime.fromtimestamp(self.last_started_at).isoformat()
+                if self.last_started_at
+                else None
+            ),
+            "last_trigger": self.last_trigger,
+            "last_error": self.last_error,
+        }
+
+
+class ScheduledJob:
+    """
+    Tarea del planificador
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        cron: Optional[List[str]] = None,
+        jitter: float = 0.0,
+        backlog_source: Optional[Callable[[], int]] = None,
+        backlog_threshold: int = 0,
+        min_interval: float = 0.0,
+        description: str = "",
+    ):
+        """
+        Inicializa la tarea
+
+        Args:
+            name (str): Nombre de la tarea
+            func (Callable[[], Any]): Función a ejecutar; un resultado False cuenta como fallo
+            cron (Optional[List[str]]): Expresiones cron en la hora del mercado
+            jitter (float): Segundos aleatorios máximos añadidos a cada ejecución programada
+            backlog_source (Optional[Callable[[], int]]): Función que devuelve el backlog
+            backlog_threshold (int): Backlog a partir del cual se adelanta la ejecución
+            min_interval (float): Segundos mínimos entre ejecuciones por backlog
+            description (str): Descripción para el log
+        """
+        self.name = name
+        self.func = func
+        self.crons = [CronExpression(expression) for expression in (cron or [])]
+        self.jitter = jitter
+        self.backlog_source = backlog_source
+        self.backlog_threshold = backlog_threshold
+        self.min_interval = min_interval
+        self.description = description or name
+        self.next_run: Optional[float] = None
+        self.metrics = JobMetrics()
+        self.running = threading.Lock()
+
+    def schedule_next(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Calcula la próxima ejecución programada (con jitter)
+
+        Args:
+            now (Optional[float]): Momento de referencia (timestamp)
+
+        Returns:
+            Optional[float]: Timestamp de la próxima ejecución o None si no tiene cron
+        """
+        if not self.crons:
+            self.next_run = None
+            return None
+
+        reference = datetime.fromtimestamp(now or time.time(), MARKET_TIMEZONE)
+        next_time = min(cron.next_after(reference) for cron in self.crons)
+        self.next_run = next_time.timestamp() + random.uniform(0, self.jitter)
+        return self.next_run
+
+
+class SchedulerLock:
+    """
+    Bloqueo de archivo para permitir una sola instancia del planificador
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCK_PATH):
+        """
+        Inicializa el bloqueo
+
+        Args:
+            path (str): Ruta del archivo de bloqueo
+        """
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        """
+        Intenta adquirir el bloqueo sin esperar
+
+        Returns:
+            bool: True si se adquirió, False si otra instancia lo tiene
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return True
+
+    def release(self) -> None:
+        """Libera el bloqueo"""
+        if self._file is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class EventScheduler:
+    """
+    Planificador de tareas por cron y por backlog
+    """
+
+    def __init__(
+        self,
+        jobs: List[ScheduledJob],
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        metrics_path: Optional[str] = DEFAULT_METRICS_PATH,
+        stop_event: Optional[threading.Event] = None,
+    ):
+        """
+        Inicializa el planificador
+
+        Args:
+            jobs (List[ScheduledJob]): Tareas a planificar
+            poll_interval (float): Segundos máximos de espera entre comprobaciones
+            metrics_path (Optional[str]): Archivo donde guardar las métricas
+            stop_event (Optional[threading.Event]): Evento para detener el planificador
+        """
+        self.jobs = jobs
+        self.poll_interval = poll_interval
+        self.metrics_path = metrics_path
+        self.stop_event = stop_event or threading.Event()
+        self.completed_runs = 0
+        self._wake_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._metrics_lock = threading.Lock()
+
+    def wake(self) -> None:
+        """Despierta al planificador para que revise el backlog de inmediato"""
+        self._wake_event.set()
+
+    def stop(self) -> None:
+        """Detiene el planificador"""
+        self.stop_event.set()
+        self._wake_event.set()
+
+    def run_job(
+        self, job: ScheduledJob, trigger: str = "manual", scheduled_at: float = None
+    ) -> bool:
+        """
+        Ejecuta una tarea en el hilo actual si no está ya en curso
+
+        Args:
+            job (ScheduledJob): Tarea a ejecutar
+            trigger (str): Origen de la ejecución
+            scheduled_at (float, optional): Hora prevista (para calcular el retraso)
+
+        Returns:
+            bool: True si la tarea se ejecutó sin errores
+        """
+        if not job.running.acquire(blocking=False):
+            job.metrics.skipped += 1
+            logger.warning(f"[{job.name}] Ejecución omitida: la anterior sigue en curso")
+            return False
+
+        started_at = time.time()
+        lag = max(0.0, started_at - scheduled_at) if scheduled_at else 0.0
+        error = None
+        try:
+            logger.info(f"[{job.name}] Iniciando ({trigger}, retraso {lag:.1f}s)")
+            if job.func() is False:
+                error = "La tarea devolvió False"
+        except Exception as e:
+            error = str(e)
+            logger.error(f"[{job.name}] Error: {error}")
+        finally:
+            duration = time.time() - started_at
+            job.metrics.last_started_at = started_at
+            job.metrics.record(duration, lag, trigger, error)
+            job.running.release()
+            self.completed_runs += 1
+            logger.info(
+                f"[{job.name}] Finalizada en {duration:.1f}s "
+                f"({'error' if error else 'correcta'})"
+            )
+            self.save_metrics()
+
+        return error is None
+
+    def _start_job(self, job: ScheduledJob, trigger: str, scheduled_at: float) -> None:
+        """Ejecuta una tarea en un hilo propio"""
+        thread = threading.Thread(
+            target=self.run_job,
+            args=(job, trigger, scheduled_at),
+            name=f"job-{job.name}",
+            daemon=True,
+        )
+        thread.start()
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+
+    def _check_backlog(self, job: ScheduledJob, now: float) -> None:
+        """Adelanta la tarea si su backlog supera el umbral"""
+        last_started = job.metrics.last_started_at or 0
+        if now - last_started < job.min_interval or job.running.locked():
+            return
+        try:
+            backlog = job.backlog_source()
+        except Exception as e:
+            logger.warning(f"[{job.name}] No se pudo consultar el backlog: {str(e)}")
+            return
+        if backlog >= job.backlog_threshold and backlog > 0:
+            logger.info(f"[{job.name}] Backlog de {backlog} elementos: ejecución anticipada")
+            self._start_job(job, "backlog", now)
+
+    def run(self, max_runs: int = 0) -> int:
+        """
+        Ejecuta el bucle del planificador hasta que se detenga
+
+        Args:
+            max_runs (int): Número máximo de ejecuciones de tareas (0 = sin límite)
+
+        Returns:
+            int: Número de ejecuciones completadas
+        """
+        now = time.time()
+        for job in self.jobs:
+            if job.schedule_next(now):
+                logger.info(
+                    f"[{job.name}] {job.description}. Próxima ejecución: "
+                    f"{datetime.fromtimestamp(job.next_run):%Y-%m-%d %H:%M:%S}"
+                )
+            elif job.backlog_source:
+                logger.info(
+                    f"[{job.name}] {job.description}. Se ejecuta con backlog >= {job.backlog_threshold}"
+                )
+
+        while not self.stop_event.is_set():
+            if max_runs and self.completed_runs >= max_runs:
+                logger.info(f"Se alcanzó el número máximo de ejecuciones ({max_runs})")
+                break
+
+            now = time.time()
+            for job in self.jobs:
+                if job.next_run is not None and now >= job.next_run:
+                    scheduled_at = job.next_run
+                    # Si el proceso estuvo detenido, se ejecuta una vez y se
+                    # reprograma desde ahora, sin recuperar cada ejecución perdida
+                    job.schedule_next(now)
+                    self._start_job(job, "cron", scheduled_at)
+                elif job.backlog_source:
+                    self._check_backlog(job, now)
+
+            next_due = min(
+                (job.next_run for job in self.jobs if job.next_run is not None),
+                default=now + self.poll_interval,
+            )
+            timeout = max(0.5, min(next_due - time.time(), self.poll_interval))
+            self._wake_event.wait(timeout)
+            self._wake_event.clear()
+
+        # Esperar a que terminen las tareas en curso
+        for thread in self._threads:
+            thread.join(timeout=60)
+
+        return self.completed_runs
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Devuelve las métricas de todas las tareas
+
+        Returns:
+            Dict[str, Any]: Métricas y próxima ejecución por tarea
+        """
+        return {
+            job.name: dict(
+                job.metrics.to_dict(),
+                next_run=(
+                    datetime.fromtimestamp(job.next_run).isoformat()
+                    if job.next_run
+                    else None
+                ),
+            )
+            for job in self.jobs
+        }
+
+    def save_metrics(self) -> None:
+        """Guarda las métricas en metrics_path"""
+        if not self.metrics_path:
+            return
+        with self._metrics_lock:
+            try:
+                os.makedirs(os.path.dirname(self.metrics_path), exist_ok=True)
+                data = {
+                    "updated_at": datetime.now().isoformat(),
+                    "pid": os.getpid(),
+                    "jobs": self.get_metrics(),
+                }
+                tmp_path = f"{self.metrics_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, self.metrics_path)
+            except Exception as e:
+                logger.warning(f"No se pudieron guardar las métricas del planificador: {str(e)}")
+
+
+def load_metrics(path: str = DEFAULT_METRICS_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Lee las métricas guardadas por el planificador
+
+    Args:
+        path (str): Archivo de métricas
+
+    Returns:
+        Optional[Dict[str, Any]]: Métricas o None si no existen
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    # Mostrar las métricas de la última ejecución
+    metrics = load_metrics()
+    if metrics is None:
+        print("No hay métricas del planificador")
+        sys.exit(1)
+    print(json.dumps(metrics, indent=2, ensure_ascii=False))
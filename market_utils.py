@@ -20,6 +20,9 @@ from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.volatility import BollingerBands, AverageTrueRange
 from ta.volume import VolumeWeightedAveragePrice, OnBalanceVolumeIndicator
 
+from news_lexicon import count_bull_bear, headline_sentiment
+from compact_data import ChartData
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -2875,7 +2878,8 @@ def get_market_context(symbol: str) -> Dict:
             "news_sentiment": sentiment_data,
             "web_analysis": web_analysis,
             "web_results": web_analysis.get("web_results", []),
-            "chart_data": data.reset_index().to_dict(orient="records"),
+            # Formato columnar: chart_data_to_frame() lo convierte en DataFrame
+            "chart_data": ChartData.from_dataframe(data),
         }
 
         return context
@@ -3047,45 +3051,8 @@ def fetch_news_data(symbol: str, api_keys: Dict = None) -> List:
                         date_element = item.select_one("span")
                         date_str = date_element.text.strip() if date_element else ""
 
-                        # Análisis simple de sentimiento
-                        sentiment_value = 0.5  # Neutral por defecto
-                        text_for_sentiment = f"{title} {summary}".lower()
-
-                        # Palabras positivas y negativas
-                        positive_words = [
-                            "buy",
-                            "bullish",
-                            "up",
-                            "surge",
-                            "growth",
-                            "positive",
-                            "rise",
-                            "gain",
-                        ]
-                        negative_words = [
-                            "sell",
-                            "bearish",
-                            "down",
-                            "fall",
-                            "drop",
-                            "decline",
-                            "negative",
-                            "loss",
-                        ]
-
-                        # Contar palabras
-                        positive_count = sum(
-                            1 for word in positive_words if word in text_for_sentiment
-                        )
-                        negative_count = sum(
-                            1 for word in negative_words if word in text_for_sentiment
-                        )
-
-                        # Ajustar sentimiento
-                        if positive_count > negative_count:
-                            sentiment_value = 0.7
-                        elif negative_count > positive_count:
-                            sentiment_value = 0.3
+                        # Análisis simple de sentimiento (0.5 = neutral)
+                        sentiment_value = headline_sentiment(f"{title} {summary}")
 
                         # Añadir noticia
                         news.append(
@@ -3239,80 +3206,6 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
     bullish_mentions = 0
     bearish_mentions = 0
 
-    # Palabras alcistas y bajistas para análisis de sentimiento
-    bullish_words = [
-        "alcista",
-        "alcanza",
-        "subida",
-        "crecimiento",
-        "positivo",
-        "optimista",
-        "aumenta",
-        "compra",
-        "oportunidad",
-        "superará",
-        "supera",
-        "mejor",
-        "ganancias",
-        "fuerte",
-        "rali",
-        "rally",
-        "bull",
-        "bullish",
-        "up",
-        "higher",
-        "gain",
-        "upgrade",
-        "surges",
-        "rises",
-        "climbing",
-        "jumped",
-        "outperform",
-    ]
-
-    bearish_words = [
-        "bajista",
-        "caída",
-        "desciende",
-        "negativo",
-        "pesimista",
-        "disminuye",
-        "venta",
-        "riesgo",
-        "peor",
-        "pérdidas",
-        "débil",
-        "bear",
-        "bearish",
-        "corrección",
-        "advertencia",
-        "precaución",
-        "preocupación",
-        "down",
-        "fall",
-        "drop",
-        "decline",
-        "plunge",
-        "downgrade",
-        "underperform",
-        "lower",
-        "loss",
-        "crash",
-        "risk",
-        "sell",
-        "warning",
-    ]
-
-    # Función para analizar sentimiento en texto
-    def analyze_text_sentiment(text):
-        if not text:
-            return 0, 0
-
-        text = text.lower()
-        bull_count = sum(1 for word in bullish_words if word in text)
-        bear_count = sum(1 for word in bearish_words if word in text)
-        return bull_count, bear_count
-
     # Intentar obtener datos de Yahoo Finance primero
     try:
         import requests
@@ -3374,7 +3267,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                                 )
 
                                 # Analizar sentimiento
-                                bull_count, bear_count = analyze_text_sentiment(content)
+                                bull_count, bear_count = count_bull_bear(content)
                                 if bull_count > bear_count:
                                     bullish_mentions += 1
                                 elif bear_count > bull_count:
@@ -3412,7 +3305,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                                 )
 
                                 # Analizar sentimiento
-                                bull_count, bear_count = analyze_text_sentiment(
+                                bull_count, bear_count = count_bull_bear(
                                     content_text
                                 )
                                 if bull_count > bear_count:
@@ -3504,7 +3397,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                             content = (
                                 hit.get("title", "") + " " + hit.get("snippet", "")
                             )
-                            bull_count, bear_count = analyze_text_sentiment(content)
+                            bull_count, bear_count = count_bull_bear(content)
 
                             # Actualizar contadores
                             if bull_count > bear_count:
@@ -3557,7 +3450,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                                 + " "
                                 + result.get("content", "")
                             )
-                            bull_count, bear_count = analyze_text_sentiment(content)
+                            bull_count, bear_count = count_bull_bear(content)
 
                             # Actualizar contadores
                             if bull_count > bear_count:
@@ -3608,7 +3501,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                                 + " "
                                 + result.get("content", "")
                             )
-                            bull_count, bear_count = analyze_text_sentiment(content)
+                            bull_count, bear_count = count_bull_bear(content)
 
                             # Actualizar contadores
                             if bull_count > bear_count:
@@ -3661,7 +3554,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                         )
 
                         # Análisis de sentimiento
-                        bull_count, bear_count = analyze_text_sentiment(
+                        bull_count, bear_count = count_bull_bear(
                             title + " " + content
                         )
 
@@ -3695,7 +3588,7 @@ def get_web_insights(symbol: str, api_keys: Dict = None) -> Dict:
                             )
 
                             # Análisis de sentimiento
-                            bull_count, bear_count = analyze_text_sentiment(
+                            bull_count, bear_count = count_bull_bear(
                                 title + " " + content
                             )
 
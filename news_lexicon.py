@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Léxico compartido para puntuar la relevancia y el sentimiento de noticias.
+
+Las listas de palabras alcistas, bajistas, de alta relevancia y de fuentes
+financieras se compilan una sola vez al importar el módulo, en lugar de crearse en
+cada llamada. Cada noticia se pasa a minúsculas una sola vez; las palabras
+completas se comparan por intersección de conjuntos y, para saber si aparece
+alguna subcadena, se usa una única expresión regular con todos los términos.
+
+Las puntuaciones son las mismas que calculaban YahooFinanceScraper y
+market_utils.get_web_insights:
+    - Los términos que antes se buscaban como subcadena ("up" en "upgrade")
+      siguen contando igual, una vez por término distinto.
+    - Los términos que antes se buscaban como palabra completa (rodeados de
+      espacios) se comparan con las palabras del texto separadas por espacios.
+"""
+
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Palabras clave de alta relevancia usadas para puntuar noticias. "CEO" y "FDA"
+# se mantienen en mayúsculas: se comparan con el texto en minúsculas, igual que
+# antes, por lo que no suman a la puntuación
+RELEVANCE_KEYWORDS = (
+    "earnings", "revenue", "profit", "loss", "guidance", "forecast", "upgrade",
+    "downgrade", "rating", "analyst", "merger", "acquisition", "dividend",
+    "split", "CEO", "executive", "lawsuit", "investigation", "patent", "FDA",
+    "approval", "product", "launch",
+)
+
+# Palabras clave para decidir si una noticia es relevante para un símbolo
+RELEVANCE_FILTER_KEYWORDS = tuple(
+    keyword.lower()
+    for keyword in RELEVANCE_KEYWORDS
+    + (
+        "quarterly", "annual", "report", "financial", "results", "performance",
+        "stock", "shares", "market", "investor", "trading", "price target",
+        "valuation",
+    )
+)
+
+# Fuentes de alta credibilidad (suman a la puntuación de relevancia)
+CREDIBLE_SOURCES = (
+    "bloomberg", "reuters", "wall street journal", "wsj", "financial times",
+    "ft", "cnbc", "finviz", "seeking alpha", "yahoo finance", "barrons",
+    "alpha vantage", "investing.com",
+)
+
+# Fuentes especializadas en finanzas (reducen el umbral de palabras clave)
+FINANCIAL_SOURCES = (
+    "yahoo finance", "bloomberg", "reuters", "cnbc", "marketwatch",
+    "seeking alpha", "barrons", "financial times", "ft.com", "wsj",
+    "wall street journal", "investor's business daily", "morningstar",
+    "motley fool", "zacks", "investopedia", "finviz",
+)
+
+# Palabras positivas y negativas (palabra completa) para el sentimiento de noticias
+POSITIVE_WORDS = (
+    "up", "rise", "gain", "profit", "growth", "positive", "beat", "exceed",
+    "outperform", "upgrade", "buy", "strong", "success", "improve", "higher",
+    "bullish", "opportunity", "innovation", "launch", "approval", "partnership",
+    "collaboration", "dividend", "increase",
+)
+NEGATIVE_WORDS = (
+    "down", "fall", "drop", "loss", "decline", "negative", "miss", "below",
+    "underperform", "downgrade", "sell", "weak", "failure", "worsen", "lower",
+    "bearish", "risk", "threat", "lawsuit", "investigation", "recall", "delay",
+    "cut", "decrease", "layoff", "restructuring",
+)
+
+# Palabras alcistas y bajistas (subcadena, español e inglés) para análisis web
+BULLISH_WORDS = (
+    "alcista", "alcanza", "subida", "crecimiento", "positivo", "optimista",
+    "aumenta", "compra", "oportunidad", "superará", "supera", "mejor",
+    "ganancias", "fuerte", "rali", "rally", "bull", "bullish", "up", "higher",
+    "gain", "upgrade", "surges", "rises", "climbing", "jumped", "outperform",
+)
+BEARISH_WORDS = (
+    "bajista", "caída", "desciende", "negativo", "pesimista", "disminuye",
+    "venta", "riesgo", "peor", "pérdidas", "débil", "bear", "bearish",
+    "corrección", "advertencia", "precaución", "preocupación", "down", "fall",
+    "drop", "decline", "plunge", "downgrade", "underperform", "lower", "loss",
+    "crash", "risk", "sell", "warning",
+)
+
+# Palabras para el sentimiento rápido de titulares de búsqueda (subcadena)
+HEADLINE_POSITIVE_WORDS = (
+    "buy", "bullish", "up", "surge", "growth", "positive", "rise", "gain",
+)
+HEADLINE_NEGATIVE_WORDS = (
+    "sell", "bearish", "down", "fall", "drop", "decline", "negative", "loss",
+)
+
+
+class TermMatcher:
+    """
+    Conjunto de términos compilado en una única expresión regular
+    """
+
+    def __init__(self, terms: Iterable[str], whole_words: bool = False):
+        """
+        Compila los términos
+
+        Args:
+            terms (Iterable[str]): Términos a buscar
+            whole_words (bool): True para buscar solo palabras completas separadas
+                por espacios; False para buscar subcadenas
+        """
+        self.terms: FrozenSet[str] = frozenset(terms)
+        self.whole_words = whole_words
+
+        if whole_words:
+            self.words = frozenset(term for term in self.terms if " " not in term)
+            self.phrases = tuple(term for term in self.terms if " " in term)
+            return
+
+        # Una sola expresión regular para saber si aparece algún término; los
+        # términos más largos primero para que "bullish" gane a "bull"
+        self.ordered = tuple(sorted(self.terms, key=len, reverse=True))
+        self.pattern = re.compile("|".join(re.escape(t) for t in self.ordered))
+
+    def found(self, text: str) -> FrozenSet[str]:
+        """
+        Devuelve los términos distintos presentes en un texto
+
+        Args:
+            text (str): Texto ya normalizado (por ejemplo, en minúsculas)
+
+        Returns:
+            FrozenSet[str]: Términos encontrados
+        """
+        if not text:
+            return frozenset()
+
+        if self.whole_words:
+            matches = self.words.intersection(text.split(" "))
+            if self.phrases:
+                padded = f" {text} "
+                matches |= {p for p in self.phrases if f" {p} " in padded}
+            return frozenset(matches)
+
+        # Las subcadenas pueden solaparse ("up" dentro de "upgrade"): cada término
+        # se comprueba por separado para contarlos todos
+        return frozenset(term for term in self.ordered if term in text)
+
+    def count(self, text: str) -> int:
+        """
+        Cuenta los términos distintos presentes en un texto
+
+        Args:
+            text (str): Texto ya normalizado
+
+        Returns:
+            int: Número de términos distintos encontrados
+        """
+        if not text or self.whole_words:
+            return len(self.found(text))
+        return sum(1 for term in self.ordered if term in text)
+
+    def contains_any(self, text: str) -> bool:
+        """
+        Indica si el texto contiene al menos uno de los términos
+
+        Args:
+            text (str): Texto ya normalizado
+
+        Returns:
+            bool: True si aparece algún término
+        """
+        if not text:
+            return False
+        if self.whole_words:
+            return bool(self.found(text))
+        return self.pattern.search(text) is not None
+
+
+# Matchers compartidos, compilados una sola vez al importar el módulo
+relevance_matcher = TermMatcher(RELEVANCE_KEYWORDS)
+relevance_filter_matcher = TermMatcher(RELEVANCE_FILTER_KEYWORDS)
+credible_source_matcher = TermMatcher(CREDIBLE_SOURCES)
+financial_source_matcher = TermMatcher(FINANCIAL_SOURCES)
+positive_matcher = TermMatcher(POSITIVE_WORDS, whole_words=True)
+negative_matcher = TermMatcher(NEGATIVE_WORDS, whole_words=True)
+bullish_matcher = TermMatcher(BULLISH_WORDS)
+bearish_matcher = TermMatcher(BEARISH_WORDS)
+headline_positive_matcher = TermMatcher(HEADLINE_POSITIVE_WORDS)
+headline_negative_matcher = TermMatcher(HEADLINE_NEGATIVE_WORDS)
+
+
+def _news_texts(news: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Devuelve título, resumen y fuente de una noticia en minúsculas"""
+    return (
+        news.get("title", "").lower(),
+        news.get("summary", "").lower(),
+        news.get("source", "").lower(),
+    )
+
+
+def _relevance(
+    title: str, summary: str, source: str, symbol: str, company_name: str = None
+) -> float:
+    """Puntuación de relevancia a partir de los textos en minúsculas"""
+    score = 0.5  # Puntuación base
+
+    # El símbolo en el título tiene mayor relevancia
+    symbol_lower = symbol.lower()
+    if symbol_lower in title:
+        score += 0.3
+    elif symbol_lower in summary:
+        score += 0.1
+
+    if company_name:
+        company_lower = company_name.lower()
+        if company_lower in title:
+            score += 0.2
+        elif company_lower in summary:
+            score += 0.1
+
+    # Palabras clave de alta relevancia: una vez por título y una por resumen
+    if relevance_matcher.contains_any(title):
+        score += 0.15
+    if relevance_matcher.contains_any(summary):
+        score += 0.05
+
+    if credible_source_matcher.contains_any(source):
+        score += 0.1
+
+    # Limitar la puntuación entre 0 y 1
+    return min(max(score, 0), 1)
+
+
+def _sentiment(news: Dict[str, Any], title: str, summary: str) -> float:
+    """Puntuación de sentimiento a partir de los textos en minúsculas"""
+    # Si ya tiene puntuación de sentimiento, usarla normalizada entre -1 y 1
+    if "sentiment" in news and isinstance(news["sentiment"], (int, float)):
+        sentiment = float(news["sentiment"])
+        if 0 <= sentiment <= 1:
+            return (sentiment * 2) - 1
+        return max(min(sentiment, 1), -1)
+
+    positive_count = len(positive_matcher.found(title) | positive_matcher.found(summary))
+    negative_count = len(negative_matcher.found(title) | negative_matcher.found(summary))
+
+    if positive_count == 0 and negative_count == 0:
+        return 0  # Neutral
+
+    return (positive_count - negative_count) / (positive_count + negative_count)
+
+
+def relevance_score(
+    news: Dict[str, Any], symbol: str, company_name: str = None
+) -> float:
+    """
+    Calcula la puntuación de relevancia de una noticia
+
+    Args:
+        news (Dict[str, Any]): Noticia a evaluar
+        symbol (str): Símbolo del activo
+        company_name (str, optional): Nombre de la empresa
+
+    Returns:
+        float: Puntuación de relevancia (0-1)
+    """
+    title, summary, source = _news_texts(news)
+    return _relevance(title, summary, source, symbol, company_name)
+
+
+def sentiment_score(news: Dict[str, Any]) -> float:
+    """
+    Calcula la puntuación de sentimiento de una noticia
+
+    Args:
+        news (Dict[str, Any]): Noticia a analizar
+
+    Returns:
+        float: Puntuación de sentimiento (-1 a 1)
+    """
+    title, summary, _ = _news_texts(news)
+    return _sentiment(news, title, summary)
+
+
+def score_news_batch(
+    news_items: Iterable[Dict[str, Any]], symbol: str, company_name: str = None
+) -> List[Tuple[float, float]]:
+    """
+    Calcula relevancia y sentimiento de varias noticias en una sola pasada
+
+    Cada noticia se pasa a minúsculas una sola vez y los mismos textos se usan
+    para ambas puntuaciones.
+
+    Args:
+        news_items (Iterable[Dict[str, Any]]): Noticias a evaluar
+        symbol (str): Símbolo del activo
+        company_name (str, optional): Nombre de la empresa
+
+    Returns:
+        List[Tuple[float, float]]: (relevancia 0-1, sentimiento -1 a 1) por noticia
+    """
+    scores = []
+    for news in news_items:
+        title, summary, source = _news_texts(news)
+        scores.append(
+            (
+                _relevance(title, summary, source, symbol, company_name),
+                _sentiment(news, title, summary),
+            )
+        )
+    return scores
+
+
+def count_bull_bear(text: Optional[str]) -> Tuple[int, int]:
+    """
+    Cuenta las palabras alcistas y bajistas distintas de un texto
+
+    Args:
+        text (Optional[str]): Texto a analizar (español o inglés)
+
+    Returns:
+        Tuple[int, int]: (palabras alcistas, palabras bajistas)
+    """
+    if not text:
+        return 0, 0
+
+    text = text.lower()
+    return bullish_matcher.count(text), bearish_matcher.count(text)
+
+
+def count_bull_bear_batch(texts: Iterable[Optional[str]]) -> List[Tuple[int, int]]:
+    """
+    Cuenta las palabras alcistas y bajistas de varios textos
+
+    Args:
+        texts (Iterable[Optional[str]]): Textos a analizar
+
+    Returns:
+        List[Tuple[int, int]]: (alcistas, bajistas) por texto, en el mismo orden
+    """
+    return [count_bull_bear(text) for text in texts]
+
+
+def count_relevance_keywords(title: str, summary: str) -> int:
+    """
+    Cuenta las palabras clave de relevancia distintas de un título y su resumen
+
+    Args:
+        title (str): Título en minúsculas
+        summary (str): Resumen en minúsculas
+
+    Returns:
+        int: Número de palabras clave distintas encontradas
+    """
+    return len(
+        relevance_filter_matcher.found(title) | relevance_filter_matcher.found(summary)
+    )
+
+
+def headline_sentiment(text: Optional[str]) -> float:
+    """
+    Sentimiento rápido de un titular de búsqueda
+
+    Args:
+        text (Optional[str]): Título y descripción del resultado
+
+    Returns:
+        float: 0.7 si predominan las palabras positivas, 0.3 si predominan las
+        negativas y 0.5 (neutral) en caso contrario
+    """
+    if not text:
+        return 0.5
+
+    text = text.lower()
+    positive_count = headline_positive_matcher.count(text)
+    negative_count = headline_negative_matcher.count(text)
+    if positive_count > negative_count:
+        return 0.7
+    if negative_count > positive_count:
+        return 0.3
+    return 0.5
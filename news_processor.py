@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Union
 import time
 
+from language_detection import is_english
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -352,31 +354,8 @@ class NewsProcessor:
         Returns:
             bool: True si el texto está en inglés, False en caso contrario
         """
-        if not text:
-            return False
-
-        # Palabras comunes en inglés
-        english_words = [
-            "the",
-            "and",
-            "for",
-            "with",
-            "that",
-            "this",
-            "from",
-            "will",
-            "have",
-            "has",
-        ]
-
-        # Contar palabras en inglés
-        text_lower = text.lower()
-        english_count = sum(
-            1 for word in english_words if f" {word} " in f" {text_lower} "
-        )
-
-        # Si hay al menos 2 palabras en inglés, considerar que está en inglés
-        return english_count >= 2
+        # Con al menos 2 palabras en inglés se considera que está en inglés
+        return is_english(text, min_words=2)
 
 
 # Ejemplo de uso
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Personalización del boletín según las preferencias de cada suscriptor.
+
+Las preferencias se guardan como JSON en newsletter_subscribers.preferences:
+
+    {"sectors": ["Tecnología", "Finanzas"], "confidence_levels": ["Alta"]}
+
+Una lista vacía o ausente significa "todas". En lugar de generar un boletín por
+suscriptor, los destinatarios se agrupan por firma de preferencias y después
+por el conjunto de señales resultante, de modo que el boletín se genera una vez
+por grupo distinto. Los destinatarios sin suscripción o sin preferencias
+reciben el boletín completo.
+"""
+
+import json
+import logging
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from company_data import SYMBOLS
+
+# Configuración de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Opciones que se ofrecen en los formularios de suscriptores: las mismas
+# categorías con las que se guardan las señales (company_data.SYMBOLS)
+SECTORS = list(SYMBOLS)
+CONFIDENCE_LEVELS = ["Alta", "Media", "Baja"]
+
+# Claves aceptadas en el JSON de preferencias
+SECTOR_KEYS = ("sectors", "categories")
+CONFIDENCE_KEYS = ("confidence_levels", "confidence")
+
+# Firma (sectores, niveles de confianza); vacía = sin filtro
+PreferenceSignature = Tuple[Tuple[str, ...], Tuple[str, ...]]
+DEFAULT_SIGNATURE: PreferenceSignature = ((), ())
+
+
+def _normalize_value(value: Any) -> str:
+    """Normaliza un valor para compararlo sin mayúsculas ni tildes"""
+    text = unicodedata.normalize("NFKD", str(value).strip().casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def preference_values(preferences: Dict[str, Any], keys: Tuple[str, ...]) -> List[str]:
+    """
+    Extrae la primera lista de preferencias encontrada, sin normalizar
+
+    Acepta listas y texto separado por comas ("Tecnología, Finanzas"), que es
+    como lo guardaban algunas versiones anteriores.
+
+    Args:
+        preferences (Dict[str, Any]): Preferencias ya convertidas en diccionario
+        keys (Tuple[str, ...]): Claves aceptadas, en orden de prioridad
+
+    Returns:
+        List[str]: Valores sin espacios sobrantes (vacía = sin filtro)
+    """
+    for key in keys:
+        values = preferences.get(key)
+        if values:
+            if isinstance(values, str):
+                values = values.split(",")
+            return [str(v).strip() for v in values if str(v).strip()]
+    return []
+
+
+def _normalized_list(
+    preferences: Dict[str, Any], keys: Tuple[str, ...]
+) -> Tuple[str, ...]:
+    """Extrae y normaliza la primera lista de preferencias encontrada"""
+    return tuple(
+        sorted({_normalize_value(v) for v in preference_values(preferences, keys)})
+    )
+
+
+def parse_preferences(preferences: Any) -> Dict[str, Any]:
+    """
+    Convierte las preferencias guardadas en un diccionario
+
+    Args:
+        preferences (Any): Diccionario, texto JSON o None
+
+    Returns:
+        Dict[str, Any]: Preferencias (vacío si no son válidas)
+    """
+    if isinstance(preferences, dict):
+        return preferences
+    if isinstance(preferences, (str, bytes)) and preferences:
+        try:
+            parsed = json.loads(preferences)
+            return parsed if isinstance(parsed, dict) else {}
+        except (TypeError, ValueError):
+            return {}
+    return {}
+
+
+def preference_signature(preferences: Any) -> PreferenceSignature:
+    """
+    Calcula la firma de preferencias de un suscriptor
+
+    Args:
+        preferences (Any): Preferencias del suscriptor (diccionario o JSON)
+
+    Returns:
+        PreferenceSignature: (sectores, niveles de confianza) normalizados y ordenados
+    """
+    prefs = parse_preferences(preferences)
+    return (
+        _normalized_list(prefs, SECTOR_KEYS),
+        _normalized_list(prefs, CONFIDENCE_KEYS),
+    )
+
+
+def signal_matches(signal: Dict[str, Any], signature: PreferenceSignature) -> bool:
+    """
+    Indica si una señal encaja con una firma de preferencias
+
+    Args:
+        signal (Dict[str, Any]): Señal de trading
+        signature (PreferenceSignature): Firma de preferencias
+
+    Returns:
+        bool: True si la señal debe incluirse en el boletín del grupo
+    """
+    sectors, confidence_levels = signature
+    if sectors:
+        signal_sectors = {
+            _normalize_value(signal.get(key))
+            for key in ("category", "company_sector")
+            if signal.get(key)
+        }
+        if not signal_sectors.intersection(sectors):
+            return False
+    if confidence_levels:
+        if (
+            _normalize_value(signal.get("confidence_level", ""))
+            not in confidence_levels
+        ):
+            return False
+    return True
+
+
+def select_signals(
+    signals: List[Dict[str, Any]], signature: PreferenceSignature
+) -> List[int]:
+    """
+    Selecciona las señales de un grupo
+
+    Si ninguna señal encaja, el grupo recibe todas para que el suscriptor no
+    se quede sin boletín.
+
+    Args:
+        signals (List[Dict[str, Any]]): Señales disponibles
+        signature (PreferenceSignature): Firma de preferencias
+
+    Returns:
+        List[int]: Índices de las señales seleccionadas, en el orden original
+    """
+    if signature == DEFAULT_SIGNATURE:
+        return list(range(len(signals)))
+    selected = [
+        i for i, signal in enumerate(signals) if signal_matches(signal, signature)
+    ]
+    return selected or list(range(len(signals)))
+
+
+def plan_newsletter_groups(
+    recipients: Iterable[str],
+    subscribers_by_email: Dict[str, Dict[str, Any]],
+    signals: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Agrupa los destinatarios para generar un boletín por grupo distinto
+
+    Los destinatarios se agrupan primero por firma de preferencias (una sola
+    evaluación de las señales por firma) y los grupos que acaban con las mismas
+    señales se fusionan.
+
+    Args:
+        recipients (Iterable[str]): Correos de los destinatarios
+        subscribers_by_email (Dict[str, Dict[str, Any]]): Suscriptores por correo
+            en minúsculas (ver NewsletterSubscriberManager.get_subscribers_by_emails)
+        signals (List[Dict[str, Any]]): Señales del boletín completo
+
+    Returns:
+        List[Dict[str, Any]]: Grupos {"recipients", "signal_indexes", "signals",
+        "signatures"}; el grupo con el boletín completo va primero
+    """
+    by_signature: Dict[PreferenceSignature, List[str]] = {}
+    for recipient in dict.fromkeys(r.strip() for r in recipients if r and r.strip()):
+        subscriber = subscribers_by_email.get(recipient.lower()) or {}
+        signature = preference_signature(subscriber.get("preferences"))
+        by_signature.setdefault(signature, []).append(recipient)
+
+    groups: Dict[Tuple[int, ...], Dict[str, Any]] = {}
+    for signature, group_recipients in by_signature.items():
+        indexes = tuple(select_signals(signals, signature))
+        group = groups.setdefault(
+            indexes,
+            {
+                "recipients": [],
+                "signal_indexes": list(indexes),
+                "signals": [signals[i] for i in indexes],
+                "signatures": [],
+            },
+        )
+        group["recipients"].extend(group_recipients)
+        group["signatures"].append(signature)
+
+    ordered = sorted(groups.values(), key=lambda g: -len(g["signal_indexes"]))
+    logger.info(
+        f"{sum(len(g['recipients']) for g in ordered)} destinatarios agrupados en "
+        f"{len(ordered)} boletines distintos ({len(by_signature)} firmas de preferencias)"
+    )
+    return ordered
+
+
+def build_preferences(
+    sectors: Optional[List[str]] = None,
+    confidence_levels: Optional[List[str]] = None,
+    base: Any = None,
+) -> Dict[str, Any]:
+    """
+    Construye el diccionario de preferencias a guardar para un suscriptor
+
+    Args:
+        sectors (List[str], optional): Sectores de interés (vacío = todos)
+        confidence_levels (List[str], optional): Niveles de confianza (vacío = todos)
+        base (Any, optional): Preferencias actuales, para conservar otras claves
+
+    Returns:
+        Dict[str, Any]: Preferencias actualizadas
+    """
+    preferences = dict(parse_preferences(base))
+    for key in SECTOR_KEYS + CONFIDENCE_KEYS:
+        preferences.pop(key, None)
+    preferences["sectors"] = list(sectors or [])
+    preferences["confidence_levels"] = list(confidence_levels or [])
+    return preferences
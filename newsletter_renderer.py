@@ -0,0 +1,910 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renderizado del boletín de trading con plantillas Jinja2 precompiladas.
+
+El boletín se divide en fragmentos independientes (encabezado, fila de la tabla
+de señales, tarjeta de análisis detallado, bloque de sentimiento, bloque de
+noticia y pie). Las plantillas se compilan una sola vez al importar el módulo y
+cada fragmento renderizado se guarda en una caché LRU con una clave derivada de
+sus datos de entrada, de modo que:
+
+- Volver a generar el boletín tras cambiar una sola señal reutiliza el resto de
+  fragmentos.
+- La misma entrada produce siempre exactamente los mismos bytes.
+
+Los datos que dependen de Streamlit o de la base de datos (por ejemplo, los
+resúmenes de noticias pendientes) se resuelven antes de llamar al renderizador.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from jinja2 import Environment
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+FRAGMENT_CACHE_SIZE = 1024
+
+MESES_ES = {
+    1: "enero",
+    2: "febrero",
+    3: "marzo",
+    4: "abril",
+    5: "mayo",
+    6: "junio",
+    7: "julio",
+    8: "agosto",
+    9: "septiembre",
+    10: "octubre",
+    11: "noviembre",
+    12: "diciembre",
+}
+
+MESES_ES_ABREV = {
+    "Jan": "ene",
+    "Feb": "feb",
+    "Mar": "mar",
+    "Apr": "abr",
+    "May": "may",
+    "Jun": "jun",
+    "Jul": "jul",
+    "Aug": "ago",
+    "Sep": "sep",
+    "Oct": "oct",
+    "Nov": "nov",
+    "Dec": "dic",
+}
+
+COLOR_POSITIVE = "#28a745"
+COLOR_NEGATIVE = "#dc3545"
+COLOR_NEUTRAL = "#6c757d"
+
+H2_STYLE = (
+    "color: #2c3e50; font-size: 22px; margin-top: 30px; margin-bottom: 20px; "
+    "border-bottom: 2px solid #eaeaea; padding-bottom: 10px; font-family: Arial, sans-serif;"
+)
+TD_STYLE = "padding: 12px 15px; text-align: left; border-bottom: 1px solid #f2f2f2;"
+TH_STYLE = (
+    "padding: 12px 15px; text-align: left; border-bottom: 1px solid #dee2e6; "
+    "font-size: 14px; font-weight: bold; color: #2c3e50;"
+)
+BOX_STYLE = (
+    "margin-top: 15px; background-color: #f9f9f9; padding: 15px; "
+    "border-radius: 5px; border: 1px solid #eee;"
+)
+NOTE_STYLE = "margin: 15px 0; font-size: 15px; line-height: 1.6; font-style: italic; color: #666;"
+
+# =================================================
+# PLANTILLAS
+# =================================================
+
+HEADER_TEMPLATE = """<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head>
+    <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
+    <title>InversorIA Pro - Boletín de Trading {{ current_date }}</title>
+</head>
+<body style="margin: 0; padding: 0; font-family: Arial, sans-serif; font-size: 14px; line-height: 1.6; color: #333333; background-color: #f9f9f9;">
+    <!-- Contenedor principal -->
+    <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse;">
+        <tr>
+            <td style="padding: 20px 0;">
+                <!-- Contenido central limitado a 600px para mejor visualización -->
+                <table align="center" border="0" cellpadding="0" cellspacing="0" width="600" style="border-collapse: collapse; background-color: #ffffff; box-shadow: 0 4px 8px rgba(0,0,0,0.1); border-radius: 8px;">
+
+                    <!-- HEADER -->
+                    <tr>
+                        <td align="center" bgcolor="#2c3e50" style="padding: 30px 20px; color: #ffffff; border-radius: 8px 8px 0 0; background: linear-gradient(135deg, #2c3e50 0%, #1a2a3a 100%);">
+                            <h1 style="margin: 0; font-size: 28px; font-weight: bold; font-family: Arial, sans-serif;">InversorIA Pro - Boletín de Trading</h1>
+                            <p style="margin: 10px 0 0; font-size: 16px; font-family: Arial, sans-serif;">{{ current_date }}</p>
+                        </td>
+                    </tr>
+
+                    <!-- CONTENIDO -->
+                    <tr>
+                        <td style="padding: 30px 20px;">
+                            <!-- Introducción contextual del boletín -->
+                            <div style="margin-bottom: 30px;">
+                                <p style="margin: 0 0 15px; line-height: 1.6; color: #444;">
+                                    Estimado inversor,
+                                </p>
+                                <p style="margin: 0 0 15px; line-height: 1.6; color: #444;">
+                                    Le presentamos nuestro boletín de trading con las oportunidades más relevantes identificadas por InversorIA Pro.
+                                    En un mercado caracterizado por {{ market_context }},
+                                    nuestros algoritmos han detectado señales que podrían representar oportunidades significativas.
+                                </p>
+                                <p style="margin: 0 0 15px; line-height: 1.6; color: #444;">
+                                    A continuación encontrará un análisis detallado de cada activo, con recomendaciones específicas
+                                    y niveles clave a vigilar. Recuerde que estas señales son el resultado de un análisis técnico y fundamental
+                                    exhaustivo, complementado con la evaluación de nuestro Trading Specialist.
+                                </p>
+                            </div>
+
+                            <h2 style="color: #2c3e50; font-size: 22px; margin-top: 0; margin-bottom: 20px; border-bottom: 2px solid #eaeaea; padding-bottom: 10px; font-family: Arial, sans-serif;">Señales de Trading Recientes</h2>
+"""
+
+SIGNAL_TABLE_HEADER = f"""<table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 30px;">
+    <tr style="background-color: #f2f6f9;">
+        <th style="{TH_STYLE}">Símbolo</th>
+        <th style="{TH_STYLE}">Dirección</th>
+        <th style="{TH_STYLE}">Precio</th>
+        <th style="{TH_STYLE}">Confianza</th>
+        <th style="{TH_STYLE}">Timeframe</th>
+    </tr>
+"""
+
+SIGNAL_ROW_TEMPLATE = """    <tr style="background-color: {{ row_bg_color }};">
+        <td style="{{ td_style }} font-weight: bold;">{{ symbol }}
+{%- if company_name %}<br/><span style='font-size: 11px; font-weight: normal; color: #666;'>{{ company_name }}</span>{% endif %}
+{%- if asset_params %}<br/><span style='font-size: 10px; color: #666;'>{{ asset_params | join(' | ') }}</span>{% endif %}</td>
+        <td style="{{ td_style }} color: {{ direction_color }}; font-weight: bold;">{{ direction_text }}</td>
+        <td style="{{ td_style }}">${{ price }}</td>
+        <td style="{{ td_style }}">{{ confidence_level }}</td>
+        <td style="{{ td_style }}">{{ timeframe }}</td>
+    </tr>
+"""
+
+SIGNAL_CARD_TEMPLATE = """<table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 30px; border-left: 4px solid {{ direction_color }}; background-color: {{ trend_bg }}; border-radius: 4px; box-shadow: 0 2px 4px rgba(0,0,0,0.05);" class="signal-{{ direction_text | lower }}">
+    <tr>
+        <td style="padding: 20px;">
+            <!-- Encabezado de la señal con más información -->
+            <div style="display: flex; justify-content: space-between; align-items: flex-start;">
+                <div>
+                    <h3 style="margin-top: 0; color: {{ direction_color }}; font-size: 18px; font-weight: bold; margin-bottom: 5px;">
+                        {{ symbol }} - {{ direction_text }}
+                    </h3>
+                    <p style="margin: 0 0 5px; color: #444; font-size: 15px;">{{ company_name }}</p>
+{% if company_description %}
+                    <p style="margin: 0 0 15px; color: #666; font-size: 13px; font-style: italic;">{{ company_description }}</p>
+{% endif %}
+                </div>
+                <div style="text-align: right;">
+                    <span style="display: inline-block; padding: 5px 10px; background-color: {{ direction_color }}; color: white; border-radius: 20px; font-size: 12px; font-weight: bold;">{{ confidence_badge }}</span>
+{% if updated %}
+                    <p style="margin: 5px 0 0; font-size: 12px; color: #666;">Actualizado: {{ updated }}</p>
+{% endif %}
+                </div>
+            </div>
+
+            <!-- Información básica -->
+            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 15px;">
+                <tr>
+                    <td width="50%" style="padding: 8px 0;"><strong>Estrategia:</strong> {{ strategy }}</td>
+                    <td width="50%" style="padding: 8px 0;"><strong>Confianza:</strong> {{ confidence_level }}</td>
+                </tr>
+                <tr>
+                    <td width="50%" style="padding: 8px 0;"><strong>Categoría:</strong> {{ category }}</td>
+                    <td width="50%" style="padding: 8px 0;"><strong>Timeframe:</strong> {{ timeframe }}</td>
+                </tr>
+            </table>
+{% if prices %}
+            <!-- Precios objetivos -->
+            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 15px; background-color: #f8f9fa; border-radius: 4px;">
+                <tr>
+{% for label, value, color in prices %}
+                    <td align="center" width="33%" style="padding: 12px;">
+                        <p style="margin: 0; font-size: 12px; color: #6c757d;">{{ label }}</p>
+                        <p style="margin: 5px 0 0; font-size: 16px; font-weight: bold; color: {{ color }};">${{ value }}</p>
+                    </td>
+{% endfor %}
+                </tr>
+            </table>
+{% if risk_reward %}
+            <p style="margin: 10px 0; text-align: center;">
+                <span style="background-color: #f2f6f9; padding: 6px 12px; border-radius: 4px; font-weight: bold; color: {{ rr_color }};">
+                    R/R: {{ risk_reward }}
+                </span>
+            </p>
+{% endif %}
+{% endif %}
+{% if trend %}
+            <p style="margin: 15px 0 5px; font-size: 14px; color: #6c757d;">Tendencia:</p>
+            <p style="margin: 0 0 15px; padding: 8px 12px; background-color: {{ trend_bg }}; display: inline-block; border-radius: 4px; color: {{ trend_color }}; font-weight: bold;">
+                {{ trend }}{{ ' (%s)' % trend_strength if trend_strength else '' }}
+            </p>
+{% endif %}
+{% if timeframes %}
+            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin: 15px 0; background-color: #f8f9fa; border-radius: 4px;">
+                <tr>
+{% for label, value, color in timeframes %}
+                    <td width="33%" style="padding: 10px; text-align: center;">
+                        <p style="margin: 0; font-size: 12px; color: #6c757d;">{{ label }}</p>
+                        <p style="margin: 5px 0 0; color: {{ color }}; font-weight: bold;">{{ value }}</p>
+                    </td>
+{% endfor %}
+                </tr>
+            </table>
+{% endif %}
+{% if expert_html %}
+            <div style="{{ box_style }}">
+                {{ expert_html }}
+            </div>
+{% elif expert_text %}
+            <div style="{{ box_style }}">
+                <pre style="white-space: pre-wrap; font-family: Arial, sans-serif; font-size: 14px; line-height: 1.6; color: #444;">{{ expert_text }}</pre>
+            </div>
+{% else %}
+{% if analysis %}
+            <div style="{{ box_style }}">
+                <h3 style="margin-top: 0; color: #2c3e50; font-size: 16px;">Análisis Fundamental</h3>
+                <p style="margin: 10px 0; font-size: 14px; line-height: 1.6; color: #444;">
+                    {{ analysis }}
+                </p>
+            </div>
+{% else %}
+            <p style="{{ note_style }}">
+                No hay análisis fundamental disponible para este activo.
+            </p>
+{% endif %}
+{% if technical_analysis %}
+            <div style="{{ box_style }}">
+                <h3 style="margin-top: 0; color: #2c3e50; font-size: 16px;">Análisis Técnico</h3>
+                <p style="margin: 10px 0; font-size: 14px; line-height: 1.6; color: #444;">
+                    {{ technical_analysis }}
+                </p>
+            </div>
+{% elif not analysis %}
+            <p style="{{ note_style }}">
+                No hay análisis técnico disponible para este activo.
+            </p>
+{% endif %}
+{% endif %}
+{% if recommendation %}
+            <div style="margin: 20px 0 10px; text-align: center;">
+                <p style="margin: 0 0 8px; font-size: 14px; color: #6c757d;">Recomendación Final</p>
+                <p style="margin: 0; display: inline-block; padding: 8px 20px; background-color: {{ rec_bg }};
+                        border: 2px solid {{ rec_color }}; border-radius: 20px; font-size: 16px; font-weight: bold; color: {{ rec_color }};">
+                    {{ recommendation }}
+                </p>
+            </div>
+{% endif %}
+        </td>
+    </tr>
+</table>
+"""
+
+SENTIMENT_TEMPLATE = """<h2 style="{{ h2_style }}">Sentimiento de Mercado</h2>
+
+<table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 30px; background-color: {{ sentiment_bg }}; border-left: 4px solid {{ sentiment_border }}; border-radius: 4px;">
+    <tr>
+        <td style="padding: 20px;">
+            <h3 style="margin-top: 0; margin-bottom: 15px; font-size: 18px; color: #2c3e50;">Sentimiento General: {{ overall }}</h3>
+
+            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse;">
+                <tr>
+                    <td width="50%" style="padding: 8px 0;"><strong>VIX:</strong> {{ vix }}</td>
+                    <td width="50%" style="padding: 8px 0;"><strong>S&P 500:</strong> {{ sp500_trend }}</td>
+                </tr>
+                <tr>
+                    <td width="50%" style="padding: 8px 0;"><strong>Indicadores Técnicos:</strong> {{ technical_indicators }}</td>
+                    <td width="50%" style="padding: 8px 0;"><strong>Volumen:</strong> {{ volume }}</td>
+                </tr>
+            </table>
+        </td>
+    </tr>
+</table>
+"""
+
+NEWS_INTRO = f"""<h2 style="{H2_STYLE}">Noticias Relevantes</h2>
+<p style="margin: 0 0 20px; line-height: 1.6; color: #444;">
+    A continuación presentamos las noticias más relevantes que podrían impactar sus decisiones de inversión.
+    Estas noticias han sido seleccionadas por su potencial impacto en los mercados y en los activos destacados en este boletín.
+</p>
+"""
+
+NEWS_TEMPLATE = """<table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 20px; background-color: #ffffff; border-radius: 4px; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
+    <tr>
+        <td style="padding: 20px;">
+            <h3 style="margin-top: 0; margin-bottom: 10px; color: #0275d8; font-size: 18px;">
+{%- if url %}<a href='{{ url }}' target='_blank' style='color: #0275d8; text-decoration: none;'>{{ title }} <span style='font-size: 12px;'>&#128279;</span></a>
+{%- else %}{{ title }}{% endif %}</h3>
+{% if symbol and company_name %}
+            <p style="margin: 0 0 10px; font-size: 13px; color: #444;"><strong>{{ symbol }}</strong> - {{ company_name }}</p>
+{% endif %}
+            <div style="margin: 0 0 15px; line-height: 1.6; background-color: #f9f9f9; padding: 12px; border-left: 3px solid #0275d8; border-radius: 4px;">
+                <p style="margin: 0; color: #333;">{{ summary }}</p>
+            </div>
+            <p style="margin: 0; font-size: 12px; color: #6c757d;">
+                {% if impact %}<span style="color: {{ impact_color }}; font-weight: bold;">Impacto: {{ impact }}</span> &bull; {% endif %}Fuente: {{ source }} &bull; {{ formatted_date }}
+            </p>
+        </td>
+    </tr>
+</table>
+"""
+
+EMPTY_TEMPLATE = (
+    '<p style="margin-bottom: 30px; color: #6c757d; font-style: italic;">{{ message }}</p>\n'
+)
+
+FOOTER = """                        </td>
+                    </tr>
+
+                    <!-- FOOTER -->
+                    <tr>
+                        <td style="padding: 30px 20px; background-color: #f8f9fa; border-top: 1px solid #eaeaea; border-radius: 0 0 8px 8px; color: #6c757d; text-align: center; font-size: 12px;">
+                            <p style="margin: 0 0 15px;"><strong>Aviso importante:</strong> Este boletín es generado automáticamente por InversorIA Pro. La información proporcionada es solo para fines educativos y no constituye asesoramiento financiero.</p>
+                            <p style="margin: 0 0 15px;">Los datos presentados son calculados utilizando análisis técnico avanzado, algoritmos de inteligencia artificial y evaluación de expertos en trading. Recuerde que toda inversión conlleva riesgos y los resultados pasados no garantizan rendimientos futuros.</p>
+                            <p style="margin: 0 0 15px;">Para obtener análisis más detallados y personalizados, le recomendamos consultar la plataforma completa de InversorIA Pro, donde encontrará herramientas adicionales y funcionalidades avanzadas.</p>
+                            <p style="margin: 0;">&copy; 2025 InversorIA Pro. Todos los derechos reservados.</p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>
+"""
+
+# Las plantillas se compilan una sola vez. El contenido ya viene en HTML (análisis,
+# enlaces), igual que con las f-strings anteriores, por lo que no se escapa
+_environment = Environment(autoescape=False, trim_blocks=True, keep_trailing_newline=True)
+_templates = {
+    "header": _environment.from_string(HEADER_TEMPLATE),
+    "signal_row": _environment.from_string(SIGNAL_ROW_TEMPLATE),
+    "signal_card": _environment.from_string(SIGNAL_CARD_TEMPLATE),
+    "sentiment": _environment.from_string(SENTIMENT_TEMPLATE),
+    "news": _environment.from_string(NEWS_TEMPLATE),
+    "empty": _environment.from_string(EMPTY_TEMPLATE),
+}
+
+
+# =================================================
+# CACHÉ DE FRAGMENTOS
+# =================================================
+
+
+class FragmentCache:
+    """
+    Caché LRU de fragmentos HTML renderizados
+    """
+
+    def __init__(self, maxsize: int = FRAGMENT_CACHE_SIZE):
+        """
+        Inicializa la caché
+
+        Args:
+            maxsize (int): Número máximo de fragmentos guardados
+        """
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        """
+        Devuelve el fragmento guardado o lo renderiza y lo guarda
+
+        Args:
+            key (str): Clave del fragmento
+            render (Callable[[], str]): Función que renderiza el fragmento
+
+        Returns:
+            str: HTML del fragmento
+        """
+        with self._lock:
+            html = self._items.get(key)
+            if html is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = render()
+        with self._lock:
+            self._items[key] = html
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return html
+
+    def clear(self):
+        """
+        Vacía la caché
+        """
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve estadísticas de uso de la caché
+
+        Returns:
+            Dict[str, int]: Fragmentos guardados, aciertos y fallos
+        """
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+fragment_cache = FragmentCache()
+
+
+def fragment_key(name: str, data: Any) -> str:
+    """
+    Genera una clave estable para un fragmento a partir de sus datos
+
+    Args:
+        name (str): Nombre del fragmento
+        data (Any): Datos de entrada (serializables a JSON; el resto con str)
+
+    Returns:
+        str: Clave del fragmento
+    """
+    payload = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return f"{name}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+
+# =================================================
+# DATOS DE APOYO
+# =================================================
+
+_company_cache: Dict[str, Dict[str, Any]] = {}
+_options_params: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def _company_info(symbol: str) -> Dict[str, Any]:
+    """Obtiene (una vez por símbolo) la información de la empresa"""
+    if not symbol:
+        return {}
+    if symbol not in _company_cache:
+        try:
+            from company_data import get_company_info
+
+            _company_cache[symbol] = get_company_info(symbol) or {}
+        except Exception as e:
+            logger.warning(
+                f"No se pudo obtener información de la empresa para {symbol}: {str(e)}"
+            )
+            _company_cache[symbol] = {}
+    return _company_cache[symbol]
+
+
+def _asset_params(symbol: str) -> Dict[str, Any]:
+    """Obtiene los parámetros de opciones del activo (MarketUtils se crea una sola vez)"""
+    global _options_params
+    if _options_params is None:
+        try:
+            from market_utils import MarketUtils
+
+            _options_params = MarketUtils().options_params
+        except Exception as e:
+            logger.warning(f"No se pudieron obtener parámetros de activos: {str(e)}")
+            _options_params = {}
+    return _options_params.get(symbol, {}) if symbol else {}
+
+
+def _trend_color(value: str) -> str:
+    """Color según la tendencia (alcista, bajista o neutral)"""
+    upper = value.upper()
+    if "ALCISTA" in upper:
+        return COLOR_POSITIVE
+    if "BAJISTA" in upper:
+        return COLOR_NEGATIVE
+    return COLOR_NEUTRAL
+
+
+def _direction(signal: Dict[str, Any]):
+    """Color y texto de la dirección de una señal"""
+    direction = signal.get("direction")
+    if direction == "CALL":
+        return COLOR_POSITIVE, "Compra"
+    if direction == "PUT":
+        return COLOR_NEGATIVE, "Venta"
+    return COLOR_NEUTRAL, "Neutral"
+
+
+def _expert_html(expert_analysis: str) -> Optional[str]:
+    """Convierte el análisis experto de markdown a HTML con estilos en línea"""
+    try:
+        import markdown
+
+        html = markdown.markdown(expert_analysis)
+    except Exception as e:
+        logger.warning(f"Error al convertir markdown a HTML: {str(e)}")
+        return None
+
+    return (
+        html.replace(
+            "<h2>",
+            '<h2 style="color: #2c3e50; font-size: 18px; margin-top: 20px; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">',
+        )
+        .replace(
+            "<p>",
+            '<p style="margin: 10px 0; font-size: 14px; line-height: 1.6; color: #444;">',
+        )
+        .replace("<ul>", '<ul style="margin: 10px 0; padding-left: 20px;">')
+        .replace(
+            "<li>",
+            '<li style="margin: 5px 0; font-size: 14px; line-height: 1.6; color: #444;">',
+        )
+    )
+
+
+def format_current_date(now: datetime) -> str:
+    """
+    Formatea una fecha en español ("5 de marzo de 2025")
+
+    Args:
+        now (datetime): Fecha a formatear
+
+    Returns:
+        str: Fecha formateada
+    """
+    return f"{now.day} de {MESES_ES[now.month]} de {now.year}"
+
+
+def format_news_date(news_date: Any) -> str:
+    """
+    Formatea la fecha de una noticia en español abreviado ("05 mar 2025")
+
+    Args:
+        news_date (Any): Fecha de la noticia (datetime o texto)
+
+    Returns:
+        str: Fecha formateada
+    """
+    if not isinstance(news_date, datetime):
+        return str(news_date)
+
+    fecha_en = news_date.strftime("%d %b %Y")
+    for mes_en, mes_es in MESES_ES_ABREV.items():
+        if mes_en in fecha_en:
+            return fecha_en.replace(mes_en, mes_es)
+    return fecha_en
+
+
+def is_high_confidence(signal: Dict[str, Any]) -> bool:
+    """
+    Indica si una señal se muestra con análisis detallado
+
+    Args:
+        signal (Dict[str, Any]): Señal de trading
+
+    Returns:
+        bool: True si es de alta confianza
+    """
+    return signal.get("is_high_confidence") == 1 or signal.get("confidence_level") == "Alta"
+
+
+# =================================================
+# FRAGMENTOS
+# =================================================
+
+
+def render_signal_row(signal: Dict[str, Any]) -> str:
+    """
+    Renderiza la fila de una señal en la tabla resumen
+
+    Args:
+        signal (Dict[str, Any]): Señal de trading
+
+    Returns:
+        str: HTML de la fila
+    """
+
+    def render():
+        symbol = signal.get("symbol", "")
+        direction_color, direction_text = _direction(signal)
+
+        confidence = signal.get("confidence_level")
+        if signal.get("direction") == "CALL":
+            row_bg_color = "#e8f5e9"  # Verde claro para CALL
+        elif signal.get("direction") == "PUT":
+            row_bg_color = "#ffebee"  # Rojo claro para PUT
+        elif confidence == "Alta":
+            row_bg_color = "#d4edda"
+        elif confidence == "Media":
+            row_bg_color = "#fff3cd"
+        else:
+            row_bg_color = "#f8f9fa"
+
+        params = _asset_params(symbol)
+        asset_params = []
+        if "costo_strike" in params:
+            asset_params.append(f"Costo strike: {params['costo_strike']}")
+        if "volumen_min" in params:
+            asset_params.append(f"Volumen mínimo: {params['volumen_min']}")
+        if "distance_spot_strike" in params:
+            asset_params.append(f"Distancia spot-strike: {params['distance_spot_strike']}")
+
+        return _templates["signal_row"].render(
+            td_style=TD_STYLE,
+            row_bg_color=row_bg_color,
+            symbol=symbol,
+            company_name=_company_info(symbol).get("name", ""),
+            asset_params=asset_params,
+            direction_color=direction_color,
+            direction_text=direction_text,
+            price=signal.get("price", "0.00"),
+            confidence_level=signal.get("confidence_level", "Baja"),
+            timeframe=signal.get("timeframe", "Corto"),
+        )
+
+    return fragment_cache.get_or_render(fragment_key("signal_row", signal), render)
+
+
+def render_signal_card(signal: Dict[str, Any]) -> str:
+    """
+    Renderiza la tarjeta de análisis detallado de una señal
+
+    Args:
+        signal (Dict[str, Any]): Señal de trading
+
+    Returns:
+        str: HTML de la tarjeta
+    """
+
+    def render():
+        symbol = signal.get("symbol", "")
+        direction_color, direction_text = _direction(signal)
+        company_info = _company_info(symbol)
+
+        trend = signal.get("trend", "") or ""
+        trend_bg = "#ffffff"
+        if trend:
+            if "ALCISTA" in trend.upper():
+                trend_bg = "#e8f5e9"
+            elif "BAJISTA" in trend.upper():
+                trend_bg = "#ffebee"
+            else:
+                trend_bg = "#f5f5f5"
+
+        created_at = signal.get("created_at")
+        updated = ""
+        if created_at:
+            updated = (
+                created_at.strftime("%d/%m/%Y")
+                if isinstance(created_at, datetime)
+                else "Hoy"
+            )
+
+        # Precios objetivos si están disponibles
+        prices = []
+        entry_price = signal.get("entry_price")
+        stop_loss = signal.get("stop_loss")
+        target_price = signal.get("target_price")
+        if entry_price:
+            prices.append(("Entrada", entry_price, "#0275d8"))
+        if stop_loss:
+            prices.append(("Stop Loss", stop_loss, COLOR_NEGATIVE))
+        if target_price:
+            prices.append(("Objetivo", target_price, COLOR_POSITIVE))
+
+        risk_reward = signal.get("risk_reward")
+        rr_color = COLOR_NEUTRAL
+        if risk_reward:
+            if risk_reward >= 2:
+                rr_color = COLOR_POSITIVE
+            elif risk_reward < 1:
+                rr_color = COLOR_NEGATIVE
+
+        timeframes = [
+            (label, signal.get(key), _trend_color(signal.get(key)))
+            for label, key in (
+                ("Diario", "daily_trend"),
+                ("Semanal", "weekly_trend"),
+                ("Mensual", "monthly_trend"),
+            )
+            if signal.get(key)
+        ]
+
+        # Análisis experto si es sustancial y no contiene errores
+        expert_analysis = signal.get("expert_analysis", "") or ""
+        expert_html = expert_text = None
+        if expert_analysis and "st.session_state has no attribute" in expert_analysis:
+            logger.warning(
+                f"Error detectado en el análisis experto para {symbol}: {expert_analysis[:100]}..."
+            )
+        elif len(expert_analysis) > 50:
+            expert_html = _expert_html(expert_analysis)
+            if expert_html is None:
+                expert_text = expert_analysis
+
+        analysis = signal.get("analysis", "") or ""
+        technical_analysis = signal.get("technical_analysis", "") or ""
+
+        recommendation = signal.get("recommendation")
+        rec_color, rec_bg = COLOR_NEUTRAL, "#f5f5f5"
+        if recommendation:
+            if "COMPRAR" in recommendation.upper():
+                rec_color, rec_bg = COLOR_POSITIVE, "#e8f5e9"
+            elif "VENDER" in recommendation.upper():
+                rec_color, rec_bg = COLOR_NEGATIVE, "#ffebee"
+
+        return _templates["signal_card"].render(
+            box_style=BOX_STYLE,
+            note_style=NOTE_STYLE,
+            symbol=symbol,
+            direction_color=direction_color,
+            direction_text=direction_text,
+            company_name=company_info.get("name", ""),
+            company_description=company_info.get("description", ""),
+            confidence_badge=signal.get("confidence_level", "Media"),
+            confidence_level=signal.get("confidence_level", "N/A"),
+            updated=updated,
+            strategy=signal.get("strategy", "N/A"),
+            category=signal.get("category", "N/A"),
+            timeframe=signal.get("timeframe", "N/A"),
+            prices=prices,
+            risk_reward=f"{risk_reward:.2f}" if risk_reward else "",
+            rr_color=rr_color,
+            trend=trend,
+            trend_bg=trend_bg,
+            trend_color=_trend_color(trend),
+            trend_strength=signal.get("trend_strength", ""),
+            timeframes=timeframes,
+            expert_html=expert_html,
+            expert_text=expert_text,
+            analysis=analysis if len(analysis) > 10 else "",
+            technical_analysis=(
+                technical_analysis if len(technical_analysis) > 10 else ""
+            ),
+            recommendation=recommendation,
+            rec_color=rec_color,
+            rec_bg=rec_bg,
+        )
+
+    return fragment_cache.get_or_render(fragment_key("signal_card", signal), render)
+
+
+def render_sentiment(market_sentiment: Dict[str, Any]) -> str:
+    """
+    Renderiza el bloque de sentimiento de mercado
+
+    Args:
+        market_sentiment (Dict[str, Any]): Sentimiento de mercado
+
+    Returns:
+        str: HTML del bloque
+    """
+
+    def render():
+        overall = market_sentiment.get("overall")
+        if overall == "Alcista":
+            border, background = COLOR_POSITIVE, "#e8f5e9"
+        elif overall == "Bajista":
+            border, background = COLOR_NEGATIVE, "#ffebee"
+        else:
+            border, background = COLOR_NEUTRAL, "#f5f5f5"
+
+        return _templates["sentiment"].render(
+            h2_style=H2_STYLE,
+            sentiment_border=border,
+            sentiment_bg=background,
+            overall=market_sentiment.get("overall", "Neutral"),
+            vix=market_sentiment.get("vix", "N/A"),
+            sp500_trend=market_sentiment.get("sp500_trend", "N/A"),
+            technical_indicators=market_sentiment.get("technical_indicators", "N/A"),
+            volume=market_sentiment.get("volume", "N/A"),
+        )
+
+    return fragment_cache.get_or_render(
+        fragment_key("sentiment", market_sentiment), render
+    )
+
+
+def render_news_item(item: Dict[str, Any], now: datetime = None) -> str:
+    """
+    Renderiza el bloque de una noticia
+
+    Args:
+        item (Dict[str, Any]): Noticia (con el resumen ya resuelto)
+        now (datetime, optional): Fecha a usar si la noticia no tiene fecha
+
+    Returns:
+        str: HTML del bloque
+    """
+    item = dict(item)
+    if "news_date" not in item:
+        # Solo se muestra el día, así la clave del fragmento no cambia en cada llamada
+        now = now or datetime.now()
+        item["news_date"] = datetime(now.year, now.month, now.day)
+
+    def render():
+        symbol = item.get("symbol", "")
+        impact = item.get("impact", "Medio")
+        if impact == "Alto":
+            impact_color = COLOR_NEGATIVE
+        elif impact == "Medio":
+            impact_color = "#fd7e14"
+        else:
+            impact_color = COLOR_NEUTRAL
+
+        url = item.get("url", "") or ""
+        return _templates["news"].render(
+            url=url if len(url) > 5 else "",
+            title=item.get("title", ""),
+            symbol=symbol,
+            company_name=_company_info(symbol).get("name", ""),
+            summary=item.get("summary", ""),
+            impact=impact,
+            impact_color=impact_color,
+            source=item.get("source", ""),
+            formatted_date=format_news_date(item["news_date"]),
+        )
+
+    return fragment_cache.get_or_render(fragment_key("news", item), render)
+
+
+# =================================================
+# BOLETÍN COMPLETO
+# =================================================
+
+
+def render_newsletter(
+    signals: List[Dict[str, Any]],
+    market_sentiment: Optional[Dict[str, Any]],
+    news_summary: List[Dict[str, Any]],
+    market_context: str,
+    now: datetime = None,
+) -> str:
+    """
+    Renderiza el boletín completo a partir de fragmentos cacheados
+
+    Args:
+        signals (List[Dict[str, Any]]): Señales de trading
+        market_sentiment (Optional[Dict[str, Any]]): Sentimiento de mercado
+        news_summary (List[Dict[str, Any]]): Noticias con el resumen resuelto
+        market_context (str): Descripción del contexto de mercado para la introducción
+        now (datetime, optional): Fecha del boletín (por defecto, la actual)
+
+    Returns:
+        str: HTML del boletín
+    """
+    now = now or datetime.now()
+    current_date = format_current_date(now)
+
+    parts = [
+        fragment_cache.get_or_render(
+            fragment_key("header", [current_date, market_context]),
+            lambda: _templates["header"].render(
+                current_date=current_date, market_context=market_context
+            ),
+        )
+    ]
+
+    if signals:
+        parts.append(SIGNAL_TABLE_HEADER)
+        parts.extend(render_signal_row(signal) for signal in signals)
+        parts.append("</table>\n")
+
+        high_confidence_signals = [s for s in signals if is_high_confidence(s)]
+        if high_confidence_signals:
+            parts.append(f'<h2 style="{H2_STYLE}">Análisis Detallado de Señales</h2>\n')
+            parts.extend(render_signal_card(s) for s in high_confidence_signals)
+    else:
+        parts.append(
+            _templates["empty"].render(
+                message="No hay señales de trading disponibles en este momento."
+            )
+        )
+
+    if market_sentiment:
+        parts.append(render_sentiment(market_sentiment))
+
+    parts.append(NEWS_INTRO)
+    if news_summary:
+        parts.extend(render_news_item(item, now) for item in news_summary)
+    else:
+        parts.append(
+            _templates["empty"].render(
+                message="No hay noticias relevantes disponibles en este momento."
+            )
+        )
+
+    parts.append(FOOTER)
+    return "".join(parts)
@@ -7,6 +7,8 @@ import time
 import streamlit as st
 import openai
 
+from utils.session_state import add_chat_message, enforce_memory_budget
+
 # Verificación de autenticación
 if "authenticated" not in st.session_state or not st.session_state.authenticated:
     st.title("🔒 Acceso Restringido")
@@ -118,12 +120,15 @@ if not st.session_state.thread_id:
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Aplicar los presupuestos de memoria de la sesión
+enforce_memory_budget()
+
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
 
 if prompt := st.chat_input("¿Cómo puedo ayudarte hoy?"):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    add_chat_message("user", prompt, key="messages")
     with st.chat_message("usuario"):
         st.markdown(prompt)
 
@@ -156,7 +161,7 @@ if prompt := st.chat_input("¿Cómo puedo ayudarte hoy?"):
     for message in messages:
         if message.run_id == run.id and message.role == "assistant":
             full_response = process_message_with_citations(message)
-            st.session_state.messages.append({"role": "assistant", "content": full_response})
+            add_chat_message("assistant", full_response, key="messages")
             with st.chat_message("assistant"):
                 st.markdown(full_response)
                 
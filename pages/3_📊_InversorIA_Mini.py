@@ -11,6 +11,8 @@ import pytz
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union, Tuple
 
+from utils.session_state import enforce_memory_budget, set_state
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1066,6 +1068,7 @@ def main():
     
     # Inicializar estado
     initialize_session_state()
+    enforce_memory_budget()
     
     # Obtener información de mercado para la barra superior
     market_status = get_market_status()
@@ -1104,7 +1107,7 @@ def main():
             if st.button("🔍 Escanear", use_container_width=True):
                 with st.spinner("Escaneando mercado..."):
                     st.session_state.last_scan_sectors = selected_sectors
-                    st.session_state.scan_results = st.session_state.scanner.scan_market(selected_sectors)
+                    set_state("scan_results", st.session_state.scanner.scan_market(selected_sectors))
                     st.session_state.last_scan_time = datetime.now()
         
         with button_col2:
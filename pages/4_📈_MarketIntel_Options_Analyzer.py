@@ -13,7 +13,6 @@ from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import os
 import json
-import time
 import openai
 import logging
 from typing import Dict, List, Tuple, Any, Optional
@@ -24,12 +23,14 @@ from market_data_engine import (
     _data_cache,
     get_api_keys_from_secrets,
 )
+from ai_client import get_ai_client
 from authenticator import (
     check_password,
     validate_session,
     clear_session,
     get_session_info,
 )
+from chart_builder import cached_figure
 from technical_analysis import (
     detect_support_resistance,
     detect_trend_lines,
@@ -425,6 +426,7 @@ def init_openai_client():
     return client, ASSISTANT_ID
 
 
+@cached_figure("marketintel_technical_chart")
 def create_technical_chart(data):
     """Crea gráfico técnico con indicadores y patrones técnicos"""
     # Verificación adecuada de DataFrame vacío
@@ -883,59 +885,42 @@ def consult_expert_ia(client, assistant_id, recommendation, symbol):
     """
 
     try:
-        # Enviar mensaje al thread
-        client.beta.threads.messages.create(
-            thread_id=st.session_state.thread_id, role="user", content=prompt
-        )
-
-        # Crear una ejecución para el thread
-        run = client.beta.threads.runs.create(
-            thread_id=st.session_state.thread_id, assistant_id=assistant_id
-        )
-
         # Mostrar progreso
         progress_bar = st.progress(0)
         status_text = st.empty()
 
-        # Esperar a que se complete la ejecución con timeout
-        start_time = time.time()
         timeout = 60  # 60 segundos máximo
 
-        while run.status not in ["completed", "failed", "cancelled", "expired"]:
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                status_text.error(
-                    "El análisis del experto está tardando demasiado. Por favor, inténtalo de nuevo."
-                )
-                return "Error: Timeout en la consulta al experto"
-
-            # Actualizar progreso
-            progress = min(0.9, elapsed / timeout)
-            progress_bar.progress(progress)
+        def update_status(run, elapsed):
+            """Actualiza la barra de progreso en cada comprobación de la ejecución"""
+            progress_bar.progress(min(0.9, elapsed / timeout))
             status_text.text(f"El experto está analizando {symbol}... ({run.status})")
 
-            # Esperar antes de verificar de nuevo
-            time.sleep(1)
-            run = client.beta.threads.runs.retrieve(
-                thread_id=st.session_state.thread_id, run_id=run.id
+        # Esperar la ejecución con backoff exponencial y plazo total
+        result = get_ai_client().run_assistant(
+            prompt,
+            assistant_id=assistant_id,
+            thread_id=st.session_state.thread_id,
+            timeout=timeout,
+            on_status=update_status,
+            client=client,
+        )
+
+        if result["status"] == "expired":
+            status_text.error(
+                "El análisis del experto está tardando demasiado. Por favor, inténtalo de nuevo."
             )
+            return "Error: Timeout en la consulta al experto"
 
         # Completar barra de progreso
         progress_bar.progress(1.0)
         status_text.empty()
 
-        if run.status != "completed":
-            return f"Error: La consulta al experto falló con estado {run.status}"
-
-        # Recuperar mensajes
-        messages = client.beta.threads.messages.list(
-            thread_id=st.session_state.thread_id
-        )
+        if result["status"] != "completed":
+            return f"Error: La consulta al experto falló con estado {result['status']}"
 
-        # Obtener respuesta
-        for message in messages:
-            if message.run_id == run.id and message.role == "assistant":
-                return process_message_with_citations(message)
+        if result["text"]:
+            return result["text"]
 
         return "No se recibió respuesta del experto."
 
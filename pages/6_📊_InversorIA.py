@@ -12,6 +12,8 @@ import sys
 import requests
 import openai
 
+from utils.session_state import add_chat_message, enforce_memory_budget
+
 # Importar componentes personalizados
 try:
     from market_utils import (
@@ -1125,6 +1127,7 @@ def main():
 
         # Inicialización para usuario autenticado
         initialize_session_state()
+        enforce_memory_budget()
 
         # Mostrar el estado del sistema al iniciar sesión y luego desactivarlo
         if st.session_state.get("show_system_status", False):
@@ -1262,9 +1265,7 @@ def main():
                 # Campo de entrada para nuevos mensajes
                 if prompt := st.chat_input("Pregunta sobre análisis o trading..."):
                     # Agregar mensaje del usuario
-                    st.session_state.messages.append(
-                        {"role": "user", "content": prompt}
-                    )
+                    add_chat_message("user", prompt, key="messages")
 
                     with st.chat_message("user"):
                         st.markdown(prompt)
@@ -1283,9 +1284,7 @@ def main():
                             response = fallback_analyze_symbol(symbol, prompt)
 
                     # Agregar respuesta del asistente
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": response}
-                    )
+                    add_chat_message("assistant", response, key="messages")
 
                     with st.chat_message("assistant"):
                         st.markdown(response)
@@ -1,9 +1,7 @@
 import streamlit as st
 import pandas as pd
 import logging
-import socket
 import time
-import smtplib
 import mysql.connector
 import sys
 import os
@@ -13,23 +11,31 @@ import csv
 import subprocess
 
 # import tempfile  # No se utiliza, usar carpeta 'temp' para archivos temporales
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
-from email.mime.application import MIMEApplication
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 
-# Intentar importar pdfkit para la generación de PDF
-try:
-    import pdfkit
+from email_delivery import DEFAULT_BATCH_SIZE, DEFAULT_POOL_SIZE, NewsletterDelivery
+from newsletter_personalization import (
+    CONFIDENCE_KEYS,
+    CONFIDENCE_LEVELS,
+    SECTOR_KEYS,
+    SECTORS,
+    build_preferences,
+    parse_preferences,
+    plan_newsletter_groups,
+    preference_values,
+)
+from newsletter_renderer import render_newsletter
+from pdf_renderer import (
+    RENDERER_AUTO,
+    available_renderers,
+    get_pdf_job,
+    render_pdf,
+    submit_pdf,
+    wait_for_pdf,
+)
+from utils.session_state import enforce_memory_budget
 
-    PDFKIT_AVAILABLE = True
-except ImportError:
-    PDFKIT_AVAILABLE = False
-    logging.warning(
-        "pdfkit no está instalado. La funcionalidad de PDF no estará disponible."
-    )
 
 # Configuración de logging
 logging.basicConfig(
@@ -237,6 +243,12 @@ with st.sidebar:
         value=True,
         help="Adjunta una versión PDF del boletín al correo",
     )
+    pdf_engine = st.selectbox(
+        "Motor de PDF",
+        [RENDERER_AUTO] + available_renderers(),
+        disabled=not include_pdf,
+        help="'auto' usa wkhtmltopdf si está instalado y, si no, un motor en Python puro",
+    )
 
     # Botón para limpiar caché
     if st.button("🔄 Actualizar Datos"):
@@ -671,7 +683,7 @@ class DatabaseManager:
     def get_market_news(self, days_back=7, limit=5):
         """Obtiene noticias de mercado recientes"""
         query = """SELECT * FROM market_news
-                  WHERE DATE(news_date) >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+                  WHERE news_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
                   ORDER BY news_date DESC, impact DESC
                   LIMIT %s"""
         params = [days_back, limit]
@@ -803,7 +815,10 @@ class DatabaseManager:
     def save_market_news(self, news_data):
         """Guarda una noticia del mercado en la base de datos"""
         # Verificar si la noticia ya existe (por título)
-        check_query = """SELECT id FROM market_news WHERE title = %s AND DATE(news_date) = CURDATE()"""
+        check_query = """SELECT id FROM market_news
+                        WHERE title = %s
+                          AND news_date >= CURDATE()
+                          AND news_date < CURDATE() + INTERVAL 1 DAY"""
         result = self.execute_query(check_query, (news_data.get("title"),))
 
         if result and len(result) > 0:
@@ -962,6 +977,7 @@ class EmailManager:
 
     def __init__(self):
         """Inicializa el gestor de correos con credenciales desde secrets"""
+        self.pdf_renderer = RENDERER_AUTO
         try:
             # Obtener credenciales desde secrets.toml
             self.email_config = {
@@ -970,25 +986,18 @@ class EmailManager:
                 "email_user": st.secrets.get("email_user", ""),
                 "email_password": st.secrets.get("email_password", ""),
                 "email_from": st.secrets.get("email_from", ""),
+                "smtp_pool_size": st.secrets.get("smtp_pool_size", DEFAULT_POOL_SIZE),
+                "smtp_batch_size": st.secrets.get(
+                    "smtp_batch_size", DEFAULT_BATCH_SIZE
+                ),
             }
             logger.info("Configuración de correo electrónico inicializada")
         except Exception as e:
             logger.error(f"Error inicializando configuración de correo: {str(e)}")
             self.email_config = None
 
-    def send_email(
-        self, recipients, subject, html_content, pdf_attachment=None, images=None
-    ):
-        """Envía un correo electrónico con contenido HTML, PDF y opcionalmente imágenes"""
-        # Validar que hay destinatarios
-        if not recipients:
-            logger.error("No se especificaron destinatarios para el correo")
-            return False
-
-        # Convertir a lista si es un string
-        if isinstance(recipients, str):
-            recipients = [r.strip() for r in recipients.split(",") if r.strip()]
-
+    def _ensure_email_config(self):
+        """Verifica que haya credenciales de correo, recargándolas desde secrets si faltan"""
         # Validar configuración de correo
         if not self.email_config or not self.email_config.get("email_user"):
             logger.warning(
@@ -1002,6 +1011,12 @@ class EmailManager:
                     "email_user": st.secrets.get("email_user", ""),
                     "email_password": st.secrets.get("email_password", ""),
                     "email_from": st.secrets.get("email_from", ""),
+                    "smtp_pool_size": st.secrets.get(
+                        "smtp_pool_size", DEFAULT_POOL_SIZE
+                    ),
+                    "smtp_batch_size": st.secrets.get(
+                        "smtp_batch_size", DEFAULT_BATCH_SIZE
+                    ),
                 }
                 logger.info(
                     f"Credenciales de correo actualizadas: {self.email_config['email_user']}"
@@ -1017,964 +1032,220 @@ class EmailManager:
             logger.error("Faltan credenciales de correo en secrets.toml")
             return False
 
-        try:
-            # Crear mensaje
-            msg = MIMEMultipart("related")
-            msg["Subject"] = subject
-            msg["From"] = self.email_config.get("email_from") or self.email_config.get(
-                "email_user"
-            )
-            msg["To"] = ", ".join(recipients)
-
-            logger.info(f"Preparando correo para: {msg['To']}")
-
-            # Crear parte alternativa para texto plano/HTML
-            alt = MIMEMultipart("alternative")
-            msg.attach(alt)
+        return True
 
-            # Añadir versión de texto plano (simplificada)
-            text_plain = "Este correo contiene un boletín de trading de InversorIA Pro. Por favor, utilice un cliente de correo que soporte HTML para visualizarlo correctamente."
-            text_part = MIMEText(text_plain, "plain")
-            alt.attach(text_part)
-
-            # Adjuntar contenido HTML
-            html_part = MIMEText(html_content, "html")
-            alt.attach(html_part)
-
-            # Adjuntar PDF si existe
-            if pdf_attachment:
-                try:
-                    pdf_part = MIMEApplication(pdf_attachment, _subtype="pdf")
-                    pdf_part.add_header(
-                        "Content-Disposition",
-                        "attachment",
-                        filename="InversorIA_Pro_Boletin_Trading.pdf",
-                    )
-                    msg.attach(pdf_part)
-                    logger.info("PDF adjuntado al correo")
-                except Exception as pdf_error:
-                    logger.error(f"Error adjuntando PDF al correo: {str(pdf_error)}")
-                    # Intentar con un enfoque alternativo
-                    try:
-                        # Guardar PDF temporalmente y adjuntarlo desde archivo
-                        temp_pdf_path = "temp/boletin_temp.pdf"
-                        os.makedirs("temp", exist_ok=True)
-                        with open(temp_pdf_path, "wb") as f:
-                            f.write(pdf_attachment)
-
-                        with open(temp_pdf_path, "rb") as f:
-                            pdf_data = f.read()
-                            pdf_part = MIMEApplication(pdf_data, _subtype="pdf")
-                            pdf_part.add_header(
-                                "Content-Disposition",
-                                "attachment",
-                                filename="InversorIA_Pro_Boletin_Trading.pdf",
-                            )
-                            msg.attach(pdf_part)
-                            logger.info(
-                                "PDF adjuntado al correo usando archivo temporal"
-                            )
-
-                        # Eliminar archivo temporal
-                        try:
-                            os.remove(temp_pdf_path)
-                        except:
-                            pass
-                    except Exception as alt_error:
-                        logger.error(
-                            f"Error con enfoque alternativo para PDF: {str(alt_error)}"
-                        )
-
-            # Adjuntar imágenes si existen
-            if images and isinstance(images, dict):
-                for img_id, img_data in images.items():
-                    image = MIMEImage(img_data)
-                    image.add_header("Content-ID", f"<{img_id}>")
-                    msg.attach(image)
-
-            # Conectar al servidor SMTP con timeout
-            logger.info(
-                f"Conectando a servidor SMTP: {self.email_config.get('smtp_server')}:{self.email_config.get('smtp_port')}"
-            )
-
-            # Verificar si el puerto es 465 (SSL) o 587 (TLS)
-            port = self.email_config.get("smtp_port")
-            use_ssl = port == 465
-
-            try:
-                if use_ssl:
-                    # Conexión SSL directa
-                    logger.info("Usando conexión SSL")
-                    server = smtplib.SMTP_SSL(
-                        self.email_config.get("smtp_server"),
-                        port,
-                        timeout=10,  # Timeout de 10 segundos
-                    )
-                else:
-                    # Conexión normal con STARTTLS
-                    logger.info("Usando conexión con STARTTLS")
-                    server = smtplib.SMTP(
-                        self.email_config.get("smtp_server"),
-                        port,
-                        timeout=10,  # Timeout de 10 segundos
-                    )
-                    server.starttls()
-
-                server.set_debuglevel(
-                    1
-                )  # Activar debug para ver la comunicación con el servidor
-            except socket.timeout:
-                logger.error(
-                    f"Timeout al conectar con el servidor SMTP: {self.email_config.get('smtp_server')}:{port}"
-                )
-                return False
-            except ConnectionRefusedError:
-                logger.error(
-                    f"Conexión rechazada por el servidor SMTP: {self.email_config.get('smtp_server')}:{port}"
-                )
-                return False
-
-            # Intentar login
-            logger.info(
-                f"Iniciando sesión con usuario: {self.email_config.get('email_user')}"
-            )
-            server.login(
-                self.email_config.get("email_user"),
-                self.email_config.get("email_password"),
-            )
+    def send_email(
+        self, recipients, subject, html_content, pdf_attachment=None, images=None
+    ):
+        """Envía un correo electrónico con contenido HTML, PDF y opcionalmente imágenes"""
+        # Validar que hay destinatarios
+        if not recipients:
+            logger.error("No se especificaron destinatarios para el correo")
+            return False
 
-            # Enviar correo con timeout
-            logger.info("Enviando mensaje...")
-            try:
-                server.send_message(msg)
-                server.quit()
-                logger.info(f"Correo enviado exitosamente a {msg['To']}")
-                return True
-            except smtplib.SMTPServerDisconnected:
-                logger.error("El servidor SMTP se desconectó durante el envío")
-                return False
-            except socket.timeout:
-                logger.error("Timeout durante el envío del correo")
-                return False
-            except Exception as e:
-                logger.error(f"Error durante el envío del correo: {str(e)}")
-                return False
+        # Convertir a lista si es un string
+        if isinstance(recipients, str):
+            recipients = [r.strip() for r in recipients.split(",") if r.strip()]
 
-        except smtplib.SMTPAuthenticationError as e:
-            logger.error(f"Error de autenticación SMTP: {str(e)}")
+        results = self.send_bulk(
+            recipients, subject, html_content, pdf_attachment, images
+        )
+        failed = [r for r in results if r["status"] != "success"]
+        if failed:
             logger.error(
-                "Verifica tu usuario y contraseña. Si usas Gmail, asegúrate de usar una 'Clave de aplicación'."
+                f"No se pudo enviar el correo a {len(failed)} de {len(results)} destinatarios"
             )
             return False
-        except smtplib.SMTPException as e:
-            logger.error(f"Error SMTP: {str(e)}")
-            return False
-        except Exception as e:
-            logger.error(f"Error enviando correo: {str(e)}")
-            return False
-
-    def create_newsletter_html(self, signals, market_sentiment, news_summary):
-        """Crea el contenido HTML para el boletín de trading con diseño mejorado optimizado para clientes de correo"""
-        # Fecha actual formateada en español
-        # Definir meses en español
-        meses_es = {
-            "January": "enero",
-            "February": "febrero",
-            "March": "marzo",
-            "April": "abril",
-            "May": "mayo",
-            "June": "junio",
-            "July": "julio",
-            "August": "agosto",
-            "September": "septiembre",
-            "October": "octubre",
-            "November": "noviembre",
-            "December": "diciembre",
-        }
 
-        # Formatear fecha y traducir el mes
-        fecha_actual = datetime.now()
-        mes_en = fecha_actual.strftime("%B")
-        mes_es = meses_es.get(mes_en, mes_en)
-        current_date = f"{fecha_actual.day} de {mes_es} de {fecha_actual.year}"
-
-        # Encabezado del boletín con diseño mejorado para compatibilidad con clientes de correo
-        html = f"""
-        <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
-        <html xmlns="http://www.w3.org/1999/xhtml">
-        <head>
-            <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
-            <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
-            <title>InversorIA Pro - Boletín de Trading {current_date}</title>
-        </head>
-        <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; font-size: 14px; line-height: 1.6; color: #333333; background-color: #f9f9f9;">
-            <!-- Contenedor principal -->
-            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse;">
-                <tr>
-                    <td style="padding: 20px 0;">
-                        <!-- Contenido central limitado a 600px para mejor visualización -->
-                        <table align="center" border="0" cellpadding="0" cellspacing="0" width="600" style="border-collapse: collapse; background-color: #ffffff; box-shadow: 0 4px 8px rgba(0,0,0,0.1); border-radius: 8px;">
-
-                            <!-- HEADER -->
-                            <tr>
-                                <td align="center" bgcolor="#2c3e50" style="padding: 30px 20px; color: #ffffff; border-radius: 8px 8px 0 0; background: linear-gradient(135deg, #2c3e50 0%, #1a2a3a 100%);">
-                                    <h1 style="margin: 0; font-size: 28px; font-weight: bold; font-family: Arial, sans-serif;">InversorIA Pro - Boletín de Trading</h1>
-                                    <p style="margin: 10px 0 0; font-size: 16px; font-family: Arial, sans-serif;">{current_date}</p>
-                                </td>
-                            </tr>
-
-                            <!-- CONTENIDO -->
-                            <tr>
-                                <td style="padding: 30px 20px;">
-                                    <!-- Introducción contextual del boletín -->
-                                    <div style="margin-bottom: 30px;">
-                                        <p style="margin: 0 0 15px; line-height: 1.6; color: #444;">
-                                            Estimado inversor,
-                                        </p>
-                                        <p style="margin: 0 0 15px; line-height: 1.6; color: #444;">
-                                            Le presentamos nuestro boletín de trading con las oportunidades más relevantes identificadas por InversorIA Pro.
-                                            En un mercado caracterizado por {self._get_market_context(market_sentiment)},
-                                            nuestros algoritmos han detectado señales que podrían representar oportunidades significativas.
-                                        </p>
-                                        <p style="margin: 0 0 15px; line-height: 1.6; color: #444;">
-                                            A continuación encontrará un análisis detallado de cada activo, con recomendaciones específicas
-                                            y niveles clave a vigilar. Recuerde que estas señales son el resultado de un análisis técnico y fundamental
-                                            exhaustivo, complementado con la evaluación de nuestro Trading Specialist.
-                                        </p>
-                                    </div>
+        logger.info(f"Correo enviado exitosamente a {', '.join(recipients)}")
+        return True
 
-                                    <h2 style="color: #2c3e50; font-size: 22px; margin-top: 0; margin-bottom: 20px; border-bottom: 2px solid #eaeaea; padding-bottom: 10px; font-family: Arial, sans-serif;">Señales de Trading Recientes</h2>
+    def send_bulk(
+        self,
+        recipients,
+        subject,
+        html_content,
+        pdf_attachment=None,
+        images=None,
+        personalize=None,
+    ):
         """
+        Envía un correo a cada destinatario reutilizando las sesiones SMTP
 
-        # Tabla de señales
-        if signals and len(signals) > 0:
-            html += """
-            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 30px;">
-                <tr style="background-color: #f2f6f9;">
-                    <th style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #dee2e6; font-size: 14px; font-weight: bold; color: #2c3e50;">Símbolo</th>
-                    <th style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #dee2e6; font-size: 14px; font-weight: bold; color: #2c3e50;">Dirección</th>
-                    <th style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #dee2e6; font-size: 14px; font-weight: bold; color: #2c3e50;">Precio</th>
-                    <th style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #dee2e6; font-size: 14px; font-weight: bold; color: #2c3e50;">Confianza</th>
-                    <th style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #dee2e6; font-size: 14px; font-weight: bold; color: #2c3e50;">Timeframe</th>
-                </tr>
-            """
-
-            for signal in signals:
-                # Determinar color de fondo según nivel de confianza
-                if signal.get("confidence_level") == "Alta":
-                    bg_color = "#d4edda"
-                elif signal.get("confidence_level") == "Media":
-                    bg_color = "#fff3cd"
-                else:
-                    bg_color = "#f8f9fa"
-
-                if signal.get("direction") == "CALL":
-                    direction_color = "#28a745"
-                    direction_text = "Compra"
-                elif signal.get("direction") == "PUT":
-                    direction_color = "#dc3545"
-                    direction_text = "Venta"
-                else:
-                    direction_color = "#6c757d"
-                    direction_text = "Neutral"
-
-                # Obtener nombre completo de la empresa
-                symbol = signal.get("symbol", "")
-                company_name = ""
-                if symbol:
-                    # Importar función para obtener información de la empresa
-                    try:
-                        from company_data import get_company_info
-
-                        company_info = get_company_info(symbol)
-                        company_name = company_info.get("name", "")
-                    except Exception as e:
-                        logger.warning(
-                            f"No se pudo obtener información de la empresa para {symbol}: {str(e)}"
-                        )
-
-                # Mostrar símbolo y nombre completo
-                symbol_display = symbol
-                if company_name:
-                    symbol_display = f"{symbol}<br/><span style='font-size: 11px; font-weight: normal; color: #666;'>{company_name}</span>"
-
-                # Determinar color de fondo de la fila según la dirección
-                if signal.get("direction") == "CALL":
-                    row_bg_color = "#e8f5e9"  # Verde claro para CALL
-                elif signal.get("direction") == "PUT":
-                    row_bg_color = "#ffebee"  # Rojo claro para PUT
-                else:
-                    row_bg_color = (
-                        bg_color  # Mantener el color original basado en confianza
-                    )
-
-                # Obtener parámetros del activo desde market_utils.py
-                asset_params = {}
-                try:
-                    from market_utils import MarketUtils
-
-                    market_utils = MarketUtils()
-                    symbol_key = signal.get("symbol", "")
-                    if symbol_key in market_utils.options_params:
-                        asset_params = market_utils.options_params[symbol_key]
-                except Exception as e:
-                    logger.warning(
-                        f"No se pudieron obtener parámetros del activo para {signal.get('symbol', '')}: {str(e)}"
-                    )
-
-                # Crear cadena de parámetros del activo
-                params_str = ""
-                if asset_params:
-                    params_list = []
-                    if "costo_strike" in asset_params:
-                        params_list.append(
-                            f"Costo strike: {asset_params['costo_strike']}"
-                        )
-                    if "volumen_min" in asset_params:
-                        params_list.append(
-                            f"Volumen mínimo: {asset_params['volumen_min']}"
-                        )
-                    if "distance_spot_strike" in asset_params:
-                        params_list.append(
-                            f"Distancia spot-strike: {asset_params['distance_spot_strike']}"
-                        )
-
-                    if params_list:
-                        params_str = f"<br/><span style='font-size: 10px; color: #666;'>{' | '.join(params_list)}</span>"
-
-                html += f"""
-                <tr style="background-color: {row_bg_color};">
-                    <td style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #f2f2f2; font-weight: bold;">{symbol_display}{params_str}</td>
-                    <td style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #f2f2f2; color: {direction_color}; font-weight: bold;">{direction_text}</td>
-                    <td style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #f2f2f2;">${signal.get('price', '0.00')}</td>
-                    <td style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #f2f2f2;">{signal.get('confidence_level', 'Baja')}</td>
-                    <td style="padding: 12px 15px; text-align: left; border-bottom: 1px solid #f2f2f2;">{signal.get('timeframe', 'Corto')}</td>
-                </tr>
-                """
+        Las partes comunes (PDF, imágenes) se construyen una sola vez y los
+        destinatarios se envían por lotes en paralelo (ver email_delivery).
 
-            html += "</table>"
+        Returns:
+            List[Dict]: Estado por destinatario ({"email", "status", "error_message"})
+        """
+        if isinstance(recipients, str):
+            recipients = [r.strip() for r in recipients.split(",") if r.strip()]
 
-            # Sección de análisis detallado
-            high_confidence_signals = [
-                s
-                for s in signals
-                if s.get("is_high_confidence") == 1
-                or s.get("confidence_level") == "Alta"
+        if not self._ensure_email_config():
+            return [
+                {
+                    "email": r,
+                    "status": "failed",
+                    "error_message": "Configuración de correo no disponible",
+                }
+                for r in recipients
             ]
 
-            if high_confidence_signals:
-                html += """
-                <h2 style="color: #2c3e50; font-size: 22px; margin-top: 30px; margin-bottom: 20px; border-bottom: 2px solid #eaeaea; padding-bottom: 10px; font-family: Arial, sans-serif;">Análisis Detallado de Señales</h2>
-                """
-
-                for signal in high_confidence_signals:
-                    symbol = signal.get("symbol", "")
-                    direction = signal.get("direction", "NEUTRAL")
-
-                    # Color según dirección
-                    if direction == "CALL":
-                        border_color = "#28a745"
-                        direction_text = "Compra"
-                        direction_color = "#28a745"
-                    elif direction == "PUT":
-                        border_color = "#dc3545"
-                        direction_text = "Venta"
-                        direction_color = "#dc3545"
-                    else:
-                        border_color = "#6c757d"
-                        direction_text = "Neutral"
-                        direction_color = "#6c757d"
-
-                    # Obtener datos básicos para la visualización
-                    entry_price = signal.get("entry_price")
-                    stop_loss = signal.get("stop_loss")
-                    target_price = signal.get("target_price")
-                    risk_reward = signal.get("risk_reward")
-
-                    # Obtener nombre completo de la empresa para la señal detallada
-                    company_name = ""
-                    company_description = ""
-                    if symbol:
-                        try:
-                            from company_data import get_company_info
-
-                            company_info = get_company_info(symbol)
-                            company_name = company_info.get("name", "")
-                            company_description = company_info.get("description", "")
-                        except Exception as e:
-                            logger.warning(
-                                f"No se pudo obtener información detallada de la empresa para {symbol}: {str(e)}"
-                            )
-
-                    # Inicializar variables de tendencia
-                    trend = signal.get("trend", "")
-                    trend_strength = signal.get("trend_strength", "")
-                    trend_bg = "#ffffff"  # Color por defecto
-
-                    # Determinar color de fondo según tendencia si está disponible
-                    if trend:
-                        if "ALCISTA" in trend.upper():
-                            trend_bg = "#e8f5e9"  # Verde claro para tendencia alcista
-                        elif "BAJISTA" in trend.upper():
-                            trend_bg = "#ffebee"  # Rojo claro para tendencia bajista
-                        else:
-                            trend_bg = "#f5f5f5"  # Gris claro para tendencia neutral
-
-                    html += f"""
-                    <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 30px; border-left: 4px solid {border_color}; background-color: {trend_bg}; border-radius: 4px; box-shadow: 0 2px 4px rgba(0,0,0,0.05);" class="signal-{direction_text.lower()}">
-                        <tr>
-                            <td style="padding: 20px;">
-                                <!-- Encabezado de la señal con más información -->
-                                <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                                    <div>
-                                        <h3 style="margin-top: 0; color: {direction_color}; font-size: 18px; font-weight: bold; margin-bottom: 5px;">
-                                            {symbol} - {direction_text}
-                                        </h3>
-                                        <p style="margin: 0 0 5px; color: #444; font-size: 15px;">{company_name}</p>
-                                        {f'<p style="margin: 0 0 15px; color: #666; font-size: 13px; font-style: italic;">{company_description}</p>' if company_description else ''}
-                                    </div>
-                                    <div style="text-align: right;">
-                                        <span style="display: inline-block; padding: 5px 10px; background-color: {direction_color}; color: white; border-radius: 20px; font-size: 12px; font-weight: bold;">{signal.get('confidence_level', 'Media')}</span>
-                                        {f'<p style="margin: 5px 0 0; font-size: 12px; color: #666;">Actualizado: {signal.get("created_at").strftime("%d/%m/%Y") if isinstance(signal.get("created_at"), datetime) else "Hoy"}</p>' if signal.get("created_at") else ''}
-                                    </div>
-                                </div>
-
-                                <!-- Información básica -->
-                                <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 15px;">
-                                    <tr>
-                                        <td width="50%" style="padding: 8px 0;"><strong>Estrategia:</strong> {signal.get('strategy', 'N/A')}</td>
-                                        <td width="50%" style="padding: 8px 0;"><strong>Confianza:</strong> {signal.get('confidence_level', 'N/A')}</td>
-                                    </tr>
-                                    <tr>
-                                        <td width="50%" style="padding: 8px 0;"><strong>Categoría:</strong> {signal.get('category', 'N/A')}</td>
-                                        <td width="50%" style="padding: 8px 0;"><strong>Timeframe:</strong> {signal.get('timeframe', 'N/A')}</td>
-                                    </tr>
-                                </table>
-                    """
+        logger.info(f"Preparando correo para {len(recipients)} destinatarios")
+        return self._create_delivery().send(
+            recipients,
+            subject,
+            html_content,
+            pdf_attachment=pdf_attachment,
+            images=images,
+            personalize=personalize,
+        )
 
-                    # Precios objetivos si están disponibles
-                    if entry_price or stop_loss or target_price:
-                        html += """
-                        <!-- Precios objetivos -->
-                        <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 15px; background-color: #f8f9fa; border-radius: 4px;">
-                            <tr>
-                        """
+    def send_groups(self, groups, subject):
+        """
+        Envía varias variantes del boletín compartiendo las sesiones SMTP
 
-                        if entry_price:
-                            html += f"""
-                            <td align="center" width="33%" style="padding: 12px;">
-                                <p style="margin: 0; font-size: 12px; color: #6c757d;">Entrada</p>
-                                <p style="margin: 5px 0 0; font-size: 16px; font-weight: bold; color: #0275d8;">${entry_price}</p>
-                            </td>
-                            """
+        Args:
+            groups (List[Dict]): Grupos {"recipients", "html_content", "pdf_attachment"}
+            subject (str): Asunto
 
-                        if stop_loss:
-                            html += f"""
-                            <td align="center" width="33%" style="padding: 12px;">
-                                <p style="margin: 0; font-size: 12px; color: #6c757d;">Stop Loss</p>
-                                <p style="margin: 5px 0 0; font-size: 16px; font-weight: bold; color: #dc3545;">${stop_loss}</p>
-                            </td>
-                            """
-
-                        if target_price:
-                            html += f"""
-                            <td align="center" width="33%" style="padding: 12px;">
-                                <p style="margin: 0; font-size: 12px; color: #6c757d;">Objetivo</p>
-                                <p style="margin: 5px 0 0; font-size: 16px; font-weight: bold; color: #28a745;">${target_price}</p>
-                            </td>
-                            """
+        Returns:
+            List[Dict]: Estado por destinatario ({"email", "status", "error_message"})
+        """
+        if not self._ensure_email_config():
+            return [
+                {
+                    "email": r,
+                    "status": "failed",
+                    "error_message": "Configuración de correo no disponible",
+                }
+                for group in groups
+                for r in group["recipients"]
+            ]
 
-                        html += """
-                            </tr>
-                        </table>
-                        """
+        logger.info(
+            f"Preparando {len(groups)} variantes del boletín para "
+            f"{sum(len(g['recipients']) for g in groups)} destinatarios"
+        )
+        return self._create_delivery().send_groups(groups, subject)
+
+    def _create_delivery(self):
+        """Crea el motor de envío con el tamaño de pool y de lote configurados"""
+        return NewsletterDelivery(
+            self.email_config,
+            pool_size=int(self.email_config.get("smtp_pool_size") or DEFAULT_POOL_SIZE),
+            batch_size=int(
+                self.email_config.get("smtp_batch_size") or DEFAULT_BATCH_SIZE
+            ),
+        )
 
-                        # Ratio riesgo/recompensa
-                        if risk_reward:
-                            rr_color = (
-                                "#28a745"
-                                if risk_reward >= 2
-                                else ("#6c757d" if risk_reward >= 1 else "#dc3545")
-                            )
-                            html += f"""
-                            <p style="margin: 10px 0; text-align: center;">
-                                <span style="background-color: #f2f6f9; padding: 6px 12px; border-radius: 4px; font-weight: bold; color: {rr_color};">
-                                    R/R: {risk_reward:.2f}
-                                </span>
-                            </p>
-                            """
+    def create_newsletter_html(self, signals, market_sentiment, news_summary):
+        """Crea el contenido HTML para el boletín de trading con diseño mejorado optimizado para clientes de correo"""
+        # Resolver antes los resúmenes pendientes: el renderizador solo recibe datos
+        # y reutiliza los fragmentos ya generados (ver newsletter_renderer)
+        news_items = []
+        for item in news_summary or []:
+            news_items.append({**item, "summary": self._resolve_news_summary(item)})
+
+        return render_newsletter(
+            signals or [],
+            market_sentiment,
+            news_items,
+            self._get_market_context(market_sentiment),
+        )
 
-                    # Tendencias - usar las variables ya definidas
-                    if trend:
-                        trend_color = (
-                            "#28a745"
-                            if "ALCISTA" in trend.upper()
-                            else (
-                                "#dc3545" if "BAJISTA" in trend.upper() else "#6c757d"
-                            )
-                        )
-                        # trend_bg ya está definido arriba
+    def _resolve_news_summary(self, item):
+        """Devuelve el resumen de una noticia, intentando generarlo si no existe"""
+        # Obtener el resumen de la noticia
+        summary = item.get("summary", "")
 
-                        html += f"""
-                        <p style="margin: 15px 0 5px; font-size: 14px; color: #6c757d;">Tendencia:</p>
-                        <p style="margin: 0 0 15px; padding: 8px 12px; background-color: {trend_bg}; display: inline-block; border-radius: 4px; color: {trend_color}; font-weight: bold;">
-                            {trend} {f'({trend_strength})' if trend_strength else ''}
-                        </p>
-                        """
+        # Si no hay resumen, ejecutar post_save_quality_check.py y mostrar un mensaje
+        if not summary or len(summary.strip()) < 10:
+            # Verificar si tenemos credenciales de OpenAI disponibles
+            has_openai_credentials = False
+            try:
+                # Intentar cargar las credenciales de OpenAI desde secrets.toml
+                if "OPENAI_API_KEY" in st.secrets:
+                    has_openai_credentials = True
+                elif (
+                    "openai" in st.secrets and "api_key" in st.secrets["openai"]
+                ):
+                    has_openai_credentials = True
+                elif (
+                    "api_keys" in st.secrets
+                    and "OPENAI_API_KEY" in st.secrets["api_keys"]
+                ):
+                    has_openai_credentials = True
+            except Exception:
+                has_openai_credentials = False
 
-                    # Timeframes adicionales
-                    timeframes_available = (
-                        signal.get("daily_trend")
-                        or signal.get("weekly_trend")
-                        or signal.get("monthly_trend")
+            if has_openai_credentials:
+                # Ejecutar post_save_quality_check.py para procesar noticias sin resumen
+                try:
+                    st.warning(
+                        "Detectadas noticias sin resumen. Ejecutando verificación de calidad..."
                     )
-
-                    if timeframes_available:
-                        html += """
-                        <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin: 15px 0; background-color: #f8f9fa; border-radius: 4px;">
-                            <tr>
-                        """
-
-                        if signal.get("daily_trend"):
-                            dt = signal.get("daily_trend")
-                            dt_color = (
-                                "#28a745"
-                                if "ALCISTA" in dt.upper()
-                                else (
-                                    "#dc3545" if "BAJISTA" in dt.upper() else "#6c757d"
-                                )
-                            )
-                            html += f"""
-                            <td width="33%" style="padding: 10px; text-align: center;">
-                                <p style="margin: 0; font-size: 12px; color: #6c757d;">Diario</p>
-                                <p style="margin: 5px 0 0; color: {dt_color}; font-weight: bold;">{dt}</p>
-                            </td>
-                            """
-
-                        if signal.get("weekly_trend"):
-                            wt = signal.get("weekly_trend")
-                            wt_color = (
-                                "#28a745"
-                                if "ALCISTA" in wt.upper()
-                                else (
-                                    "#dc3545" if "BAJISTA" in wt.upper() else "#6c757d"
-                                )
-                            )
-                            html += f"""
-                            <td width="33%" style="padding: 10px; text-align: center;">
-                                <p style="margin: 0; font-size: 12px; color: #6c757d;">Semanal</p>
-                                <p style="margin: 5px 0 0; color: {wt_color}; font-weight: bold;">{wt}</p>
-                            </td>
-                            """
-
-                        if signal.get("monthly_trend"):
-                            mt = signal.get("monthly_trend")
-                            mt_color = (
-                                "#28a745"
-                                if "ALCISTA" in mt.upper()
-                                else (
-                                    "#dc3545" if "BAJISTA" in mt.upper() else "#6c757d"
-                                )
-                            )
-                            html += f"""
-                            <td width="33%" style="padding: 10px; text-align: center;">
-                                <p style="margin: 0; font-size: 12px; color: #6c757d;">Mensual</p>
-                                <p style="margin: 5px 0 0; color: {mt_color}; font-weight: bold;">{mt}</p>
-                            </td>
-                            """
-
-                        html += """
-                            </tr>
-                        </table>
-                        """
-
-                    # Verificar si hay un error en el análisis experto
-                    expert_analysis = signal.get("expert_analysis", "")
-                    has_expert_error = False
-
-                    # Detectar errores comunes en el análisis experto
-                    if (
-                        expert_analysis
-                        and "st.session_state has no attribute" in expert_analysis
+                    # Pasar las credenciales de OpenAI como variables de entorno
+                    env = os.environ.copy()
+                    if "OPENAI_API_KEY" in st.secrets:
+                        env["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
+                    elif (
+                        "openai" in st.secrets
+                        and "api_key" in st.secrets["openai"]
                     ):
-                        has_expert_error = True
-                        logger.warning(
-                            f"Error detectado en el análisis experto para {signal.get('symbol', '')}: {expert_analysis[:100]}..."
-                        )
+                        env["OPENAI_API_KEY"] = st.secrets["openai"]["api_key"]
 
-                    # Usar el análisis experto si está disponible y no tiene errores, o los análisis básicos si no
-                    if (
-                        expert_analysis
-                        and len(expert_analysis) > 50
-                        and not has_expert_error
-                    ):  # Verificar que sea un análisis sustancial
-                        # Convertir el formato markdown a HTML para el correo
-                        try:
-                            # Importar markdown para convertir el formato
-                            import markdown
-
-                            # Convertir markdown a HTML
-                            expert_html = markdown.markdown(expert_analysis)
-
-                            # Aplicar estilos adicionales para mejorar la presentación
-                            expert_html = expert_html.replace(
-                                "<h2>",
-                                '<h2 style="color: #2c3e50; font-size: 18px; margin-top: 20px; margin-bottom: 10px; border-bottom: 1px solid #eee; padding-bottom: 5px;">',
-                            )
-                            expert_html = expert_html.replace(
-                                "<p>",
-                                '<p style="margin: 10px 0; font-size: 14px; line-height: 1.6; color: #444;">',
-                            )
-                            expert_html = expert_html.replace(
-                                "<ul>",
-                                '<ul style="margin: 10px 0; padding-left: 20px;">',
-                            )
-                            expert_html = expert_html.replace(
-                                "<li>",
-                                '<li style="margin: 5px 0; font-size: 14px; line-height: 1.6; color: #444;">',
-                            )
+                    if "OPENAI_API_MODEL" in st.secrets:
+                        env["OPENAI_API_MODEL"] = st.secrets["OPENAI_API_MODEL"]
+                    elif (
+                        "openai" in st.secrets
+                        and "model" in st.secrets["openai"]
+                    ):
+                        env["OPENAI_API_MODEL"] = st.secrets["openai"]["model"]
 
-                            html += f"""
-                            <div style="margin-top: 15px; background-color: #f9f9f9; padding: 15px; border-radius: 5px; border: 1px solid #eee;">
-                                {expert_html}
-                            </div>
-                            """
-                        except Exception as e:
-                            logger.warning(
-                                f"Error al convertir markdown a HTML: {str(e)}"
-                            )
-                            # Si falla la conversión, mostrar el texto plano con formato básico
-                            html += f"""
-                            <div style="margin-top: 15px; background-color: #f9f9f9; padding: 15px; border-radius: 5px; border: 1px solid #eee;">
-                                <pre style="white-space: pre-wrap; font-family: Arial, sans-serif; font-size: 14px; line-height: 1.6; color: #444;">{expert_analysis}</pre>
-                            </div>
-                            """
-                    else:
-                        # Usar los análisis básicos si no hay análisis experto o hay errores
-                        analysis_content = signal.get("analysis", "")
-                        technical_analysis_content = signal.get(
-                            "technical_analysis", ""
+                    # Ejecutar el script con las variables de entorno
+                    subprocess.run(
+                        ["python", "database_quality_processor.py"],
+                        check=True,
+                        env=env,
+                    )
+                    logger.info(
+                        "Verificación de calidad ejecutada correctamente"
+                    )
+                    # Intentar obtener el resumen actualizado
+                    if item.get("id"):
+                        # Consultar la noticia actualizada
+                        db_manager = DatabaseManager()
+                        updated_news = db_manager.execute_query(
+                            "SELECT summary FROM market_news WHERE id = %s",
+                            [item.get("id")],
                         )
-
-                        # Si hay contenido en alguno de los campos de análisis, usarlo
-                        if analysis_content and len(analysis_content) > 10:
-                            html += f"""
-                            <div style="margin-top: 15px; background-color: #f9f9f9; padding: 15px; border-radius: 5px; border: 1px solid #eee;">
-                                <h3 style="margin-top: 0; color: #2c3e50; font-size: 16px;">Análisis Fundamental</h3>
-                                <p style="margin: 10px 0; font-size: 14px; line-height: 1.6; color: #444;">
-                                    {analysis_content}
-                                </p>
-                            </div>
-                            """
-                        else:
-                            html += f"""
-                            <p style="margin: 15px 0; font-size: 15px; line-height: 1.6; font-style: italic; color: #666;">
-                                No hay análisis fundamental disponible para este activo.
-                            </p>
-                            """
-
-                        # Añadir análisis técnico si está disponible
                         if (
-                            technical_analysis_content
-                            and len(technical_analysis_content) > 10
-                        ):
-                            html += f"""
-                            <div style="margin-top: 15px; background-color: #f9f9f9; padding: 15px; border-radius: 5px; border: 1px solid #eee;">
-                                <h3 style="margin-top: 0; color: #2c3e50; font-size: 16px;">Análisis Técnico</h3>
-                                <p style="margin: 10px 0; font-size: 14px; line-height: 1.6; color: #444;">
-                                    {technical_analysis_content}
-                                </p>
-                            </div>
-                            """
-                        elif not analysis_content or len(analysis_content) <= 10:
-                            html += f"""
-                            <p style="margin: 15px 0; font-size: 15px; line-height: 1.6; font-style: italic; color: #666;">
-                                No hay análisis técnico disponible para este activo.
-                            </p>
-                            """
-
-                    # Recomendación final
-                    recommendation = signal.get("recommendation")
-                    if recommendation:
-                        rec_color = (
-                            "#28a745"
-                            if "COMPRAR" in recommendation.upper()
-                            else (
-                                "#dc3545"
-                                if "VENDER" in recommendation.upper()
-                                else "#6c757d"
-                            )
-                        )
-                        rec_bg = (
-                            "#e8f5e9"
-                            if "COMPRAR" in recommendation.upper()
-                            else (
-                                "#ffebee"
-                                if "VENDER" in recommendation.upper()
-                                else "#f5f5f5"
-                            )
-                        )
-
-                        html += f"""
-                        <div style="margin: 20px 0 10px; text-align: center;">
-                            <p style="margin: 0 0 8px; font-size: 14px; color: #6c757d;">Recomendación Final</p>
-                            <p style="margin: 0; display: inline-block; padding: 8px 20px; background-color: {rec_bg};
-                                    border: 2px solid {rec_color}; border-radius: 20px; font-size: 16px; font-weight: bold; color: {rec_color};">
-                                {recommendation}
-                            </p>
-                        </div>
-                        """
-
-                    html += """
-                            </td>
-                        </tr>
-                    </table>
-                    """
-        else:
-            html += """
-            <p style="margin-bottom: 30px; color: #6c757d; font-style: italic;">No hay señales de trading disponibles en este momento.</p>
-            """
-
-        # Sección de sentimiento de mercado
-        if market_sentiment:
-            # Determinar colores según el sentimiento
-            if market_sentiment.get("overall") == "Alcista":
-                sentiment_border = "#28a745"
-                sentiment_bg = "#e8f5e9"
-            elif market_sentiment.get("overall") == "Bajista":
-                sentiment_border = "#dc3545"
-                sentiment_bg = "#ffebee"
-            else:
-                sentiment_border = "#6c757d"
-                sentiment_bg = "#f5f5f5"
-
-            html += f"""
-            <h2 style="color: #2c3e50; font-size: 22px; margin-top: 30px; margin-bottom: 20px; border-bottom: 2px solid #eaeaea; padding-bottom: 10px; font-family: Arial, sans-serif;">Sentimiento de Mercado</h2>
-
-            <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 30px; background-color: {sentiment_bg}; border-left: 4px solid {sentiment_border}; border-radius: 4px;">
-                <tr>
-                    <td style="padding: 20px;">
-                        <h3 style="margin-top: 0; margin-bottom: 15px; font-size: 18px; color: #2c3e50;">Sentimiento General: {market_sentiment.get('overall', 'Neutral')}</h3>
-
-                        <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse;">
-                            <tr>
-                                <td width="50%" style="padding: 8px 0;"><strong>VIX:</strong> {market_sentiment.get('vix', 'N/A')}</td>
-                                <td width="50%" style="padding: 8px 0;"><strong>S&P 500:</strong> {market_sentiment.get('sp500_trend', 'N/A')}</td>
-                            </tr>
-                            <tr>
-                                <td width="50%" style="padding: 8px 0;"><strong>Indicadores Técnicos:</strong> {market_sentiment.get('technical_indicators', 'N/A')}</td>
-                                <td width="50%" style="padding: 8px 0;"><strong>Volumen:</strong> {market_sentiment.get('volume', 'N/A')}</td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-            """
-
-        # Sección de noticias
-        html += """
-        <h2 style="color: #2c3e50; font-size: 22px; margin-top: 30px; margin-bottom: 20px; border-bottom: 2px solid #eaeaea; padding-bottom: 10px; font-family: Arial, sans-serif;">Noticias Relevantes</h2>
-        <p style="margin: 0 0 20px; line-height: 1.6; color: #444;">
-            A continuación presentamos las noticias más relevantes que podrían impactar sus decisiones de inversión.
-            Estas noticias han sido seleccionadas por su potencial impacto en los mercados y en los activos destacados en este boletín.
-        </p>
-        """
-
-        if news_summary and len(news_summary) > 0:
-            for item in news_summary:
-                # Formatear fecha en español
-                news_date = item.get("news_date", datetime.now())
-                if isinstance(news_date, datetime):
-                    # Definir meses en español abreviados
-                    meses_es_abrev = {
-                        "Jan": "ene",
-                        "Feb": "feb",
-                        "Mar": "mar",
-                        "Apr": "abr",
-                        "May": "may",
-                        "Jun": "jun",
-                        "Jul": "jul",
-                        "Aug": "ago",
-                        "Sep": "sep",
-                        "Oct": "oct",
-                        "Nov": "nov",
-                        "Dec": "dic",
-                    }
-
-                    # Formatear fecha y traducir el mes
-                    fecha_en = news_date.strftime("%d %b %Y")
-                    for mes_en, mes_es in meses_es_abrev.items():
-                        if mes_en in fecha_en:
-                            formatted_date = fecha_en.replace(mes_en, mes_es)
-                            break
-                    else:
-                        formatted_date = fecha_en
-                else:
-                    formatted_date = str(news_date)
-
-                # Color según impacto
-                impact = item.get("impact", "Medio")
-                if impact == "Alto":
-                    impact_color = "#dc3545"
-                elif impact == "Medio":
-                    impact_color = "#fd7e14"
-                else:
-                    impact_color = "#6c757d"
-
-                # Obtener información de la empresa para la noticia
-                symbol = item.get("symbol", "")
-                company_name = ""
-                if symbol:
-                    try:
-                        from company_data import get_company_info
-
-                        company_info = get_company_info(symbol)
-                        company_name = company_info.get("name", "")
-                    except Exception as e:
-                        logger.warning(
-                            f"No se pudo obtener información de la empresa para noticia de {symbol}: {str(e)}"
-                        )
-
-                # Preparar enlace si hay URL
-                title_display = item.get("title", "")
-                url = item.get("url", "")
-                if url and len(url) > 5:
-                    title_display = f"<a href='{url}' target='_blank' style='color: #0275d8; text-decoration: none;'>{item.get('title', '')} <span style='font-size: 12px;'>&#128279;</span></a>"
-
-                # Obtener el resumen de la noticia
-                summary = item.get("summary", "")
-
-                # Si no hay resumen, ejecutar post_save_quality_check.py y mostrar un mensaje
-                if not summary or len(summary.strip()) < 10:
-                    # Verificar si tenemos credenciales de OpenAI disponibles
-                    has_openai_credentials = False
-                    try:
-                        # Intentar cargar las credenciales de OpenAI desde secrets.toml
-                        if "OPENAI_API_KEY" in st.secrets:
-                            has_openai_credentials = True
-                        elif (
-                            "openai" in st.secrets and "api_key" in st.secrets["openai"]
+                            updated_news
+                            and len(updated_news) > 0
+                            and updated_news[0].get("summary")
                         ):
-                            has_openai_credentials = True
-                        elif (
-                            "api_keys" in st.secrets
-                            and "OPENAI_API_KEY" in st.secrets["api_keys"]
-                        ):
-                            has_openai_credentials = True
-                    except Exception:
-                        has_openai_credentials = False
-
-                    if has_openai_credentials:
-                        # Ejecutar post_save_quality_check.py para procesar noticias sin resumen
-                        try:
-                            st.warning(
-                                "Detectadas noticias sin resumen. Ejecutando verificación de calidad..."
-                            )
-                            # Pasar las credenciales de OpenAI como variables de entorno
-                            env = os.environ.copy()
-                            if "OPENAI_API_KEY" in st.secrets:
-                                env["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
-                            elif (
-                                "openai" in st.secrets
-                                and "api_key" in st.secrets["openai"]
-                            ):
-                                env["OPENAI_API_KEY"] = st.secrets["openai"]["api_key"]
-
-                            if "OPENAI_API_MODEL" in st.secrets:
-                                env["OPENAI_API_MODEL"] = st.secrets["OPENAI_API_MODEL"]
-                            elif (
-                                "openai" in st.secrets
-                                and "model" in st.secrets["openai"]
-                            ):
-                                env["OPENAI_API_MODEL"] = st.secrets["openai"]["model"]
-
-                            # Ejecutar el script con las variables de entorno
-                            subprocess.run(
-                                ["python", "database_quality_processor.py"],
-                                check=True,
-                                env=env,
-                            )
+                            summary = updated_news[0].get("summary")
                             logger.info(
-                                "Verificación de calidad ejecutada correctamente"
+                                f"Resumen actualizado para noticia ID {item.get('id')}"
                             )
-                            # Intentar obtener el resumen actualizado
-                            if item.get("id"):
-                                # Consultar la noticia actualizada
-                                db_manager = DatabaseManager()
-                                updated_news = db_manager.execute_query(
-                                    "SELECT summary FROM market_news WHERE id = %s",
-                                    [item.get("id")],
-                                )
-                                if (
-                                    updated_news
-                                    and len(updated_news) > 0
-                                    and updated_news[0].get("summary")
-                                ):
-                                    summary = updated_news[0].get("summary")
-                                    logger.info(
-                                        f"Resumen actualizado para noticia ID {item.get('id')}"
-                                    )
-                                else:
-                                    summary = "No hay resumen disponible para esta noticia. Se ha programado una verificación de calidad."
-                            else:
-                                summary = "No hay resumen disponible para esta noticia. Se ha programado una verificación de calidad."
-                        except Exception as e:
-                            logger.error(
-                                f"Error ejecutando verificación de calidad: {str(e)}"
-                            )
-                            summary = "No hay resumen disponible para esta noticia. Error en la verificación de calidad."
+                        else:
+                            summary = "No hay resumen disponible para esta noticia. Se ha programado una verificación de calidad."
                     else:
-                        # No hay credenciales de OpenAI disponibles
-                        st.warning(
-                            "No se pueden generar resúmenes automáticamente porque no hay credenciales de OpenAI configuradas. Por favor, configure las credenciales en secrets.toml."
-                        )
-                        summary = "No hay resumen disponible para esta noticia. Se requieren credenciales de OpenAI para generar resúmenes automáticamente."
-
-                html += f"""
-                <table border="0" cellpadding="0" cellspacing="0" width="100%" style="border-collapse: collapse; margin-bottom: 20px; background-color: #ffffff; border-radius: 4px; box-shadow: 0 1px 3px rgba(0,0,0,0.05);">
-                    <tr>
-                        <td style="padding: 20px;">
-                            <h3 style="margin-top: 0; margin-bottom: 10px; color: #0275d8; font-size: 18px;">{title_display}</h3>
-                            {f'<p style="margin: 0 0 10px; font-size: 13px; color: #444;"><strong>{symbol}</strong> - {company_name}</p>' if symbol and company_name else ''}
-                            <div style="margin: 0 0 15px; line-height: 1.6; background-color: #f9f9f9; padding: 12px; border-left: 3px solid #0275d8; border-radius: 4px;">
-                                <p style="margin: 0; color: #333;">{summary}</p>
-                            </div>
-                            <p style="margin: 0; font-size: 12px; color: #6c757d;">
-                                {f'<span style="color: {impact_color}; font-weight: bold;">Impacto: {impact}</span> &bull; ' if impact else ''}
-                                Fuente: {item.get('source', '')} &bull; {formatted_date}
-                            </p>
-                        </td>
-                    </tr>
-                </table>
-                """
-        else:
-            html += """
-            <p style="margin-bottom: 30px; color: #6c757d; font-style: italic;">No hay noticias relevantes disponibles en este momento.</p>
-            """
-
-        # Pie de página
-        html += """
-                                </td>
-                            </tr>
-
-                            <!-- FOOTER -->
-                            <tr>
-                                <td style="padding: 30px 20px; background-color: #f8f9fa; border-top: 1px solid #eaeaea; border-radius: 0 0 8px 8px; color: #6c757d; text-align: center; font-size: 12px;">
-                                    <p style="margin: 0 0 15px;"><strong>Aviso importante:</strong> Este boletín es generado automáticamente por InversorIA Pro. La información proporcionada es solo para fines educativos y no constituye asesoramiento financiero.</p>
-                                    <p style="margin: 0 0 15px;">Los datos presentados son calculados utilizando análisis técnico avanzado, algoritmos de inteligencia artificial y evaluación de expertos en trading. Recuerde que toda inversión conlleva riesgos y los resultados pasados no garantizan rendimientos futuros.</p>
-                                    <p style="margin: 0 0 15px;">Para obtener análisis más detallados y personalizados, le recomendamos consultar la plataforma completa de InversorIA Pro, donde encontrará herramientas adicionales y funcionalidades avanzadas.</p>
-                                    <p style="margin: 0;">&copy; 2025 InversorIA Pro. Todos los derechos reservados.</p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
+                        summary = "No hay resumen disponible para esta noticia. Se ha programado una verificación de calidad."
+                except Exception as e:
+                    logger.error(
+                        f"Error ejecutando verificación de calidad: {str(e)}"
+                    )
+                    summary = "No hay resumen disponible para esta noticia. Error en la verificación de calidad."
+            else:
+                # No hay credenciales de OpenAI disponibles
+                st.warning(
+                    "No se pueden generar resúmenes automáticamente porque no hay credenciales de OpenAI configuradas. Por favor, configure las credenciales en secrets.toml."
+                )
+                summary = "No hay resumen disponible para esta noticia. Se requieren credenciales de OpenAI para generar resúmenes automáticamente."
 
-        return html
+        return summary
 
     def _get_market_context(self, market_sentiment):
         """Genera un contexto de mercado basado en el sentimiento"""
@@ -2065,172 +1336,197 @@ class EmailManager:
 
         return context
 
-    def generate_pdf(self, html_content):
-        """Genera un PDF a partir del contenido HTML con diseño mejorado"""
-        # Verificar si pdfkit está disponible
-        if not PDFKIT_AVAILABLE:
-            logger.warning("pdfkit no está disponible. No se puede generar PDF.")
-            return None
+    # Estilos adicionales para mejorar la apariencia en el PDF
+    PDF_STYLES = """
+    <style>
+        @page {
+            size: A4;
+            margin: 1cm;
+        }
+        body {
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+        }
+        h1, h2, h3, h4 {
+            color: #2c3e50;
+            margin-top: 20px;
+            margin-bottom: 10px;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-bottom: 20px;
+        }
+        img {
+            max-width: 100%;
+            height: auto;
+        }
+        .page-break {
+            page-break-after: always;
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 30px;
+            padding-bottom: 10px;
+            border-bottom: 2px solid #eaeaea;
+        }
+        .footer {
+            text-align: center;
+            font-size: 10px;
+            color: #6c757d;
+            margin-top: 30px;
+            padding-top: 10px;
+            border-top: 1px solid #eaeaea;
+        }
+        /* Estilos para señales de trading */
+        .signal-call {
+            background-color: #e8f5e9;
+            border-left: 4px solid #28a745;
+        }
+        .signal-put {
+            background-color: #ffebee;
+            border-left: 4px solid #dc3545;
+        }
+        .signal-neutral {
+            background-color: #f5f5f5;
+            border-left: 4px solid #6c757d;
+        }
+        /* Estilos para tablas */
+        .data-table th {
+            background-color: #f2f6f9;
+            color: #2c3e50;
+            padding: 10px;
+            text-align: left;
+            border-bottom: 1px solid #dee2e6;
+        }
+        .data-table td {
+            padding: 8px;
+            border-bottom: 1px solid #f2f2f2;
+        }
+        .data-table tr:nth-child(even) {
+            background-color: #f9f9f9;
+        }
+    </style>
+    """
+
+    # Opciones para pdfkit (ajustar según sea necesario)
+    PDF_OPTIONS = {
+        "page-size": "A4",
+        "margin-top": "10mm",
+        "margin-right": "10mm",
+        "margin-bottom": "10mm",
+        "margin-left": "10mm",
+        "encoding": "UTF-8",
+        "no-outline": None,
+        "enable-local-file-access": "",
+        "print-media-type": "",
+        "javascript-delay": "1000",  # Esperar a que se carguen los scripts
+        "enable-javascript": "",  # Habilitar JavaScript
+        "images": "",  # Incluir imágenes
+        "quiet": "",  # Modo silencioso
+    }
 
-        try:
-            # Mejorar el HTML para el PDF con estilos adicionales
-            # Añadir CSS para mejorar la apariencia en el PDF
-            pdf_styles = """
-            <style>
-                @page {
-                    size: A4;
-                    margin: 1cm;
-                }
-                body {
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                }
-                h1, h2, h3, h4 {
-                    color: #2c3e50;
-                    margin-top: 20px;
-                    margin-bottom: 10px;
-                }
-                table {
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin-bottom: 20px;
-                }
-                img {
-                    max-width: 100%;
-                    height: auto;
-                }
-                .page-break {
-                    page-break-after: always;
-                }
-                .header {
-                    text-align: center;
-                    margin-bottom: 30px;
-                    padding-bottom: 10px;
-                    border-bottom: 2px solid #eaeaea;
-                }
-                .footer {
-                    text-align: center;
-                    font-size: 10px;
-                    color: #6c757d;
-                    margin-top: 30px;
-                    padding-top: 10px;
-                    border-top: 1px solid #eaeaea;
-                }
-                /* Estilos para señales de trading */
-                .signal-call {
-                    background-color: #e8f5e9;
-                    border-left: 4px solid #28a745;
-                }
-                .signal-put {
-                    background-color: #ffebee;
-                    border-left: 4px solid #dc3545;
-                }
-                .signal-neutral {
-                    background-color: #f5f5f5;
-                    border-left: 4px solid #6c757d;
-                }
-                /* Estilos para tablas */
-                .data-table th {
-                    background-color: #f2f6f9;
-                    color: #2c3e50;
-                    padding: 10px;
-                    text-align: left;
-                    border-bottom: 1px solid #dee2e6;
-                }
-                .data-table td {
-                    padding: 8px;
-                    border-bottom: 1px solid #f2f2f2;
-                }
-                .data-table tr:nth-child(even) {
-                    background-color: #f9f9f9;
-                }
-            </style>
-            """
+    def _add_pdf_styles(self, html_content):
+        """Inserta los estilos del PDF en el HTML del boletín"""
+        if "</head>" in html_content:
+            return html_content.replace("</head>", f"{self.PDF_STYLES}</head>")
+        return f"<html><head>{self.PDF_STYLES}</head><body>{html_content}</body></html>"
 
-            # Insertar los estilos en el HTML
-            enhanced_html = html_content
-            if "</head>" in enhanced_html:
-                enhanced_html = enhanced_html.replace("</head>", f"{pdf_styles}</head>")
-            else:
-                enhanced_html = f"<html><head>{pdf_styles}</head><body>{enhanced_html}</body></html>"
+    def build_pdf_html(self, html_content, signals, news_summary):
+        """Crea la versión del boletín para el PDF, con secciones que no están en el correo"""
+        pdf_html = html_content
 
-            # Verificar si wkhtmltopdf está instalado
-            try:
-                import subprocess
+        # Añadir información detallada de cada señal para el PDF
+        if signals and len(signals) > 0:
+            pdf_html = pdf_html.replace(
+                "</body>",
+                """
+            <div class="page-break"></div>
+            <h1 style="text-align: center; margin-top: 20px;">Análisis Detallado de Señales</h1>
+            <p style="text-align: center; color: #666;">Este análisis detallado solo está disponible en la versión PDF del boletín</p>
+            """,
+            )
 
-                subprocess.run(
-                    ["which", "wkhtmltopdf"], check=True, capture_output=True
-                )
-                logger.info("wkhtmltopdf está instalado en el sistema")
-            except (subprocess.SubprocessError, FileNotFoundError):
-                logger.warning(
-                    "wkhtmltopdf no está instalado o no se encuentra en el PATH"
-                )
-                # Intentar usar la ruta configurada en pdfkit
-                try:
-                    config = pdfkit.configuration()
-                    logger.info(f"Usando configuración de pdfkit: {config.wkhtmltopdf}")
-                except Exception as config_error:
-                    logger.warning(
-                        f"Error obteniendo configuración de pdfkit: {str(config_error)}"
-                    )
+            for signal in signals:
+                symbol = signal.get("symbol", "")
+                company_name = signal.get("company_name", symbol)
+                analysis = signal.get("analysis", "")
+                technical_analysis = signal.get("technical_analysis", "")
+                expert_analysis = signal.get("expert_analysis", "")
+
+                pdf_html += f"""
+                <div style="margin: 30px 0; padding: 20px; border: 1px solid #eee; border-radius: 10px;">
+                    <h2>{symbol} - {company_name}</h2>
+                    <h3>Análisis Fundamental</h3>
+                    <p>{analysis}</p>
+
+                    <h3>Análisis Técnico</h3>
+                    <p>{technical_analysis}</p>
+
+                    <h3>Análisis del Experto</h3>
+                    <p>{expert_analysis}</p>
+                </div>
+                """
 
-            # Opciones para pdfkit (ajustar según sea necesario)
-            options = {
-                "page-size": "A4",
-                "margin-top": "10mm",
-                "margin-right": "10mm",
-                "margin-bottom": "10mm",
-                "margin-left": "10mm",
-                "encoding": "UTF-8",
-                "no-outline": None,
-                "enable-local-file-access": "",
-                "print-media-type": "",
-                "javascript-delay": "1000",  # Esperar a que se carguen los scripts
-                "enable-javascript": "",  # Habilitar JavaScript
-                "images": "",  # Incluir imágenes
-                "quiet": "",  # Modo silencioso
-            }
+            pdf_html += "</body>"
 
-            # Generar PDF
-            try:
-                # Intentar con configuración personalizada primero
-                try:
-                    config = pdfkit.configuration()
-                    pdf = pdfkit.from_string(
-                        enhanced_html, False, options=options, configuration=config
-                    )
-                    logger.info(
-                        "PDF generado correctamente con configuración personalizada"
-                    )
-                    return pdf
-                except Exception as config_error:
-                    logger.warning(
-                        f"Error con configuración personalizada: {str(config_error)}"
-                    )
-                    # Intentar sin configuración personalizada
-                    pdf = pdfkit.from_string(enhanced_html, False, options=options)
-                    logger.info("PDF generado correctamente con diseño mejorado")
-                    return pdf
-            except Exception as pdf_error:
-                logger.error(f"Error generando PDF completo: {str(pdf_error)}")
-                # Intentar con opciones más básicas
-                try:
-                    logger.info("Intentando generar PDF con opciones básicas...")
-                    options = {
-                        "page-size": "A4",
-                        "encoding": "UTF-8",
-                        "no-outline": None,
-                    }
-                    pdf = pdfkit.from_string(html_content, False, options=options)
-                    logger.info("PDF generado correctamente con opciones básicas")
-                    return pdf
-                except Exception as basic_error:
-                    logger.error(
-                        f"Error al generar PDF con opciones básicas: {str(basic_error)}"
-                    )
-                    return None
+        # Añadir información detallada de noticias para el PDF
+        if news_summary and len(news_summary) > 0:
+            pdf_html = pdf_html.replace(
+                "</body>",
+                """
+            <div class="page-break"></div>
+            <h1 style="text-align: center; margin-top: 20px;">Noticias Completas</h1>
+            <p style="text-align: center; color: #666;">Versión completa de las noticias mencionadas en el boletín</p>
+            """,
+            )
+
+            for news in news_summary:
+                title = news.get("title", "")
+                summary = news.get("summary", "")
+                source = news.get("source", "")
+                url = news.get("url", "")
+
+                pdf_html += f"""
+                <div style="margin: 20px 0; padding: 15px; border: 1px solid #eee; border-radius: 8px;">
+                    <h3>{title}</h3>
+                    <p>{summary}</p>
+                    <p style="color: #666; font-size: 12px;">Fuente: {source} {f'<a href="{url}">{url}</a>' if url else ''}</p>
+                </div>
+                """
+
+            pdf_html += "</body>"
+
+        return pdf_html
+
+    def submit_pdf(self, html_content):
+        """
+        Encola la generación del PDF en segundo plano
+
+        Args:
+            html_content (str): HTML del boletín
+
+        Returns:
+            str: Identificador del trabajo, consultable con get_pdf_job
+        """
+        return submit_pdf(
+            self._add_pdf_styles(html_content),
+            options=self.PDF_OPTIONS,
+            renderer=self.pdf_renderer,
+        )
+
+    def generate_pdf(self, html_content):
+        """Genera un PDF a partir del contenido HTML con diseño mejorado"""
+        try:
+            pdf = render_pdf(
+                self._add_pdf_styles(html_content),
+                options=self.PDF_OPTIONS,
+                renderer=self.pdf_renderer,
+            )
+            if not pdf:
+                logger.error("No se pudo generar el PDF con ningún motor")
+            return pdf
         except Exception as e:
             logger.error(f"Error general al generar PDF: {str(e)}")
             return None
@@ -2469,7 +1765,9 @@ class SignalManager:
                         # Verificar si la señal ya existe para el mismo símbolo y fecha
                         check_query = """
                             SELECT id FROM trading_signals
-                            WHERE symbol = %s AND DATE(created_at) = CURDATE()
+                            WHERE symbol = %s
+                              AND created_at >= CURDATE()
+                              AND created_at < CURDATE() + INTERVAL 1 DAY
                             LIMIT 1
                         """
                         cursor.execute(check_query, (signal_data.get("symbol"),))
@@ -2527,129 +1825,65 @@ class SignalManager:
                     signal_ids.append(f"temp_{len(signal_ids)}")
                     logger.error(f"Error al guardar señal: {str(e)}")
 
-        # Crear contenido HTML del boletín
-        html_content = self.email_manager.create_newsletter_html(
-            signals, market_sentiment, news_summary
-        )
-
-        # Generar PDF mejorado si está habilitado
-        pdf_content = None
-        if include_pdf and PDFKIT_AVAILABLE:
-            try:
-                # Crear una versión mejorada del HTML para el PDF
-                # Añadir información adicional para el PDF que no está en el correo
-                pdf_html = html_content
-
-                # Añadir información detallada de cada señal para el PDF
-                if signals and len(signals) > 0:
-                    pdf_html = pdf_html.replace(
-                        "</body>",
-                        """
-                    <div class="page-break"></div>
-                    <h1 style="text-align: center; margin-top: 20px;">Análisis Detallado de Señales</h1>
-                    <p style="text-align: center; color: #666;">Este análisis detallado solo está disponible en la versión PDF del boletín</p>
-                    """,
-                    )
-
-                    for signal in signals:
-                        symbol = signal.get("symbol", "")
-                        company_name = signal.get("company_name", symbol)
-                        analysis = signal.get("analysis", "")
-                        technical_analysis = signal.get("technical_analysis", "")
-                        expert_analysis = signal.get("expert_analysis", "")
-
-                        pdf_html += f"""
-                        <div style="margin: 30px 0; padding: 20px; border: 1px solid #eee; border-radius: 10px;">
-                            <h2>{symbol} - {company_name}</h2>
-                            <h3>Análisis Fundamental</h3>
-                            <p>{analysis}</p>
-
-                            <h3>Análisis Técnico</h3>
-                            <p>{technical_analysis}</p>
+        # Inicializar gestor de suscriptores
+        subscriber_manager = NewsletterSubscriberManager()
 
-                            <h3>Análisis del Experto</h3>
-                            <p>{expert_analysis}</p>
-                        </div>
-                        """
+        # Convertir a lista si es un string
+        recipient_list = (
+            recipients
+            if isinstance(recipients, list)
+            else [r.strip() for r in recipients.split(",") if r.strip()]
+        )
 
-                    pdf_html += "</body>"
+        # Agrupar destinatarios por preferencias: un boletín por grupo distinto,
+        # no uno por suscriptor (ver newsletter_personalization)
+        subscribers_by_email = subscriber_manager.get_subscribers_by_emails(
+            recipient_list
+        )
+        groups = plan_newsletter_groups(
+            recipient_list, subscribers_by_email, signals or []
+        )
 
-                # Añadir información detallada de noticias para el PDF
-                if news_summary and len(news_summary) > 0:
-                    pdf_html = pdf_html.replace(
-                        "</body>",
-                        """
-                    <div class="page-break"></div>
-                    <h1 style="text-align: center; margin-top: 20px;">Noticias Completas</h1>
-                    <p style="text-align: center; color: #666;">Versión completa de las noticias mencionadas en el boletín</p>
-                    """,
+        # Crear contenido HTML de cada grupo y encolar sus PDF en segundo plano
+        for group in groups:
+            group["html_content"] = self.email_manager.create_newsletter_html(
+                group["signals"], market_sentiment, news_summary
+            )
+            group["pdf_job_id"] = None
+            if include_pdf:
+                try:
+                    # Si la vista previa ya encoló el mismo PDF, se reutiliza desde la caché
+                    group["pdf_job_id"] = self.email_manager.submit_pdf(
+                        self.email_manager.build_pdf_html(
+                            group["html_content"], group["signals"], news_summary
+                        )
                     )
+                except Exception as e:
+                    logger.error(f"Error encolando PDF: {str(e)}")
 
-                    for news in news_summary:
-                        title = news.get("title", "")
-                        summary = news.get("summary", "")
-                        source = news.get("source", "")
-                        url = news.get("url", "")
-
-                        pdf_html += f"""
-                        <div style="margin: 20px 0; padding: 15px; border: 1px solid #eee; border-radius: 8px;">
-                            <h3>{title}</h3>
-                            <p>{summary}</p>
-                            <p style="color: #666; font-size: 12px;">Fuente: {source} {f'<a href="{url}">{url}</a>' if url else ''}</p>
-                        </div>
-                        """
-
-                    pdf_html += "</body>"
-
-                # Generar el PDF con el contenido mejorado
-                pdf_content = self.email_manager.generate_pdf(pdf_html)
-                if pdf_content:
-                    logger.info(
-                        "PDF mejorado generado correctamente para adjuntar al correo"
-                    )
-                else:
-                    logger.warning(
-                        "No se pudo generar el PDF mejorado para adjuntar al correo"
-                    )
-                    # Intentar con el HTML original como fallback
-                    pdf_content = self.email_manager.generate_pdf(html_content)
-                    if pdf_content:
-                        logger.info("PDF básico generado como alternativa")
-            except Exception as e:
-                logger.error(f"Error generando PDF: {str(e)}")
-                # Intentar con opciones más básicas
-                try:
-                    logger.info("Intentando generar PDF con opciones básicas...")
-                    pdf_content = self.email_manager.generate_pdf(html_content)
-                    if pdf_content:
-                        logger.info("PDF básico generado como alternativa")
-                except Exception as e2:
-                    logger.error(f"Error generando PDF básico: {str(e2)}")
+        # Recoger los PDF generados mientras se preparaban los demás grupos
+        for group in groups:
+            group["pdf_attachment"] = (
+                self._collect_group_pdf(group) if include_pdf else None
+            )
 
         # Enviar correo
         subject = (
             f"InversorIA Pro - Boletín de Trading {datetime.now().strftime('%d/%m/%Y')}"
         )
 
-        # Inicializar gestor de suscriptores
-        subscriber_manager = NewsletterSubscriberManager()
-
-        # Convertir a lista si es un string
-        recipient_list = (
-            recipients
-            if isinstance(recipients, list)
-            else [r.strip() for r in recipients.split(",") if r.strip()]
-        )
-
         # Registrar el envío en la base de datos
         email_log_id = None
         signal_ids_str = ", ".join(signal_ids) if signal_ids else "Ninguna"
 
         # Preparar datos para el registro de correo
+        content_summary = f"Boletín con {len(signals) if signals else 0} señales"
+        if len(groups) > 1:
+            content_summary += f" ({len(groups)} versiones personalizadas)"
         email_data = {
             "recipients": ", ".join(recipient_list),
             "subject": subject,
-            "content_summary": f"Boletín con {len(signals) if signals else 0} señales",
+            "content_summary": content_summary,
             "signals_included": signal_ids_str,
             "status": "pending",  # Se actualizará después del envío
             "error_message": None,
@@ -2658,62 +1892,64 @@ class SignalManager:
         # Registrar el correo antes de enviarlo
         email_log_id = self.db_manager.log_email_sent(email_data)
 
-        # Enviar el correo
-        success = self.email_manager.send_email(
-            recipient_list, subject, html_content, pdf_content
-        )
+        # Enviar todas las versiones por lotes con sesiones SMTP compartidas
+        send_results = self.email_manager.send_groups(groups, subject)
+        failed = [r for r in send_results if r["status"] != "success"]
+        success = bool(send_results) and not failed
 
         # Actualizar el estado del envío en la base de datos
         if success:
-            # Actualizar el registro de correo
             update_data = {
                 "status": "success",
                 "error_message": None,
             }
-            self.db_manager.update_email_log(email_log_id, update_data)
-
-            # Registrar el envío para cada suscriptor
-            for recipient in recipient_list:
-                # Verificar si es un suscriptor registrado
-                subscriber = subscriber_manager.get_subscriber_by_email(recipient)
-
-                if subscriber:
-                    # Registrar el envío para este suscriptor
-                    subscriber_manager.log_newsletter_send(
-                        subscriber_id=subscriber["id"],
-                        email_log_id=email_log_id,
-                        status="success",
-                        pdf_attached=include_pdf and pdf_content is not None,
-                        signals_included=signal_ids_str,
-                    )
-                    logger.info(f"Envío registrado para suscriptor: {recipient}")
-
-            return True
         else:
-            # Actualizar el registro de correo con el error
             update_data = {
                 "status": "failed",
-                "error_message": "Error enviando el correo electrónico",
+                "error_message": (
+                    f"Error enviando el correo electrónico a {len(failed)} de "
+                    f"{len(send_results)} destinatarios"
+                ),
             }
-            self.db_manager.update_email_log(email_log_id, update_data)
-
-            # Registrar el fallo para cada suscriptor
-            for recipient in recipient_list:
-                # Verificar si es un suscriptor registrado
-                subscriber = subscriber_manager.get_subscriber_by_email(recipient)
-
-                if subscriber:
-                    # Registrar el fallo para este suscriptor
-                    subscriber_manager.log_newsletter_send(
-                        subscriber_id=subscriber["id"],
-                        email_log_id=email_log_id,
-                        status="failed",
-                        error_message="Error enviando el correo electrónico",
-                        pdf_attached=False,
-                        signals_included=signal_ids_str,
-                    )
+        self.db_manager.update_email_log(email_log_id, update_data)
 
-            return False
+        # Registrar en lote el resultado para cada suscriptor, con las señales de su grupo
+        results_by_email = {r["email"]: r for r in send_results}
+        for group in groups:
+            group_ids = [
+                signal_ids[i] for i in group["signal_indexes"] if i < len(signal_ids)
+            ]
+            subscriber_manager.log_newsletter_sends(
+                [
+                    results_by_email[r]
+                    for r in group["recipients"]
+                    if r in results_by_email
+                ],
+                email_log_id,
+                pdf_attached=group["pdf_attachment"] is not None,
+                signals_included=", ".join(group_ids) if group_ids else "Ninguna",
+            )
+
+        return success
+
+    def _collect_group_pdf(self, group):
+        """Espera el PDF encolado de un grupo, con el HTML básico como alternativa"""
+        pdf_content = None
+        if group.get("pdf_job_id"):
+            pdf_content = wait_for_pdf(group["pdf_job_id"])
+        if pdf_content:
+            logger.info("PDF mejorado generado correctamente para adjuntar al correo")
+            return pdf_content
+
+        logger.warning("No se pudo generar el PDF mejorado para adjuntar al correo")
+        # Intentar con el HTML original como fallback
+        try:
+            pdf_content = self.email_manager.generate_pdf(group["html_content"])
+            if pdf_content:
+                logger.info("PDF básico generado como alternativa")
+        except Exception as e:
+            logger.error(f"Error generando PDF básico: {str(e)}")
+        return pdf_content
 
 
 # Asegurarnos de que subscriber_manager esté disponible para la barra lateral
@@ -2764,6 +2000,9 @@ if "market_signals" in st.session_state and st.session_state.market_signals:
         f"Se importaron {len(st.session_state.market_signals)} señales desde otras páginas"
     )
 
+# Aplicar los presupuestos de memoria de la sesión
+enforce_memory_budget()
+
 # Inicializar el gestor de señales
 signal_manager = SignalManager()
 
@@ -3883,6 +3122,34 @@ with tab2:
     with st.expander("Ver Vista Previa del Boletín", expanded=True):
         st.components.v1.html(html_content, height=600, scrolling=True)
 
+    # El PDF se genera en segundo plano; la página solo consulta el estado del trabajo
+    if include_pdf:
+        signal_manager.email_manager.pdf_renderer = pdf_engine
+        pdf_job_id = signal_manager.email_manager.submit_pdf(
+            signal_manager.email_manager.build_pdf_html(
+                html_content, summary_signals, preview_news
+            )
+        )
+        pdf_job = get_pdf_job(pdf_job_id) or {}
+
+        if pdf_job.get("status") == "done":
+            pdf_preview = wait_for_pdf(pdf_job_id, timeout=0)
+            if pdf_preview:
+                st.download_button(
+                    "📄 Descargar PDF del boletín",
+                    data=pdf_preview,
+                    file_name=f"InversorIA_Boletin_{datetime.now().strftime('%Y%m%d')}.pdf",
+                    mime="application/pdf",
+                )
+        elif pdf_job.get("status") == "failed":
+            st.warning(f"No se pudo generar el PDF: {pdf_job.get('error')}")
+        else:
+            col_pdf1, col_pdf2 = st.columns([3, 1])
+            with col_pdf1:
+                st.info("⏳ Generando el PDF del boletín en segundo plano...")
+            with col_pdf2:
+                st.button("🔄 Comprobar PDF")
+
     # Botón para enviar boletín
     st.subheader("Paso 4: Enviar Boletín")
 
@@ -4268,25 +3535,13 @@ with tab4:
                 "🔄 Actualizar Lista", key="refresh_subscribers"
             )
 
-        # Obtener suscriptores
-        # Si se solicita actualizar, limpiar la caché primero
-        if refresh_subscribers and hasattr(st, "session_state"):
-            # Limpiar todas las claves de caché de suscriptores
-            keys_to_remove = [
-                k
-                for k in st.session_state.keys()
-                if k.startswith("cached_subscribers_")
-            ]
-            for key in keys_to_remove:
-                if key in st.session_state:
-                    del st.session_state[key]
-                    logger.info(f"Caché de suscriptores invalidada: {key}")
-            st.success("Lista de suscriptores actualizada")
-
-        # Obtener suscriptores (la caché se maneja internamente en la clase)
+        # Obtener suscriptores (la caché compartida se maneja internamente en la
+        # clase; si se solicita actualizar, se fuerza la recarga)
         subscribers = subscriber_manager.get_all_subscribers(
-            active_only=not show_inactive
+            active_only=not show_inactive, force_refresh=refresh_subscribers
         )
+        if refresh_subscribers:
+            st.success("Lista de suscriptores actualizada")
 
         if subscribers and len(subscribers) > 0:
             # Convertir a DataFrame para mejor visualización
@@ -4429,17 +3684,7 @@ with tab4:
                                         st.success(
                                             f"Suscriptor {selected_email} desactivado correctamente"
                                         )
-                                        # Limpiar la caché de suscriptores para forzar una recarga
-                                        if hasattr(st, "session_state"):
-                                            # Limpiar todas las claves de caché de suscriptores
-                                            keys_to_remove = [
-                                                k
-                                                for k in st.session_state.keys()
-                                                if k.startswith("cached_subscribers_")
-                                            ]
-                                            for key in keys_to_remove:
-                                                if key in st.session_state:
-                                                    del st.session_state[key]
+                                        # update_subscriber ya invalidó la caché compartida
                                         # Recargar sin ejecutar todo el código nuevamente
                                         st.rerun()
                                     else:
@@ -4461,17 +3706,7 @@ with tab4:
                                         st.success(
                                             f"Suscriptor {selected_email} activado correctamente"
                                         )
-                                        # Limpiar la caché de suscriptores para forzar una recarga
-                                        if hasattr(st, "session_state"):
-                                            # Limpiar todas las claves de caché de suscriptores
-                                            keys_to_remove = [
-                                                k
-                                                for k in st.session_state.keys()
-                                                if k.startswith("cached_subscribers_")
-                                            ]
-                                            for key in keys_to_remove:
-                                                if key in st.session_state:
-                                                    del st.session_state[key]
+                                        # update_subscriber ya invalidó la caché compartida
                                         # Recargar sin ejecutar todo el código nuevamente
                                         st.rerun()
                                     else:
@@ -4535,6 +3770,32 @@ with tab4:
                                 "Correo Electrónico",
                                 value=selected_subscriber.get("email", ""),
                             )
+                            current_preferences = parse_preferences(
+                                selected_subscriber.get("preferences")
+                            )
+                            current_sectors = preference_values(
+                                current_preferences, SECTOR_KEYS
+                            )
+                            # Conservar sectores guardados que ya no están en la lista
+                            edit_sectors = st.multiselect(
+                                "Sectores de interés",
+                                SECTORS
+                                + [x for x in current_sectors if x not in SECTORS],
+                                default=current_sectors,
+                                help="Vacío para recibir señales de todos los sectores",
+                            )
+                            edit_confidence = st.multiselect(
+                                "Niveles de confianza",
+                                CONFIDENCE_LEVELS,
+                                default=[
+                                    x
+                                    for x in preference_values(
+                                        current_preferences, CONFIDENCE_KEYS
+                                    )
+                                    if x in CONFIDENCE_LEVELS
+                                ],
+                                help="Vacío para recibir señales de cualquier confianza",
+                            )
 
                             col1, col2 = st.columns(2)
                             with col1:
@@ -4555,6 +3816,11 @@ with tab4:
                                         "last_name": edit_last_name,
                                         "company": edit_company,
                                         "email": edit_email,
+                                        "preferences": build_preferences(
+                                            edit_sectors,
+                                            edit_confidence,
+                                            base=current_preferences,
+                                        ),
                                     }
 
                                     if subscriber_manager.update_subscriber(
@@ -4701,6 +3967,20 @@ with tab4:
                     key="new_company_input",
                 )
 
+            # Preferencias para personalizar el boletín (vacío = todo)
+            new_sectors = st.multiselect(
+                "Sectores de interés",
+                SECTORS,
+                key="new_sectors_input",
+                help="Vacío para recibir señales de todos los sectores",
+            )
+            new_confidence = st.multiselect(
+                "Niveles de confianza",
+                CONFIDENCE_LEVELS,
+                key="new_confidence_input",
+                help="Vacío para recibir señales de cualquier confianza",
+            )
+
             submit_button = st.form_submit_button("Añadir Suscriptor")
 
             if submit_button:
@@ -4714,6 +3994,11 @@ with tab4:
                         name=new_name,
                         last_name=new_last_name,
                         company=new_company,
+                        preferences=(
+                            build_preferences(new_sectors, new_confidence)
+                            if new_sectors or new_confidence
+                            else None
+                        ),
                     )
 
                     if result:
@@ -4787,16 +4072,26 @@ with tab4:
                     f.write(uploaded_file.getvalue())
 
                 # Mostrar vista previa
-                df_preview = pd.read_csv(uploaded_file)
+                df_preview = pd.read_csv(uploaded_file, nrows=5)
                 st.write("Vista previa:")
                 st.dataframe(df_preview.head(5), use_container_width=True)
 
                 # Botón para importar
                 if st.button("Importar Suscriptores"):
-                    # Importar suscriptores
+                    # Importar suscriptores por bloques mostrando el progreso
+                    import_progress = st.empty()
+
+                    def show_import_progress(rows, added, errors):
+                        import_progress.info(
+                            f"Procesadas {rows} filas: {added} suscriptores importados, {errors} errores"
+                        )
+
                     added, errors, error_messages = (
-                        subscriber_manager.import_subscribers_from_csv(temp_file_path)
+                        subscriber_manager.import_subscribers_from_csv(
+                            temp_file_path, progress_callback=show_import_progress
+                        )
                     )
+                    import_progress.empty()
 
                     # Mostrar resultados
                     if added > 0:
@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generación de PDF en segundo plano con caché por contenido.
+
+El HTML se convierte a PDF en un hilo trabajador para no bloquear la interfaz de
+Streamlit. Cada PDF se guarda en disco con el hash SHA-256 del HTML, el motor y
+las opciones como nombre, así que un HTML idéntico reutiliza el PDF ya generado
+sin volver a invocar wkhtmltopdf.
+
+Motores disponibles (se eligen con el parámetro renderer o la variable de
+entorno PDF_RENDERER):
+- "wkhtmltopdf": pdfkit + wkhtmltopdf, el de mejor calidad.
+- "xhtml2pdf": alternativa en Python puro, si está instalada.
+- "text": escritor mínimo incluido en este módulo, sin dependencias; conserva
+  solo el texto del boletín.
+- "auto" (por defecto): el primero disponible en el orden anterior, pasando al
+  siguiente si uno falla.
+
+Uso:
+    job_id = submit_pdf(html)               # Vuelve de inmediato
+    get_pdf_job(job_id)["status"]           # pending, running, done o failed
+    pdf_bytes = wait_for_pdf(job_id, 30)    # Espera el resultado
+    pdf_bytes = render_pdf(html)            # Versión síncrona con caché
+"""
+
+import os
+import re
+import html
+import time
+import shutil
+import hashlib
+import logging
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Intentar importar pdfkit (wkhtmltopdf)
+try:
+    import pdfkit
+
+    PDFKIT_AVAILABLE = True
+except ImportError:
+    PDFKIT_AVAILABLE = False
+
+# Intentar importar xhtml2pdf (Python puro)
+try:
+    from xhtml2pdf import pisa
+
+    XHTML2PDF_AVAILABLE = True
+except ImportError:
+    XHTML2PDF_AVAILABLE = False
+
+# Configuración de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "pdfs"
+)
+MAX_CACHED_PDFS = 200
+MAX_TRACKED_JOBS = 500
+DEFAULT_WORKERS = 1
+DEFAULT_WAIT_TIMEOUT = 60  # Segundos
+
+RENDERER_AUTO = "auto"
+RENDERER_WKHTMLTOPDF = "wkhtmltopdf"
+RENDERER_XHTML2PDF = "xhtml2pdf"
+RENDERER_TEXT = "text"
+RENDERER_ORDER = (RENDERER_WKHTMLTOPDF, RENDERER_XHTML2PDF, RENDERER_TEXT)
+
+# Estados de un trabajo
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Opciones de wkhtmltopdf si el llamador no indica otras
+DEFAULT_PDF_OPTIONS = {
+    "page-size": "A4",
+    "encoding": "UTF-8",
+    "no-outline": None,
+    "quiet": "",
+}
+BASIC_PDF_OPTIONS = {"quiet": ""}
+
+# Rutas habituales de wkhtmltopdf además del PATH
+WKHTMLTOPDF_PATHS = (
+    "/usr/local/bin/wkhtmltopdf",
+    "/usr/bin/wkhtmltopdf",
+    "C:\\Program Files\\wkhtmltopdf\\bin\\wkhtmltopdf.exe",
+)
+
+
+def get_cache_dir() -> str:
+    """Devuelve el directorio de la caché de PDF"""
+    return os.environ.get("PDF_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def find_wkhtmltopdf() -> Optional[str]:
+    """Devuelve la ruta de wkhtmltopdf o None si no está instalado"""
+    path = shutil.which("wkhtmltopdf")
+    if path:
+        return path
+    for candidate in WKHTMLTOPDF_PATHS:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def available_renderers() -> List[str]:
+    """
+    Lista los motores de PDF utilizables en este entorno
+
+    Returns:
+        List[str]: Nombres de los motores, en orden de preferencia
+    """
+    renderers = []
+    if PDFKIT_AVAILABLE and find_wkhtmltopdf():
+        renderers.append(RENDERER_WKHTMLTOPDF)
+    if XHTML2PDF_AVAILABLE:
+        renderers.append(RENDERER_XHTML2PDF)
+    renderers.append(RENDERER_TEXT)
+    return renderers
+
+
+def resolve_renderers(renderer: Optional[str] = None) -> List[str]:
+    """
+    Devuelve los motores a probar, en orden, para un motor solicitado
+
+    Args:
+        renderer (str, optional): Motor solicitado; por defecto PDF_RENDERER o "auto"
+
+    Returns:
+        List[str]: Motores a probar
+    """
+    renderer = (renderer or os.environ.get("PDF_RENDERER") or RENDERER_AUTO).lower()
+    available = available_renderers()
+    if renderer == RENDERER_AUTO:
+        return available
+    if renderer not in RENDERER_ORDER:
+        logger.warning(f"Motor de PDF desconocido '{renderer}', usando 'auto'")
+        return available
+    if renderer not in available:
+        logger.warning(f"Motor de PDF '{renderer}' no disponible, usando 'auto'")
+        return available
+    return [renderer]
+
+
+def pdf_cache_key(
+    html_content: str, renderer: str, options: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Calcula la clave de caché de un PDF
+
+    Args:
+        html_content (str): Contenido HTML
+        renderer (str): Motor solicitado
+        options (dict, optional): Opciones de wkhtmltopdf
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    digest = hashlib.sha256()
+    digest.update(renderer.encode("utf-8"))
+    digest.update(repr(sorted((options or {}).items())).encode("utf-8"))
+    digest.update(html_content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PDFCache:
+    """Caché en disco de PDF generados, indexada por hash de contenido"""
+
+    def __init__(
+        self, directory: Optional[str] = None, max_files: int = MAX_CACHED_PDFS
+    ):
+        """
+        Inicializa la caché
+
+        Args:
+            directory (str, optional): Directorio de la caché
+            max_files (int): Número máximo de PDF guardados
+        """
+        self.directory = directory or get_cache_dir()
+        self.max_files = max_files
+
+    def path(self, key: str) -> str:
+        """Devuelve la ruta del PDF de una clave"""
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Lee un PDF de la caché
+
+        Args:
+            key (str): Clave del PDF
+
+        Returns:
+            Optional[bytes]: Contenido del PDF o None si no está en caché
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path, None)  # Marcar como usado recientemente
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Guarda un PDF en la caché de forma atómica
+
+        Args:
+            key (str): Clave del PDF
+            data (bytes): Contenido del PDF
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+            self._prune()
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el PDF en caché: {str(e)}")
+
+    def _prune(self) -> None:
+        """Elimina los PDF usados hace más tiempo si se supera el máximo"""
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".pdf")
+        ]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[: len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _render_wkhtmltopdf(html_content: str, options: Dict[str, Any]) -> bytes:
+    """Genera el PDF con pdfkit y wkhtmltopdf, reintentando con opciones básicas"""
+    config = pdfkit.configuration(wkhtmltopdf=find_wkhtmltopdf())
+    try:
+        return pdfkit.from_string(
+            html_content, False, options=options, configuration=config
+        )
+    except Exception as e:
+        logger.warning(
+            f"Error con wkhtmltopdf, reintentando con opciones básicas: {str(e)}"
+        )
+        return pdfkit.from_string(
+            html_content, False, options=BASIC_PDF_OPTIONS, configuration=config
+        )
+
+
+def _render_xhtml2pdf(html_content: str, options: Dict[str, Any]) -> bytes:
+    """Genera el PDF con xhtml2pdf"""
+    from io import BytesIO
+
+    output = BytesIO()
+    result = pisa.CreatePDF(html_content, dest=output, encoding="utf-8")
+    if result.err:
+        raise RuntimeError(f"xhtml2pdf devolvió {result.err} errores")
+    return output.getvalue()
+
+
+# Conversión de HTML a texto para el motor "text"
+_DROP_BLOCKS = re.compile(r"<(head|style|script)\b.*?</\1\s*>", re.I | re.S)
+_LINE_BREAKS = re.compile(r"<br\s*/?>|</(p|div|h[1-6]|tr|li|table|ul|ol)\s*>", re.I)
+_CELL_BREAKS = re.compile(r"</t[dh]\s*>", re.I)
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+
+TEXT_PAGE_WIDTH = 595  # A4 en puntos
+TEXT_PAGE_HEIGHT = 842
+TEXT_MARGIN = 50
+TEXT_FONT_SIZE = 10
+TEXT_LEADING = 13
+TEXT_WRAP = 95  # Caracteres por línea con Helvetica 10 pt
+
+
+def html_to_text_lines(html_content: str) -> List[str]:
+    """
+    Extrae las líneas de texto de un documento HTML
+
+    Args:
+        html_content (str): Contenido HTML
+
+    Returns:
+        List[str]: Líneas ajustadas al ancho de la página
+    """
+    text = _DROP_BLOCKS.sub("", html_content)
+    text = _LINE_BREAKS.sub("\n", text)
+    text = _CELL_BREAKS.sub("  ", text)
+    text = html.unescape(_TAGS.sub("", text))
+
+    lines = []
+    previous_blank = True
+    for raw_line in text.split("\n"):
+        line = _SPACES.sub(" ", raw_line).strip()
+        if not line:
+            if not previous_blank:
+                lines.append("")
+            previous_blank = True
+            continue
+        lines.extend(textwrap.wrap(line, TEXT_WRAP) or [""])
+        previous_blank = False
+    return lines
+
+
+def _pdf_string(text: str) -> bytes:
+    """Codifica una línea como cadena literal de PDF (WinAnsiEncoding)"""
+    data = text.encode("cp1252", errors="replace")
+    return (
+        b"("
+        + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+        + b")"
+    )
+
+
+def _render_text(html_content: str, options: Dict[str, Any]) -> bytes:
+    """Genera un PDF solo con el texto del HTML, sin dependencias externas"""
+    lines = html_to_text_lines(html_content) or [""]
+    per_page = (TEXT_PAGE_HEIGHT - 2 * TEXT_MARGIN) // TEXT_LEADING
+    pages = [lines[i : i + per_page] for i in range(0, len(lines), per_page)]
+
+    # Objetos: 1 catálogo, 2 árbol de páginas, 3 fuente, después página + contenido
+    objects = [
+        b"",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_refs = []
+    for page_lines in pages:
+        stream = [
+            b"BT",
+            f"/F1 {TEXT_FONT_SIZE} Tf {TEXT_LEADING} TL".encode("ascii"),
+            f"{TEXT_MARGIN} {TEXT_PAGE_HEIGHT - TEXT_MARGIN} Td".encode("ascii"),
+        ]
+        for line in page_lines:
+            stream.append(_pdf_string(line) + b" Tj T*")
+        stream.append(b"ET")
+        content = b"\n".join(stream)
+
+        page_number = len(objects) + 1
+        page_refs.append(f"{page_number} 0 R")
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {TEXT_PAGE_WIDTH} {TEXT_PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>"
+            ).encode("ascii")
+        )
+        objects.append(
+            f"<< /Length {len(content)} >>\nstream\n".encode("ascii")
+            + content
+            + b"\nendstream"
+        )
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = (
+        f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>".encode(
+            "ascii"
+        )
+    )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode("ascii")
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode("ascii")
+    return bytes(output)
+
+
+_RENDERERS = {
+    RENDERER_WKHTMLTOPDF: _render_wkhtmltopdf,
+    RENDERER_XHTML2PDF: _render_xhtml2pdf,
+    RENDERER_TEXT: _render_text,
+}
+
+
+def _render_uncached(
+    html_content: str, options: Dict[str, Any], renderer: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Genera el PDF probando los motores en orden
+
+    Returns:
+        Dict[str, Any]: {"data": bytes o None, "renderer": motor usado, "error": texto}
+    """
+    errors = []
+    for name in resolve_renderers(renderer):
+        start = time.time()
+        try:
+            data = _RENDERERS[name](html_content, options)
+            if data:
+                logger.info(
+                    f"PDF generado con {name} en {time.time() - start:.2f}s ({len(data)} bytes)"
+                )
+                return {"data": data, "renderer": name, "error": None}
+            errors.append(f"{name}: PDF vacío")
+        except Exception as e:
+            logger.warning(f"Error generando PDF con {name}: {str(e)}")
+            errors.append(f"{name}: {str(e)}")
+    return {"data": None, "renderer": None, "error": "; ".join(errors)}
+
+
+class PDFJobManager:
+    """Genera PDF en un hilo trabajador y expone el estado de cada trabajo"""
+
+    def __init__(
+        self, cache: Optional[PDFCache] = None, max_workers: int = DEFAULT_WORKERS
+    ):
+        """
+        Inicializa el gestor de trabajos
+
+        Args:
+            cache (PDFCache, optional): Caché en disco a usar
+            max_workers (int): Número de hilos trabajadores
+        """
+        self.cache = cache or PDFCache()
+        self.max_workers = max_workers
+        self._executor = None
+        self._jobs = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Crea el ejecutor la primera vez que se necesita"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="pdf-worker"
+            )
+        return self._executor
+
+    def submit(
+        self,
+        html_content: str,
+        options: Optional[Dict[str, Any]] = None,
+        renderer: Optional[str] = None,
+    ) -> str:
+        """
+        Encola la generación de un PDF y vuelve de inmediato
+
+        Si el PDF ya está en caché, el trabajo queda terminado sin encolarse; si
+        hay un trabajo igual en curso, se reutiliza.
+
+        Args:
+            html_content (str): Contenido HTML
+            options (dict, optional): Opciones de wkhtmltopdf
+            renderer (str, optional): Motor a usar ("auto" por defecto)
+
+        Returns:
+            str: Identificador del trabajo (la clave de caché)
+        """
+        options = DEFAULT_PDF_OPTIONS if options is None else options
+        renderer = renderer or os.environ.get("PDF_RENDERER") or RENDERER_AUTO
+        job_id = pdf_cache_key(html_content, renderer, options)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job["status"] in (JOB_PENDING, JOB_RUNNING):
+                return job_id
+            if (
+                job
+                and job["status"] == JOB_DONE
+                and os.path.exists(self.cache.path(job_id))
+            ):
+                return job_id
+
+            self._forget_finished_jobs()
+            now = time.time()
+            job = {
+                "job_id": job_id,
+                "status": JOB_PENDING,
+                "renderer": None,
+                "cache_key": job_id,
+                "size": None,
+                "error": None,
+                "cached": False,
+                "submitted_at": now,
+                "finished_at": None,
+            }
+            self._jobs[job_id] = job
+
+            if os.path.exists(self.cache.path(job_id)):
+                job.update(
+                    status=JOB_DONE,
+                    cached=True,
+                    size=os.path.getsize(self.cache.path(job_id)),
+                    finished_at=now,
+                )
+                return job_id
+
+            self._futures[job_id] = self._get_executor().submit(
+                self._run, job_id, html_content, options, renderer
+            )
+        return job_id
+
+    def _run(
+        self, job_id: str, html_content: str, options: Dict[str, Any], renderer: str
+    ) -> Optional[bytes]:
+        """
+        Ejecuta un trabajo en el hilo trabajador
+
+        Si el motor preferido falla y el PDF sale de un motor alternativo, se guarda
+        bajo la clave de ese motor y no bajo la del trabajo: así la siguiente
+        solicitud vuelve a intentar el motor preferido en lugar de servir para
+        siempre la versión degradada.
+        """
+        self._update(job_id, status=JOB_RUNNING)
+        result = _render_uncached(html_content, options, renderer)
+        if result["data"]:
+            cache_key = job_id
+            if result["renderer"] != resolve_renderers(renderer)[0]:
+                cache_key = pdf_cache_key(html_content, result["renderer"], options)
+                logger.info(
+                    f"PDF {job_id[:12]} generado con el motor alternativo "
+                    f"{result['renderer']}; no se guarda bajo la clave del trabajo"
+                )
+            self.cache.put(cache_key, result["data"])
+            self._update(
+                job_id,
+                status=JOB_DONE,
+                renderer=result["renderer"],
+                cache_key=cache_key,
+                size=len(result["data"]),
+                finished_at=time.time(),
+            )
+        else:
+            self._update(
+                job_id,
+                status=JOB_FAILED,
+                error=result["error"],
+                finished_at=time.time(),
+            )
+        return result["data"]
+
+    def _forget_finished_jobs(self) -> None:
+        """Olvida los trabajos terminados más antiguos (el PDF sigue en caché)"""
+        if len(self._jobs) < MAX_TRACKED_JOBS:
+            return
+        finished = sorted(
+            (job["submitted_at"], job_id)
+            for job_id, job in self._jobs.items()
+            if job["status"] in (JOB_DONE, JOB_FAILED)
+        )
+        for _, job_id in finished[: len(finished) // 2 or 1]:
+            self._jobs.pop(job_id, None)
+            self._futures.pop(job_id, None)
+
+    def _update(self, job_id: str, **fields) -> None:
+        """Actualiza los campos de un trabajo"""
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve el estado de un trabajo
+
+        Args:
+            job_id (str): Identificador del trabajo
+
+        Returns:
+            Optional[Dict[str, Any]]: Copia del estado o None si no existe
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def result(
+        self, job_id: str, timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT
+    ) -> Optional[bytes]:
+        """
+        Espera a que termine un trabajo y devuelve el PDF
+
+        Args:
+            job_id (str): Identificador del trabajo
+            timeout (float, optional): Segundos máximos de espera
+
+        Returns:
+            Optional[bytes]: Contenido del PDF o None si falló o no terminó a tiempo
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                logger.warning(
+                    f"El PDF {job_id[:12]} no está listo: {type(e).__name__}"
+                )
+                return None
+            with self._lock:
+                self._futures.pop(job_id, None)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            cache_key = job["cache_key"] if job else job_id
+        return self.cache.get(cache_key)
+
+    def render(
+        self,
+        html_content: str,
+        options: Optional[Dict[str, Any]] = None,
+        renderer: Optional[str] = None,
+        timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT,
+    ) -> Optional[bytes]:
+        """Encola un PDF y espera su resultado (versión síncrona con caché)"""
+        return self.result(self.submit(html_content, options, renderer), timeout)
+
+
+# Gestor compartido por todas las sesiones del proceso
+pdf_jobs = PDFJobManager()
+
+
+def submit_pdf(
+    html_content: str,
+    options: Optional[Dict[str, Any]] = None,
+    renderer: Optional[str] = None,
+) -> str:
+    """Encola un PDF en el gestor compartido y devuelve el identificador del trabajo"""
+    return pdf_jobs.submit(html_content, options, renderer)
+
+
+def get_pdf_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Devuelve el estado de un trabajo del gestor compartido"""
+    return pdf_jobs.status(job_id)
+
+
+def wait_for_pdf(
+    job_id: str, timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT
+) -> Optional[bytes]:
+    """Espera el resultado de un trabajo del gestor compartido"""
+    return pdf_jobs.result(job_id, timeout)
+
+
+def render_pdf(
+    html_content: str,
+    options: Optional[Dict[str, Any]] = None,
+    renderer: Optional[str] = None,
+    timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT,
+) -> Optional[bytes]:
+    """
+    Genera un PDF de forma síncrona, reutilizando la caché
+
+    Args:
+        html_content (str): Contenido HTML
+        options (dict, optional): Opciones de wkhtmltopdf
+        renderer (str, optional): Motor a usar ("auto" por defecto)
+        timeout (float, optional): Segundos máximos de espera
+
+    Returns:
+        Optional[bytes]: Contenido del PDF o None si no se pudo generar
+    """
+    return pdf_jobs.render(html_content, options, renderer, timeout)
@@ -8,7 +8,6 @@ Este script debe ser llamado después de cada proceso de grabación para asegura
 import sys
 import logging
 import argparse
-import time
 from datetime import datetime
 from typing import Dict
 import mysql.connector
@@ -91,17 +90,19 @@ from database_quality_utils import (
     connect_to_db,
     get_empty_news_summaries,
     get_empty_sentiment_analysis,
-    update_news_summary,
-    update_news_title,
-    update_news_url,
-    update_sentiment_analysis,
     get_empty_trading_signals_analysis,
     get_error_trading_signals_analysis,
-    update_trading_signal_analysis,
+    update_rows_batch,
     get_empty_news_symbols,
+    get_quality_backlog,
+    reset_quality_watermarks,
 )
-from text_processing import translate_title_to_spanish
+from text_processing import translate_titles_to_spanish
 from data_enrichment import get_news_from_yahoo
+from quality_pipeline import PipelineMetrics, run_concurrently
+
+# Métricas de la última ejecución de cada proceso (backlog, filas/s y latencia por etapa)
+LAST_PIPELINE_METRICS: Dict[str, Dict] = {}
 
 
 # Función para generar análisis de respaldo para señales de trading
@@ -454,12 +455,25 @@ def check_database_quality(
     """
     Verifica la calidad de los datos en la base de datos
 
+    Si el seguimiento incremental está disponible, los conteos se leen de la cola de
+    enriquecimiento y solo se revisan las filas nuevas o modificadas.
+
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
 
     Returns:
         Dict[str, int]: Diccionario con el número de registros con campos vacíos por tabla
     """
+    backlog = get_quality_backlog(connection)
+    if backlog is not None:
+        return {
+            "empty_news_summaries": backlog["news_summary"],
+            "news_for_review": backlog["news_review"],
+            "empty_sentiment_analysis": backlog["sentiment_fields"],
+            "empty_trading_signals_analysis": backlog["signal_analysis"],
+            "error_trading_signals_analysis": backlog["signal_analysis_error"],
+        }
+
     result = {}
 
     # Verificar noticias con resumen vacío
@@ -493,89 +507,162 @@ def check_database_quality(
 
 
 def process_empty_news_summaries(
-    connection: mysql.connector.MySQLConnection, limit: int = 10
+    connection: mysql.connector.MySQLConnection, limit: int = 10, workers: int = None
 ) -> int:
     """
     Procesa noticias con resumen vacío
 
+    Los títulos se traducen en lote, la búsqueda de URL en Yahoo Finance y la
+    generación del resumen se reparten en un pool de hilos y las actualizaciones
+    se escriben en la base de datos en lote.
+
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         limit (int): Número máximo de registros a procesar
+        workers (int, optional): Número de hilos (por defecto AI_MAX_CONCURRENCY)
 
     Returns:
         int: Número de registros procesados
     """
-    # Obtener noticias con resumen vacío
-    empty_news = get_empty_news_summaries(connection, limit)
+    # Etapa 1: obtener noticias con resumen vacío
+    metrics = PipelineMetrics("news_summaries")
+    with metrics.stage("fetch"):
+        empty_news = get_empty_news_summaries(connection, limit)
 
     if not empty_news:
         logger.info("No hay noticias con resumen vacío para procesar")
         return 0
 
+    metrics.backlog = len(empty_news)
     logger.info(f"Se encontraron {len(empty_news)} noticias con resumen vacío")
 
-    # Procesar cada noticia
-    processed_count = 0
-    for news in empty_news:
+    # Etapa 2: traducir en lote los títulos en inglés (pocas solicitudes en lugar de una por noticia)
+    with metrics.stage("translate"):
+        translated_titles = translate_titles_to_spanish(
+            [news.get("title", "") for news in empty_news]
+        )
+
+    def enrich_news(item) -> Dict:
+        """Obtiene la URL si falta y genera el resumen de una noticia"""
+        news, translated_title = item
         news_id = news.get("id")
         title = news.get("title", "")
         symbol = news.get("symbol", "SPY")
         url = news.get("url", "")
+        update = {"id": news_id}
 
-        logger.info(f"Procesando noticia ID {news_id}: {title[:50]}...")
-
-        # Traducir título si está en inglés
-        original_title = title
-        translated_title = translate_title_to_spanish(title)
-        if translated_title != original_title:
-            logger.info(f"Título traducido: {translated_title}")
-
-            # Actualizar título en la base de datos
-            if update_news_title(connection, news_id, translated_title):
-                logger.info(f"Título actualizado para noticia ID {news_id}")
-
-                # Usar el título traducido para generar el resumen
-                title = translated_title
-            else:
-                logger.error(f"Error actualizando título para noticia ID {news_id}")
+        if translated_title and translated_title != title:
+            logger.info(f"Título traducido para noticia ID {news_id}: {translated_title}")
+            update["title"] = translated_title
+            # Usar el título traducido para generar el resumen
+            title = translated_title
 
         # Intentar obtener noticias de Yahoo Finance si no hay URL
         if not url:
-            yahoo_news = get_news_from_yahoo(symbol, 1)
+            with metrics.stage("yahoo"):
+                yahoo_news = get_news_from_yahoo(symbol, 1)
             if yahoo_news:
                 # Usar la primera noticia como referencia
                 url = yahoo_news[0].get("url", "")
-                logger.info(f"URL obtenida de Yahoo Finance: {url}")
-
-                # Actualizar URL en la base de datos
-                if update_news_url(connection, news_id, url):
-                    logger.info(f"URL actualizada para noticia ID {news_id}")
-                else:
-                    logger.error(f"Error actualizando URL para noticia ID {news_id}")
+                update["url"] = url or None
+                logger.info(f"URL obtenida de Yahoo Finance para noticia ID {news_id}: {url}")
 
         # Generar resumen con IA
-        summary = generate_summary_with_ai(title, symbol, url)
+        with metrics.stage("ai"):
+            update["summary"] = generate_summary_with_ai(title, symbol, url)
 
-        # Actualizar resumen en la base de datos solo si se generó un resumen válido
-        if summary is not None:
-            if update_news_summary(connection, news_id, summary):
-                logger.info(f"Resumen actualizado para noticia ID {news_id}")
-                processed_count += 1
-            else:
-                logger.error(f"Error actualizando resumen para noticia ID {news_id}")
-        else:
+        if update["summary"] is None:
             logger.warning(
                 f"No se pudo generar un resumen válido para la noticia ID {news_id}"
             )
+        return update
+
+    # Etapa 3: enriquecimiento e IA en paralelo
+    updates = run_concurrently(
+        list(zip(empty_news, translated_titles)),
+        enrich_news,
+        max_workers=workers,
+        metrics=metrics,
+        stage_name="row",
+    )
+    updates = [update for update in updates if update]
+
+    # Etapa 4: escribir en lote. El título y la URL se guardan aunque no haya resumen
+    with metrics.stage("db_update"):
+        update_rows_batch(
+            connection,
+            "market_news",
+            [{key: value for key, value in update.items() if key != "summary"} for update in updates],
+        )
+        with_summary = [
+            {"id": update["id"], "summary": update["summary"]}
+            for update in updates
+            if update.get("summary") is not None
+        ]
+        processed_count = update_rows_batch(connection, "market_news", with_summary)
 
-        # Esperar un poco para no sobrecargar la API
-        time.sleep(1)
+    metrics.processed = processed_count
+    metrics.failed = len(empty_news) - processed_count
+    LAST_PIPELINE_METRICS["news"] = metrics.finish()
 
     return processed_count
 
 
+def build_sentiment_updates(sentiment: Dict) -> Dict:
+    """
+    Calcula los campos vacíos de un registro de sentimiento que no requieren IA
+
+    Args:
+        sentiment (Dict): Registro de sentimiento
+
+    Returns:
+        Dict: Campos a actualizar
+    """
+    fields_to_update = {}
+
+    # Verificar si el símbolo está vacío
+    if not sentiment.get("symbol"):
+        # Usar SPY como valor predeterminado o determinar el símbolo basado en otros campos
+        fields_to_update["symbol"] = "SPY"
+
+    # Verificar si el sentimiento está vacío
+    if not sentiment.get("sentiment"):
+        # Determinar el sentimiento basado en overall o usar un valor predeterminado
+        overall = sentiment.get("overall")
+        if overall == "Alcista":
+            fields_to_update["sentiment"] = "Positivo"
+        elif overall == "Bajista":
+            fields_to_update["sentiment"] = "Negativo"
+        else:
+            fields_to_update["sentiment"] = "Neutral"
+
+    # Verificar si el score está vacío
+    if sentiment.get("score") is None:
+        # Asignar un score basado en overall o usar un valor predeterminado
+        overall = sentiment.get("overall")
+        if overall == "Alcista":
+            fields_to_update["score"] = 0.75
+        elif overall == "Bajista":
+            fields_to_update["score"] = 0.25
+        else:
+            fields_to_update["score"] = 0.5
+
+    # Verificar si la fuente está vacía
+    if not sentiment.get("source"):
+        fields_to_update["source"] = "InversorIA AI"
+
+    # Verificar si la fecha del sentimiento está vacía
+    if not sentiment.get("sentiment_date"):
+        # Usar la fecha actual
+        fields_to_update["sentiment_date"] = sentiment.get(
+            "date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+    return fields_to_update
+
+
 def process_empty_sentiment_analysis(
-    connection: mysql.connector.MySQLConnection, limit: int = 10
+    connection: mysql.connector.MySQLConnection, limit: int = 10, workers: int = None
 ) -> int:
     """
     Procesa registros de sentimiento con campos críticos vacíos
@@ -583,12 +670,15 @@ def process_empty_sentiment_analysis(
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         limit (int): Número máximo de registros a procesar
+        workers (int, optional): Número de hilos (por defecto AI_MAX_CONCURRENCY)
 
     Returns:
         int: Número de registros procesados
     """
-    # Obtener registros de sentimiento con campos críticos vacíos
-    empty_sentiment = get_empty_sentiment_analysis(connection, limit)
+    # Etapa 1: obtener registros de sentimiento con campos críticos vacíos
+    metrics = PipelineMetrics("sentiment_analysis")
+    with metrics.stage("fetch"):
+        empty_sentiment = get_empty_sentiment_analysis(connection, limit)
 
     if not empty_sentiment:
         logger.info(
@@ -596,98 +686,55 @@ def process_empty_sentiment_analysis(
         )
         return 0
 
+    metrics.backlog = len(empty_sentiment)
     logger.info(
         f"Se encontraron {len(empty_sentiment)} registros de sentimiento con campos críticos vacíos"
     )
 
-    # Procesar cada registro
-    processed_count = 0
-    for sentiment in empty_sentiment:
-        sentiment_id = sentiment.get("id")
-
-        logger.info(f"Procesando sentimiento ID {sentiment_id}...")
-
-        # Verificar qué campos están vacíos
-        fields_to_update = {}
+    def complete_sentiment(sentiment: Dict) -> Dict:
+        """Genera el análisis con IA si falta y completa el resto de campos"""
+        fields_to_update = {"id": sentiment.get("id")}
 
         # Verificar si el análisis está vacío
         if not sentiment.get("analysis"):
-            # Generar análisis con IA
-            analysis = generate_sentiment_analysis_with_ai(sentiment)
-            if analysis is not None:
-                fields_to_update["analysis"] = analysis
-
-        # Verificar si el símbolo está vacío
-        if not sentiment.get("symbol"):
-            # Usar SPY como valor predeterminado o determinar el símbolo basado en otros campos
-            fields_to_update["symbol"] = "SPY"
-
-        # Verificar si el sentimiento está vacío
-        if not sentiment.get("sentiment"):
-            # Determinar el sentimiento basado en overall o usar un valor predeterminado
-            overall = sentiment.get("overall")
-            if overall == "Alcista":
-                fields_to_update["sentiment"] = "Positivo"
-            elif overall == "Bajista":
-                fields_to_update["sentiment"] = "Negativo"
-            else:
-                fields_to_update["sentiment"] = "Neutral"
-
-        # Verificar si el score está vacío
-        if sentiment.get("score") is None:
-            # Asignar un score basado en overall o usar un valor predeterminado
-            overall = sentiment.get("overall")
-            if overall == "Alcista":
-                fields_to_update["score"] = 0.75
-            elif overall == "Bajista":
-                fields_to_update["score"] = 0.25
-            else:
-                fields_to_update["score"] = 0.5
+            with metrics.stage("ai"):
+                fields_to_update["analysis"] = generate_sentiment_analysis_with_ai(
+                    sentiment
+                )
 
-        # Verificar si la fuente está vacía
-        if not sentiment.get("source"):
-            fields_to_update["source"] = "InversorIA AI"
+        fields_to_update.update(build_sentiment_updates(sentiment))
+        return fields_to_update
 
-        # Verificar si la fecha del sentimiento está vacía
-        if not sentiment.get("sentiment_date"):
-            # Usar la fecha actual
-            fields_to_update["sentiment_date"] = sentiment.get(
-                "date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            )
+    # Etapa 2: IA en paralelo
+    updates = run_concurrently(
+        empty_sentiment,
+        complete_sentiment,
+        max_workers=workers,
+        metrics=metrics,
+        stage_name="row",
+    )
+    updates = [
+        update
+        for update in updates
+        if update and any(v is not None for k, v in update.items() if k != "id")
+    ]
 
-        # Actualizar los campos en la base de datos
-        if fields_to_update:
-            if update_sentiment_analysis(
-                connection,
-                sentiment_id,
-                analysis=fields_to_update.get("analysis"),
-                symbol=fields_to_update.get("symbol"),
-                sentiment_value=fields_to_update.get("sentiment"),
-                score=fields_to_update.get("score"),
-                source=fields_to_update.get("source"),
-                sentiment_date=fields_to_update.get("sentiment_date"),
-            ):
-                logger.info(
-                    f"Campos actualizados para sentimiento ID {sentiment_id}: {', '.join(fields_to_update.keys())}"
-                )
-                processed_count += 1
-            else:
-                logger.error(
-                    f"Error actualizando campos para sentimiento ID {sentiment_id}"
-                )
-        else:
-            logger.info(
-                f"No hay campos para actualizar en el sentimiento ID {sentiment_id}"
-            )
+    # Etapa 3: escribir en lote
+    with metrics.stage("db_update"):
+        processed_count = update_rows_batch(connection, "market_sentiment", updates)
+
+    if processed_count:
+        logger.info(f"Campos actualizados en {processed_count} registros de sentimiento")
 
-        # Esperar un poco para no sobrecargar la API
-        time.sleep(1)
+    metrics.processed = processed_count
+    metrics.failed = len(empty_sentiment) - processed_count
+    LAST_PIPELINE_METRICS["sentiment"] = metrics.finish()
 
     return processed_count
 
 
 def process_empty_trading_signals_analysis(
-    connection: mysql.connector.MySQLConnection, limit: int = 10
+    connection: mysql.connector.MySQLConnection, limit: int = 10, workers: int = None
 ) -> int:
     """
     Procesa señales de trading con análisis experto vacío o con errores
@@ -695,15 +742,17 @@ def process_empty_trading_signals_analysis(
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         limit (int): Número máximo de registros a procesar
+        workers (int, optional): Número de hilos (por defecto AI_MAX_CONCURRENCY)
 
     Returns:
         int: Número de registros procesados
     """
-    # Obtener señales de trading con análisis experto vacío
-    empty_signals = get_empty_trading_signals_analysis(connection, limit)
+    metrics = PipelineMetrics("trading_signals_analysis")
 
-    # Obtener señales con errores en el análisis experto
-    error_signals = get_error_trading_signals_analysis(connection, limit)
+    # Etapa 1: obtener señales con análisis experto vacío o con errores
+    with metrics.stage("fetch"):
+        empty_signals = get_empty_trading_signals_analysis(connection, limit)
+        error_signals = get_error_trading_signals_analysis(connection, limit)
 
     # Combinar ambas listas, eliminando duplicados por ID
     all_signals = {signal.get("id"): signal for signal in empty_signals}
@@ -719,17 +768,15 @@ def process_empty_trading_signals_analysis(
         )
         return 0
 
+    metrics.backlog = len(signals_to_process)
     logger.info(
         f"Se encontraron {len(signals_to_process)} señales de trading con análisis experto vacío o con errores"
     )
 
-    # Procesar cada señal
-    processed_count = 0
-    for signal in signals_to_process:
+    def analyze_signal(signal: Dict) -> Dict:
+        """Genera el análisis experto de una señal"""
         signal_id = signal.get("id")
 
-        logger.info(f"Procesando señal ID {signal_id}...")
-
         # Verificar si hay un error en el análisis experto
         expert_analysis = signal.get("expert_analysis", "")
         if expert_analysis and "st.session_state has no attribute" in expert_analysis:
@@ -737,25 +784,35 @@ def process_empty_trading_signals_analysis(
                 f"Se detectó un error en el análisis experto de la señal ID {signal_id}: {expert_analysis[:100]}..."
             )
 
-        # Generar análisis con IA
-        analysis = generate_trading_signal_analysis_with_ai(signal)
+        with metrics.stage("ai"):
+            analysis = generate_trading_signal_analysis_with_ai(signal)
 
-        # Actualizar análisis en la base de datos solo si se generó un análisis válido
-        if analysis is not None:
-            if update_trading_signal_analysis(connection, signal_id, analysis):
-                logger.info(f"Análisis experto actualizado para señal ID {signal_id}")
-                processed_count += 1
-            else:
-                logger.error(
-                    f"Error actualizando análisis experto para señal ID {signal_id}"
-                )
-        else:
+        if analysis is None:
             logger.warning(
                 f"No se pudo generar un análisis válido para la señal ID {signal_id}"
             )
+        return {"id": signal_id, "expert_analysis": analysis}
+
+    # Etapa 2: IA en paralelo
+    updates = run_concurrently(
+        signals_to_process,
+        analyze_signal,
+        max_workers=workers,
+        metrics=metrics,
+        stage_name="row",
+    )
+    updates = [update for update in updates if update and update["expert_analysis"]]
+
+    # Etapa 3: escribir en lote
+    with metrics.stage("db_update"):
+        processed_count = update_rows_batch(connection, "trading_signals", updates)
 
-        # Esperar un poco para no sobrecargar la API
-        time.sleep(1)
+    if processed_count:
+        logger.info(f"Análisis experto actualizado para {processed_count} señales")
+
+    metrics.processed = processed_count
+    metrics.failed = len(signals_to_process) - processed_count
+    LAST_PIPELINE_METRICS["signals"] = metrics.finish()
 
     return processed_count
 
@@ -1067,6 +1124,17 @@ def main():
             default="all",
             help="Tabla a procesar (news, sentiment, signals o all)",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Número de hilos para la IA y el enriquecimiento (por defecto AI_MAX_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--reset-watermarks",
+            action="store_true",
+            help="Reiniciar el seguimiento incremental y volver a revisar las tablas completas",
+        )
         args = parser.parse_args()
 
         # Cargar configuración
@@ -1078,6 +1146,9 @@ def main():
             logger.error("No se pudo conectar a la base de datos")
             return
 
+        if args.reset_watermarks and reset_quality_watermarks(connection):
+            logger.info("Seguimiento incremental reiniciado")
+
         # Verificar la calidad de los datos
         quality_stats = check_database_quality(connection)
 
@@ -1115,7 +1186,9 @@ def main():
 
         if args.table in ["news", "all"]:
             # Procesar noticias con resumen vacío
-            news_processed = process_empty_news_summaries(connection, args.limit)
+            news_processed = process_empty_news_summaries(
+                connection, args.limit, args.workers
+            )
             logger.info(f"Se procesaron {news_processed} noticias con resumen vacío")
 
             # Procesar noticias con símbolos marcados para revisión
@@ -1170,7 +1243,7 @@ def main():
         if args.table in ["sentiment", "all"]:
             # Procesar registros de sentimiento con análisis vacío
             sentiment_processed = process_empty_sentiment_analysis(
-                connection, args.limit
+                connection, args.limit, args.workers
             )
             logger.info(
                 f"Se procesaron {sentiment_processed} registros de sentimiento con análisis vacío"
@@ -1195,7 +1268,7 @@ def main():
                     process_message = "errores en el análisis"
 
             signals_processed = process_empty_trading_signals_analysis(
-                connection, args.limit
+                connection, args.limit, args.workers
             )
             logger.info(
                 f"Se procesaron {signals_processed} señales de trading con {process_message}"
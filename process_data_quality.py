@@ -31,9 +31,10 @@ from database_quality_utils import (
     update_news_title,
     update_news_url,
     update_sentiment_analysis,
-    get_empty_trading_signals_analysis
+    get_empty_trading_signals_analysis,
+    get_quality_backlog
 )
-from text_processing import translate_title_to_spanish
+from text_processing import translate_titles_to_spanish
 from data_enrichment import get_news_from_yahoo
 from ai_content_generator import (
     generate_summary_with_ai,
@@ -45,12 +46,23 @@ def check_database_quality(connection: mysql.connector.MySQLConnection) -> Dict[
     """
     Verifica la calidad de los datos en la base de datos
     
+    Si el seguimiento incremental está disponible, los conteos se leen de la cola de
+    enriquecimiento y solo se revisan las filas nuevas o modificadas.
+    
     Args:
         connection (mysql.connector.MySQLConnection): Conexión a la base de datos
         
     Returns:
         Dict[str, int]: Diccionario con el número de registros con campos vacíos por tabla
     """
+    backlog = get_quality_backlog(connection)
+    if backlog is not None:
+        return {
+            "empty_news_summaries": backlog["news_summary"],
+            "empty_sentiment_analysis": backlog["sentiment_fields"],
+            "empty_trading_signals_analysis": backlog["signal_analysis"],
+        }
+    
     result = {}
     
     # Verificar noticias con resumen vacío
@@ -89,9 +101,14 @@ def process_empty_news_summaries(
     
     logger.info(f"Se encontraron {len(empty_news)} noticias con resumen vacío")
     
+    # Traducir en lote los títulos en inglés (pocas solicitudes en lugar de una por noticia)
+    translated_titles = translate_titles_to_spanish(
+        [news.get("title", "") for news in empty_news]
+    )
+    
     # Procesar cada noticia
     processed_count = 0
-    for news in empty_news:
+    for news, translated_title in zip(empty_news, translated_titles):
         news_id = news.get("id")
         title = news.get("title", "")
         symbol = news.get("symbol", "SPY")
@@ -101,7 +118,6 @@ def process_empty_news_summaries(
         
         # Traducir título si está en inglés
         original_title = title
-        translated_title = translate_title_to_spanish(title)
         if translated_title != original_title:
             logger.info(f"Título traducido: {translated_title}")
             
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cola persistente de trabajos de control de calidad.
+
+Las funciones de guardado (save_market_news, save_market_sentiment,
+save_trading_signal) solo encolan un trabajo y vuelven de inmediato; un proceso
+trabajador separado (este script o schedule_data_processor.py --worker) vacía la
+cola ejecutando el control de calidad con IA.
+
+La cola es una tabla SQLite local con:
+- Deduplicación: un trabajo pendiente por tabla; los nuevos encolados solo
+  amplían su límite y su prioridad.
+- Prioridades: se procesan primero los trabajos de mayor prioridad.
+- Reintentos con espera exponencial y un número máximo de intentos.
+- Recuperación de trabajos que quedaron en ejecución si el trabajador murió.
+
+Uso:
+    python quality_job_queue.py worker            # Vaciar la cola de forma continua
+    python quality_job_queue.py worker --once     # Procesar lo pendiente y salir
+    python quality_job_queue.py enqueue --table news --limit 20
+    python quality_job_queue.py status
+    python quality_job_queue.py purge --days 7
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "quality_jobs.db"
+)
+
+# Nombres de tabla aceptados por los llamadores -> tipo de trabajo
+JOB_TYPES = {
+    "news": "news",
+    "market_news": "news",
+    "sentiment": "sentiment",
+    "market_sentiment": "sentiment",
+    "signals": "signals",
+    "trading_signals": "signals",
+    "news_symbols": "news_symbols",
+    "all": "all",
+}
+
+# Prioridades por defecto (mayor = antes)
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 1
+
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 30  # Segundos; se duplica en cada intento
+STALE_JOB_TIMEOUT = 30 * 60  # Trabajos "running" más antiguos se reintentan
+
+_local = threading.local()
+
+
+def get_queue_path() -> str:
+    """Devuelve la ruta del archivo de la cola"""
+    return os.environ.get("QUALITY_QUEUE_PATH", DEFAULT_QUEUE_PATH)
+
+
+def get_queue_connection() -> sqlite3.Connection:
+    """
+    Devuelve la conexión SQLite del hilo actual, creando la tabla si no existe
+
+    Returns:
+        sqlite3.Connection: Conexión a la cola
+    """
+    path = get_queue_path()
+    connection = getattr(_local, "connection", None)
+    if connection is not None and getattr(_local, "path", None) == path:
+        return connection
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS quality_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_type TEXT NOT NULL,
+            record_limit INTEGER NOT NULL DEFAULT 1,
+            priority INTEGER NOT NULL DEFAULT 5,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 5,
+            available_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            record_ids TEXT,
+            last_error TEXT,
+            result TEXT
+        )"""
+    )
+    # Solo puede haber un trabajo pendiente por tipo (deduplicación)
+    connection.execute(
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_pending_job_type
+           ON quality_jobs (job_type) WHERE status = 'pending'"""
+    )
+    connection.execute(
+        """CREATE INDEX IF NOT EXISTS idx_status_priority
+           ON quality_jobs (status, priority, available_at)"""
+    )
+
+    _local.connection = connection
+    _local.path = path
+    return connection
+
+
+def enqueue_quality_job(
+    table_name: str,
+    limit: int = 1,
+    record_id: Optional[int] = None,
+    priority: int = PRIORITY_NORMAL,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Optional[int]:
+    """
+    Encola un trabajo de control de calidad
+
+    Si ya hay un trabajo pendiente del mismo tipo, no se crea otro: se amplía su
+    límite de registros, se conserva la mayor prioridad y se añade el ID.
+
+    Args:
+        table_name (str): Tabla a procesar (news, sentiment, signals, news_symbols o all)
+        limit (int): Número de registros a procesar
+        record_id (Optional[int]): ID del registro guardado (informativo)
+        priority (int): Prioridad (mayor = antes)
+        max_attempts (int): Número máximo de intentos
+
+    Returns:
+        Optional[int]: ID del trabajo o None si no se pudo encolar
+    """
+    job_type = JOB_TYPES.get(table_name)
+    if not job_type:
+        logger.error(f"Tipo de trabajo de calidad no válido: {table_name}")
+        return None
+
+    now = time.time()
+    try:
+        connection = get_queue_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT id, record_ids FROM quality_jobs WHERE job_type = ? AND status = 'pending'",
+                (job_type,),
+            ).fetchone()
+
+            if row:
+                record_ids = json.loads(row["record_ids"] or "[]")
+                if record_id is not None and record_id not in record_ids:
+                    record_ids.append(record_id)
+                connection.execute(
+                    """UPDATE quality_jobs
+                       SET record_limit = record_limit + ?, priority = MAX(priority, ?),
+                           record_ids = ?, updated_at = ?
+                       WHERE id = ?""",
+                    (limit, priority, json.dumps(record_ids), now, row["id"]),
+                )
+                job_id = row["id"]
+            else:
+                cursor = connection.execute(
+                    """INSERT INTO quality_jobs
+                       (job_type, record_limit, priority, max_attempts, available_at,
+                        created_at, updated_at, record_ids)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        job_type,
+                        limit,
+                        priority,
+                        max_attempts,
+                        now,
+                        now,
+                        now,
+                        json.dumps([record_id] if record_id is not None else []),
+                    ),
+                )
+                job_id = cursor.lastrowid
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        logger.info(f"Trabajo de calidad '{job_type}' encolado (ID {job_id})")
+        return job_id
+    except Exception as e:
+        logger.error(f"Error encolando trabajo de calidad: {str(e)}")
+        return None
+
+
+def claim_jobs(max_jobs: int = 10) -> List[Dict[str, Any]]:
+    """
+    Reserva los siguientes trabajos disponibles por orden de prioridad
+
+    Args:
+        max_jobs (int): Número máximo de trabajos a reservar
+
+    Returns:
+        List[Dict[str, Any]]: Trabajos reservados (estado "running")
+    """
+    now = time.time()
+    connection = get_queue_connection()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        rows = connection.execute(
+            """SELECT * FROM quality_jobs
+               WHERE status = 'pending' AND available_at <= ?
+               ORDER BY priority DESC, id ASC
+               LIMIT ?""",
+            (now, max_jobs),
+        ).fetchall()
+        for row in rows:
+            connection.execute(
+                """UPDATE quality_jobs
+                   SET status = 'running', attempts = attempts + 1, updated_at = ?
+                   WHERE id = ?""",
+                (now, row["id"]),
+            )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+    return [dict(row) for row in rows]
+
+
+def complete_job(job_id: int, result: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Marca un trabajo como completado
+
+    Args:
+        job_id (int): ID del trabajo
+        result (Optional[Dict[str, Any]]): Resultado del procesamiento
+    """
+    get_queue_connection().execute(
+        "UPDATE quality_jobs SET status = 'done', result = ?, updated_at = ? WHERE id = ?",
+        (json.dumps(result, default=str) if result else None, time.time(), job_id),
+    )
+
+
+def fail_job(job: Dict[str, Any], error: str) -> None:
+    """
+    Registra el fallo de un trabajo y lo reprograma si le quedan intentos
+
+    Args:
+        job (Dict[str, Any]): Trabajo reservado con claim_jobs()
+        error (str): Mensaje de error
+    """
+    now = time.time()
+    connection = get_queue_connection()
+    attempts = job["attempts"] + 1  # claim_jobs ya incrementó el contador en la tabla
+
+    if attempts >= job["max_attempts"]:
+        connection.execute(
+            """UPDATE quality_jobs SET status = 'failed', last_error = ?, updated_at = ?
+               WHERE id = ?""",
+            (error, now, job["id"]),
+        )
+        logger.error(
+            f"Trabajo de calidad {job['id']} descartado tras {attempts} intentos: {error}"
+        )
+        return
+
+    delay = RETRY_BASE_DELAY * (2 ** (attempts - 1))
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        # Si mientras tanto se encoló otro trabajo del mismo tipo, fusionar con él
+        pending = connection.execute(
+            "SELECT id FROM quality_jobs WHERE job_type = ? AND status = 'pending'",
+            (job["job_type"],),
+        ).fetchone()
+        if pending:
+            connection.execute(
+                """UPDATE quality_jobs
+                   SET record_limit = record_limit + ?, priority = MAX(priority, ?), updated_at = ?
+                   WHERE id = ?""",
+                (job["record_limit"], job["priority"], now, pending["id"]),
+            )
+            connection.execute(
+                """UPDATE quality_jobs SET status = 'merged', last_error = ?, updated_at = ?
+                   WHERE id = ?""",
+                (error, now, job["id"]),
+            )
+        else:
+            connection.execute(
+                """UPDATE quality_jobs
+                   SET status = 'pending', available_at = ?, last_error = ?, updated_at = ?
+                   WHERE id = ?""",
+                (now + delay, error, now, job["id"]),
+            )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+    logger.warning(
+        f"Trabajo de calidad {job['id']} fallido (intento {attempts}), reintento en {delay}s: {error}"
+    )
+
+
+def recover_stale_jobs(timeout: int = STALE_JOB_TIMEOUT) -> int:
+    """
+    Devuelve a la cola los trabajos que llevan demasiado tiempo en ejecución
+
+    Args:
+        timeout (int): Segundos tras los que un trabajo "running" se considera perdido
+
+    Returns:
+        int: Número de trabajos recuperados
+    """
+    stale = get_queue_connection().execute(
+        "SELECT * FROM quality_jobs WHERE status = 'running' AND updated_at < ?",
+        (time.time() - timeout,),
+    ).fetchall()
+    for row in stale:
+        job = dict(row)
+        job["attempts"] -= 1  # fail_job suma el intento reservado
+        fail_job(job, "Trabajo interrumpido (trabajador detenido)")
+    return len(stale)
+
+
+def get_queue_status() -> Dict[str, Any]:
+    """
+    Devuelve el estado de la cola
+
+    Returns:
+        Dict[str, Any]: Número de trabajos por estado y trabajos pendientes por tipo
+    """
+    connection = get_queue_connection()
+    by_status = dict(
+        connection.execute(
+            "SELECT status, COUNT(*) FROM quality_jobs GROUP BY status"
+        ).fetchall()
+    )
+    pending = [
+        dict(row)
+        for row in connection.execute(
+            """SELECT id, job_type, record_limit, priority, attempts, available_at
+               FROM quality_jobs WHERE status = 'pending'
+               ORDER BY priority DESC, id ASC"""
+        ).fetchall()
+    ]
+    return {"path": get_queue_path(), "by_status": by_status, "pending": pending}
+
+
+def get_pending_count() -> int:
+    """
+    Devuelve el número de trabajos pendientes
+
+    Returns:
+        int: Trabajos pendientes
+    """
+    try:
+        return get_queue_connection().execute(
+            "SELECT COUNT(*) FROM quality_jobs WHERE status = 'pending'"
+        ).fetchone()[0]
+    except Exception as e:
+        logger.error(f"Error consultando la cola de calidad: {str(e)}")
+        return 0
+
+
+def purge_jobs(days: int = 7) -> int:
+    """
+    Elimina los trabajos terminados más antiguos que el número de días indicado
+
+    Args:
+        days (int): Antigüedad mínima en días
+
+    Returns:
+        int: Número de trabajos eliminados
+    """
+    cursor = get_queue_connection().execute(
+        """DELETE FROM quality_jobs
+           WHERE status IN ('done', 'failed', 'merged') AND updated_at < ?""",
+        (time.time() - days * 86400,),
+    )
+    return cursor.rowcount
+
+
+def execute_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo de control de calidad
+
+    Args:
+        job (Dict[str, Any]): Trabajo reservado
+
+    Returns:
+        Dict[str, Any]: Resultado del procesamiento
+    """
+    if job["job_type"] == "news_symbols":
+        import update_news_symbols
+
+        updated, skipped = update_news_symbols.update_news_symbols()
+        return {"updated": updated, "skipped": skipped}
+
+    import post_save_quality_check
+
+    result = post_save_quality_check.process_quality_after_save(
+        table_name=job["job_type"], limit=job["record_limit"]
+    )
+    if result is None:
+        raise RuntimeError("El control de calidad no devolvió resultado")
+    return result
+
+
+def process_pending_jobs(max_jobs: int = 10) -> int:
+    """
+    Reserva y ejecuta los trabajos disponibles
+
+    Args:
+        max_jobs (int): Número máximo de trabajos a procesar
+
+    Returns:
+        int: Número de trabajos completados
+    """
+    completed = 0
+    for job in claim_jobs(max_jobs):
+        logger.info(
+            f"Procesando trabajo de calidad {job['id']} ({job['job_type']}, "
+            f"{job['record_limit']} registros, prioridad {job['priority']})"
+        )
+        start = time.time()
+        try:
+            result = execute_job(job)
+            complete_job(job["id"], result)
+            completed += 1
+            logger.info(
+                f"Trabajo de calidad {job['id']} completado en {time.time() - start:.1f}s: {result}"
+            )
+        except Exception as e:
+            fail_job(job, str(e))
+    return completed
+
+
+def run_worker(
+    once: bool = False,
+    poll_interval: float = 5.0,
+    max_jobs: int = 10,
+    stop_event: Optional[threading.Event] = None,
+) -> int:
+    """
+    Vacía la cola de trabajos de calidad
+
+    Args:
+        once (bool): Procesar lo pendiente y salir
+        poll_interval (float): Segundos de espera cuando la cola está vacía
+        max_jobs (int): Trabajos reservados por iteración
+        stop_event (Optional[threading.Event]): Evento para detener el trabajador
+
+    Returns:
+        int: Número total de trabajos completados
+    """
+    total = 0
+    recovered = recover_stale_jobs()
+    if recovered:
+        logger.warning(f"Se recuperaron {recovered} trabajos de calidad interrumpidos")
+
+    logger.info("Trabajador de la cola de calidad iniciado")
+    while not (stop_event and stop_event.is_set()):
+        try:
+            completed = process_pending_jobs(max_jobs)
+        except Exception as e:
+            logger.error(f"Error en el trabajador de la cola de calidad: {str(e)}")
+            completed = 0
+        total += completed
+
+        if once and (completed == 0 or get_pending_count() == 0):
+            break
+        if completed == 0:
+            if stop_event:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+
+    logger.info(f"Trabajador de la cola de calidad detenido ({total} trabajos completados)")
+    return total
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Cola de trabajos de control de calidad")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    worker_parser = subparsers.add_parser("worker", help="Procesar la cola")
+    worker_parser.add_argument(
+        "--once", action="store_true", help="Procesar lo pendiente y salir"
+    )
+    worker_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Segundos de espera cuando la cola está vacía",
+    )
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Encolar un trabajo")
+    enqueue_parser.add_argument(
+        "--table", choices=sorted(JOB_TYPES), default="all", help="Tabla a procesar"
+    )
+    enqueue_parser.add_argument(
+        "--limit", type=int, default=10, help="Número de registros a procesar"
+    )
+    enqueue_parser.add_argument(
+        "--priority", type=int, default=PRIORITY_NORMAL, help="Prioridad (mayor = antes)"
+    )
+
+    subparsers.add_parser("status", help="Mostrar el estado de la cola")
+
+    purge_parser = subparsers.add_parser("purge", help="Eliminar trabajos terminados")
+    purge_parser.add_argument(
+        "--days", type=int, default=7, help="Antigüedad mínima en días"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        try:
+            run_worker(once=args.once, poll_interval=args.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Trabajador interrumpido por el usuario")
+    elif args.command == "enqueue":
+        job_id = enqueue_quality_job(args.table, args.limit, priority=args.priority)
+        return 0 if job_id else 1
+    elif args.command == "status":
+        print(json.dumps(get_queue_status(), indent=2, ensure_ascii=False))
+    elif args.command == "purge":
+        logger.info(f"Se eliminaron {purge_jobs(args.days)} trabajos terminados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
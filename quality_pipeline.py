@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades para el procesamiento concurrente del control de calidad.
+
+El control de calidad se ejecuta por etapas:
+1. Obtener los registros candidatos (una consulta).
+2. Repartir el enriquecimiento y las llamadas a la IA en un pool de hilos con
+   concurrencia limitada. El ritmo de llamadas lo controla el limitador
+   compartido de ai_client, por lo que no hacen falta pausas fijas entre filas.
+3. Escribir los resultados en la base de datos en lote.
+
+PipelineMetrics registra el tamaño del backlog, el rendimiento (filas/s) y la
+latencia de cada etapa.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+
+def get_default_workers() -> int:
+    """
+    Obtiene el número de hilos por defecto del pipeline
+
+    Usa la concurrencia configurada para el cliente de IA (AI_MAX_CONCURRENCY),
+    ya que casi todo el trabajo de cada fila es una llamada a la IA.
+
+    Returns:
+        int: Número de hilos
+    """
+    try:
+        from ai_client import get_ai_config
+
+        return get_ai_config().get("max_concurrency", DEFAULT_WORKERS)
+    except ImportError:
+        return int(os.environ.get("AI_MAX_CONCURRENCY", DEFAULT_WORKERS))
+
+
+class PipelineMetrics:
+    """
+    Métricas de una ejecución del pipeline de calidad
+    """
+
+    def __init__(self, name: str, backlog: int = 0):
+        """
+        Inicializa las métricas
+
+        Args:
+            name (str): Nombre del proceso (por ejemplo, "news_summaries")
+            backlog (int): Número de registros pendientes
+        """
+        self.name = name
+        self.backlog = backlog
+        self.processed = 0
+        self.failed = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, stage_name: str):
+        """
+        Mide la duración de una etapa (puede usarse desde varios hilos)
+
+        Args:
+            stage_name (str): Nombre de la etapa
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(stage_name, time.time() - start)
+
+    def record(self, stage_name: str, seconds: float) -> None:
+        """
+        Registra una medición de una etapa
+
+        Args:
+            stage_name (str): Nombre de la etapa
+            seconds (float): Duración en segundos
+        """
+        with self._lock:
+            stats = self.stages.setdefault(
+                stage_name, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Cierra la medición y registra el resumen en el log
+
+        Returns:
+            Dict[str, Any]: Resumen de las métricas
+        """
+        self.finished_at = time.time()
+        summary = self.to_dict()
+
+        stages_text = ", ".join(
+            f"{name}: {stats['avg']:.2f}s media / {stats['max']:.2f}s máx"
+            for name, stats in summary["stages"].items()
+        )
+        logger.info(
+            f"[{self.name}] backlog {self.backlog}, procesados {self.processed}, "
+            f"fallidos {self.failed}, {summary['elapsed']:.1f}s "
+            f"({summary['throughput']:.2f} filas/s). Etapas: {stages_text or '-'}"
+        )
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Devuelve las métricas como diccionario
+
+        Returns:
+            Dict[str, Any]: Backlog, procesados, fallidos, duración, rendimiento y etapas
+        """
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        with self._lock:
+            stages = {
+                name: {
+                    "count": stats["count"],
+                    "total": round(stats["total"], 3),
+                    "avg": stats["total"] / stats["count"] if stats["count"] else 0.0,
+                    "max": stats["max"],
+                }
+                for name, stats in self.stages.items()
+            }
+        return {
+            "name": self.name,
+            "backlog": self.backlog,
+            "processed": self.processed,
+            "failed": self.failed,
+            "elapsed": elapsed,
+            "throughput": self.processed / elapsed if elapsed > 0 else 0.0,
+            "stages": stages,
+        }
+
+
+def run_concurrently(
+    items: List[Any],
+    worker: Callable[[Any], Any],
+    max_workers: Optional[int] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    stage_name: str = "worker",
+) -> List[Any]:
+    """
+    Ejecuta una función sobre cada elemento en un pool de hilos limitado
+
+    Los errores de un elemento no detienen el resto: se registran y su resultado es
+    None. Las funciones no deben usar la conexión a la base de datos, que no es
+    segura entre hilos; deben devolver los cambios para escribirlos en lote.
+
+    Args:
+        items (List[Any]): Elementos a procesar
+        worker (Callable[[Any], Any]): Función a ejecutar por elemento
+        max_workers (Optional[int]): Número máximo de hilos
+        metrics (Optional[PipelineMetrics]): Métricas donde registrar la latencia
+        stage_name (str): Nombre de la etapa en las métricas
+
+    Returns:
+        List[Any]: Resultados en el mismo orden que los elementos
+    """
+    if not items:
+        return []
+
+    max_workers = max(1, min(max_workers or get_default_workers(), len(items)))
+    results: List[Any] = [None] * len(items)
+
+    def timed(item):
+        start = time.time()
+        try:
+            return worker(item)
+        finally:
+            if metrics:
+                metrics.record(stage_name, time.time() - start)
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="quality"
+    ) as executor:
+        futures = {executor.submit(timed, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                logger.error(f"Error procesando elemento {index}: {str(e)}")
+
+    return results
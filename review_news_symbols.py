@@ -10,9 +10,7 @@ que han sido marcadas para revisión (symbol = 'REVIEW').
 import logging
 import sys
 import os
-import pandas as pd
 from datetime import datetime
-import time
 
 # Configurar logging
 logging.basicConfig(
@@ -30,7 +28,7 @@ os.makedirs("logs", exist_ok=True)
 
 # Importar utilidades de base de datos
 try:
-    from database_utils import DatabaseManager, extract_symbol_from_content
+    from database_utils import DatabaseManager
     from company_data import COMPANY_INFO
     
     # Intentar importar funciones de IA
@@ -241,6 +239,44 @@ def interactive_review():
             print(f"Error: {str(e)}")
 
 
+def symbols_from_similar_news(db, items, min_similarity=0.85):
+    """
+    Reutiliza el símbolo de noticias ya clasificadas con un título casi idéntico
+
+    Busca las noticias similares de todo el bloque con una sola consulta por
+    grupo (DatabaseManager.find_similar_news_titles_batch).
+
+    Args:
+        db (DatabaseManager): Gestor de base de datos del llamador (se reutiliza su conexión)
+        items (list): Pares (id, título) de las noticias a revisar
+        min_similarity (float): Similitud mínima entre títulos (0-1)
+
+    Returns:
+        dict: Símbolo encontrado por ID de noticia (solo las que tienen coincidencias válidas)
+    """
+    try:
+        similar_by_id = db.find_similar_news_titles_batch(
+            items, min_similarity=min_similarity
+        )
+    except Exception as e:
+        logger.error(f"Error buscando noticias similares: {str(e)}")
+        return {}
+
+    common_indices = ["SPY", "QQQ", "DIA", "IWM", "VIX"]
+    symbols = {}
+    for news_id, similar_news in similar_by_id.items():
+        for item in similar_news:
+            symbol = item.get("symbol")
+            if symbol and (symbol in COMPANY_INFO or symbol in common_indices):
+                logger.info(
+                    f"ID {news_id}: símbolo {symbol} tomado de la noticia similar "
+                    f"ID {item['id']} (similitud {item['similarity']})"
+                )
+                symbols[news_id] = symbol
+                break
+    return symbols
+
+
 def ai_advanced_symbol_extraction(title, summary=None, url=None):
     """
     Utiliza IA avanzada para extraer el símbolo de una noticia
@@ -295,59 +331,39 @@ def ai_advanced_symbol_extraction(title, summary=None, url=None):
         return None
 
 
-def batch_review(use_advanced_ai=True):
+def batch_review(use_advanced_ai=True, chunk_size=500):
     """
     Realiza una revisión por lotes de las noticias marcadas para revisión
     
+    Las noticias se procesan por bloques (ver update_news_symbols.reassign_news_symbols):
+    extracción de símbolos para todo el bloque, reutilización de noticias similares,
+    una solicitud agrupada a la IA para las noticias ambiguas y un único UPDATE.
+    
     Args:
         use_advanced_ai (bool): Si es True, utiliza IA avanzada para extraer símbolos
+        chunk_size (int): Noticias por bloque
     """
-    news = get_news_for_review()
-    if not news:
-        return
-        
-    # Convertir a DataFrame para facilitar la manipulación
-    df = pd.DataFrame(news)
-    
-    # Mostrar un resumen
-    print(f"\nSe encontraron {len(df)} noticias para revisar")
+    from update_news_symbols import reassign_news_symbols
     
-    # Intentar asignar símbolos automáticamente
-    updated_count = 0
-    ai_updated_count = 0
-    
-    for _, row in df.iterrows():
-        title = row["title"]
-        summary = row.get("summary", "")
-        url = row.get("url", "")
-        
-        # Paso 1: Intentar extraer símbolo con el método estándar
-        extracted_symbol = extract_symbol_from_content(title, summary)
-        
-        # Paso 2: Si no se pudo extraer un símbolo y se solicitó IA avanzada, intentar con IA
-        if not extracted_symbol and use_advanced_ai and AI_AVAILABLE:
-            print(f"Analizando con IA avanzada: {title[:50]}...")
-            extracted_symbol = ai_advanced_symbol_extraction(title, summary, url)
-            if extracted_symbol:
-                ai_updated_count += 1
-        
-        if extracted_symbol:
-            # Actualizar en la base de datos
-            success = update_news_symbol(row["id"], extracted_symbol)
-            if success:
-                updated_count += 1
-                source = "IA avanzada" if not extract_symbol_from_content(title, summary) else "análisis estándar"
-                print(f"ID {row['id']}: Asignado símbolo {extracted_symbol} mediante {source} - {title[:50]}...")
-                # Pequeña pausa para no sobrecargar la API si se usa IA
-                if use_advanced_ai and AI_AVAILABLE:
-                    time.sleep(0.5)
+    stats = reassign_news_symbols(
+        chunk_size=chunk_size,
+        use_ai=use_advanced_ai and AI_AVAILABLE,
+        review_only=True,
+        fallback=symbols_from_similar_news,
+    )
+    if not stats["processed"]:
+        print("No hay noticias para revisar")
+        return
     
-    print(f"\nSe actualizaron automáticamente {updated_count} de {len(df)} noticias")
+    print(
+        f"\nSe actualizaron automáticamente {stats['updated']} de {stats['processed']} noticias "
+        f"({stats['rows_per_second']:.1f} filas/s)"
+    )
     if use_advanced_ai and AI_AVAILABLE:
-        print(f"De las cuales {ai_updated_count} fueron identificadas con IA avanzada")
+        print(f"De las cuales {stats['ai_resolved']} fueron identificadas con IA avanzada")
     
     # Si quedan noticias sin asignar, sugerir revisión manual
-    remaining = len(df) - updated_count
+    remaining = stats["processed"] - stats["updated"]
     if remaining > 0:
         print(f"Quedan {remaining} noticias que requieren revisión manual")
         choice = input("¿Desea iniciar la revisión manual ahora? (s/n): ")
@@ -2,16 +2,27 @@
 # -*- coding: utf-8 -*-
 """
 Script para programar la ejecución periódica del procesador de calidad de datos.
-Este script ejecuta database_quality_processor.py cada cierto tiempo.
+
+Las tareas siguen las sesiones del mercado (hora de Nueva York, ver
+market_scheduler.py):
+- pre_market (8:30): símbolos de noticias y calidad de datos antes de la apertura.
+- intraday (9:30-16:00): calidad de datos según --interval.
+- post_close (16:15): calidad de datos y, si se configura, envío del boletín.
+- nightly (3:00): calidad de datos y archivo de filas antiguas (--archive).
+- quality_backlog: vacía la cola de calidad cuando acumula trabajos.
 """
 
 import logging
 import sys
 import os
-import time
 import subprocess
 import argparse
-from datetime import datetime, timedelta
+import json
+import threading
+from functools import partial
+from typing import List
+
+from market_scheduler import EventScheduler, ScheduledJob, SchedulerLock, load_metrics
 
 # Configurar logging
 logging.basicConfig(
@@ -60,6 +71,207 @@ def run_data_processor():
         return False
 
 
+def run_data_archiver():
+    """
+    Ejecuta data_archiver.py para mover a las tablas de archivo las filas antiguas
+
+    Returns:
+        bool: True si se ejecutó correctamente, False en caso contrario
+    """
+    try:
+        logger.info("Ejecutando data_archiver.py...")
+
+        script_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "data_archiver.py"
+        )
+
+        result = subprocess.run(
+            [sys.executable, script_path, "archive"], capture_output=True, text=True
+        )
+
+        if result.returncode == 0:
+            logger.info("Archivo de datos completado")
+            logger.info(f"Salida: {result.stdout}")
+            return True
+        else:
+            logger.error(f"Error archivando datos: {result.stderr}")
+            return False
+    except Exception as e:
+        logger.error(f"Error ejecutando data_archiver.py: {str(e)}")
+        return False
+
+
+def start_quality_worker(stop_event: threading.Event) -> threading.Thread:
+    """
+    Inicia en segundo plano el trabajador de la cola de control de calidad
+
+    Args:
+        stop_event (threading.Event): Evento para detener el trabajador
+
+    Returns:
+        threading.Thread: Hilo del trabajador
+    """
+    from quality_job_queue import run_worker
+
+    worker = threading.Thread(
+        target=run_worker,
+        kwargs={"stop_event": stop_event},
+        name="quality-worker",
+        daemon=True,
+    )
+    worker.start()
+    logger.info("Trabajador de la cola de calidad iniciado en segundo plano")
+    return worker
+
+
+def run_news_symbols():
+    """
+    Ejecuta update_news_symbols.py para asignar símbolos a las noticias recientes
+
+    Returns:
+        bool: True si se ejecutó correctamente, False en caso contrario
+    """
+    try:
+        logger.info("Ejecutando update_news_symbols.py...")
+
+        script_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "update_news_symbols.py"
+        )
+
+        result = subprocess.run(
+            [sys.executable, script_path], capture_output=True, text=True
+        )
+
+        if result.returncode == 0:
+            logger.info("Símbolos de noticias actualizados")
+            return True
+        else:
+            logger.error(f"Error actualizando símbolos de noticias: {result.stderr}")
+            return False
+    except Exception as e:
+        logger.error(f"Error ejecutando update_news_symbols.py: {str(e)}")
+        return False
+
+
+def run_command(command: str):
+    """
+    Ejecuta un comando externo configurado (por ejemplo, el envío del boletín)
+
+    Args:
+        command (str): Comando a ejecutar
+
+    Returns:
+        bool: True si se ejecutó correctamente, False en caso contrario
+    """
+    try:
+        logger.info(f"Ejecutando comando: {command}")
+        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+
+        if result.returncode == 0:
+            logger.info(f"Salida: {result.stdout}")
+            return True
+        else:
+            logger.error(f"Error ejecutando comando: {result.stderr}")
+            return False
+    except Exception as e:
+        logger.error(f"Error ejecutando comando {command}: {str(e)}")
+        return False
+
+
+def build_intraday_crons(interval: int) -> List[str]:
+    """
+    Construye las expresiones cron de la actualización intradía (9:30-16:00, hora de NY)
+
+    Args:
+        interval (int): Intervalo entre actualizaciones en segundos
+
+    Returns:
+        List[str]: Expresiones cron
+    """
+    if interval < 3600:
+        minutes = max(1, interval // 60)
+        return [f"*/{minutes} 10-15 * * 1-5", "30 9 * * 1-5", "0 16 * * 1-5"]
+
+    hours = max(1, interval // 3600)
+    return [f"30 9-15/{hours} * * 1-5"]
+
+
+def build_jobs(args) -> List[ScheduledJob]:
+    """
+    Crea las tareas del planificador a partir de los argumentos
+
+    Args:
+        args: Argumentos de línea de comandos
+
+    Returns:
+        List[ScheduledJob]: Tareas programadas
+    """
+
+    def pre_market():
+        symbols_ok = run_news_symbols()
+        return run_data_processor() and symbols_ok
+
+    def post_close():
+        success = run_data_processor()
+        if args.newsletter_command:
+            success = run_command(args.newsletter_command) and success
+        return success
+
+    def nightly():
+        success = run_data_processor()
+        if args.archive:
+            success = run_data_archiver() and success
+        return success
+
+    jobs = [
+        ScheduledJob(
+            "pre_market",
+            pre_market,
+            cron=["30 8 * * 1-5"],
+            jitter=args.jitter,
+            description="Preparación antes de la apertura (símbolos y calidad de datos)",
+        ),
+        ScheduledJob(
+            "intraday",
+            run_data_processor,
+            cron=build_intraday_crons(args.interval),
+            jitter=args.jitter,
+            description="Actualización intradía de la calidad de datos",
+        ),
+        ScheduledJob(
+            "post_close",
+            post_close,
+            cron=["15 16 * * 1-5"],
+            jitter=args.jitter,
+            description="Cierre de sesión (calidad de datos y boletín)",
+        ),
+        ScheduledJob(
+            "nightly",
+            nightly,
+            cron=["0 3 * * *"],
+            jitter=args.jitter,
+            description="Mantenimiento nocturno (calidad de datos y archivo)",
+        ),
+    ]
+
+    # Sin trabajador permanente, la cola de calidad se vacía cuando acumula trabajos
+    if not args.worker:
+        from quality_job_queue import get_pending_count, run_worker
+
+        jobs.append(
+            ScheduledJob(
+                "quality_backlog",
+                partial(run_worker, once=True),
+                backlog_source=get_pending_count,
+                backlog_threshold=args.backlog_threshold,
+                min_interval=60,
+                description="Vaciado de la cola de control de calidad",
+            )
+        )
+
+    return jobs
+
+
 def main():
     """Función principal"""
     # Configurar argumentos de línea de comandos
@@ -70,61 +282,101 @@ def main():
         "--interval",
         type=int,
         default=3600,
-        help="Intervalo de ejecución en segundos (por defecto: 3600 = 1 hora)",
+        help="Intervalo de la actualización intradía en segundos (por defecto: 3600 = 1 hora)",
     )
     parser.add_argument(
         "--max-runs",
         type=int,
         default=0,
-        help="Número máximo de ejecuciones (0 = infinito)",
+        help="Número máximo de ejecuciones de tareas (0 = infinito)",
     )
     parser.add_argument(
         "--run-once", action="store_true", help="Ejecutar una sola vez y salir"
     )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Archivar las filas antiguas (data_archiver.py) en el mantenimiento nocturno",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Procesar en segundo plano la cola de control de calidad (quality_job_queue.py)",
+    )
+    parser.add_argument(
+        "--backlog-threshold",
+        type=int,
+        default=10,
+        help="Trabajos pendientes en la cola de calidad que adelantan su procesamiento",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=60,
+        help="Segundos aleatorios máximos añadidos a cada tarea programada",
+    )
+    parser.add_argument(
+        "--newsletter-command",
+        default=os.environ.get("NEWSLETTER_COMMAND"),
+        help="Comando para enviar el boletín después del cierre (o NEWSLETTER_COMMAND)",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Mostrar las métricas de las tareas y salir",
+    )
 
     # Parsear argumentos
     args = parser.parse_args()
 
-    # Mostrar configuración
-    if args.run_once:
-        logger.info("Modo de ejecución única")
-    else:
-        logger.info(f"Intervalo de ejecución: {args.interval} segundos")
+    if args.status:
+        metrics = load_metrics()
+        if metrics is None:
+            print("No hay métricas del planificador")
+        else:
+            print(json.dumps(metrics, indent=2, ensure_ascii=False))
+        return
+
+    # Una sola instancia a la vez
+    lock = SchedulerLock()
+    if not lock.acquire():
+        logger.error("Ya hay otra instancia del programador en ejecución")
+        sys.exit(1)
+
+    try:
+        # Ejecutar una vez si se especifica
+        if args.run_once:
+            logger.info("Modo de ejecución única")
+            run_data_processor()
+            if args.archive:
+                run_data_archiver()
+            if args.worker:
+                from quality_job_queue import run_worker
+
+                run_worker(once=True)
+            return
+
+        # Trabajador de la cola de calidad en segundo plano
+        stop_event = threading.Event()
+        if args.worker:
+            start_quality_worker(stop_event)
+
         if args.max_runs > 0:
             logger.info(f"Número máximo de ejecuciones: {args.max_runs}")
         else:
             logger.info("Ejecución continua (sin límite)")
 
-    # Ejecutar una vez si se especifica
-    if args.run_once:
-        run_data_processor()
-        return
-
-    # Ejecutar periódicamente
-    run_count = 0
-    try:
-        while True:
-            # Ejecutar el procesador
-            success = run_data_processor()
-            run_count += 1
-
-            # Verificar si se alcanzó el número máximo de ejecuciones
-            if args.max_runs > 0 and run_count >= args.max_runs:
-                logger.info(
-                    f"Se alcanzó el número máximo de ejecuciones ({args.max_runs})"
-                )
-                break
-
-            # Calcular próxima ejecución
-            next_run = datetime.now() + timedelta(seconds=args.interval)
-            logger.info(f"Próxima ejecución: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
-
-            # Esperar hasta la próxima ejecución
-            time.sleep(args.interval)
-    except KeyboardInterrupt:
-        logger.info("Ejecución interrumpida por el usuario")
-    except Exception as e:
-        logger.error(f"Error en la ejecución: {str(e)}")
+        scheduler = EventScheduler(build_jobs(args), stop_event=stop_event)
+        try:
+            scheduler.run(max_runs=args.max_runs)
+        except KeyboardInterrupt:
+            logger.info("Ejecución interrumpida por el usuario")
+        except Exception as e:
+            logger.error(f"Error en la ejecución: {str(e)}")
+        finally:
+            scheduler.stop()
+    finally:
+        lock.release()
 
 
 if __name__ == "__main__":
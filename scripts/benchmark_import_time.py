@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para medir el tiempo de importación del punto de entrada y sus módulos.
+
+Ejecuta cada objetivo en un proceso nuevo con "python -X importtime" (arranque en
+frío, sin nada en sys.modules) y resume el tiempo total de importación, el tiempo
+de reloj del proceso y los módulos de primer nivel más costosos.
+
+El objetivo "entrypoint" carga 📊_InversorIA_Pro.py como módulo sin ejecutar
+main(), que es lo que Streamlit hace antes de dibujar la primera pantalla. Con
+--compare se mide también el punto de entrada de otra revisión de git para ver
+la diferencia.
+
+Uso:
+    python scripts/benchmark_import_time.py
+    python scripts/benchmark_import_time.py --compare HEAD~1 --runs 5
+    python scripts/benchmark_import_time.py --modules market_utils openai --top 15
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ENTRYPOINT = "📊_InversorIA_Pro.py"
+
+# Módulos que el punto de entrada importaba al cargar antes de la carga diferida
+DEFAULT_MODULES = [
+    "market_utils",
+    "trading_dashboard",
+    "enhanced_market_scanner",
+    "technical_analysis",
+    "openai_utils",
+    "authenticator",
+    "plotly.graph_objects",
+    "openai",
+    "mysql.connector",
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+ENTRYPOINT_SNIPPET = """
+import importlib.util, sys
+sys.path.insert(0, {root!r})
+spec = importlib.util.spec_from_file_location("inversoria_pro", {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+"""
+
+
+def run_importtime(code: str) -> Dict:
+    """
+    Ejecuta código en un proceso nuevo con -X importtime
+
+    Args:
+        code (str): Código a ejecutar
+
+    Returns:
+        Dict: {"ok", "wall", "total", "modules": [(cumulativo_us, nombre)], "error"}
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    wall = time.perf_counter() - start
+
+    total_us = 0
+    top_level = []
+    other_lines = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            total_us += int(self_us)
+            if len(indent) <= 1:
+                top_level.append((int(cumulative_us), name))
+        elif not line.startswith("import time:"):
+            other_lines.append(line)
+
+    error = None
+    if proc.returncode != 0:
+        error = (other_lines or ["error desconocido"])[-1]
+
+    return {
+        "ok": proc.returncode == 0,
+        "wall": wall,
+        "total": total_us / 1e6,
+        "modules": sorted(top_level, reverse=True),
+        "error": error,
+    }
+
+
+def benchmark(code: str, runs: int) -> Dict:
+    """Repite la medición y devuelve la mediana (y los módulos de la última)"""
+    results = [run_importtime(code) for _ in range(runs)]
+    last = results[-1]
+    return {
+        **last,
+        "wall": statistics.median(r["wall"] for r in results),
+        "total": statistics.median(r["total"] for r in results),
+    }
+
+
+def entrypoint_code(path: str) -> str:
+    """Código que carga un archivo del punto de entrada sin ejecutar main()"""
+    return ENTRYPOINT_SNIPPET.format(root=ROOT_DIR, path=path)
+
+
+def load_revision(revision: str) -> Optional[str]:
+    """
+    Escribe el punto de entrada de una revisión de git en un archivo temporal
+
+    Args:
+        revision (str): Revisión de git (por ejemplo, HEAD~1)
+
+    Returns:
+        Optional[str]: Ruta del archivo temporal o None si no existe
+    """
+    proc = subprocess.run(
+        ["git", "show", f"{revision}:{ENTRYPOINT}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        print(
+            f"No se pudo leer {ENTRYPOINT} en {revision}: {proc.stderr.decode().strip()}"
+        )
+        return None
+    handle, path = tempfile.mkstemp(suffix=".py", prefix="inversoria_pro_")
+    with os.fdopen(handle, "wb") as f:
+        f.write(proc.stdout)
+    return path
+
+
+def print_result(label: str, result: Dict, top: int):
+    """Muestra el resumen de una medición"""
+    status = "ok" if result["ok"] else f"ERROR: {result['error']}"
+    print(
+        f"{label:<32} importación {result['total'] * 1000:8.1f} ms | "
+        f"proceso {result['wall'] * 1000:8.1f} ms | {status}"
+    )
+    for cumulative_us, name in result["modules"][:top]:
+        print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Mide el tiempo de importación de InversorIA Pro"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="Repeticiones por objetivo (mediana)"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Módulos más costosos a mostrar"
+    )
+    parser.add_argument(
+        "--compare", metavar="REV", help="Revisión de git con la que comparar"
+    )
+    parser.add_argument(
+        "--modules",
+        nargs="*",
+        default=DEFAULT_MODULES,
+        help="Módulos a medir por separado (vacío para omitirlos)",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"Python {sys.version.split()[0]} - mediana de {args.runs} ejecuciones\n")
+
+    current = benchmark(entrypoint_code(os.path.join(ROOT_DIR, ENTRYPOINT)), args.runs)
+    print_result("entrypoint (actual)", current, args.top)
+
+    if args.compare:
+        path = load_revision(args.compare)
+        if path:
+            try:
+                previous = benchmark(entrypoint_code(path), args.runs)
+            finally:
+                os.remove(path)
+            print_result(f"entrypoint ({args.compare})", previous, args.top)
+            if current["ok"] and previous["ok"]:
+                saved = previous["total"] - current["total"]
+                print(
+                    f"\nDiferencia en importación: {saved * 1000:+.1f} ms "
+                    f"({saved / previous['total'] * 100 if previous['total'] else 0:.0f}%)"
+                )
+
+    if args.modules:
+        print("\nMódulos por separado:")
+        for module in args.modules:
+            print_result(module, benchmark(f"import {module}", args.runs), 0)
+
+    return 0 if current["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para generar el informe EXPLAIN de las consultas más frecuentes.
+
+Ejecuta EXPLAIN sobre cada consulta crítica (señales, noticias, sentimiento y control
+de calidad), antes y después de la optimización, y escribe sql/explain_hot_queries.md
+con los dos planes y el índice esperado. Con --offline solo se documentan los planes
+esperados.
+
+Uso:
+    python scripts/explain_hot_queries.py            # Consulta la base de datos
+    python scripts/explain_hot_queries.py --offline  # Sin conexión
+"""
+
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Añadir directorio raíz al path para importar módulos del proyecto principal
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+REPORT_PATH = os.path.join(ROOT_DIR, "sql", "explain_hot_queries.md")
+
+# Consultas críticas: nombre, origen, SQL antes y después de la optimización,
+# parámetros de ejemplo y plan esperado. La consulta "before" es la forma original
+# (predicados DATE(col) o condiciones sobre TEXT); cuando solo cambió el índice se
+# usa IGNORE INDEX para reproducir el plan anterior a la migración.
+HOT_QUERIES = [
+    {
+        "name": "Señales recientes filtradas",
+        "origin": "DatabaseManager.get_signals",
+        "note": "category y confidence_level se filtran dentro del índice en lugar de leer cada fila",
+        "before_query": """SELECT * FROM trading_signals
+                  IGNORE INDEX (idx_created_category_confidence)
+                  WHERE created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
+                  AND category IN (%s, %s) AND confidence_level IN (%s)
+                  ORDER BY created_at DESC""",
+        "query": """SELECT * FROM trading_signals
+                  WHERE created_at >= DATE_SUB(NOW(), INTERVAL %s DAY)
+                  AND category IN (%s, %s) AND confidence_level IN (%s)
+                  ORDER BY created_at DESC""",
+        "params": [7, "Tecnología", "Finanzas", "Alta"],
+        "expected_before": ("idx_created_at", "range"),
+        "expected": ("idx_created_category_confidence", "range"),
+    },
+    {
+        "name": "Señal del día por símbolo",
+        "origin": "SignalManager.send_newsletter",
+        "note": "DATE(created_at) no es indexable; el rango usa el índice compuesto sin leer la fila",
+        "before_query": """SELECT id FROM trading_signals
+                  WHERE symbol = %s AND DATE(created_at) = CURDATE()
+                  LIMIT 1""",
+        "before_params": ["AAPL"],
+        "query": """SELECT id FROM trading_signals
+                  WHERE symbol = %s
+                    AND created_at >= CURDATE()
+                    AND created_at < CURDATE() + INTERVAL 1 DAY
+                  LIMIT 1""",
+        "params": ["AAPL"],
+        "expected_before": ("idx_symbol", "ref"),
+        "expected": ("idx_symbol_created", "range"),
+    },
+    {
+        "name": "Último análisis por símbolo",
+        "origin": "DatabaseManager.get_detailed_analysis",
+        "note": "el índice ya entrega las filas ordenadas: desaparece el filesort",
+        "before_query": """SELECT * FROM trading_signals
+                  IGNORE INDEX (idx_symbol_created)
+                  WHERE symbol = %s
+                  ORDER BY created_at DESC
+                  LIMIT 1""",
+        "query": """SELECT * FROM trading_signals
+                  WHERE symbol = %s
+                  ORDER BY created_at DESC
+                  LIMIT 1""",
+        "params": ["AAPL"],
+        "expected_before": ("idx_symbol", "ref"),
+        "expected": ("idx_symbol_created", "ref"),
+    },
+    {
+        "name": "Señales sin análisis experto",
+        "origin": "database_quality_utils.get_empty_trading_signals_analysis",
+        "note": "la condición sobre TEXT obligaba a recorrer la tabla; la columna generada está indexada",
+        "before_query": """SELECT id, symbol FROM trading_signals
+                  WHERE (expert_analysis IS NULL OR expert_analysis = '')
+                  ORDER BY id DESC
+                  LIMIT %s""",
+        "query": """SELECT id, symbol FROM trading_signals
+                  WHERE expert_analysis_missing = 1
+                  ORDER BY id DESC
+                  LIMIT %s""",
+        "params": [10],
+        "expected_before": ("PRIMARY", "index"),
+        "expected": ("idx_expert_analysis_missing", "ref"),
+    },
+    {
+        "name": "Noticia duplicada (título y día)",
+        "origin": "DatabaseManager.save_market_news",
+        "note": "no había índice sobre title y DATE(news_date) no es indexable",
+        "before_query": """SELECT id FROM market_news
+                  WHERE title = %s AND DATE(news_date) = DATE(%s)""",
+        "before_params": ["Título de ejemplo", "2025-01-01"],
+        "query": """SELECT id FROM market_news
+                  WHERE title = %s
+                    AND news_date >= DATE(%s)
+                    AND news_date < DATE(%s) + INTERVAL 1 DAY""",
+        "params": ["Título de ejemplo", "2025-01-01", "2025-01-01"],
+        "expected_before": (None, "ALL"),
+        "expected": ("idx_title_news_date", "range"),
+    },
+    {
+        "name": "Noticias recientes",
+        "origin": "DatabaseManager.get_market_news",
+        "note": "DATE(news_date) obligaba a recorrer el índice completo; ahora es un rango",
+        "before_query": """SELECT * FROM market_news
+                  WHERE DATE(news_date) >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+                  ORDER BY news_date DESC
+                  LIMIT %s""",
+        "query": """SELECT * FROM market_news
+                  WHERE news_date >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+                  ORDER BY news_date DESC
+                  LIMIT %s""",
+        "params": [7, 5],
+        "expected_before": ("idx_news_date", "index"),
+        "expected": ("idx_news_date", "range"),
+    },
+    {
+        "name": "Noticias sin resumen",
+        "origin": "database_quality_utils.get_empty_news_summaries",
+        "note": "la condición sobre TEXT obligaba a recorrer la tabla; la columna generada está indexada",
+        "before_query": """SELECT id, title, symbol FROM market_news
+                  WHERE (summary IS NULL OR summary = '')
+                  ORDER BY id DESC
+                  LIMIT %s""",
+        "query": """SELECT id, title, symbol FROM market_news
+                  WHERE summary_missing = 1
+                  ORDER BY id DESC
+                  LIMIT %s""",
+        "params": [10],
+        "expected_before": ("PRIMARY", "index"),
+        "expected": ("idx_summary_missing", "ref"),
+    },
+    {
+        "name": "Sentimiento del día",
+        "origin": "save_market_sentiment",
+        "note": "no había índice sobre created_at y DATE(created_at) no es indexable",
+        "before_query": """SELECT id FROM market_sentiment
+                  WHERE DATE(created_at) = %s""",
+        "before_params": ["2025-01-01"],
+        "query": """SELECT id FROM market_sentiment
+                  WHERE created_at >= %s AND created_at < %s + INTERVAL 1 DAY""",
+        "params": ["2025-01-01", "2025-01-01"],
+        "expected_before": (None, "ALL"),
+        "expected": ("idx_created_at", "range"),
+    },
+]
+
+
+def explain_query(connection, query: str, params: list) -> list:
+    """
+    Ejecuta EXPLAIN sobre una consulta
+
+    Args:
+        connection: Conexión a la base de datos
+        query (str): Consulta SQL
+        params (list): Parámetros de ejemplo
+
+    Returns:
+        list: Filas devueltas por EXPLAIN
+    """
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(f"EXPLAIN {query}", params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def _plan_cell(plan: list) -> str:
+    """Resume la primera fila de EXPLAIN como key / type / rows / Extra"""
+    first = (plan or [{}])[0]
+    return (
+        f"{first.get('key') or 'NULL'} / {first.get('type') or '-'} / "
+        f"{first.get('rows') or '-'} / {first.get('Extra') or '-'}"
+    )
+
+
+def _expected_cell(expected: tuple) -> str:
+    """Formatea un plan esperado (key, type)"""
+    key, access_type = expected
+    return f"{key or 'NULL'} / {access_type}"
+
+
+def build_report(results: list, offline: bool) -> str:
+    """
+    Construye el informe en formato Markdown
+
+    Args:
+        results (list): Resultados por consulta
+        offline (bool): Si el informe se generó sin conexión
+
+    Returns:
+        str: Contenido del informe
+    """
+    lines = [
+        "# Plan de ejecución de las consultas críticas",
+        "",
+        "Generado por `scripts/explain_hot_queries.py` el "
+        f"{datetime.now().strftime('%Y-%m-%d %H:%M')}.",
+        "Requiere haber aplicado `sql/add_performance_indexes.sql`. La columna",
+        "\"Antes\" corresponde a la forma original de cada consulta (predicados",
+        "`DATE(col)` o condiciones sobre columnas TEXT) o, si solo cambió el índice, a",
+        "la misma consulta con `IGNORE INDEX`.",
+        "",
+    ]
+
+    if offline:
+        lines += [
+            "> Generado con `--offline`: los planes son los **esperados** según los",
+            "> índices definidos, no medidos. Ejecute el script contra la base de datos",
+            "> para sustituirlos por la salida real de EXPLAIN.",
+            "",
+            "| Consulta | Origen | Antes (key / type) | Después (key / type) | Motivo |",
+            "|---|---|---|---|---|",
+        ]
+        for result in results:
+            spec = result["spec"]
+            lines.append(
+                f"| {spec['name']} | `{spec['origin']}` "
+                f"| {_expected_cell(spec['expected_before'])} "
+                f"| {_expected_cell(spec['expected'])} | {spec['note']} |"
+            )
+    else:
+        lines += [
+            "| Consulta | Origen | Antes (key / type / rows / Extra) "
+            "| Después (key / type / rows / Extra) | Esperado | Estado |",
+            "|---|---|---|---|---|---|",
+        ]
+        for result in results:
+            spec = result["spec"]
+            plan = result.get("plan") or [{}]
+            if result.get("error"):
+                status = f"error: {result['error']}"
+            elif (plan[0].get("key"), plan[0].get("type")) == spec["expected"]:
+                status = "OK"
+            else:
+                status = "revisar"
+            lines.append(
+                f"| {spec['name']} | `{spec['origin']}` "
+                f"| {_plan_cell(result.get('before_plan'))} | {_plan_cell(plan)} "
+                f"| {_expected_cell(spec['expected'])} | {status} |"
+            )
+
+    lines += ["", "## Consultas", ""]
+    for result in results:
+        spec = result["spec"]
+        lines += [f"### {spec['name']}", ""]
+        for title, sql in (("Antes", spec["before_query"]), ("Después", spec["query"])):
+            query = "\n".join(line.strip() for line in sql.splitlines())
+            lines += [f"{title}:", "", "```sql", query, "```", ""]
+
+    return "\n".join(lines)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(
+        description="Generar el informe EXPLAIN de las consultas críticas"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Generar el informe sin conectarse a la base de datos",
+    )
+    parser.add_argument(
+        "--output", type=str, default=REPORT_PATH, help="Ruta del informe"
+    )
+    args = parser.parse_args()
+
+    results = [{"spec": spec} for spec in HOT_QUERIES]
+
+    if not args.offline:
+        from database_quality_utils import load_db_config, connect_to_db
+
+        connection = connect_to_db(load_db_config())
+        if not connection:
+            logger.error("No se pudo conectar a la base de datos")
+            return 1
+
+        for result in results:
+            spec = result["spec"]
+            try:
+                result["before_plan"] = explain_query(
+                    connection,
+                    spec["before_query"],
+                    spec.get("before_params", spec["params"]),
+                )
+                result["plan"] = explain_query(
+                    connection, spec["query"], spec["params"]
+                )
+            except Exception as e:
+                logger.error(f"Error ejecutando EXPLAIN para {spec['name']}: {str(e)}")
+                result["error"] = str(e)
+
+        connection.close()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(build_report(results, args.offline))
+
+    logger.info(f"Informe guardado en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
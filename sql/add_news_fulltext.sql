@@ -0,0 +1,16 @@
+-- Script para añadir índices FULLTEXT a la tabla market_news
+-- Permite búsquedas por palabras clave ordenadas por relevancia y la detección de
+-- noticias con títulos casi duplicados en una sola consulta indexada.
+-- Usado por DatabaseManager.search_market_news, search_news_by_symbol y
+-- find_similar_news_titles (database_utils.py).
+
+-- Búsqueda por palabras clave sobre título y resumen
+ALTER TABLE market_news
+    ADD FULLTEXT INDEX IF NOT EXISTS ft_title_summary (title, summary);
+
+-- Búsqueda de títulos similares (MATCH requiere un índice con exactamente las mismas columnas)
+ALTER TABLE market_news
+    ADD FULLTEXT INDEX IF NOT EXISTS ft_title (title);
+
+-- Actualizar estadísticas
+ANALYZE TABLE market_news;
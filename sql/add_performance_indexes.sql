@@ -0,0 +1,64 @@
+-- Script para añadir índices compuestos y de cobertura para las consultas más frecuentes
+-- Las consultas de los paneles filtran por fecha de creación junto con categoría y
+-- nivel de confianza, y el control de calidad busca campos de texto vacíos.
+-- sql/explain_hot_queries.md recoge el plan de cada consulta antes y después de la migración
+-- (scripts/explain_hot_queries.py lo regenera contra la base de datos).
+
+-- =============================================================================
+-- trading_signals
+-- =============================================================================
+
+-- get_signals: WHERE created_at >= ... AND category IN (...) AND confidence_level IN (...)
+--              ORDER BY created_at DESC
+-- El rango sobre created_at conserva el orden y category/confidence_level se evalúan
+-- dentro del índice (Index Condition Pushdown) sin leer la fila completa.
+ALTER TABLE trading_signals
+    ADD INDEX IF NOT EXISTS idx_created_category_confidence (created_at, category, confidence_level);
+
+-- send_newsletter / get_detailed_analysis:
+--   WHERE symbol = %s AND created_at >= CURDATE() AND created_at < CURDATE() + INTERVAL 1 DAY
+--   WHERE symbol = %s ORDER BY created_at DESC LIMIT 1
+ALTER TABLE trading_signals
+    ADD INDEX IF NOT EXISTS idx_symbol_created (symbol, created_at);
+
+-- get_empty_trading_signals_analysis: una columna generada hace indexable la condición
+-- (expert_analysis IS NULL OR expert_analysis = '') sobre un campo TEXT.
+ALTER TABLE trading_signals
+    ADD COLUMN IF NOT EXISTS expert_analysis_missing TINYINT(1)
+        AS (expert_analysis IS NULL OR expert_analysis = '') STORED
+        COMMENT 'Indica si el análisis experto está vacío (columna generada)',
+    ADD INDEX IF NOT EXISTS idx_expert_analysis_missing (expert_analysis_missing);
+
+-- =============================================================================
+-- market_news
+-- =============================================================================
+
+-- save_market_news (detección de duplicados):
+--   WHERE title = %s AND news_date >= DATE(%s) AND news_date < DATE(%s) + INTERVAL 1 DAY
+-- Prefijo de 191 caracteres para respetar el límite de 767 bytes en utf8mb4.
+ALTER TABLE market_news
+    ADD INDEX IF NOT EXISTS idx_title_news_date (title(191), news_date);
+
+-- Noticias por símbolo ordenadas por fecha (paneles y boletín)
+ALTER TABLE market_news
+    ADD INDEX IF NOT EXISTS idx_symbol_news_date (symbol, news_date);
+
+-- get_empty_news_summaries: misma técnica que expert_analysis_missing.
+ALTER TABLE market_news
+    ADD COLUMN IF NOT EXISTS summary_missing TINYINT(1)
+        AS (summary IS NULL OR summary = '') STORED
+        COMMENT 'Indica si el resumen está vacío (columna generada)',
+    ADD INDEX IF NOT EXISTS idx_summary_missing (summary_missing);
+
+-- =============================================================================
+-- market_sentiment
+-- =============================================================================
+
+-- save_market_sentiment: WHERE created_at >= %s AND created_at < %s + INTERVAL 1 DAY
+ALTER TABLE market_sentiment
+    ADD INDEX IF NOT EXISTS idx_created_at (created_at);
+
+-- =============================================================================
+-- Actualizar estadísticas para que el optimizador considere los nuevos índices
+-- =============================================================================
+ANALYZE TABLE trading_signals, market_news, market_sentiment;
@@ -0,0 +1,47 @@
+-- Tablas de archivo y de resumen para el histórico de señales, noticias y envíos
+-- Las tablas principales conservan solo la ventana reciente (ver data_archiver.py);
+-- las filas antiguas se mueven a las tablas *_archive y los gráficos de largo plazo
+-- leen de las tablas *_daily_summary.
+-- Se usa una división caliente/archivo en lugar de particiones RANGE porque MySQL
+-- exige que la columna de partición forme parte de la clave primaria y no admite
+-- claves foráneas en tablas particionadas (newsletter_send_logs -> email_logs).
+
+-- =============================================================================
+-- Tablas de archivo (misma estructura que la tabla principal)
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS trading_signals_archive LIKE trading_signals;
+CREATE TABLE IF NOT EXISTS market_news_archive LIKE market_news;
+CREATE TABLE IF NOT EXISTS email_logs_archive LIKE email_logs;
+
+-- =============================================================================
+-- Tablas de resumen diario para gráficos de largo plazo
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS trading_signals_daily_summary (
+    summary_date DATE NOT NULL COMMENT 'Día de las señales',
+    symbol VARCHAR(20) NOT NULL COMMENT 'Símbolo del activo',
+    direction VARCHAR(10) NOT NULL COMMENT 'Dirección de la señal',
+    confidence_level VARCHAR(10) NOT NULL COMMENT 'Nivel de confianza',
+    signal_count INT NOT NULL DEFAULT 0 COMMENT 'Número de señales',
+    avg_price DECIMAL(10, 2) COMMENT 'Precio medio',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (summary_date, symbol, direction, confidence_level),
+    INDEX idx_symbol_date (symbol, summary_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Resumen diario de señales de trading';
+
+CREATE TABLE IF NOT EXISTS market_news_daily_summary (
+    summary_date DATE NOT NULL COMMENT 'Día de las noticias',
+    symbol VARCHAR(20) NOT NULL COMMENT 'Símbolo del activo',
+    impact VARCHAR(10) NOT NULL COMMENT 'Impacto de la noticia',
+    news_count INT NOT NULL DEFAULT 0 COMMENT 'Número de noticias',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (summary_date, symbol, impact),
+    INDEX idx_symbol_date (symbol, summary_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Resumen diario de noticias de mercado';
+
+CREATE TABLE IF NOT EXISTS email_logs_daily_summary (
+    summary_date DATE NOT NULL COMMENT 'Día de los envíos',
+    status VARCHAR(20) NOT NULL COMMENT 'Estado del envío',
+    send_count INT NOT NULL DEFAULT 0 COMMENT 'Número de envíos',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (summary_date, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Resumen diario de envíos de boletines';
@@ -0,0 +1,35 @@
+-- Tablas para el control de calidad incremental (ver database_quality_utils.py)
+-- quality_watermarks guarda, por tabla, el último ID revisado y el momento de la
+-- última revisión; cada ejecución solo lee las filas nuevas (id > last_id) o
+-- modificadas (updated_at >= last_scan_at).
+-- quality_enrichment_queue contiene las filas que necesitan enriquecimiento por cada
+-- verificación (resumen vacío, símbolo en revisión, etc.). Las filas se añaden o se
+-- eliminan al revisarlas, de modo que los conteos y las búsquedas de pendientes solo
+-- recorren la cola y no la tabla completa.
+
+CREATE TABLE IF NOT EXISTS quality_watermarks (
+    table_name VARCHAR(64) NOT NULL PRIMARY KEY COMMENT 'Tabla revisada',
+    last_id BIGINT NOT NULL DEFAULT 0 COMMENT 'Último ID revisado',
+    last_scan_at DATETIME NULL COMMENT 'Inicio de la última revisión',
+    rows_scanned BIGINT NOT NULL DEFAULT 0 COMMENT 'Filas leídas en la última revisión',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS quality_enrichment_queue (
+    check_name VARCHAR(32) NOT NULL COMMENT 'Verificación (news_summary, sentiment_fields, ...)',
+    table_name VARCHAR(64) NOT NULL COMMENT 'Tabla del registro',
+    record_id BIGINT NOT NULL COMMENT 'ID del registro que necesita enriquecimiento',
+    queued_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Fecha en que se detectó',
+    PRIMARY KEY (check_name, record_id),
+    INDEX idx_table_record (table_name, record_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Índices para leer solo las filas modificadas desde la última revisión
+ALTER TABLE market_news
+    ADD INDEX IF NOT EXISTS idx_updated_at (updated_at);
+
+ALTER TABLE market_sentiment
+    ADD INDEX IF NOT EXISTS idx_updated_at (updated_at);
+
+ALTER TABLE trading_signals
+    ADD INDEX IF NOT EXISTS idx_updated_at (updated_at);
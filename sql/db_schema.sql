@@ -1,6 +1,9 @@
 -- Esquema de base de datos para el sistema de notificaciones de InversorIA Pro
 -- Este archivo contiene las definiciones de las tablas necesarias para almacenar
 -- señales de trading y registros de envíos de boletines.
+-- Incluye los índices y columnas generadas de add_performance_indexes.sql, así
+-- como las columnas en las que se basan (trading_signals.expert_analysis y
+-- market_news.symbol).
 
 -- Tabla para almacenar señales de trading
 CREATE TABLE IF NOT EXISTS trading_signals (
@@ -13,13 +16,18 @@ CREATE TABLE IF NOT EXISTS trading_signals (
     strategy VARCHAR(100) COMMENT 'Estrategia utilizada para generar la señal',
     category VARCHAR(50) COMMENT 'Categoría del activo (tecnología, finanzas, etc.)',
     analysis TEXT COMMENT 'Análisis detallado que justifica la señal',
+    expert_analysis TEXT COMMENT 'Análisis del experto',
+    expert_analysis_missing TINYINT(1) AS (expert_analysis IS NULL OR expert_analysis = '') STORED COMMENT 'Indica si el análisis experto está vacío (columna generada)',
     created_at DATETIME NOT NULL COMMENT 'Fecha y hora de creación de la señal',
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Fecha y hora de última actualización',
     INDEX idx_symbol (symbol),
     INDEX idx_direction (direction),
     INDEX idx_confidence (confidence_level),
     INDEX idx_category (category),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    INDEX idx_created_category_confidence (created_at, category, confidence_level),
+    INDEX idx_symbol_created (symbol, created_at),
+    INDEX idx_expert_analysis_missing (expert_analysis_missing)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Señales de trading generadas por el sistema';
 
 -- Tabla para almacenar registros de envíos de boletines
@@ -46,7 +54,8 @@ CREATE TABLE IF NOT EXISTS market_sentiment (
     volume VARCHAR(100) COMMENT 'Descripción del volumen',
     notes TEXT COMMENT 'Notas adicionales sobre el sentimiento',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Fecha y hora de registro',
-    UNIQUE INDEX idx_date (date)
+    UNIQUE INDEX idx_date (date),
+    INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Registro diario del sentimiento de mercado';
 
 -- Tabla para almacenar noticias relevantes
@@ -54,11 +63,16 @@ CREATE TABLE IF NOT EXISTS market_news (
     id INT AUTO_INCREMENT PRIMARY KEY,
     title VARCHAR(255) NOT NULL COMMENT 'Título de la noticia',
     summary TEXT COMMENT 'Resumen de la noticia',
+    summary_missing TINYINT(1) AS (summary IS NULL OR summary = '') STORED COMMENT 'Indica si el resumen está vacío (columna generada)',
     source VARCHAR(100) COMMENT 'Fuente de la noticia',
     url VARCHAR(255) COMMENT 'URL de la noticia original',
     news_date DATETIME COMMENT 'Fecha y hora de la noticia',
     impact ENUM('Alto', 'Medio', 'Bajo') COMMENT 'Impacto potencial en el mercado',
+    symbol VARCHAR(20) COMMENT 'Símbolo del activo relacionado',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT 'Fecha y hora de registro',
     INDEX idx_news_date (news_date),
-    INDEX idx_impact (impact)
+    INDEX idx_impact (impact),
+    INDEX idx_title_news_date (title(191), news_date),
+    INDEX idx_symbol_news_date (symbol, news_date),
+    INDEX idx_summary_missing (summary_missing)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Noticias relevantes del mercado';
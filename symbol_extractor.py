@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extracción de símbolos bursátiles a partir de títulos y resúmenes de noticias.
+
+El extractor se construye una sola vez al importar el módulo: todos los patrones
+(símbolos entre paréntesis, prefijos de bolsa, tickers sueltos, nombres de
+compañías, alias e índices) se combinan en una única expresión regular con
+alternativas, de modo que cada texto se recorre una sola vez.
+
+La puntuación es la misma que usaba extract_symbol_from_content:
+    - Símbolo de contexto explícito: 5.0
+    - (AAPL) o NYSE:AAPL: 3.0 en el título / 2.0 en el contenido
+    - Nombre de la compañía: 2.5 / 1.5 (una vez por nombre)
+    - Ticker suelto en mayúsculas: 2.0 / 1.0 por aparición (también dentro de
+      paréntesis y tras el prefijo de bolsa)
+    - Índice (S&P 500, Nasdaq, ...): 1.5 / 0.8 (una vez por nombre)
+
+Los empates se resuelven de forma determinista a favor del símbolo que aparece
+primero (el de contexto, luego el título y después el contenido).
+"""
+
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from company_data import COMPANY_INFO
+
+logger = logging.getLogger(__name__)
+
+# Abreviaturas que no son símbolos aunque aparezcan en mayúsculas
+COMMON_ABBREVIATIONS = frozenset(
+    {
+        "CEO", "CFO", "CTO", "COO", "USA", "UK", "EU", "Q1", "Q2", "Q3", "Q4",
+        "AI", "IPO", "ETF", "SEC", "FED", "GDP", "CPI",
+    }
+)
+
+# Índices comunes y el ETF que los representa
+INDEX_ALIASES: Dict[str, str] = {
+    "S&P 500": "SPY",
+    "S&P500": "SPY",
+    "SP500": "SPY",
+    "Dow Jones": "DIA",
+    "DJIA": "DIA",
+    "Nasdaq": "QQQ",
+    "Nasdaq 100": "QQQ",
+    "Russell 2000": "IWM",
+    "VIX": "VIX",
+    "Volatilidad": "VIX",
+}
+
+# Nombres cortos con los que los titulares suelen referirse a las compañías
+COMPANY_ALIASES: Dict[str, str] = {
+    "Apple": "AAPL",
+    "Microsoft": "MSFT",
+    "Alphabet": "GOOGL",
+    "Google": "GOOGL",
+    "Amazon": "AMZN",
+    "Nvidia": "NVDA",
+    "Tesla": "TSLA",
+    "Meta Platforms": "META",
+    "Facebook": "META",
+    "Netflix": "NFLX",
+    "JPMorgan": "JPM",
+    "Goldman Sachs": "GS",
+    "ExxonMobil": "XOM",
+    "Exxon": "XOM",
+}
+
+# Puntuaciones (título, contenido)
+SCORE_CONTEXT = 5.0
+SCORE_EXPLICIT = (3.0, 2.0)
+SCORE_NAME = (2.5, 1.5)
+SCORE_TICKER = (2.0, 1.0)
+SCORE_INDEX = (1.5, 0.8)
+
+
+class SymbolExtractor:
+    """
+    Extractor de símbolos con un único patrón compilado
+    """
+
+    def __init__(
+        self,
+        company_info: Dict[str, Dict[str, str]],
+        company_aliases: Optional[Dict[str, str]] = None,
+        index_aliases: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Construye el patrón a partir de los datos de las compañías
+
+        Args:
+            company_info (Dict[str, Dict[str, str]]): Datos de company_data.COMPANY_INFO
+            company_aliases (Optional[Dict[str, str]]): Nombres alternativos -> símbolo
+            index_aliases (Optional[Dict[str, str]]): Nombres de índices -> símbolo
+        """
+        self.symbols = frozenset(company_info)
+
+        # Nombres en minúsculas -> (símbolo, tipo de coincidencia)
+        self.names: Dict[str, Tuple[str, str]] = {}
+        for symbol, info in company_info.items():
+            name = info.get("name", "")
+            if name and len(name) > 3:  # Evitar nombres muy cortos
+                self.names.setdefault(name.lower(), (symbol, "name"))
+        for alias, symbol in (company_aliases or {}).items():
+            if symbol in self.symbols:
+                self.names.setdefault(alias.lower(), (symbol, "name"))
+        for alias, symbol in (index_aliases or {}).items():
+            self.names.setdefault(alias.lower(), (symbol, "index"))
+
+        # Los nombres más largos primero para que "Nasdaq 100" gane a "Nasdaq"
+        names_pattern = "|".join(
+            re.escape(name) for name in sorted(self.names, key=len, reverse=True)
+        )
+        self.pattern = re.compile(
+            r"\((?P<paren>[A-Z]{1,5})\)"
+            r"|\b(?P<exchange>NYSE|NASDAQ):\s*(?P<exchange_symbol>[A-Z]{1,5})\b"
+            rf"|(?<!\w)(?P<name>(?i:{names_pattern}))(?!\w)"
+            r"|\b(?P<ticker>[A-Z]{2,5})\b"
+        )
+
+    def score(
+        self, title: str, content: str = None, context_symbol: str = None
+    ) -> Dict[str, float]:
+        """
+        Calcula la puntuación de cada símbolo candidato
+
+        Args:
+            title (str): Título de la noticia
+            content (str, optional): Contenido o resumen de la noticia
+            context_symbol (str, optional): Símbolo que se está analizando
+
+        Returns:
+            Dict[str, float]: Puntuación por símbolo, en orden de primera aparición
+        """
+        candidates: Dict[str, float] = {}
+        if context_symbol and context_symbol in self.symbols:
+            candidates[context_symbol] = SCORE_CONTEXT
+
+        seen_names = set()
+        for position, text in enumerate((title, content)):
+            if not text:
+                continue
+            for match in self.pattern.finditer(text):
+                kind = match.lastgroup
+                if kind == "paren":
+                    symbol = match.group("paren")
+                    if symbol in COMMON_ABBREVIATIONS or len(symbol) < 2:
+                        continue
+                    scores = (SCORE_EXPLICIT[position], SCORE_TICKER[position])
+                elif kind == "exchange_symbol":
+                    symbol = match.group("exchange_symbol")
+                    scores = (SCORE_EXPLICIT[position],)
+                    if len(symbol) >= 2 and symbol not in COMMON_ABBREVIATIONS:
+                        scores += (SCORE_TICKER[position],)
+                elif kind == "name":
+                    name = match.group("name").lower()
+                    if name in seen_names:
+                        continue
+                    seen_names.add(name)
+                    symbol, name_kind = self.names[name]
+                    table = SCORE_INDEX if name_kind == "index" else SCORE_NAME
+                    candidates[symbol] = candidates.get(symbol, 0) + table[position]
+                    continue
+                else:
+                    symbol = match.group("ticker")
+                    if symbol in COMMON_ABBREVIATIONS:
+                        continue
+                    scores = (SCORE_TICKER[position],)
+
+                if symbol in self.symbols:
+                    candidates[symbol] = candidates.get(symbol, 0) + sum(scores)
+
+        return candidates
+
+    def extract(
+        self, title: str, content: str = None, context_symbol: str = None
+    ) -> Optional[str]:
+        """
+        Devuelve el símbolo con mayor puntuación
+
+        Args:
+            title (str): Título de la noticia
+            content (str, optional): Contenido o resumen de la noticia
+            context_symbol (str, optional): Símbolo que se está analizando
+
+        Returns:
+            Optional[str]: Símbolo extraído o None si no se encuentra
+        """
+        candidates = self.score(title, content, context_symbol)
+        if not candidates:
+            return None
+
+        # El diccionario conserva el orden de aparición: en caso de empate gana el
+        # primer símbolo encontrado
+        best_score = max(candidates.values())
+        return next(
+            symbol for symbol, score in candidates.items() if score == best_score
+        )
+
+    def extract_many(
+        self,
+        items: Iterable[Tuple[str, Optional[str]]],
+        context_symbol: str = None,
+    ) -> List[Optional[str]]:
+        """
+        Extrae el símbolo de varias noticias
+
+        Args:
+            items (Iterable[Tuple[str, Optional[str]]]): Pares (título, contenido)
+            context_symbol (str, optional): Símbolo común a todas las noticias
+
+        Returns:
+            List[Optional[str]]: Símbolo de cada noticia (None si no se encuentra)
+        """
+        return [
+            self.extract(title, content, context_symbol) for title, content in items
+        ]
+
+
+# Extractor compartido, construido una sola vez al importar el módulo
+symbol_extractor = SymbolExtractor(COMPANY_INFO, COMPANY_ALIASES, INDEX_ALIASES)
+
+
+def extract_symbol(
+    title: str, content: str = None, context_symbol: str = None
+) -> Optional[str]:
+    """
+    Extrae el símbolo de una noticia con el extractor compartido
+
+    Args:
+        title (str): Título de la noticia
+        content (str, optional): Contenido o resumen de la noticia
+        context_symbol (str, optional): Símbolo que se está analizando
+
+    Returns:
+        Optional[str]: Símbolo extraído o None si no se encuentra
+    """
+    return symbol_extractor.extract(title, content, context_symbol)
@@ -6,8 +6,11 @@ Incluye funciones para detectar idiomas y traducir texto.
 """
 
 import re
+import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from language_detection import is_english, is_english_batch
 
 # Configurar logging
 logging.basicConfig(
@@ -25,42 +28,42 @@ try:
 except ImportError:
     logger.warning("AIExpert no está disponible en text_processing.py. Se usarán métodos alternativos.")
 
+# Experto en IA compartido por todas las traducciones (se crea al primer uso)
+_ai_expert = None
+
+# Etiquetas que el modelo antepone a veces a la traducción ("Traducción: ...")
+TRANSLATION_LABEL_PATTERN = re.compile(
+    r"^(?:t[ií]tulo(?: traducido)?|traducci[oó]n)\s*:\s*", re.IGNORECASE
+)
+
+
+def get_ai_expert():
+    """
+    Devuelve el experto en IA compartido del módulo
+    
+    Returns:
+        AIExpert: Instancia compartida o None si no está disponible
+    """
+    global _ai_expert
+    if _ai_expert is None and AI_EXPERT_AVAILABLE:
+        _ai_expert = AIExpert()
+    return _ai_expert
+
 
 def is_english_text(text: str) -> bool:
     """
     Detecta si un texto está en inglés
     
+    Usa el detector compartido de language_detection.py, que divide el texto en
+    palabras una sola vez y las compara con conjuntos de palabras vacías.
+    
     Args:
         text (str): Texto a analizar
         
     Returns:
         bool: True si el texto parece estar en inglés, False en caso contrario
     """
-    if not text or len(text) < 10:
-        return False
-    
-    # Palabras comunes en inglés que no suelen usarse en español
-    english_words = [
-        r'\bthe\b', r'\band\b', r'\bof\b', r'\bto\b', r'\ba\b', r'\bin\b', 
-        r'\bthat\b', r'\bhave\b', r'\bI\b', r'\bit\b', r'\bfor\b', r'\bnot\b', 
-        r'\bon\b', r'\bwith\b', r'\bhe\b', r'\bas\b', r'\byou\b', r'\bdo\b', 
-        r'\bat\b', r'\bthis\b', r'\bbut\b', r'\bhis\b', r'\bby\b', r'\bfrom\b',
-        r'\bthey\b', r'\bwe\b', r'\bsay\b', r'\bher\b', r'\bshe\b', r'\bor\b',
-        r'\ban\b', r'\bwill\b', r'\bmy\b', r'\bone\b', r'\ball\b', r'\bwould\b',
-        r'\bthere\b', r'\btheir\b', r'\bwhat\b', r'\bso\b', r'\bup\b', r'\bout\b',
-        r'\bif\b', r'\babout\b', r'\bwho\b', r'\bget\b', r'\bwhich\b', r'\bgo\b',
-        r'\bme\b', r'\bwhen\b', r'\bmake\b', r'\bcan\b', r'\blike\b', r'\btime\b',
-        r'\bno\b', r'\bjust\b', r'\bhim\b', r'\bknow\b', r'\btake\b', r'\bpeople\b'
-    ]
-    
-    # Contar palabras en inglés
-    english_count = 0
-    for word in english_words:
-        if re.search(word, text.lower()):
-            english_count += 1
-    
-    # Si hay más de 3 palabras en inglés, consideramos que el texto está en inglés
-    return english_count > 3
+    return is_english(text)
 
 
 def translate_title_to_spanish_without_ai(title: str) -> str:
@@ -200,8 +203,8 @@ def translate_title_to_spanish(title: str) -> str:
         return title
     
     try:
-        # Inicializar experto en IA
-        ai_expert = AIExpert()
+        # Obtener experto en IA compartido (no se crea uno por título)
+        ai_expert = get_ai_expert()
         
         # Verificar si el cliente OpenAI está disponible
         if not hasattr(ai_expert, 'client') or not ai_expert.client:
@@ -219,7 +222,7 @@ La traducción debe:
 4. NO exceder la longitud original significativamente"""
         
         # Traducir título
-        translated_title = ai_expert.process_text(prompt, max_tokens=150)
+        translated_title = ai_expert.process_text(prompt, max_tokens=150, namespace="title_translation")
         
         # Verificar si la traducción contiene parte del prompt (caso de fallback)
         if not translated_title or "Traduce este título" in translated_title:
@@ -227,17 +230,7 @@ La traducción debe:
             return translate_title_to_spanish_without_ai(title)
         
         # Limpiar título traducido
-        # Eliminar comillas al inicio y final
-        translated_title = re.sub(r'^["\']|["\']$', "", translated_title)
-        
-        # Reemplazar múltiples saltos de línea por uno solo
-        translated_title = re.sub(r"\n+", " ", translated_title)
-        
-        # Reemplazar múltiples espacios por uno solo
-        translated_title = re.sub(r"\s+", " ", translated_title)
-        
-        # Eliminar espacios al inicio y final
-        translated_title = translated_title.strip()
+        translated_title = _clean_translated_title(translated_title)
         
         # Verificar que la traducción tenga una longitud mínima
         if len(translated_title) < 10:
@@ -250,6 +243,133 @@ La traducción debe:
         return translate_title_to_spanish_without_ai(title)
 
 
+def _clean_translated_title(translated_title: str) -> str:
+    """
+    Limpia un título traducido por la IA
+    
+    Args:
+        translated_title (str): Título devuelto por el modelo
+        
+    Returns:
+        str: Título limpio (ver clean_text) y sin etiquetas como "Traducción:"
+    """
+    # El modelo a veces antepone una etiqueta a la traducción
+    return clean_text(TRANSLATION_LABEL_PATTERN.sub("", clean_text(translated_title)))
+
+
+def _parse_translation_batch(response: str, expected: int) -> Optional[List[Any]]:
+    """
+    Extrae el array JSON de traducciones de la respuesta del modelo
+    
+    Args:
+        response (str): Respuesta del modelo
+        expected (int): Número de títulos enviados
+        
+    Returns:
+        Optional[List[Any]]: Lista de traducciones o None si la respuesta no es válida
+    """
+    if not response:
+        return None
+    
+    # El modelo puede envolver el JSON en un bloque de código o añadir texto
+    match = re.search(r"\[.*\]", response, re.DOTALL)
+    if not match:
+        return None
+    
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return None
+    
+    if not isinstance(items, list) or len(items) != expected:
+        return None
+    return items
+
+
+def translate_titles_to_spanish(titles: List[str], batch_size: int = 25) -> List[str]:
+    """
+    Traduce varios títulos al español agrupándolos en pocas solicitudes a la IA
+    
+    Los títulos en inglés se envían en lotes como un array JSON y el modelo devuelve
+    otro array JSON con las traducciones en el mismo orden. Cada traducción se valida
+    por separado; las que no son válidas se traducen con
+    translate_title_to_spanish_without_ai.
+    
+    Args:
+        titles (List[str]): Títulos a traducir
+        batch_size (int): Número máximo de títulos por solicitud
+        
+    Returns:
+        List[str]: Títulos traducidos, en el mismo orden que los originales
+    """
+    results = list(titles)
+    
+    # Solo se traducen los títulos en inglés (sin repetir, conservando el orden);
+    # el diccionario permite comprobar la pertenencia en tiempo constante
+    pending = dict.fromkeys(
+        title for title, english in zip(titles, is_english_batch(titles)) if english
+    )
+    
+    if not pending:
+        return results
+    
+    translations: Dict[str, str] = {}
+    ai_expert = get_ai_expert() if AI_EXPERT_AVAILABLE else None
+    
+    if ai_expert is not None and getattr(ai_expert, "client", None):
+        pending_titles = list(pending)
+        chunks = [
+            pending_titles[i:i + batch_size]
+            for i in range(0, len(pending_titles), batch_size)
+        ]
+        prompts = [
+            f"""Traduce al español estos títulos de noticias financieras de forma profesional y concisa.
+Devuelve SOLO un array JSON con {len(chunk)} cadenas, una traducción por título y en el mismo orden.
+Mantén el significado original, usa terminología financiera correcta en español
+y no excedas la longitud original significativamente.
+
+{json.dumps(chunk, ensure_ascii=False)}"""
+            for chunk in chunks
+        ]
+        
+        try:
+            # Los lotes se envían en paralelo a través del cliente compartido
+            responses = ai_expert.process_texts(
+                prompts, max_tokens=60 * batch_size + 100, namespace="title_translation_batch"
+            )
+        except Exception as e:
+            logger.error(f"Error traduciendo títulos en lote: {str(e)}")
+            responses = [None] * len(chunks)
+        
+        for chunk, response in zip(chunks, responses):
+            items = _parse_translation_batch(response, len(chunk))
+            if items is None:
+                logger.warning(
+                    f"Respuesta de traducción en lote no válida para {len(chunk)} títulos. Usando traducción básica."
+                )
+                continue
+            
+            for title, item in zip(chunk, items):
+                if not isinstance(item, str) or "Traduce" in item:
+                    continue
+                translated = _clean_translated_title(item)
+                if len(translated) >= 10:
+                    translations[title] = translated
+    else:
+        logger.warning("Cliente OpenAI no disponible. Usando traducción básica.")
+    
+    logger.info(
+        f"Títulos traducidos con IA: {len(translations)}/{len(pending)} "
+        f"en {-(-len(pending) // batch_size)} solicitudes"
+    )
+    
+    for i, title in enumerate(titles):
+        if title in pending:
+            results[i] = translations.get(title) or translate_title_to_spanish_without_ai(title)
+    
+    return results
+
+
 def clean_text(text: str) -> str:
     """
     Limpia un texto eliminando caracteres especiales y espacios innecesarios
@@ -311,8 +431,8 @@ if __name__ == "__main__":
     
     print("Pruebas de detección de idioma:")
     for text in test_texts:
-        is_english = is_english_text(text)
-        print(f"'{text[:30]}...' -> {'Inglés' if is_english else 'Español'}")
+        english = is_english_text(text)
+        print(f"'{text[:30]}...' -> {'Inglés' if english else 'Español'}")
     
     print("\nPruebas de traducción básica:")
     for text in test_texts:
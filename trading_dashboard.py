@@ -7,6 +7,8 @@ from datetime import datetime
 import logging
 import traceback
 
+from chart_builder import cached_figure, downsample_ohlc, line_trace, use_webgl
+
 # Constantes
 TIMEFRAMES = {
     "Intradía": ["1m", "5m", "15m", "30m", "1h"],
@@ -15,8 +17,14 @@ TIMEFRAMES = {
 }
 
 
+@cached_figure("advanced_chart")
 def create_advanced_chart(data, timeframe="diario"):
-    """Crea gráfico técnico avanzado con análisis institucional"""
+    """
+    Crea gráfico técnico avanzado con análisis institucional
+
+    La figura se cachea por temporalidad y huella de los datos; las velas y el
+    volumen se agrupan al presupuesto de píxeles y las líneas se reducen con LTTB.
+    """
     try:
         if data is None or len(data) < 2:
             st.warning(
@@ -24,6 +32,9 @@ def create_advanced_chart(data, timeframe="diario"):
             )
             return None
 
+        plot_data = downsample_ohlc(data)
+        webgl = use_webgl(len(data))
+
         fig = make_subplots(
             rows=3,
             cols=1,
@@ -36,11 +47,11 @@ def create_advanced_chart(data, timeframe="diario"):
         # Panel Principal: OHLC y Bandas de Bollinger
         fig.add_trace(
             go.Candlestick(
-                x=data.index,
-                open=data["Open"],
-                high=data["High"],
-                low=data["Low"],
-                close=data["Close"],
+                x=plot_data.index,
+                open=plot_data["Open"],
+                high=plot_data["High"],
+                low=plot_data["Low"],
+                close=plot_data["Close"],
                 name="OHLC",
                 increasing_line_color="#26a69a",
                 decreasing_line_color="#ef5350",
@@ -57,9 +68,10 @@ def create_advanced_chart(data, timeframe="diario"):
         ]:
             if band in data.columns:
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data[band],
+                    line_trace(
+                        data.index,
+                        data[band],
+                        webgl=webgl,
                         name=name,
                         line=dict(color=color, width=1),
                         fill="tonexty" if band == "BB_Low" else None,
@@ -76,9 +88,10 @@ def create_advanced_chart(data, timeframe="diario"):
         ]:
             if ma in data.columns:
                 fig.add_trace(
-                    go.Scatter(
-                        x=data.index,
-                        y=data[ma],
+                    line_trace(
+                        data.index,
+                        data[ma],
+                        webgl=webgl,
                         name=f"{ma}",
                         line=dict(color=color, width=width),
                     ),
@@ -89,9 +102,10 @@ def create_advanced_chart(data, timeframe="diario"):
         # Panel MACD y RSI
         if all(x in data.columns for x in ["MACD", "MACD_Signal"]):
             fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=data["MACD"],
+                line_trace(
+                    data.index,
+                    data["MACD"],
+                    webgl=webgl,
                     name="MACD",
                     line=dict(color="#2196f3", width=1.5),
                 ),
@@ -99,9 +113,10 @@ def create_advanced_chart(data, timeframe="diario"):
                 col=1,
             )
             fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=data["MACD_Signal"],
+                line_trace(
+                    data.index,
+                    data["MACD_Signal"],
+                    webgl=webgl,
                     name="Señal",
                     line=dict(color="#ff9800", width=1.5),
                 ),
@@ -112,9 +127,10 @@ def create_advanced_chart(data, timeframe="diario"):
         # Añadir RSI
         if "RSI" in data.columns:
             fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=data["RSI"],
+                line_trace(
+                    data.index,
+                    data["RSI"],
+                    webgl=webgl,
                     name="RSI",
                     line=dict(color="#9c27b0", width=1.5),
                 ),
@@ -138,14 +154,14 @@ def create_advanced_chart(data, timeframe="diario"):
         # Panel de Volumen
         if "Volume" in data.columns:
             volume_colors = np.where(
-                data["Close"] >= data["Open"],
+                plot_data["Close"] >= plot_data["Open"],
                 "rgba(38, 166, 154, 0.5)",  # Verde para velas alcistas
                 "rgba(239, 83, 80, 0.5)",  # Rojo para velas bajistas
             )
             fig.add_trace(
                 go.Bar(
-                    x=data.index,
-                    y=data["Volume"],
+                    x=plot_data.index,
+                    y=plot_data["Volume"],
                     name="Volumen",
                     marker_color=volume_colors,
                 ),
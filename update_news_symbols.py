@@ -1,12 +1,26 @@
 """
 Script para actualizar los símbolos en la tabla market_news basado en los títulos y contenido de las noticias.
-Utiliza la función mejorada extract_symbol_from_content para obtener símbolos más precisos.
+Utiliza symbol_extractor (symbol_extractor.py) para obtener símbolos más precisos.
+
+Las noticias se procesan por bloques: cada bloque se lee con una consulta, los
+símbolos se extraen para todo el bloque, las noticias ambiguas se envían a la IA
+en solicitudes agrupadas (opcional) y los cambios se escriben con un único UPDATE.
+
+Uso:
+    python update_news_symbols.py [--chunk-size 500] [--ai] [--ai-batch-size 20]
 """
 
+import re
+import json
+import time
 import logging
+import argparse
 import sys
-from database_utils import DatabaseManager, extract_symbol_from_content
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from database_utils import DatabaseManager
 from company_data import COMPANY_INFO
+from symbol_extractor import symbol_extractor
 
 # Configurar logging
 logging.basicConfig(
@@ -22,74 +36,358 @@ handler = logging.StreamHandler(sys.stdout)
 handler.setLevel(logging.DEBUG)
 logger.addHandler(handler)
 
+COMMON_INDICES = ["SPY", "QQQ", "DIA", "IWM", "VIX"]
+
+# Por debajo de esta puntuación (o con empate) la extracción se considera ambigua:
+# solo hay menciones sueltas en el resumen
+AMBIGUOUS_SCORE = 2.0
 
-def update_news_symbols():
+
+def is_valid_symbol(symbol: Optional[str]) -> bool:
     """
-    Actualiza los símbolos en la tabla market_news basado en los títulos y contenido de las noticias.
-    Utiliza la función mejorada extract_symbol_from_content para obtener símbolos más precisos.
+    Verifica que el símbolo exista en COMPANY_INFO o sea un índice común
+
+    Args:
+        symbol (Optional[str]): Símbolo a verificar
 
     Returns:
-        tuple: (número de registros actualizados, número de registros sin cambios)
+        bool: True si el símbolo es válido
+    """
+    return bool(symbol) and (symbol in COMPANY_INFO or symbol in COMMON_INDICES)
+
+
+def iter_news_chunks(
+    db: DatabaseManager, chunk_size: int = 500, where: str = None
+) -> Iterator[List[Dict[str, Any]]]:
     """
+    Recorre la tabla market_news por bloques ordenados por ID
+
+    Args:
+        db (DatabaseManager): Gestor de base de datos
+        chunk_size (int): Noticias por bloque
+        where (str, optional): Condición adicional (sin parámetros)
+
+    Yields:
+        List[Dict[str, Any]]: Noticias del bloque
+    """
+    last_id = 0
+    condition = f"AND ({where})" if where else ""
+    while True:
+        rows = db.execute_query(
+            f"""
+            SELECT id, title, summary, symbol, url
+            FROM market_news
+            WHERE id > %s {condition}
+            ORDER BY id
+            LIMIT %s
+            """,
+            [last_id, chunk_size],
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+        if len(rows) < chunk_size:
+            return
+
+
+def extract_chunk_symbols(
+    rows: List[Dict[str, Any]]
+) -> Tuple[Dict[int, Optional[str]], List[Dict[str, Any]]]:
+    """
+    Extrae el símbolo de todas las noticias de un bloque
+
+    Args:
+        rows (List[Dict[str, Any]]): Noticias del bloque
+
+    Returns:
+        Tuple[Dict[int, Optional[str]], List[Dict[str, Any]]]: Símbolo extraído por ID
+        (None si no se encontró) y noticias cuya extracción es ambigua
+    """
+    extracted = {}
+    ambiguous = []
+    for row in rows:
+        scores = symbol_extractor.score(row.get("title") or "", row.get("summary"))
+        ranking = sorted(scores.values(), reverse=True)
+
+        if scores:
+            best = max(scores.values())
+            extracted[row["id"]] = next(
+                symbol for symbol, score in scores.items() if score == best
+            )
+        else:
+            extracted[row["id"]] = None
+
+        if not ranking or ranking[0] < AMBIGUOUS_SCORE or (
+            len(ranking) > 1 and ranking[0] == ranking[1]
+        ):
+            ambiguous.append(row)
+
+    return extracted, ambiguous
+
+
+def _parse_symbol_batch(response: str) -> Dict[str, Any]:
+    """
+    Extrae el objeto JSON {id: símbolo} de la respuesta del modelo
+
+    Args:
+        response (str): Respuesta del modelo
+
+    Returns:
+        Dict[str, Any]: Símbolo por ID (vacío si la respuesta no es válida)
+    """
+    if not response:
+        return {}
+
+    match = re.search(r"\{.*\}", response, re.DOTALL)
+    if not match:
+        return {}
+
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    return items if isinstance(items, dict) else {}
+
+
+def extract_symbols_with_ai(
+    rows: List[Dict[str, Any]], batch_size: int = 20
+) -> Dict[int, str]:
+    """
+    Identifica con IA el símbolo de varias noticias agrupándolas en pocas solicitudes
+
+    Args:
+        rows (List[Dict[str, Any]]): Noticias ambiguas
+        batch_size (int): Noticias por solicitud
+
+    Returns:
+        Dict[int, str]: Símbolo válido por ID de noticia
+    """
+    if not rows:
+        return {}
+
     try:
-        print("Conectando a la base de datos...")
-        db = DatabaseManager()
-        print("Conexión establecida")
-
-        # Obtener todas las noticias con resumen
-        print("Obteniendo noticias...")
-        news = db.execute_query("SELECT id, title, summary, symbol FROM market_news")
-        print(f"Se obtuvieron {len(news)} noticias")
-
-        updated_count = 0
-        skipped_count = 0
-
-        for item in news:
-            news_id = item["id"]
-            title = item["title"]
-            current_symbol = item["symbol"]
-
-            # Extraer símbolo del título y resumen
-            summary = item.get("summary", "")
-            extracted_symbol = extract_symbol_from_content(title, summary)
-
-            # Si se extrajo un símbolo y es diferente al actual
-            if extracted_symbol and extracted_symbol != current_symbol:
-                # Validar que el símbolo exista en COMPANY_INFO o sea un índice común
-                common_indices = ["SPY", "QQQ", "DIA", "IWM", "VIX"]
-                if (
-                    extracted_symbol not in COMPANY_INFO
-                    and extracted_symbol not in common_indices
-                ):
+        from text_processing import get_ai_expert
+
+        ai_expert = get_ai_expert()
+    except ImportError:
+        ai_expert = None
+
+    if ai_expert is None or not getattr(ai_expert, "client", None):
+        logger.warning("IA no disponible para la extracción de símbolos en lote")
+        return {}
+
+    chunks = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+    prompts = []
+    for chunk in chunks:
+        items = [
+            {
+                "id": row["id"],
+                "title": row.get("title") or "",
+                "summary": (row.get("summary") or "")[:300],
+            }
+            for row in chunk
+        ]
+        prompts.append(
+            f"""Analiza estas noticias financieras y determina el símbolo bursátil (ticker) principal de cada una.
+Devuelve SOLO un objeto JSON cuyas claves sean los id y cuyos valores sean el símbolo
+en formato de 1-5 letras mayúsculas (como AAPL, MSFT, TSLA, SPY, QQQ) o null si no puedes identificarlo.
+Si la noticia se refiere a un índice, usa su ETF correspondiente (S&P 500 = SPY, Nasdaq = QQQ, Dow Jones = DIA).
+
+{json.dumps(items, ensure_ascii=False)}"""
+        )
+
+    try:
+        responses = ai_expert.process_texts(
+            prompts, max_tokens=12 * batch_size + 50, namespace="symbol_extraction_batch"
+        )
+    except Exception as e:
+        logger.error(f"Error extrayendo símbolos con IA en lote: {str(e)}")
+        return {}
+
+    valid_ids = {row["id"] for row in rows}
+    result = {}
+    for response in responses:
+        for news_id, symbol in _parse_symbol_batch(response).items():
+            symbol = symbol.strip().upper() if isinstance(symbol, str) else None
+            try:
+                news_id = int(news_id)
+            except ValueError:
+                continue
+            if news_id in valid_ids and is_valid_symbol(symbol):
+                result[news_id] = symbol
+
+    logger.info(
+        f"Símbolos identificados con IA: {len(result)}/{len(rows)} en {len(prompts)} solicitudes"
+    )
+    return result
+
+
+def bulk_update_news_symbols(db: DatabaseManager, assignments: Dict[int, str]) -> int:
+    """
+    Actualiza el símbolo de varias noticias con una sola consulta
+
+    Args:
+        db (DatabaseManager): Gestor de base de datos
+        assignments (Dict[int, str]): Nuevo símbolo por ID de noticia
+
+    Returns:
+        int: Número de noticias actualizadas
+    """
+    if not assignments:
+        return 0
+
+    ids = list(assignments)
+    cases = " ".join(["WHEN %s THEN %s"] * len(ids))
+    placeholders = ", ".join(["%s"] * len(ids))
+    params: List[Any] = []
+    for news_id in ids:
+        params.extend([news_id, assignments[news_id]])
+    params.extend(ids)
+
+    result = db.execute_query(
+        f"""
+        UPDATE market_news
+        SET symbol = CASE id {cases} END
+        WHERE id IN ({placeholders})
+        """,
+        params,
+        fetch=False,
+    )
+    return len(ids) if result is not None else 0
+
+
+def reassign_news_symbols(
+    chunk_size: int = 500,
+    use_ai: bool = False,
+    ai_batch_size: int = 20,
+    review_only: bool = False,
+    fallback: Optional[
+        Callable[[DatabaseManager, List[Tuple[int, str]]], Dict[int, str]]
+    ] = None,
+) -> Dict[str, Any]:
+    """
+    Reasigna los símbolos de las noticias por bloques
+
+    Por cada bloque: una consulta de lectura, la extracción de símbolos de todas las
+    noticias, una solicitud agrupada a la IA para las ambiguas (si use_ai) y un
+    único UPDATE con los cambios.
+
+    Args:
+        chunk_size (int): Noticias por bloque
+        use_ai (bool): Enviar a la IA las noticias cuya extracción es ambigua
+        ai_batch_size (int): Noticias por solicitud a la IA
+        review_only (bool): Procesar solo las noticias marcadas para revisión
+            (symbol = 'REVIEW'); las que no se resuelven no se modifican
+        fallback (Optional[Callable]): Función (db, [(id, título), ...]) -> {id: símbolo}
+            que resuelve de una vez las noticias del bloque sin símbolo, antes de
+            recurrir a la IA; recibe el gestor de base de datos del bloque
+
+    Returns:
+        Dict[str, Any]: processed, updated, review, skipped, ai_resolved, elapsed y rows_per_second
+    """
+    db = DatabaseManager()
+    stats = {
+        "processed": 0,
+        "updated": 0,
+        "review": 0,
+        "skipped": 0,
+        "ai_resolved": 0,
+    }
+    start = time.time()
+
+    where = "symbol = 'REVIEW'" if review_only else None
+    for rows in iter_news_chunks(db, chunk_size, where):
+        extracted, ambiguous = extract_chunk_symbols(rows)
+
+        resolved_by_fallback = set()
+        if fallback:
+            unresolved = [
+                (row["id"], row.get("title") or "")
+                for row in rows
+                if extracted[row["id"]] is None
+            ]
+            if unresolved:
+                fallback_symbols = {
+                    news_id: symbol
+                    for news_id, symbol in fallback(db, unresolved).items()
+                    if symbol
+                }
+                extracted.update(fallback_symbols)
+                resolved_by_fallback.update(fallback_symbols)
+
+        if use_ai:
+            ai_symbols = extract_symbols_with_ai(
+                [row for row in ambiguous if row["id"] not in resolved_by_fallback],
+                ai_batch_size,
+            )
+            stats["ai_resolved"] += len(ai_symbols)
+            extracted.update(ai_symbols)
+
+        assignments = {}
+        for row in rows:
+            news_id = row["id"]
+            current_symbol = row.get("symbol")
+            symbol = extracted.get(news_id)
+
+            if symbol and symbol != current_symbol:
+                if not is_valid_symbol(symbol):
                     logger.warning(
-                        f"ID {news_id}: Símbolo extraído '{extracted_symbol}' no válido - Título: {title[:50]}..."
+                        f"ID {news_id}: Símbolo extraído '{symbol}' no válido - Título: {(row.get('title') or '')[:50]}..."
                     )
                     # Marcar para revisión manual
-                    extracted_symbol = "REVIEW"
-                # Actualizar el símbolo en la base de datos
-                update_query = "UPDATE market_news SET symbol = %s WHERE id = %s"
-                db.execute_query(update_query, [extracted_symbol, news_id], fetch=False)
-
-                logger.info(
-                    f"ID {news_id}: Símbolo actualizado de '{current_symbol}' a '{extracted_symbol}' - Título: {title[:50]}..."
-                )
-                updated_count += 1
-            else:
-                # Si el símbolo actual es SPY y no se pudo extraer uno mejor, marcar para revisión manual
-                if current_symbol == "SPY" or not current_symbol:
-                    update_query = "UPDATE market_news SET symbol = %s WHERE id = %s"
-                    db.execute_query(update_query, ["REVIEW", news_id], fetch=False)
-                    logger.info(
-                        f"ID {news_id}: Marcado para revisión manual - Título: {title[:50]}..."
-                    )
-                    updated_count += 1
+                    symbol = "REVIEW"
+                if symbol == current_symbol:
+                    # Ya estaba marcada para revisión: no hay nada que actualizar
+                    stats["skipped"] += 1
                 else:
-                    skipped_count += 1
+                    assignments[news_id] = symbol
+            elif not symbol and not review_only and (
+                current_symbol == "SPY" or not current_symbol
+            ):
+                # Si el símbolo actual es SPY y no se pudo extraer uno mejor, marcar para revisión manual
+                assignments[news_id] = "REVIEW"
+            else:
+                stats["skipped"] += 1
+
+        updated = bulk_update_news_symbols(db, assignments)
+        stats["updated"] += updated
+        stats["review"] += sum(1 for symbol in assignments.values() if symbol == "REVIEW")
+        stats["processed"] += len(rows)
 
+        elapsed = time.time() - start
         logger.info(
-            f"Actualización completada: {updated_count} registros actualizados, {skipped_count} registros sin cambios"
+            f"Bloque de {len(rows)} noticias: {updated} actualizadas "
+            f"({stats['processed']} procesadas, {stats['processed'] / elapsed if elapsed else 0:.1f} filas/s)"
         )
-        return updated_count, skipped_count
+
+    stats["elapsed"] = time.time() - start
+    stats["rows_per_second"] = (
+        stats["processed"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    )
+    logger.info(
+        f"Reasignación completada: {stats['processed']} noticias en {stats['elapsed']:.1f}s "
+        f"({stats['rows_per_second']:.1f} filas/s), {stats['updated']} actualizadas, "
+        f"{stats['review']} marcadas para revisión, {stats['ai_resolved']} resueltas con IA"
+    )
+    return stats
+
+
+def update_news_symbols(chunk_size: int = 500, use_ai: bool = False):
+    """
+    Actualiza los símbolos en la tabla market_news basado en los títulos y contenido de las noticias.
+    Utiliza symbol_extractor para obtener símbolos más precisos.
+
+    Args:
+        chunk_size (int): Noticias por bloque
+        use_ai (bool): Enviar a la IA las noticias cuya extracción es ambigua
+
+    Returns:
+        tuple: (número de registros actualizados, número de registros sin cambios)
+    """
+    try:
+        stats = reassign_news_symbols(chunk_size=chunk_size, use_ai=use_ai)
+        return stats["updated"], stats["skipped"]
     except Exception as e:
         logger.error(f"Error en update_news_symbols: {str(e)}")
         logger.error("Traza completa:", exc_info=True)
@@ -97,18 +395,29 @@ def update_news_symbols():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Actualiza los símbolos de las noticias por bloques"
+    )
+    parser.add_argument("--chunk-size", type=int, default=500, help="Noticias por bloque")
+    parser.add_argument(
+        "--ai", action="store_true", help="Usar IA para las noticias ambiguas"
+    )
+    parser.add_argument(
+        "--ai-batch-size", type=int, default=20, help="Noticias por solicitud a la IA"
+    )
+    args = parser.parse_args()
+
     print("Iniciando actualización de símbolos en noticias...")
     try:
-        print("Conectando a la base de datos...")
-        from database_utils import DatabaseManager
-
-        db = DatabaseManager()
-        print("Conexión establecida")
-
-        print("Ejecutando update_news_symbols()...")
-        updated, skipped = update_news_symbols()
+        stats = reassign_news_symbols(
+            chunk_size=args.chunk_size,
+            use_ai=args.ai,
+            ai_batch_size=args.ai_batch_size,
+        )
         print(
-            f"Proceso finalizado: {updated} registros actualizados, {skipped} registros sin cambios"
+            f"Proceso finalizado: {stats['updated']} registros actualizados, "
+            f"{stats['skipped']} registros sin cambios "
+            f"({stats['rows_per_second']:.1f} filas/s)"
         )
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -9,6 +9,8 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from compact_data import ChartData
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,6 +40,8 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.to_dict()
         elif isinstance(obj, pd.DataFrame):
             return obj.to_dict(orient="records")
+        elif isinstance(obj, ChartData):
+            return obj.to_json_dict()
         elif isinstance(obj, datetime):
             return obj.isoformat()
         return super(NumpyEncoder, self).default(obj)
@@ -2,6 +2,8 @@ import logging
 import re
 from datetime import datetime
 
+from language_detection import is_english
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
@@ -21,12 +23,14 @@ class DataValidator:
         """
         self.ai_expert = ai_expert
 
-    def validate_market_news(self, news_data):
+    def validate_market_news(self, news_data, context_symbol=None):
         """
         Valida y mejora los datos de noticias antes de guardarlos
 
         Args:
             news_data (dict): Datos de la noticia a validar
+            context_symbol (str, optional): Símbolo que se está analizando, usado al
+                extraer el símbolo de una noticia que no lo tiene
 
         Returns:
             dict: Datos de la noticia validados y mejorados
@@ -49,22 +53,6 @@ class DataValidator:
                 title = validated_data.get("title", "")
                 summary = validated_data.get("summary", "")
 
-                # Buscar el símbolo actual en el contexto
-                import inspect
-
-                current_frame = inspect.currentframe()
-                context_symbol = None
-
-                # Buscar en los frames anteriores si hay un símbolo en el contexto
-                while current_frame:
-                    if (
-                        "symbol" in current_frame.f_locals
-                        and current_frame.f_locals["symbol"]
-                    ):
-                        context_symbol = current_frame.f_locals["symbol"]
-                        break
-                    current_frame = current_frame.f_back
-
                 # Extraer símbolo usando la función mejorada que analiza título y contenido
                 extracted_symbol = extract_symbol_from_content(
                     title, summary, context_symbol
@@ -416,81 +404,7 @@ class DataValidator:
         Returns:
             bool: True si el texto parece estar en inglés, False en caso contrario
         """
-        if not text or len(text) < 10:
-            return False
-
-        # Palabras comunes en inglés que no suelen usarse en español
-        english_words = [
-            r"\bthe\b",
-            r"\band\b",
-            r"\bof\b",
-            r"\bto\b",
-            r"\ba\b",
-            r"\bin\b",
-            r"\bthat\b",
-            r"\bhave\b",
-            r"\bI\b",
-            r"\bit\b",
-            r"\bfor\b",
-            r"\bnot\b",
-            r"\bon\b",
-            r"\bwith\b",
-            r"\bhe\b",
-            r"\bas\b",
-            r"\byou\b",
-            r"\bdo\b",
-            r"\bat\b",
-            r"\bthis\b",
-            r"\bbut\b",
-            r"\bhis\b",
-            r"\bby\b",
-            r"\bfrom\b",
-            r"\bthey\b",
-            r"\bwe\b",
-            r"\bsay\b",
-            r"\bher\b",
-            r"\bshe\b",
-            r"\bor\b",
-            r"\ban\b",
-            r"\bwill\b",
-            r"\bmy\b",
-            r"\bone\b",
-            r"\ball\b",
-            r"\bwould\b",
-            r"\bthere\b",
-            r"\btheir\b",
-            r"\bwhat\b",
-            r"\bso\b",
-            r"\bup\b",
-            r"\bout\b",
-            r"\bif\b",
-            r"\babout\b",
-            r"\bwho\b",
-            r"\bget\b",
-            r"\bwhich\b",
-            r"\bgo\b",
-            r"\bme\b",
-            r"\bwhen\b",
-            r"\bmake\b",
-            r"\bcan\b",
-            r"\blike\b",
-            r"\btime\b",
-            r"\bno\b",
-            r"\bjust\b",
-            r"\bhim\b",
-            r"\bknow\b",
-            r"\btake\b",
-            r"\bpeople\b",
-        ]
-
-        # Contar palabras en inglés
-        english_count = 0
-        for word in english_words:
-            if re.search(word, text.lower()):
-                english_count += 1
-
-        # Si hay más de 3 palabras en inglés, consideramos que el texto está en inglés
-        return english_count > 3
+        return is_english(text)
 
     def _clean_text(self, text):
         """
@@ -0,0 +1,141 @@
+"""
+Carga diferida de módulos para InversorIA Pro
+
+Streamlit vuelve a ejecutar el script principal en cada interacción y, en el
+arranque en frío, importa todo lo que aparece al inicio del archivo aunque la
+pantalla actual (por ejemplo, el inicio de sesión) no lo use. Con lazy_import
+y lazy_attr el módulo solo se importa la primera vez que se usa un atributo o
+se llama a la función; después queda en sys.modules y el coste desaparece.
+
+Ejemplo:
+    go = lazy_import("plotly.graph_objects")
+    fetch_market_data = lazy_attr("market_utils", "fetch_market_data")
+"""
+
+import sys
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# Tiempos de carga de los módulos diferidos (para el estado del sistema)
+_load_times: Dict[str, float] = {}
+_load_lock = threading.RLock()
+
+
+def _load_module(name: str):
+    """Importa un módulo registrando cuánto tardó la primera vez"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    with _load_lock:
+        module = sys.modules.get(name)
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            _load_times[name] = time.perf_counter() - start
+            logger.info(
+                f"Módulo {name} cargado bajo demanda en {_load_times[name] * 1000:.0f} ms"
+            )
+        return module
+
+
+class LazyModule:
+    """
+    Módulo que se importa la primera vez que se accede a uno de sus atributos
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_lazy_name", name)
+
+    def _lazy_load(self):
+        return _load_module(object.__getattribute__(self, "_lazy_name"))
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._lazy_load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        name = object.__getattribute__(self, "_lazy_name")
+        state = "cargado" if name in sys.modules else "sin cargar"
+        return f"<módulo diferido {name} ({state})>"
+
+
+class LazyAttribute:
+    """
+    Función, clase u objeto de un módulo que se importa al primer uso
+
+    Las llamadas y el acceso a atributos se delegan en el objeto real.
+    """
+
+    def __init__(self, module_name: str, attr: str):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+
+    def _lazy_load(self) -> Any:
+        if self._target is None:
+            self._target = getattr(_load_module(self._module_name), self._attr)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self._lazy_load()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_lazy") or attr in ("_module_name", "_attr", "_target"):
+            raise AttributeError(attr)
+        return getattr(self._lazy_load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<{self._module_name}.{self._attr} diferido>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Devuelve un módulo que se importará al primer uso
+
+    Equivale a "import name as alias" sin el coste de importarlo ahora.
+
+    Args:
+        name (str): Nombre completo del módulo (por ejemplo, "plotly.graph_objects")
+
+    Returns:
+        LazyModule: Módulo diferido
+    """
+    return LazyModule(name)
+
+
+def lazy_attr(module_name: str, attr: str) -> LazyAttribute:
+    """
+    Devuelve un atributo de un módulo que se importará al primer uso
+
+    Equivale a "from module_name import attr".
+
+    Args:
+        module_name (str): Nombre del módulo
+        attr (str): Nombre de la función, clase u objeto
+
+    Returns:
+        LazyAttribute: Atributo diferido
+    """
+    return LazyAttribute(module_name, attr)
+
+
+def get_lazy_load_times() -> Dict[str, float]:
+    """
+    Devuelve los módulos diferidos cargados y su tiempo de importación
+
+    Returns:
+        Dict[str, float]: Segundos por módulo, en orden de carga
+    """
+    with _load_lock:
+        return dict(_load_times)
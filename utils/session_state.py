@@ -1,14 +1,735 @@
 """
 Gestión del estado de la sesión para InversorIA Pro
+
+Además de la inicialización, este módulo limita la memoria que ocupa
+st.session_state. Los valores grandes (resultados del scanner, historiales de
+chat, análisis cacheados) se registran en session_memory:
+
+- Cada clave tiene un presupuesto (KEY_BUDGETS); un valor que lo supera se
+  guarda en disco y en la sesión queda solo una referencia.
+- Los valores en memoria de todas las sesiones comparten un presupuesto global
+  (SESSION_MEMORY_BUDGET_MB) y otro por sesión; al superarlos se vuelcan a
+  disco los menos usados recientemente.
+- El almacén en disco (SESSION_SPILL_DIR) es compartido por todos los procesos y
+  se limpia por tamaño y antigüedad, sin borrar los valores de las sesiones
+  activas. Si aun así un valor se pierde, su clave se elimina de la sesión.
+
+En la sesión, estas claves contienen un ManagedValue que se comporta como el
+valor original para las lecturas habituales (atributos, len, iteración,
+índices); get_state() devuelve el objeto real, necesario para pasarlo a otras
+funciones (st.dataframe, pd.concat...).
 """
 
-import streamlit as st
-import pandas as pd
-from datetime import datetime
+import os
+import sys
+import time
+import uuid
+import pickle
 import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
 
 logger = logging.getLogger(__name__)
 
+# Presupuestos de memoria
+MB = 1024 * 1024
+SESSION_MEMORY_BUDGET = int(float(os.environ.get("SESSION_MEMORY_BUDGET_MB", 256)) * MB)
+PER_SESSION_BUDGET = int(float(os.environ.get("PER_SESSION_MEMORY_MB", 16)) * MB)
+DEFAULT_KEY_BUDGET = 1 * MB
+KEY_BUDGETS = {
+    "scan_results": 4 * MB,
+    "cached_signals": 1 * MB,
+    "last_expert_analysis": 1 * MB,
+    "messages": 512 * 1024,
+    "chat_history": 512 * 1024,
+    # Los archivos de chat solo se leen al consultar el historial completo
+    "messages_archive": 0,
+    "chat_history_archive": 0,
+}
+MAX_CHAT_MESSAGES = 100
+MAX_ARCHIVED_MESSAGES = 1000
+CHAT_ARCHIVE_SUFFIX = "_archive"
+
+# Atributos que pueden modificar el valor en el sitio: al usarlos a través del
+# ManagedValue el valor se marca como modificado y se vuelve a escribir en disco
+MUTATING_ATTRS = frozenset(
+    {
+        "append", "extend", "insert", "pop", "popitem", "remove", "clear",
+        "update", "setdefault", "sort", "reverse",
+        "loc", "iloc", "at", "iat", "drop", "fillna", "replace", "rename",
+        "reset_index", "set_index", "sort_values", "sort_index",
+    }
+)
+
+# Almacén compartido en disco
+SPILL_DIR = os.environ.get(
+    "SESSION_SPILL_DIR",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ".cache",
+        "session_state",
+    ),
+)
+SPILL_DISK_BUDGET = int(float(os.environ.get("SESSION_SPILL_DISK_MB", 1024)) * MB)
+SPILL_TTL = 24 * 3600  # Segundos
+SESSION_ID_KEY = "_memory_session_id"
+
+# Valor vacío que se devuelve cuando un valor gestionado ya no existe
+EMPTY_VALUES = {
+    "DataFrame": pd.DataFrame,
+    "Series": pd.Series,
+    "list": list,
+    "dict": dict,
+}
+
+
+def empty_value(type_name):
+    """
+    Devuelve un valor vacío del tipo indicado (None si no se conoce)
+
+    Args:
+        type_name (str): Nombre del tipo original
+
+    Returns:
+        Valor vacío del mismo tipo
+    """
+    factory = EMPTY_VALUES.get(type_name)
+    return factory() if factory else None
+
+
+def estimate_size(obj, _depth=0):
+    """
+    Estima los bytes que ocupa un objeto en memoria
+
+    Args:
+        obj: Objeto a medir
+        _depth (int): Profundidad de recursión (uso interno)
+
+    Returns:
+        int: Tamaño aproximado en bytes
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(obj)
+    if _depth >= 8:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(v, _depth + 1) for v in obj)
+    return size
+
+
+class SpillStore:
+    """
+    Almacén en disco de valores volcados, compartido entre sesiones y procesos
+    """
+
+    def __init__(self, directory=SPILL_DIR, max_bytes=SPILL_DISK_BUDGET, ttl=SPILL_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Función que devuelve las claves en uso, que la limpieza no debe borrar
+        self.protected_keys = None
+        self._last_prune = 0.0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def put(self, value, key=None):
+        """
+        Guarda un valor en disco (escritura atómica)
+
+        Args:
+            value: Valor serializable con pickle
+            key (str, optional): Clave a sobrescribir; por defecto una nueva
+
+        Returns:
+            str: Clave del valor guardado
+        """
+        key = key or uuid.uuid4().hex
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        if time.time() - self._last_prune > 60:
+            self.prune()
+        return key
+
+    def get(self, key):
+        """Carga un valor del disco (None si ya no existe)"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"No se pudo leer el valor volcado {key}: {str(e)}")
+            return None
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self._path(key))
+        except OSError:
+            return 0
+
+    def prune(self):
+        """
+        Elimina los valores caducados y los más antiguos si se supera el presupuesto
+
+        Las claves que devuelve protected_keys (valores de sesiones activas) no
+        se borran.
+        """
+        self._last_prune = time.time()
+        protected = set(self.protected_keys()) if self.protected_keys else set()
+        try:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".pkl") or name[: -len(".pkl")] in protected:
+                    continue
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes and now - mtime <= self.ttl:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class ManagedValue:
+    """
+    Referencia guardada en st.session_state en lugar de un valor gestionado
+
+    Las lecturas habituales se delegan en el valor real, que se carga de disco
+    si estaba volcado. Las modificaciones hechas a través de la referencia
+    (índices, append, update, .loc...) marcan el valor como modificado (dirty);
+    solo los valores modificados se vuelven a escribir en disco.
+    """
+
+    __slots__ = (
+        "session_id",
+        "key",
+        "nbytes",
+        "spill_key",
+        "type_name",
+        "dirty",
+        "version",
+        "__weakref__",
+    )
+
+    def __init__(self, session_id, key, nbytes, type_name):
+        self.session_id = session_id
+        self.key = key
+        self.nbytes = nbytes
+        self.spill_key = None
+        self.type_name = type_name
+        self.dirty = True  # La copia en memoria no coincide con la de disco
+        self.version = 0  # Aumenta con cada cambio; invalida las cachés de ejecución
+
+    def load(self):
+        """
+        Devuelve el valor real
+
+        Si el valor ya no existe (el archivo en disco se borró), la clave se
+        elimina de la sesión para que la página la vuelva a inicializar y se
+        devuelve un valor vacío del mismo tipo.
+        """
+        value = session_memory.load(self)
+        if value is MISSING:
+            _discard_reference(self)
+            return empty_value(self.type_name)
+        return value
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        value = self.load()
+        if attr in MUTATING_ATTRS:
+            session_memory.mark_dirty(self)
+        return getattr(value, attr)
+
+    def __len__(self):
+        return len(self.load())
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __contains__(self, item):
+        return item in self.load()
+
+    def __getitem__(self, item):
+        return self.load()[item]
+
+    def __setitem__(self, item, value):
+        self.load()[item] = value
+        session_memory.mark_dirty(self)
+
+    def __delitem__(self, item):
+        del self.load()[item]
+        session_memory.mark_dirty(self)
+
+    def __bool__(self):
+        value = self.load()
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return not value.empty
+        return bool(value)
+
+    def __repr__(self):
+        return f"<{self.type_name} gestionado '{self.key}' ({self.nbytes / 1024:.1f} KB)>"
+
+
+# Marca que devuelve SessionMemoryManager.load cuando el valor se ha perdido
+MISSING = object()
+
+
+def _discard_reference(ref):
+    """Elimina de la sesión actual una referencia cuyo valor se ha perdido"""
+    try:
+        if st.session_state.get(ref.key) is ref:
+            del st.session_state[ref.key]
+    except Exception:
+        pass
+
+
+class SessionMemoryManager:
+    """
+    Presupuestos de memoria para los valores grandes de st.session_state
+
+    Los valores en memoria de todas las sesiones se guardan en un LRU común; la
+    sesión solo conserva el ManagedValue. Al superar el presupuesto global o el
+    de una sesión, los valores menos usados se vuelcan al SpillStore.
+
+    Los valores que superan el presupuesto de su clave no vuelven al LRU al
+    leerlos: se sirven desde una caché de la ejecución actual (por hilo, que
+    enforce_session vacía al empezar cada ejecución), de modo que no ocupan
+    memoria entre ejecuciones y no se reescriben si no han cambiado.
+    """
+
+    def __init__(
+        self,
+        memory_budget=SESSION_MEMORY_BUDGET,
+        session_budget=PER_SESSION_BUDGET,
+        key_budgets=None,
+        store=None,
+    ):
+        self.memory_budget = memory_budget
+        self.session_budget = session_budget
+        self.key_budgets = dict(KEY_BUDGETS if key_budgets is None else key_budgets)
+        self.store = store or SpillStore()
+        self.store.protected_keys = self._live_spill_keys
+        self._resident = OrderedDict()  # (sesión, clave) -> (valor, bytes)
+        self._refs = {}  # (sesión, clave) -> ManagedValue
+        self._last_seen = {}  # sesión -> timestamp
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        self._run_cache = threading.local()  # Valores grandes leídos en esta ejecución
+        self.spills = 0
+        self.loads = 0
+
+    def key_budget(self, key):
+        return self.key_budgets.get(key, DEFAULT_KEY_BUDGET)
+
+    def _live_spill_keys(self):
+        """Claves en disco de las sesiones que el gestor sigue conociendo"""
+        with self._lock:
+            return [ref.spill_key for ref in self._refs.values() if ref.spill_key]
+
+    def _run_values(self):
+        """Caché de valores grandes de la ejecución actual (por hilo)"""
+        values = getattr(self._run_cache, "values", None)
+        if values is None:
+            values = self._run_cache.values = {}
+        return values
+
+    def _drop_resident(self, slot):
+        entry = self._resident.pop(slot, None)
+        if entry is not None:
+            self._resident_bytes -= entry[1]
+        return entry
+
+    def _admit(self, slot, value, nbytes):
+        self._drop_resident(slot)
+        self._resident[slot] = (value, nbytes)
+        self._resident_bytes += nbytes
+
+    def _spill(self, slot):
+        """
+        Vuelca a disco un valor residente; devuelve False si no se pudo
+
+        Si el valor no ha cambiado desde que se leyó o escribió, el archivo en
+        disco sigue siendo válido y solo se libera la memoria.
+        """
+        entry = self._resident.get(slot)
+        ref = self._refs.get(slot)
+        if entry is None or ref is None:
+            self._drop_resident(slot)
+            return True
+        if ref.dirty or not ref.spill_key or not self.store.exists(ref.spill_key):
+            try:
+                ref.spill_key = self.store.put(entry[0], ref.spill_key)
+            except Exception as e:
+                logger.warning(f"No se pudo volcar '{slot[1]}' a disco: {str(e)}")
+                return False
+            ref.dirty = False
+            self.spills += 1
+        self._drop_resident(slot)
+        return True
+
+    def _enforce(self, session_id=None, keep=None):
+        """Vuelca valores hasta cumplir los presupuestos de la sesión y global"""
+        if session_id is not None:
+            session_bytes = sum(
+                nbytes for (sid, _), (_, nbytes) in self._resident.items() if sid == session_id
+            )
+            for slot in list(self._resident):
+                if session_bytes <= self.session_budget:
+                    break
+                if slot[0] != session_id or slot == keep:
+                    continue
+                nbytes = self._resident[slot][1]
+                if self._spill(slot):
+                    session_bytes -= nbytes
+
+        for slot in list(self._resident):
+            if self._resident_bytes <= self.memory_budget:
+                break
+            if slot != keep:
+                self._spill(slot)
+
+    def set(self, session_id, key, value):
+        """
+        Registra un valor y devuelve la referencia para la sesión
+
+        Args:
+            session_id (str): Identificador de la sesión
+            key (str): Clave en st.session_state
+            value: Valor a guardar
+
+        Returns:
+            ManagedValue: Referencia que se guarda en la sesión
+        """
+        slot = (session_id, key)
+        nbytes = estimate_size(value)
+        with self._lock:
+            self._last_seen[session_id] = time.time()
+            ref = self._refs.get(slot)
+            if ref is None:
+                ref = ManagedValue(session_id, key, nbytes, type(value).__name__)
+                self._refs[slot] = ref
+            ref.nbytes = nbytes
+            ref.type_name = type(value).__name__
+            ref.dirty = True
+            ref.version += 1
+            self._admit(slot, value, nbytes)
+            if nbytes > self.key_budget(key) and self._spill(slot):
+                # Disponible sin volver a leerlo de disco durante esta ejecución
+                self._run_values()[slot] = (ref, ref.version, value)
+            self._enforce(session_id, keep=slot)
+        return ref
+
+    def load(self, ref):
+        """
+        Devuelve el valor de una referencia, cargándolo de disco si hace falta
+
+        El valor cargado vuelve a la memoria (puede modificarse en el sitio) y se
+        vuelca de nuevo cuando los presupuestos lo exijan. Si supera el
+        presupuesto de su clave, solo se guarda en la caché de la ejecución.
+
+        Returns:
+            Valor real o MISSING si ya no está en memoria ni en disco
+        """
+        slot = (ref.session_id, ref.key)
+        with self._lock:
+            entry = self._resident.get(slot)
+            if entry is not None:
+                self._resident.move_to_end(slot)
+                return entry[0]
+            cached = self._run_values().get(slot)
+            if cached is not None and cached[0] is ref and cached[1] == ref.version:
+                return cached[2]
+            value = self.store.get(ref.spill_key) if ref.spill_key else None
+            if value is None:
+                logger.warning(f"Valor '{ref.key}' no disponible en el almacén en disco")
+                if self._refs.get(slot) is ref:
+                    self._refs.pop(slot)
+                return MISSING
+            self.loads += 1
+            self._refs.setdefault(slot, ref)
+            ref.dirty = False
+            if ref.nbytes > self.key_budget(ref.key):
+                self._run_values()[slot] = (ref, ref.version, value)
+                return value
+            self._admit(slot, value, ref.nbytes)
+            self._enforce(ref.session_id, keep=slot)
+            return value
+
+    def mark_dirty(self, ref):
+        """
+        Marca un valor como modificado para que se vuelva a escribir en disco
+
+        Un valor grande que solo estaba en la caché de la ejecución vuelve al LRU
+        para que enforce_session lo mida y lo vuelque en la próxima ejecución.
+        """
+        slot = (ref.session_id, ref.key)
+        with self._lock:
+            if slot not in self._resident:
+                cached = self._run_values().pop(slot, None)
+                if cached is not None and cached[0] is ref and cached[1] == ref.version:
+                    self._refs.setdefault(slot, ref)
+                    self._admit(slot, cached[2], ref.nbytes)
+            ref.dirty = True
+            ref.version += 1
+
+    def is_available(self, ref):
+        """Indica si el valor de una referencia sigue en memoria o en disco"""
+        with self._lock:
+            if (ref.session_id, ref.key) in self._resident:
+                return True
+        return bool(ref.spill_key) and self.store.exists(ref.spill_key)
+
+    def enforce_session(self, session_id, state):
+        """
+        Aplica los presupuestos a una sesión
+
+        Vacía la caché de la ejecución anterior, elimina las referencias cuyo
+        valor se ha perdido, registra los valores asignados directamente
+        (st.session_state.x = ...) a claves gestionadas, vuelve a medir los
+        valores residentes de la sesión (pueden haber crecido en el sitio) y
+        vuelca a disco lo que no cabe; los valores sin cambios no se reescriben.
+
+        Args:
+            session_id (str): Identificador de la sesión
+            state: st.session_state (o un diccionario equivalente)
+        """
+        self._run_cache.values = {}
+
+        for key in list(state.keys()):
+            value = state[key]
+            if not isinstance(value, ManagedValue):
+                continue
+            slot = (value.session_id, value.key)
+            with self._lock:
+                if self.is_available(value):
+                    # Sesión olvidada que vuelve: se registra de nuevo
+                    self._refs.setdefault(slot, value)
+                    continue
+                logger.warning(f"Valor '{key}' perdido; se elimina de la sesión")
+                if self._refs.get(slot) is value:
+                    self._refs.pop(slot)
+            del state[key]
+
+        for key in list(self.key_budgets):
+            if key in state and not isinstance(state[key], ManagedValue):
+                state[key] = self.set(session_id, key, state[key])
+
+        with self._lock:
+            self._last_seen[session_id] = time.time()
+            for slot in [s for s in self._resident if s[0] == session_id]:
+                value, old_bytes = self._resident[slot]
+                nbytes = estimate_size(value)
+                if nbytes != old_bytes:
+                    self._resident[slot] = (value, nbytes)
+                    self._resident_bytes += nbytes - old_bytes
+                    self._refs[slot].nbytes = nbytes
+                    self._refs[slot].dirty = True
+                if nbytes > self.key_budget(slot[1]):
+                    self._spill(slot)
+            self._enforce(session_id)
+
+        self.forget_idle_sessions()
+
+    def forget_idle_sessions(self, max_idle=SPILL_TTL):
+        """
+        Olvida las sesiones sin actividad
+
+        Sus valores en memoria se vuelcan antes a disco, de modo que si la sesión
+        vuelve sus referencias siguen funcionando; los archivos caducan después
+        por antigüedad (SPILL_TTL). Una sesión cuyo volcado falla no se olvida.
+
+        Args:
+            max_idle (float): Segundos sin actividad para considerar una sesión cerrada
+
+        Returns:
+            int: Número de sesiones olvidadas
+        """
+        now = time.time()
+        with self._lock:
+            idle = {sid for sid, seen in self._last_seen.items() if now - seen > max_idle}
+            if not idle:
+                return 0
+            for slot in [s for s in self._resident if s[0] in idle]:
+                if not self._spill(slot):
+                    idle.discard(slot[0])
+            for slot in [s for s in self._refs if s[0] in idle]:
+                self._refs.pop(slot, None)
+            for sid in idle:
+                self._last_seen.pop(sid, None)
+        logger.info(f"{len(idle)} sesiones inactivas eliminadas del gestor de memoria")
+        return len(idle)
+
+    def forget(self, session_id, key):
+        """Elimina un valor gestionado de memoria y de disco"""
+        slot = (session_id, key)
+        with self._lock:
+            self._drop_resident(slot)
+            ref = self._refs.pop(slot, None)
+            if ref is not None and ref.spill_key:
+                self.store.delete(ref.spill_key)
+
+    def report(self, session_id=None):
+        """
+        Resumen del uso de memoria para el panel de estado
+
+        Args:
+            session_id (str, optional): Sesión de la que detallar las claves
+
+        Returns:
+            dict: Totales, uso por sesión y detalle por clave de session_id
+        """
+        with self._lock:
+            sessions = {}
+            for (sid, key), ref in self._refs.items():
+                info = sessions.setdefault(
+                    sid,
+                    {"session": sid, "resident": 0, "spilled": 0, "keys": 0, "last_seen": self._last_seen.get(sid)},
+                )
+                info["keys"] += 1
+                if (sid, key) in self._resident:
+                    info["resident"] += self._resident[(sid, key)][1]
+                else:
+                    info["spilled"] += ref.nbytes
+
+            keys = []
+            if session_id is not None:
+                for (sid, key), ref in self._refs.items():
+                    if sid != session_id:
+                        continue
+                    resident = (sid, key) in self._resident
+                    keys.append(
+                        {
+                            "key": key,
+                            "type": ref.type_name,
+                            "bytes": ref.nbytes,
+                            "budget": self.key_budget(key),
+                            "location": "memoria" if resident else "disco",
+                        }
+                    )
+
+            return {
+                "memory_budget": self.memory_budget,
+                "session_budget": self.session_budget,
+                "resident_bytes": self._resident_bytes,
+                "spilled_bytes": sum(s["spilled"] for s in sessions.values()),
+                "spills": self.spills,
+                "loads": self.loads,
+                "sessions": sorted(sessions.values(), key=lambda s: -s["resident"]),
+                "keys": keys,
+            }
+
+
+session_memory = SessionMemoryManager()
+
+
+def get_session_id():
+    """
+    Devuelve el identificador de memoria de la sesión actual
+    """
+    if SESSION_ID_KEY not in st.session_state:
+        st.session_state[SESSION_ID_KEY] = uuid.uuid4().hex[:12]
+    return st.session_state[SESSION_ID_KEY]
+
+
+def set_state(key, value):
+    """
+    Guarda un valor en la sesión aplicando los presupuestos de memoria
+
+    Args:
+        key (str): Clave en st.session_state
+        value: Valor a guardar
+    """
+    st.session_state[key] = session_memory.set(get_session_id(), key, value)
+
+
+def get_state(key, default=None):
+    """
+    Devuelve el valor real de una clave de la sesión
+
+    Args:
+        key (str): Clave en st.session_state
+        default: Valor si la clave no existe
+
+    Returns:
+        Valor guardado (cargado de disco si estaba volcado). Es de solo lectura:
+        para modificarlo, usar set_state() con el nuevo valor
+    """
+    value = st.session_state.get(key, default)
+    if isinstance(value, ManagedValue):
+        loaded = session_memory.load(value)
+        if loaded is MISSING:
+            _discard_reference(value)
+            return default
+        return loaded
+    return value
+
+
+def enforce_memory_budget():
+    """
+    Aplica los presupuestos de memoria a la sesión actual (una vez por ejecución)
+    """
+    try:
+        session_memory.enforce_session(get_session_id(), st.session_state)
+    except Exception as e:
+        logger.warning(f"No se pudieron aplicar los presupuestos de memoria: {str(e)}")
+
+
+def get_memory_report():
+    """
+    Devuelve el uso de memoria de las sesiones con el detalle de la actual
+    """
+    return session_memory.report(get_session_id())
+
+
 def initialize_session_state():
     """
     Inicializa el estado de la sesión con valores por defecto
@@ -38,12 +759,14 @@ def initialize_session_state():
     if "last_scan_time" not in st.session_state:
         st.session_state.last_scan_time = datetime.now()
 
+
 def get_current_symbol():
     """
     Obtiene el símbolo actual seleccionado
     """
     return st.session_state.current_symbol
 
+
 def set_current_symbol(symbol):
     """
     Establece el símbolo actual
@@ -51,25 +774,67 @@ def set_current_symbol(symbol):
     st.session_state.current_symbol = symbol
     logger.info(f"Símbolo actual cambiado a: {symbol}")
 
+
 def update_scan_results(results):
     """
     Actualiza los resultados del scanner
     """
-    st.session_state.scan_results = results
+    set_state("scan_results", results)
     st.session_state.last_scan_time = datetime.now()
     logger.info(f"Resultados del scanner actualizados: {len(results)} oportunidades")
 
-def add_chat_message(role, content):
+
+def add_chat_message(role, content, key="chat_history"):
     """
     Añade un mensaje al historial de chat
+
+    Solo se mantienen en memoria los últimos MAX_CHAT_MESSAGES mensajes. Al
+    superarlos, la mitad más antigua pasa al archivo del historial, que se
+    guarda en disco (así el archivo se reescribe cada MAX_CHAT_MESSAGES / 2
+    mensajes y no con cada uno) y conserva como mucho MAX_ARCHIVED_MESSAGES.
+
+    Args:
+        role (str): Rol del mensaje ("user" o "assistant")
+        content (str): Contenido del mensaje
+        key (str): Clave del historial en la sesión
     """
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
-    
-    st.session_state.chat_history.append({"role": role, "content": content})
-    
-def clear_chat_history():
+    history = list(get_state(key, []) or [])
+    history.append({"role": role, "content": content})
+
+    if len(history) > MAX_CHAT_MESSAGES:
+        overflow = len(history) - MAX_CHAT_MESSAGES // 2
+        archive_key = key + CHAT_ARCHIVE_SUFFIX
+        archive = list(get_state(archive_key, []) or [])
+        archive.extend(history[:overflow])
+        history = history[overflow:]
+        set_state(archive_key, archive[-MAX_ARCHIVED_MESSAGES:])
+
+    set_state(key, history)
+
+
+def get_chat_history(key="chat_history", include_archived=False):
+    """
+    Devuelve el historial de chat
+
+    Args:
+        key (str): Clave del historial en la sesión
+        include_archived (bool): Incluir los mensajes archivados en disco
+
+    Returns:
+        list: Mensajes en orden cronológico
+    """
+    history = list(get_state(key, []) or [])
+    if include_archived:
+        history = list(get_state(key + CHAT_ARCHIVE_SUFFIX, []) or []) + history
+    return history
+
+
+
+def clear_chat_history(key="chat_history"):
     """
     Limpia el historial de chat
     """
-    st.session_state.chat_history = []
+    session_id = get_session_id()
+    session_memory.forget(session_id, key + CHAT_ARCHIVE_SUFFIX)
+    st.session_state.pop(key + CHAT_ARCHIVE_SUFFIX, None)
+    set_state(key, [])
@@ -14,6 +14,14 @@ import time
 import random
 from typing import Dict, List, Any, Optional
 
+from news_lexicon import (
+    count_relevance_keywords,
+    financial_source_matcher,
+    relevance_score,
+    score_news_batch,
+    sentiment_score,
+)
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -1613,22 +1621,20 @@ class YahooFinanceScraper:
                 # Normalizar formato de fecha si es posible
                 news["date"] = self._normalize_date_format(news["date"])
 
-            # Generar una puntuación de relevancia basada en el contenido
-            news["relevance_score"] = self._calculate_relevance_score(
-                news, symbol, company_name
-            )
+            # Añadir a las noticias procesadas
+            processed_news.append(news)
 
-            # Generar una puntuación de sentimiento
-            news["sentiment_score"] = self._analyze_sentiment(news)
+        # Puntuar relevancia y sentimiento de todas las noticias en una sola pasada
+        scores = score_news_batch(processed_news, symbol, company_name)
+        for news, (relevance, sentiment) in zip(processed_news, scores):
+            news["relevance_score"] = relevance
+            news["sentiment_score"] = sentiment
 
             # Generar recomendación de trading basada en la noticia
             news["trading_recommendation"] = self._generate_trading_recommendation(
                 news, symbol
             )
 
-            # Añadir a las noticias procesadas
-            processed_news.append(news)
-
         # Ordenar noticias por relevancia y sentimiento
         processed_news.sort(
             key=lambda x: (
@@ -1713,78 +1719,17 @@ class YahooFinanceScraper:
                 if f" {part} " in f" {title} " or f" {part} " in f" {summary} ":
                     return True
 
-        # Verificar palabras clave financieras de alta relevancia
-        high_relevance_keywords = [
-            "earnings",
-            "revenue",
-            "profit",
-            "loss",
-            "guidance",
-            "forecast",
-            "upgrade",
-            "downgrade",
-            "rating",
-            "analyst",
-            "merger",
-            "acquisition",
-            "dividend",
-            "split",
-            "CEO",
-            "executive",
-            "lawsuit",
-            "investigation",
-            "patent",
-            "FDA",
-            "approval",
-            "product",
-            "launch",
-            "quarterly",
-            "annual",
-            "report",
-            "financial",
-            "results",
-            "performance",
-            "stock",
-            "shares",
-            "market",
-            "investor",
-            "trading",
-            "price target",
-            "valuation",
-        ]
-
         # Si la fuente es específica para finanzas, dar más credibilidad
-        financial_sources = [
-            "yahoo finance",
-            "bloomberg",
-            "reuters",
-            "cnbc",
-            "marketwatch",
-            "seeking alpha",
-            "barrons",
-            "financial times",
-            "ft.com",
-            "wsj",
-            "wall street journal",
-            "investor's business daily",
-            "morningstar",
-            "motley fool",
-            "zacks",
-            "investopedia",
-            "finviz",
-        ]
-
-        is_financial_source = any(fs in source for fs in financial_sources)
+        is_financial_source = financial_source_matcher.contains_any(source)
 
         # Si es una fuente financiera, necesitamos menos palabras clave para considerarla relevante
         keyword_threshold = 1 if is_financial_source else 2
-        keyword_count = 0
 
-        for keyword in high_relevance_keywords:
-            if keyword.lower() in title.lower() or keyword.lower() in summary.lower():
-                keyword_count += 1
-                if keyword_count >= keyword_threshold:
-                    return True
+        # Verificar palabras clave financieras de alta relevancia
+        keyword_count = count_relevance_keywords(title, summary)
+
+        if keyword_count >= keyword_threshold:
+            return True
 
         # Si es una fuente financiera pero no tiene palabras clave suficientes,
         # verificar si la noticia es reciente (menos de 7 días)
@@ -1965,85 +1910,7 @@ class YahooFinanceScraper:
         Returns:
             float: Puntuación de relevancia (0-1)
         """
-        score = 0.5  # Puntuación base
-
-        title = news.get("title", "").lower()
-        summary = news.get("summary", "").lower()
-        source = news.get("source", "").lower()
-
-        # Verificar si el símbolo aparece en el título (mayor relevancia)
-        if symbol.lower() in title:
-            score += 0.3
-        elif symbol.lower() in summary:
-            score += 0.1
-
-        # Verificar si el nombre de la empresa aparece en el título
-        if company_name and company_name.lower() in title:
-            score += 0.2
-        elif company_name and company_name.lower() in summary:
-            score += 0.1
-
-        # Verificar palabras clave de alta relevancia
-        high_relevance_keywords = [
-            "earnings",
-            "revenue",
-            "profit",
-            "loss",
-            "guidance",
-            "forecast",
-            "upgrade",
-            "downgrade",
-            "rating",
-            "analyst",
-            "merger",
-            "acquisition",
-            "dividend",
-            "split",
-            "CEO",
-            "executive",
-            "lawsuit",
-            "investigation",
-            "patent",
-            "FDA",
-            "approval",
-            "product",
-            "launch",
-        ]
-
-        for keyword in high_relevance_keywords:
-            if keyword in title:
-                score += 0.15
-                break  # Solo sumar una vez por título
-
-        for keyword in high_relevance_keywords:
-            if keyword in summary:
-                score += 0.05
-                break  # Solo sumar una vez por resumen
-
-        # Verificar fuentes de alta credibilidad
-        credible_sources = [
-            "bloomberg",
-            "reuters",
-            "wall street journal",
-            "wsj",
-            "financial times",
-            "ft",
-            "cnbc",
-            "finviz",
-            "seeking alpha",
-            "yahoo finance",
-            "barrons",
-            "alpha vantage",
-            "investing.com",
-        ]
-
-        for cs in credible_sources:
-            if cs in source:
-                score += 0.1
-                break  # Solo sumar una vez
-
-        # Limitar la puntuación entre 0 y 1
-        return min(max(score, 0), 1)
+        return relevance_score(news, symbol, company_name)
 
     def _analyze_sentiment(self, news: Dict[str, Any]) -> float:
         """
@@ -2055,93 +1922,7 @@ class YahooFinanceScraper:
         Returns:
             float: Puntuación de sentimiento (-1 a 1, donde -1 es muy negativo, 0 es neutral, 1 es muy positivo)
         """
-        # Si ya tiene puntuación de sentimiento, usarla
-        if "sentiment" in news and isinstance(news["sentiment"], (int, float)):
-            sentiment = float(news["sentiment"])
-            # Normalizar entre -1 y 1 si es necesario
-            if 0 <= sentiment <= 1:
-                return (sentiment * 2) - 1
-            return max(min(sentiment, 1), -1)
-
-        title = news.get("title", "").lower()
-        summary = news.get("summary", "").lower()
-
-        # Palabras positivas y negativas
-        positive_words = [
-            "up",
-            "rise",
-            "gain",
-            "profit",
-            "growth",
-            "positive",
-            "beat",
-            "exceed",
-            "outperform",
-            "upgrade",
-            "buy",
-            "strong",
-            "success",
-            "improve",
-            "higher",
-            "bullish",
-            "opportunity",
-            "innovation",
-            "launch",
-            "approval",
-            "partnership",
-            "collaboration",
-            "dividend",
-            "increase",
-        ]
-
-        negative_words = [
-            "down",
-            "fall",
-            "drop",
-            "loss",
-            "decline",
-            "negative",
-            "miss",
-            "below",
-            "underperform",
-            "downgrade",
-            "sell",
-            "weak",
-            "failure",
-            "worsen",
-            "lower",
-            "bearish",
-            "risk",
-            "threat",
-            "lawsuit",
-            "investigation",
-            "recall",
-            "delay",
-            "cut",
-            "decrease",
-            "layoff",
-            "restructuring",
-        ]
-
-        # Contar palabras positivas y negativas
-        positive_count = 0
-        for word in positive_words:
-            if f" {word} " in f" {title} " or f" {word} " in f" {summary} ":
-                positive_count += 1
-
-        negative_count = 0
-        for word in negative_words:
-            if f" {word} " in f" {title} " or f" {word} " in f" {summary} ":
-                negative_count += 1
-
-        # Calcular puntuación de sentimiento
-        if positive_count == 0 and negative_count == 0:
-            return 0  # Neutral
-
-        total_count = positive_count + negative_count
-        sentiment_score = (positive_count - negative_count) / total_count
-
-        return sentiment_score
+        return sentiment_score(news)
 
     def _generate_trading_recommendation(
         self, news: Dict[str, Any], symbol: str
@@ -28,26 +28,30 @@ import os
 import time
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import pytz
 import json
 import importlib
 import sys
-import requests
-import openai
 import traceback
 import logging
 import base64
 import re
-import mysql.connector
 import decimal
 
 # Las importaciones relacionadas con el envío de correos electrónicos han sido eliminadas
 # ya que esta funcionalidad se ha movido a la página de Notificaciones
 from typing import Dict, List, Tuple, Any, Optional
 
+from utils.lazy_loader import lazy_attr, lazy_import
+from chart_builder import cached_figure, downsample_ohlc, line_trace, use_webgl
+from compact_data import ChartData, chart_data_to_frame
+from utils.session_state import (
+    add_chat_message,
+    enforce_memory_budget,
+    get_memory_report,
+    get_state,
+)
+
 # Importar configuración de pandas para mejorar rendimiento
 try:
     import pandas_config
@@ -63,59 +67,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Lista para almacenar errores de importación
-import_errors = []
-
-# Importar componentes personalizados
-try:
-    from market_utils import (
-        fetch_market_data,
-        TechnicalAnalyzer,
-        MarketUtils,  # Actualizado de OptionsParameterManager a MarketUtils
-        get_market_context,
-        get_vix_level,
-        clear_cache,
-        _data_cache,
-    )
-except Exception as e:
-    import_errors.append(f"Error importando market_utils: {str(e)}")
-
-try:
-    from trading_dashboard import (
-        render_dashboard,
-        render_technical_tab,
-        render_options_tab,
-        render_multiframe_tab,
-        render_fundamental_tab,
-        render_report_tab,
-        render_risk_tab,
-        TIMEFRAMES,
-    )
+# Bibliotecas pesadas y componentes: se importan la primera vez que se usan
+# (ver utils/lazy_loader.py). La pantalla de inicio de sesión no carga plotly,
+# openai, mysql ni los módulos de mercado, y en los reruns ya están en sys.modules.
+go = lazy_import("plotly.graph_objects")
+make_subplots = lazy_attr("plotly.subplots", "make_subplots")
+requests = lazy_import("requests")
+openai = lazy_import("openai")
+mysql_connector = lazy_import("mysql.connector")
+
+# Componentes personalizados
+fetch_market_data = lazy_attr("market_utils", "fetch_market_data")
+TechnicalAnalyzer = lazy_attr("market_utils", "TechnicalAnalyzer")
+MarketUtils = lazy_attr("market_utils", "MarketUtils")
+get_market_context = lazy_attr("market_utils", "get_market_context")
+get_vix_level = lazy_attr("market_utils", "get_vix_level")
+clear_cache = lazy_attr("market_utils", "clear_cache")
+_data_cache = lazy_attr("market_utils", "_data_cache")
+
+render_enhanced_market_scanner = lazy_attr(
+    "enhanced_market_scanner", "render_enhanced_market_scanner"
+)
 
-    # Importar el scanner mejorado
-    from enhanced_market_scanner import render_enhanced_market_scanner
-except Exception as e:
-    import_errors.append(f"Error importando trading_dashboard: {str(e)}")
+openai_utils = lazy_import("openai_utils")
+process_tool_calls = lazy_attr("openai_utils", "process_tool_calls")
 
-try:
-    from authenticator import check_password, validate_session, clear_session
-except Exception as e:
-    import_errors.append(f"Error importando authenticator: {str(e)}")
+detect_support_resistance = lazy_attr("technical_analysis", "detect_support_resistance")
+detect_trend_lines = lazy_attr("technical_analysis", "detect_trend_lines")
+detect_channels = lazy_attr("technical_analysis", "detect_channels")
+detect_candle_patterns = lazy_attr("technical_analysis", "detect_candle_patterns")
 
-try:
-    from openai_utils import process_tool_calls, tools
-except Exception as e:
-    import_errors.append(f"Error importando openai_utils: {str(e)}")
-
-try:
-    from technical_analysis import (
-        detect_support_resistance,
-        detect_trend_lines,
-        detect_channels,
-        detect_candle_patterns,
-    )
-except Exception as e:
-    import_errors.append(f"Error importando technical_analysis: {str(e)}")
+# El autenticador es ligero y se necesita en la primera pantalla
+from authenticator import check_password, validate_session, clear_session
 
 
 # Clase para manejar la codificación JSON
@@ -142,6 +125,8 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.to_dict()
         elif isinstance(obj, pd.DataFrame):
             return obj.to_dict(orient="records")
+        elif isinstance(obj, ChartData):
+            return obj.to_json_dict()
         elif isinstance(obj, datetime):
             return obj.isoformat()
         return super(NumpyEncoder, self).default(obj)
@@ -150,21 +135,25 @@ class NumpyEncoder(json.JSONEncoder):
 # Importar información de símbolos y nombres completos desde company_data.py
 from company_data import COMPANY_INFO, SYMBOLS, get_company_info
 
-# Importar gestor de datos de mercado
-try:
-    from market_data_manager import MarketDataManager
-
-    # Crear instancia del gestor de datos de mercado
-    market_data_mgr = MarketDataManager()
-    logger.info("Gestor de datos de mercado inicializado correctamente")
-except ImportError:
-    logger.warning(
-        "No se pudo importar MarketDataManager. Se usarán funciones alternativas."
-    )
-    market_data_mgr = None
-except Exception as e:
-    logger.error(f"Error inicializando MarketDataManager: {str(e)}")
-    market_data_mgr = None
+# Gestor de datos de mercado: se crea una sola vez por proceso, no en cada rerun
+@st.cache_resource(show_spinner=False)
+def get_market_data_manager():
+    """Devuelve el gestor de datos de mercado compartido (None si no está disponible)"""
+    try:
+        from market_data_manager import MarketDataManager
+
+        manager = MarketDataManager()
+        logger.info("Gestor de datos de mercado inicializado correctamente")
+        return manager
+    except ImportError:
+        logger.warning(
+            "No se pudo importar MarketDataManager. Se usarán funciones alternativas."
+        )
+        return None
+    except Exception as e:
+        logger.error(f"Error inicializando MarketDataManager: {str(e)}")
+        return None
+
 
 # Estilos personalizados
 st.markdown(
@@ -708,7 +697,7 @@ class DataCache:
 class MarketScanner:
     """Escáner de mercado con detección de estrategias"""
 
-    def __init__(self, symbols: Dict[str, List[str]], analyzer: TechnicalAnalyzer):
+    def __init__(self, symbols: Dict[str, List[str]], analyzer: "TechnicalAnalyzer"):
         self.symbols = symbols
         self.analyzer = analyzer
         self.cache = {}
@@ -918,7 +907,7 @@ class DatabaseManager:
                 del config_without_db["database"]
 
             # Conectar al servidor MySQL
-            temp_connection = mysql.connector.connect(**config_without_db)
+            temp_connection = mysql_connector.connect(**config_without_db)
             temp_cursor = temp_connection.cursor()
 
             # Verificar si la base de datos existe
@@ -1021,7 +1010,7 @@ class DatabaseManager:
             temp_connection.close()
 
             # Conectar a la base de datos
-            self.connection = mysql.connector.connect(**self.config)
+            self.connection = mysql_connector.connect(**self.config)
             logger.info(
                 f"Conexión establecida con la base de datos {self.config['database']}"
             )
@@ -2020,7 +2009,7 @@ class SignalManager:
 
             # Convertir resultados del scanner a formato de señal
             scanner_signals = []
-            scan_results = st.session_state.scan_results
+            scan_results = get_state("scan_results")
 
             # Filtrar por categoría si es necesario
             if categories and categories != "Todas":
@@ -2156,8 +2145,16 @@ class SignalManager:
 # =================================================
 
 
+@cached_figure("technical_chart")
 def create_technical_chart(data, symbol):
-    """Crea gráfico técnico avanzado con indicadores y patrones técnicos"""
+    """
+    Crea gráfico técnico avanzado con indicadores y patrones técnicos
+
+    La figura se cachea por símbolo y huella de los datos (barras, última vela e
+    indicadores). Las velas se agrupan al presupuesto de píxeles del gráfico y
+    las líneas se reducen con LTTB; los niveles y patrones se calculan sobre el
+    histórico completo.
+    """
     # Verificación adecuada de DataFrame vacío
     if (
         data is None
@@ -2181,6 +2178,10 @@ def create_technical_chart(data, symbol):
         logger.error(f"Faltan columnas OHLC en los datos de {symbol}")
         return None
 
+    # Reducir el histórico al presupuesto de píxeles del gráfico
+    plot_df = downsample_ohlc(df)
+    webgl = use_webgl(len(df))
+
     # Crear figura con subplots
     fig = make_subplots(
         rows=3,
@@ -2196,19 +2197,21 @@ def create_technical_chart(data, symbol):
         x_data = df["Date"]
         x_first = x_data.iloc[0] if len(x_data) > 0 else None
         x_last = x_data.iloc[-1] if len(x_data) > 0 else None
+        x_plot = plot_df["Date"]
     else:
         x_data = df.index
         x_first = x_data[0] if len(x_data) > 0 else None
         x_last = x_data[-1] if len(x_data) > 0 else None
+        x_plot = plot_df.index
 
     # Añadir Candlestick
     fig.add_trace(
         go.Candlestick(
-            x=x_data,
-            open=df["Open"],
-            high=df["High"],
-            low=df["Low"],
-            close=df["Close"],
+            x=x_plot,
+            open=plot_df["Open"],
+            high=plot_df["High"],
+            low=plot_df["Low"],
+            close=plot_df["Close"],
             name="OHLC",
         ),
         row=1,
@@ -2228,19 +2231,16 @@ def create_technical_chart(data, symbol):
             scale_factor = 0
 
         # Crear colores para el volumen (verde si el precio subió, rojo si bajó)
-        colors = [
-            (
-                "rgba(0, 150, 0, 0.3)"
-                if row["Close"] >= row["Open"]
-                else "rgba(255, 0, 0, 0.3)"
-            )
-            for _, row in df.iterrows()
-        ]
+        colors = np.where(
+            plot_df["Close"] >= plot_df["Open"],
+            "rgba(0, 150, 0, 0.3)",
+            "rgba(255, 0, 0, 0.3)",
+        )
 
         fig.add_trace(
             go.Bar(
-                x=x_data,
-                y=df["Volume"] * scale_factor,
+                x=x_plot,
+                y=plot_df["Volume"] * scale_factor,
                 name="Volumen",
                 marker={"color": colors},
                 opacity=0.3,
@@ -2259,9 +2259,10 @@ def create_technical_chart(data, symbol):
     ]:
         if ma in df.columns:
             fig.add_trace(
-                go.Scatter(
-                    x=x_data,
-                    y=df[ma],
+                line_trace(
+                    x_data,
+                    df[ma],
+                    webgl=webgl,
                     name=ma,
                     line=dict(color=color, width=1.5),
                 ),
@@ -2282,9 +2283,10 @@ def create_technical_chart(data, symbol):
         if y_col in df.columns:
             y_data = df[y_col]
             fig.add_trace(
-                go.Scatter(
-                    x=x_data,
-                    y=y_data,
+                line_trace(
+                    x_data,
+                    y_data,
+                    webgl=webgl,
                     name=bb,
                     line=dict(color=color, width=1),
                     fill=fill,
@@ -2301,9 +2303,10 @@ def create_technical_chart(data, symbol):
     # Añadir MACD
     if "MACD" in df.columns and "MACD_Signal" in df.columns:
         fig.add_trace(
-            go.Scatter(
-                x=x_data,
-                y=df["MACD"],
+            line_trace(
+                x_data,
+                df["MACD"],
+                webgl=webgl,
                 name="MACD",
                 line=dict(color="rgba(33, 150, 243, 0.7)", width=1.5),
             ),
@@ -2312,9 +2315,10 @@ def create_technical_chart(data, symbol):
         )
 
         fig.add_trace(
-            go.Scatter(
-                x=x_data,
-                y=df["MACD_Signal"],
+            line_trace(
+                x_data,
+                df["MACD_Signal"],
+                webgl=webgl,
                 name="Señal MACD",
                 line=dict(color="rgba(255, 87, 34, 0.7)", width=1.5),
             ),
@@ -2323,7 +2327,7 @@ def create_technical_chart(data, symbol):
         )
 
         # Añadir histograma MACD
-        macd_hist = df["MACD"] - df["MACD_Signal"]
+        macd_hist = plot_df["MACD"] - plot_df["MACD_Signal"]
         colors = [
             "rgba(33, 150, 243, 0.7)" if val >= 0 else "rgba(255, 87, 34, 0.7)"
             for val in macd_hist
@@ -2331,7 +2335,7 @@ def create_technical_chart(data, symbol):
 
         fig.add_trace(
             go.Bar(
-                x=x_data,
+                x=x_plot,
                 y=macd_hist,
                 name="Histograma MACD",
                 marker_color=colors,
@@ -2343,9 +2347,10 @@ def create_technical_chart(data, symbol):
     # Añadir RSI
     if "RSI" in df.columns:
         fig.add_trace(
-            go.Scatter(
-                x=x_data,
-                y=df["RSI"],
+            line_trace(
+                x_data,
+                df["RSI"],
+                webgl=webgl,
                 name="RSI",
                 line=dict(color="rgba(156, 39, 176, 0.7)", width=1.5),
             ),
@@ -2810,8 +2815,8 @@ def process_expert_analysis(client, assistant_id, symbol, context):
                     f"   Fuente: {result.get('source', 'Desconocida')}\n\n"
                 )
 
-    # Detectar patrones
-    chart_data = pd.DataFrame(context.get("chart_data", []))
+    # Detectar patrones (solo lectura: vistas sin copiar el bloque numérico)
+    chart_data = chart_data_to_frame(context.get("chart_data"), copy=False)
     patterns = {}
 
     if not chart_data.empty:
@@ -3797,7 +3802,7 @@ def process_with_assistant(prompt, symbol, context, assistant_id):
 
         # Ejecutar con herramientas
         run = openai.beta.threads.runs.create(
-            thread_id=st.session_state.thread_id, assistant_id=assistant_id, tools=tools
+            thread_id=st.session_state.thread_id, assistant_id=assistant_id, tools=openai_utils.tools
         )
 
         # Monitorear la ejecución
@@ -4396,21 +4401,17 @@ def initialize_session_state():
                     f"Sentimiento de mercado diario cargado y almacenado con ID: {sentiment_id}"
                 )
 
-                # Ejecutar post_save_quality_check.py para asegurar que todos los campos estén completos
+                # Encolar el control de calidad para que no bloquee la página
+                # (lo procesa quality_job_queue.py)
                 try:
-                    market_sentiment_container.info(
-                        "⏳ Realizando control de calidad de datos..."
-                    )
-                    import post_save_quality_check
+                    from quality_job_queue import enqueue_quality_job
 
-                    post_save_quality_check.process_quality_after_save(
-                        table_name="market_sentiment", limit=1
-                    )
+                    enqueue_quality_job("sentiment", limit=1, record_id=sentiment_id)
                     market_sentiment_container.success(
-                        "✅ Control de calidad completado correctamente"
+                        "✅ Control de calidad programado"
                     )
                     logger.info(
-                        f"Procesamiento de calidad completado para el sentimiento {sentiment_id}"
+                        f"Control de calidad encolado para el sentimiento {sentiment_id}"
                     )
                 except Exception as e:
                     market_sentiment_container.warning(
@@ -6345,6 +6346,60 @@ def display_system_status():
 
     st.markdown("</div></div>", unsafe_allow_html=True)
 
+    # Memoria de las sesiones
+    st.markdown(
+        """
+        <div class="dashboard-card">
+            <div class="dashboard-header">Memoria de Sesiones</div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    try:
+        memory_report = get_memory_report()
+        resident_mb = memory_report["resident_bytes"] / (1024 * 1024)
+        budget_mb = memory_report["memory_budget"] / (1024 * 1024)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("En memoria", f"{resident_mb:.1f} MB", f"de {budget_mb:.0f} MB")
+        col2.metric(
+            "En disco", f"{memory_report['spilled_bytes'] / (1024 * 1024):.1f} MB"
+        )
+        col3.metric("Sesiones", len(memory_report["sessions"]))
+        col4.metric(
+            "Volcados/Cargas",
+            f"{memory_report['spills']}/{memory_report['loads']}",
+        )
+        st.progress(min(resident_mb / budget_mb, 1.0) if budget_mb else 0.0)
+
+        if memory_report["keys"]:
+            st.write("**Sesión actual:**")
+            keys_df = pd.DataFrame(memory_report["keys"])
+            keys_df["KB"] = (keys_df.pop("bytes") / 1024).round(1)
+            keys_df["Presupuesto KB"] = (keys_df.pop("budget") / 1024).round(1)
+            st.dataframe(keys_df, use_container_width=True, hide_index=True)
+
+        if memory_report["sessions"]:
+            st.write("**Todas las sesiones:**")
+            sessions_df = pd.DataFrame(memory_report["sessions"])
+            sessions_df["resident"] = (sessions_df["resident"] / 1024).round(1)
+            sessions_df["spilled"] = (sessions_df["spilled"] / 1024).round(1)
+            sessions_df["last_seen"] = pd.to_datetime(
+                sessions_df["last_seen"], unit="s"
+            ).dt.strftime("%H:%M:%S")
+            sessions_df.columns = [
+                "Sesión",
+                "Memoria KB",
+                "Disco KB",
+                "Claves",
+                "Última actividad",
+            ]
+            st.dataframe(sessions_df, use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.write("**Error accediendo al uso de memoria:**", str(e))
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
     # Estado de APIs
     st.markdown(
         """
@@ -6563,6 +6618,9 @@ def main():
         # Inicialización para usuario autenticado
         initialize_session_state()
 
+        # Aplicar los presupuestos de memoria de la sesión
+        enforce_memory_budget()
+
         # Inicializar/actualizar scanner de mercado si es necesario
         if "scanner" not in st.session_state or st.session_state.scanner is None:
             try:
@@ -6818,9 +6876,7 @@ def main():
                     # Campo de entrada para nuevos mensajes
                     if prompt := st.chat_input("Pregunta sobre análisis o trading..."):
                         # Agregar mensaje del usuario
-                        st.session_state.messages.append(
-                            {"role": "user", "content": prompt}
-                        )
+                        add_chat_message("user", prompt, key="messages")
 
                         with st.chat_message("user"):
                             st.markdown(prompt)
@@ -6840,9 +6896,7 @@ def main():
                                 response = fallback_analyze_symbol(symbol, prompt)
 
                         # Agregar respuesta del asistente
-                        st.session_state.messages.append(
-                            {"role": "assistant", "content": response}
-                        )
+                        add_chat_message("assistant", response, key="messages")
 
                         with st.chat_message("assistant"):
                             st.markdown(response)
@@ -7944,6 +7998,7 @@ def main():
 
                                                     # Guardar noticias
                                                     news_ids = []
+                                                    market_data_mgr = get_market_data_manager()
                                                     if market_data_mgr:
                                                         news_ids = market_data_mgr.save_news_from_signal(
                                                             signal
@@ -8185,6 +8240,7 @@ def main():
                                                                 }
 
                                                         sentiment_id = None
+                                                        market_data_mgr = get_market_data_manager()
                                                         if market_data_mgr:
                                                             sentiment_id = market_data_mgr.save_sentiment_from_signal(
                                                                 signal
@@ -8343,34 +8399,16 @@ def main():
                                     </div>"""
                                     st.markdown(success_msg, unsafe_allow_html=True)
 
-                                    # Ejecutar post_save_quality_check.py para procesar la calidad de los datos
+                                    # Encolar el control de calidad de las señales guardadas
+                                    # (lo procesa quality_job_queue.py sin bloquear la página)
                                     try:
-                                        import post_save_quality_check
-                                        import sys
-                                        import os
-
-                                        # Asegurar que post_save_quality_check está en el path
-                                        current_dir = os.path.dirname(
-                                            os.path.abspath(__file__)
-                                        )
-                                        if current_dir not in sys.path:
-                                            sys.path.append(current_dir)
+                                        from quality_job_queue import enqueue_quality_job
 
-                                        # Procesar la calidad de los datos
-                                        result = post_save_quality_check.process_quality_after_save(
-                                            table_name="trading_signals",
-                                            limit=signals_saved,
-                                        )
-
-                                        if result:
-                                            logger.info(
-                                                f"Procesamiento de calidad completado para {signals_saved} señales. Resultado: {result}"
-                                            )
+                                        enqueue_quality_job("signals", limit=signals_saved)
                                     except Exception as e:
                                         logger.warning(
-                                            f"Error en el procesamiento de calidad: {str(e)}"
+                                            f"No se pudo encolar el control de calidad: {str(e)}"
                                         )
-                                        logger.warning("Traza completa:", exc_info=True)
 
                                 st.session_state.signals_saved = True
             except Exception as e:
@@ -8389,6 +8427,18 @@ def main():
 
 def run_quality_check():
     """Ejecuta el proceso de calidad de datos para asegurar que no haya campos vacíos"""
+    # No ejecutar en la pantalla de inicio de sesión ni en cada rerun: como mucho
+    # una vez cada 30 minutos por sesión (mismo control que la página de Notificaciones)
+    if not st.session_state.get("authenticated"):
+        return
+    last_quality_check = st.session_state.get("last_quality_check")
+    if (
+        last_quality_check is not None
+        and (datetime.now() - last_quality_check).total_seconds() <= 1800
+    ):
+        return
+    st.session_state.last_quality_check = datetime.now()
+
     try:
         # Mostrar mensaje de progreso
         quality_container = st.empty()